@@ -6,6 +6,8 @@ from fastapi import APIRouter, HTTPException, Query
 from pydantic import BaseModel, Field
 from typing import List, Dict, Optional, Any
 
+from ...services.case_corpus import get_case_corpus
+from ...services.fulltext_index import get_case_list_index
 from ...services.case_search_service import (
     case_search_service,
     CaseSearchRequest,
@@ -202,37 +204,15 @@ async def list_cases(
     외부 데이터베이스 의존 없음.
     """
     try:
-        rows = case_search_service._load_local_cases()
+        # 필터 → 정렬된 케이스 위치 (전문 색인 포스팅 교집합, 같은 필터의 다음 페이지는 캐시)
+        snap = get_case_corpus().snapshot()
+        ids = get_case_list_index(snap).query(search, constitution, outcome)
 
-        # 필터링
-        filtered = rows
-        if search:
-            q = search.lower()
-            filtered = [
-                r for r in filtered
-                if q in (r.get("chief_complaint") or "").lower()
-                or q in (r.get("formula_name") or "").lower()
-                or q in (r.get("diagnosis") or "").lower()
-                or q in (r.get("differentiation") or "").lower()
-                or q in (r.get("title") or "").lower()
-                or q in (r.get("full_text") or "").lower()
-            ]
-        if constitution:
-            filtered = [
-                r for r in filtered
-                if (r.get("patient_constitution") or "") == constitution
-            ]
-        if outcome:
-            filtered = [
-                r for r in filtered
-                if outcome in (r.get("result") or "")
-            ]
-
-        total = len(filtered)
+        total = len(ids)
         total_pages = (total + limit - 1) // limit if total > 0 else 0
 
         offset = (page - 1) * limit
-        page_rows = filtered[offset: offset + limit]
+        page_rows = snap.rows(ids[offset: offset + limit].tolist())
 
         # 응답 포맷 변환
         cases = []
@@ -2,6 +2,8 @@
 치험례 수집기 관리 API
 """
 
+import asyncio
+
 from fastapi import APIRouter, HTTPException, BackgroundTasks
 from pydantic import BaseModel, Field
 from typing import List, Optional
@@ -18,6 +20,7 @@ class CollectionRequest(BaseModel):
     sources: Optional[List[str]] = Field(None, description="수집 소스 (기본: 전체)")
     keywords: Optional[List[str]] = Field(None, description="검색 키워드 (기본: 치험례 관련)")
     max_articles: int = Field(50, ge=1, le=200, description="최대 논문 수")
+    incremental: bool = Field(True, description="소스·키워드별 표식 이후만 검색 (False 면 전체 재검색)")
 
 
 class ApproveRequest(BaseModel):
@@ -52,7 +55,26 @@ async def trigger_collection(
     수집 수동 실행
 
     백그라운드에서 수집을 실행하고 즉시 응답합니다.
+    수집을 다른 프로세스(수집 워커)가 맡고 있으면 실행 요청만 남깁니다.
     """
+    if collector_scheduler.delegated:
+        if collector_scheduler.get_status()["is_running"]:
+            raise HTTPException(status_code=409, detail="Collection is already in progress")
+        request_id = collector_scheduler.request_collection(
+            sources=request.sources,
+            keywords=request.keywords,
+            max_articles=request.max_articles,
+            incremental=request.incremental,
+        )
+        if request_id is None:
+            raise HTTPException(status_code=409, detail="Collection is already requested")
+        return {
+            "message": "Collection requested",
+            "request_id": request_id,
+            "sources": request.sources or list(collector_scheduler.adapters.keys()),
+            "max_articles": request.max_articles,
+        }
+
     if collector_scheduler.is_running:
         raise HTTPException(
             status_code=409,
@@ -65,6 +87,7 @@ async def trigger_collection(
         sources=request.sources,
         keywords=request.keywords,
         max_articles=request.max_articles,
+        incremental=request.incremental,
     )
 
     return {
@@ -86,23 +109,32 @@ async def get_collection_logs(limit: int = 50):
 
 
 @router.get("/pending")
-async def get_pending_cases(limit: int = 50, offset: int = 0):
+async def get_pending_cases(limit: int = 50, offset: int = 0, cursor: Optional[str] = None):
     """
     대기 중인 케이스 목록
 
     검토 대기 중인 케이스 목록을 반환합니다.
+    다음 페이지는 응답의 next_cursor 를 cursor 로 넘겨 조회합니다 (offset 은 하위 호환용).
     """
-    pending = collector_scheduler.storage.load_pending_cases()
+    storage = collector_scheduler.storage
 
-    # 페이지네이션
-    total = len(pending)
-    paginated = pending[offset:offset + limit]
+    # 페이지네이션 (요청한 페이지만 저장소에서 읽음, total 은 유지되는 건수)
+    total = storage.pending_count()
+    next_cursor = None
+    try:
+        if offset:
+            paginated = storage.load_pending_cases(offset, limit)
+        else:
+            paginated, next_cursor = storage.load_pending_page(cursor, limit)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="invalid cursor")
 
     return {
         "cases": paginated,
         "total": total,
         "limit": limit,
         "offset": offset,
+        "next_cursor": next_cursor,
     }
 
 
@@ -113,7 +145,8 @@ async def approve_cases(request: ApproveRequest):
 
     대기 중인 케이스를 승인하여 통합 데이터에 추가합니다.
     """
-    count = collector_scheduler.storage.approve_cases(request.case_ids)
+    # 코퍼스 스냅샷 확장이 이벤트 루프를 막지 않도록 스레드에서
+    count = await asyncio.to_thread(collector_scheduler.storage.approve_cases, request.case_ids)
 
     return {
         "message": f"{count} cases approved",
@@ -146,7 +179,7 @@ async def auto_approve_high_confidence(threshold: float = 0.9):
 
     지정된 신뢰도 이상의 케이스를 자동으로 승인합니다.
     """
-    count = collector_scheduler.storage.auto_approve_high_confidence(threshold)
+    count = await asyncio.to_thread(collector_scheduler.storage.auto_approve_high_confidence, threshold)
 
     return {
         "message": f"{count} cases auto-approved",
@@ -193,13 +226,17 @@ async def get_llm_metrics_daily(days: int = 30):
 # ============ Failed Extraction Queue ============
 
 @router.get("/failed")
-async def list_failed_extractions(limit: int = 50, offset: int = 0):
+async def list_failed_extractions(limit: int = 50, offset: int = 0, cursor: Optional[str] = None):
     """
     추출 실패 큐 조회
 
     규칙 기반·LLM 폴백 모두 실패한 항목을 반환합니다.
+    다음 페이지는 응답의 next_cursor 를 cursor 로 넘겨 조회합니다.
     """
-    return collector_scheduler.failed_storage.list_pending(limit=limit, offset=offset)
+    try:
+        return collector_scheduler.failed_storage.list_pending(limit=limit, offset=offset, cursor=cursor)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="invalid cursor")
 
 
 @router.get("/failed/dead-letter")
@@ -221,60 +258,10 @@ async def retry_failed_extractions(request: RetryRequest):
 
     저장된 article_text_excerpt 로 추출기를 재실행합니다.
     성공한 항목은 정상 파이프라인으로 흘려보내고 큐에서 제거합니다.
+    수집을 다른 프로세스(수집 워커)가 맡고 있으면 재시도 요청만 남깁니다.
     """
-    candidates = collector_scheduler.failed_storage.get_retry_candidates()
-    if request.keys:
-        keyset = set(request.keys)
-        candidates = [c for c in candidates if c.get("key") in keyset]
-
-    extractor = collector_scheduler.extractor
-    normalizer = collector_scheduler.normalizer
-    validator = collector_scheduler.validator
-    storage = collector_scheduler.storage
-    failed_store = collector_scheduler.failed_storage
-
-    succeeded = 0
-    still_failing = 0
-    new_pending: List[dict] = []
-
-    for item in candidates:
-        article_info = item.get("article_info", {})
-        article_text = item.get("article_text_excerpt", "")
-        try:
-            cases = extractor.extract_cases(article_text, article_info)
-        except Exception as e:
-            failed_store.add_failure(article_info, article_text, f"retry_error: {e}")
-            still_failing += 1
-            continue
-
-        if not cases:
-            failed_store.add_failure(article_info, article_text, "retry_no_cases")
-            still_failing += 1
-            continue
-
-        for case in cases:
-            d = normalizer.normalize(case.to_dict())
-            v = validator.validate(d)
-            if v.is_valid:
-                new_pending.append(d)
-
-        failed_store.remove_success(item["key"])
-        succeeded += 1
-
-    if new_pending:
-        # 신뢰도 기준으로 자동 승인 / pending 분리
-        threshold = collector_scheduler.auto_approve_threshold
-        auto = [c for c in new_pending if c.get("confidence_score", 0) >= threshold]
-        pend = [c for c in new_pending if c.get("confidence_score", 0) < threshold]
-        if auto:
-            storage.add_to_pending(auto)
-            storage.approve_cases([c["id"] for c in auto])
-        if pend:
-            storage.add_to_pending(pend)
+    if collector_scheduler.delegated:
+        request_id = collector_scheduler.request_retry(request.keys)
+        return {"message": "Retry requested", "request_id": request_id}
 
-    return {
-        "attempted": len(candidates),
-        "succeeded": succeeded,
-        "still_failing": still_failing,
-        "new_cases": len(new_pending),
-    }
+    return await collector_scheduler.retry_failed(request.keys)
@@ -2,6 +2,8 @@ from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel, Field
 from typing import List, Optional
 
+from ...services.case_search_service import case_search_service
+
 router = APIRouter()
 
 class SearchRequest(BaseModel):
@@ -27,13 +29,41 @@ async def search_similar_cases(
     search_request: SearchRequest,
 ):
     """
-    증상 기반 유사 치험례 검색 (더미 데이터)
-    
-    Note: 현재 벡터 DB가 비활성화되어 있어 더미 데이터를 반환합니다.
-    실제 처방 추천은 /api/v1/recommend 엔드포인트를 사용하세요.
+    증상 기반 유사 치험례 검색
+
+    로컬 벡터 색인(data/vector_index)이 있으면 실제 유사도 검색 결과를,
+    없으면 더미 데이터를 반환합니다.
+    처방 추천은 /api/v1/recommend 엔드포인트를 사용하세요.
     """
     query = ", ".join(search_request.symptoms)
-    
+
+    vector_service = case_search_service.vector_service
+    if vector_service.index is not None:
+        filter_dict = None
+        if search_request.constitution:
+            filter_dict = {"patient_constitution": {"$eq": search_request.constitution}}
+        hits = await vector_service.search(
+            query=f"증상: {query}",
+            filter_dict=filter_dict,
+            top_k=search_request.top_k,
+        )
+        results = [
+            CaseMatch(
+                case_id=hit['metadata'].get('case_id') or hit['id'],
+                similarity_score=round(hit['score'], 4),
+                chief_complaint=hit['metadata'].get('chief_complaint') or '',
+                symptoms=", ".join(str(s) for s in hit['metadata'].get('symptoms') or []),
+                formula_name=hit['metadata'].get('formula_name') or None,
+            )
+            for hit in hits
+        ]
+        return SearchResponse(
+            query=query,
+            total_results=len(results),
+            results=results,
+            note="로컬 벡터 색인 검색 결과입니다.",
+        )
+
     return SearchResponse(
         query=query,
         total_results=2,
@@ -53,5 +83,5 @@ async def search_similar_cases(
                 formula_name="육군자탕",
             ),
         ],
-        note="벡터 DB 비활성화 - 더미 데이터입니다. /api/v1/recommend 엔드포인트로 GPT 기반 추천을 받으세요."
+        note="벡터 색인 없음 - 더미 데이터입니다. scripts/index_cases.py 로 색인을 만들거나 /api/v1/recommend 엔드포인트로 GPT 기반 추천을 받으세요."
     )
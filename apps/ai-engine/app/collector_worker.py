@@ -0,0 +1,51 @@
+"""
+치험례 수집 워커 — API 와 별도 프로세스에서 스케줄링과 수집 파이프라인을 맡는다
+
+    python -m app.collector_worker
+
+API 는 COLLECTOR_MODE=worker 로 띄우면 수집을 하지 않고 /collector/* 요청을 공유 저장소
+(data/collector — COLLECTOR_STORAGE_BACKEND=sqlite)로 이 워커에 넘긴다.
+워커를 여러 개 띄우면 leader.lock 을 잡은 하나만 수집하고, 나머지는 대기하다가
+리더가 죽으면(락이 풀리면) 이어받는다.
+"""
+
+import asyncio
+import signal
+
+from .core.logger import get_logger
+from .services.collector import collector_scheduler
+from .services.collector.coordination import HEARTBEAT_SEC
+
+logger = get_logger("collector_worker")
+
+
+async def main() -> None:
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    # 다른 워커가 리더면 락이 풀릴 때까지 대기
+    waiting = False
+    while not collector_scheduler.leader_lock.acquire(blocking=False):
+        if not waiting:
+            logger.info("Another collector worker is the leader — standing by")
+            waiting = True
+        try:
+            await asyncio.wait_for(stop.wait(), timeout=HEARTBEAT_SEC)
+            return
+        except asyncio.TimeoutError:
+            continue
+
+    logger.info("Collector worker started (leader)")
+    await collector_scheduler.initialize(standalone=True)
+    try:
+        await stop.wait()
+    finally:
+        logger.info("Collector worker shutting down...")
+        await collector_scheduler.cleanup()
+        collector_scheduler.storage.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
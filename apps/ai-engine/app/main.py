@@ -1,3 +1,5 @@
+import asyncio
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
@@ -6,6 +8,7 @@ from .core.config import settings
 from .core.logger import get_logger
 from .core.middleware import ResponseWrapperMiddleware
 from .api.v1 import retrieval, recommendation, interaction, case_search, subscription, patient_explanation, formula_recommendation, statistics, collector, personalization
+from .services.case_corpus import get_case_corpus
 from .services.collector import collector_scheduler
 
 logger = get_logger("main")
@@ -22,6 +25,12 @@ async def lifespan(app: FastAPI):
         "configured" if settings.OPENAI_API_KEY else "not set",
     )
 
+    # 치험례 코퍼스 1회 로드 (통계/처방추천/치험례 검색 공유)
+    try:
+        await asyncio.to_thread(get_case_corpus().load)
+    except Exception:
+        logger.exception("Case corpus load failed")
+
     # 치험례 수집기 초기화
     try:
         await collector_scheduler.initialize()
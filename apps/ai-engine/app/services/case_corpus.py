@@ -0,0 +1,488 @@
+"""
+치험례 코퍼스 — 프로세스 전역 1회 로드 + 사전 계산 인덱스.
+
+배경:
+- statistics / formula_recommendation 라우터는 요청마다 extracted_cases.json 을,
+  CaseSearchService 는 all_cases_combined.json 을 각자 json.load 했다.
+  6천 건 규모에서 요청마다 수백 ms 파싱 + 일시적 메모리 스파이크가 생긴다.
+
+동작:
+- 앱 lifespan 시작 시 한 번 로드해 CorpusSnapshot(케이스 + 인덱스)을 만든다.
+- 파일 mtime 이 바뀌거나 reload() 가 명시 호출되면 새 스냅샷을 통째로 만든 뒤
+  참조 하나만 교체한다(atomic swap). 읽는 쪽은 snapshot() 으로 받은 객체만 쓰므로
+  교체 도중에도 반쯤 갱신된 인덱스를 보지 않는다.
+- snapshot() 이 변경을 감지하면 리로드(파생 인덱스 포함 수백 ms)는 백그라운드 스레드
+  하나가 맡고, 호출자는 끝날 때까지 기존 스냅샷을 받는다 (async 라우터의 이벤트 루프를
+  막지 않는다). 최초 로드만 동기.
+
+케이스 저장:
+- 파일에서 읽은 케이스는 dict 목록이 아니라 열 저장소(CaseStore)에 둔다.
+  cases[i] 는 dict 처럼 읽는 CaseRow 뷰이고, 큰 텍스트 필드는 접근할 때만 디코드한다.
+- 원본 옆 바이너리 스냅샷(case_snapshot)이 원본과 일치하면 JSON 대신 mmap 으로 연다.
+
+인덱스 (값은 cases 리스트의 위치 인덱스):
+- by_formula: formula_name 정확 일치
+- by_symptom: 증상 소문자/strip 키
+- by_constitution / by_diagnosis: 정확 일치
+- by_age_band: 통계 API 와 같은 연령대 구간 (미상 포함)
+
+파생 인덱스:
+- 각 서비스가 register_derived(name, builder) 로 자기 전용 인덱스(검색 역색인 등)를
+  등록하면 load() 가 스냅샷 교체 전에 함께 만든다. 등록이 로드보다 늦으면
+  snapshot.derived(name) 첫 호출 때 만들어 해당 스냅샷에 붙여 둔다.
+
+승인 로그:
+- 케이스 승인(CaseStorage.approve_cases)은 통합 파일을 다시 쓰지 않고 승인 로그
+  (case_log — `all_cases_combined.log/` 또는 collector.db)에 덧붙인다. 로드 시 통합 파일 + 아직 병합되지
+  않은 로그 케이스를 합치고, 로그 상태(세그먼트/크기)도 mtime 과 함께 변경 감지에 쓴다.
+
+증분 추가:
+- append() 는 파일을 다시 파싱하지 않고 기존 스냅샷 + 새로 승인된 케이스로 새 스냅샷을
+  만든다. 기본 인덱스는 새 케이스가 건드린 키의 리스트만 복사하고, 파생 인덱스는
+  extend 함수가 등록돼 있으면 증분 갱신, 없으면 새로 만든다.
+- 승인 직전 상태(prior)가 스냅샷과 다르면 다른 프로세스의 승인이 로그에 끼어 있는 것이므로
+  append 후 전체 리로드를 백그라운드로 건다 (그 케이스들을 잃지 않도록).
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Iterable, Mapping, Optional, Sequence
+
+from ..core.logger import get_logger
+from .case_log import approved_db_path, approved_log_dir, approved_state, read_approved
+from .case_snapshot import load_cases
+from .case_store import compact_cases, release_free_heap
+
+logger = get_logger("case_corpus")
+
+DATA_DIR = Path(__file__).resolve().parents[2] / "data"
+PRIMARY_FILENAME = "all_cases_combined.json"
+FALLBACK_FILENAME = "extracted_cases.json"
+
+UNKNOWN = "미상"
+AGE_BANDS = ("0-12", "13-19", "20-39", "40-59", "60+")
+
+
+# 파생 인덱스 빌더 레지스트리: name → builder(snapshot)
+_DERIVED_BUILDERS: dict[str, Callable[["CorpusSnapshot"], Any]] = {}
+# 증분 갱신 함수: name → extend(old_value, new_snapshot, start) — start 는 새 케이스 시작 위치
+_DERIVED_EXTENDERS: dict[str, Callable[[Any, "CorpusSnapshot", int], Any]] = {}
+
+
+def register_derived(
+    name: str,
+    builder: Callable[["CorpusSnapshot"], Any],
+    extend: Optional[Callable[[Any, "CorpusSnapshot", int], Any]] = None,
+) -> None:
+    """스냅샷마다 한 번 만들 파생 인덱스 등록 (같은 이름은 덮어씀)."""
+    _DERIVED_BUILDERS[name] = builder
+    if extend is not None:
+        _DERIVED_EXTENDERS[name] = extend
+    else:
+        _DERIVED_EXTENDERS.pop(name, None)
+
+
+def age_band(age: Any) -> str:
+    """나이 → 통계 API 연령대 라벨. 0/None/비정상 값은 '미상'."""
+    if not age:
+        return UNKNOWN
+    try:
+        age = int(age)
+    except (TypeError, ValueError):
+        return UNKNOWN
+    if age <= 12:
+        return "0-12"
+    if age <= 19:
+        return "13-19"
+    if age <= 39:
+        return "20-39"
+    if age <= 59:
+        return "40-59"
+    return "60+"
+
+
+def symptom_key(symptom: Any) -> str:
+    """by_symptom 인덱스 키 정규화."""
+    return str(symptom).strip().lower()
+
+
+@dataclass
+class CorpusSnapshot:
+    """로드 시점의 케이스 + 인덱스. 생성 후에는 수정하지 않는다."""
+
+    cases: Sequence[Mapping[str, Any]]
+    version: int = 0
+    source: Optional[Path] = None
+    mtime: float = 0.0
+    # 승인 로그 상태 (case_log.approved_state) — 로드/추가 시점에 반영된 것
+    log_state: tuple = ()
+    # 승인 로그에서 읽거나 append 로 붙인 케이스 id — append 가 같은 케이스를 두 번 붙이지 않도록
+    approved_ids: frozenset = frozenset()
+    loaded_at: float = field(default_factory=time.time)
+    by_formula: dict[str, list[int]] = field(default_factory=dict)
+    by_symptom: dict[str, list[int]] = field(default_factory=dict)
+    by_constitution: dict[str, list[int]] = field(default_factory=dict)
+    by_diagnosis: dict[str, list[int]] = field(default_factory=dict)
+    by_age_band: dict[str, list[int]] = field(default_factory=dict)
+    real_count: int = 0
+    _derived: dict[str, Any] = field(default_factory=dict, repr=False)
+    # 파생 인덱스가 다른 파생 인덱스를 재사용할 수 있도록 재진입 가능 락
+    _derived_lock: threading.RLock = field(default_factory=threading.RLock, repr=False)
+
+    def __len__(self) -> int:
+        return len(self.cases)
+
+    def derived(self, name: str) -> Any:
+        """등록된 파생 인덱스. 아직 없으면 이 스냅샷 기준으로 만든다."""
+        value = self._derived.get(name)
+        if value is None:
+            with self._derived_lock:
+                value = self._derived.get(name)
+                if value is None:
+                    builder = _DERIVED_BUILDERS.get(name)
+                    if builder is None:
+                        raise KeyError(f"unknown derived index: {name}")
+                    value = builder(self)
+                    self._derived[name] = value
+        return value
+
+    def build_derived(self) -> None:
+        """등록된 모든 파생 인덱스를 미리 만든다 (로드 시 스냅샷 교체 전)."""
+        for name in list(_DERIVED_BUILDERS):
+            try:
+                self.derived(name)
+            except Exception:
+                logger.exception("derived index '%s' build failed", name)
+
+    def rows(self, ids: Iterable[int]) -> list[Mapping[str, Any]]:
+        cases = self.cases
+        return [cases[i] for i in ids]
+
+
+def _index_cases(
+    snap: CorpusSnapshot,
+    cases: Sequence[Mapping],
+    start: int,
+    touched: Optional[set] = None,
+) -> None:
+    """
+    cases 를 start 위치부터 snap 인덱스에 추가.
+    touched 가 주어지면 처음 건드리는 키의 리스트를 복사한 뒤 추가한다(copy-on-write).
+    """
+
+    def add(index: dict[str, list[int]], key: str, i: int) -> None:
+        if touched is not None:
+            marker = (id(index), key)
+            if marker not in touched:
+                touched.add(marker)
+                index[key] = list(index.get(key, ()))
+        index.setdefault(key, []).append(i)
+
+    for i, case in enumerate(cases, start):
+        formula = case.get("formula_name") or ""
+        if formula:
+            add(snap.by_formula, formula, i)
+
+        constitution = case.get("patient_constitution") or ""
+        if constitution:
+            add(snap.by_constitution, constitution, i)
+
+        diagnosis = case.get("diagnosis") or ""
+        if diagnosis:
+            add(snap.by_diagnosis, diagnosis, i)
+
+        add(snap.by_age_band, age_band(case.get("patient_age")), i)
+
+        seen: set[str] = set()
+        for s in case.get("symptoms") or []:
+            key = symptom_key(s)
+            if key and key not in seen:
+                seen.add(key)
+                add(snap.by_symptom, key, i)
+
+        if case.get("is_real_case"):
+            snap.real_count += 1
+
+
+def build_snapshot(
+    cases: Sequence[Mapping],
+    version: int = 0,
+    source: Optional[Path] = None,
+    mtime: float = 0.0,
+    log_state: tuple = (),
+) -> CorpusSnapshot:
+    """케이스 리스트를 한 번 순회하며 모든 인덱스를 만든다."""
+    snap = CorpusSnapshot(
+        cases=cases,
+        version=version,
+        source=source,
+        mtime=mtime,
+        log_state=log_state,
+        by_age_band={band: [] for band in (*AGE_BANDS, UNKNOWN)},
+    )
+    _index_cases(snap, cases, 0)
+    return snap
+
+
+def extend_snapshot(
+    base: CorpusSnapshot,
+    new_cases: list[dict],
+    version: int = 0,
+    mtime: float = 0.0,
+    log_state: tuple = (),
+) -> CorpusSnapshot:
+    """
+    base 뒤에 new_cases 를 붙인 새 스냅샷. base 는 바뀌지 않는다.
+    파생 인덱스는 extend 함수가 있으면 증분 갱신, 없으면 새로 만든다.
+    """
+    start = len(base.cases)
+    snap = CorpusSnapshot(
+        # CaseStore 는 기존 블록을 공유하고 새 블록만 붙인다
+        cases=base.cases + list(new_cases),
+        version=version,
+        source=base.source,
+        mtime=mtime,
+        log_state=log_state,
+        approved_ids=base.approved_ids | _case_ids(new_cases),
+        by_formula=dict(base.by_formula),
+        by_symptom=dict(base.by_symptom),
+        by_constitution=dict(base.by_constitution),
+        by_diagnosis=dict(base.by_diagnosis),
+        by_age_band=dict(base.by_age_band),
+        real_count=base.real_count,
+    )
+    _index_cases(snap, snap.cases[start:], start, touched=set())
+
+    for name, extend in list(_DERIVED_EXTENDERS.items()):
+        old = base._derived.get(name)
+        if old is None:
+            continue
+        try:
+            snap._derived[name] = extend(old, snap, start)
+        except Exception:
+            logger.exception("derived index '%s' extend failed — rebuilding", name)
+    snap.build_derived()
+    return snap
+
+
+def _case_ids(cases: Iterable[Mapping]) -> frozenset:
+    return frozenset(c["id"] for c in cases if c.get("id") is not None)
+
+
+class CaseCorpus:
+    """치험례 코퍼스 매니저 — 현재 스냅샷 보관 + 교체."""
+
+    # mtime 확인 주기 (초). 요청마다 stat() 하지 않도록 완충.
+    RELOAD_CHECK_INTERVAL = float(os.getenv("CASE_CORPUS_RELOAD_CHECK_SECONDS", "5"))
+
+    def __init__(self, data_dir: Optional[Path] = None) -> None:
+        self.data_dir = Path(data_dir) if data_dir is not None else DATA_DIR
+        self._snapshot: Optional[CorpusSnapshot] = None
+        self._lock = threading.Lock()
+        self._version = 0
+        self._last_check = 0.0
+        # 백그라운드 리로드 (한 번에 하나)
+        self._refresh: Optional[threading.Thread] = None
+        self._refresh_lock = threading.Lock()
+
+    # ---------- 경로 ----------
+
+    def resolve_source(self) -> Optional[Path]:
+        """통합 파일 우선, 없으면 extracted_cases.json, 둘 다 없으면 승인 로그만 있는 통합 파일."""
+        primary = self.data_dir / PRIMARY_FILENAME
+        fallback = self.data_dir / FALLBACK_FILENAME
+        if primary.exists():
+            return primary
+        if fallback.exists():
+            return fallback
+        if approved_log_dir(primary).exists() or approved_db_path(primary).exists():
+            return primary
+        return None
+
+    @staticmethod
+    def _mtime(path: Optional[Path]) -> float:
+        if path is None:
+            return 0.0
+        try:
+            return path.stat().st_mtime
+        except OSError:
+            return 0.0
+
+    # ---------- 로드 / 교체 ----------
+
+    def _read(self) -> CorpusSnapshot:
+        source = self.resolve_source()
+        mtime = self._mtime(source)
+        state: tuple = ()
+        cases: Sequence[Mapping] = []
+        approved: list[dict] = []
+        if source is not None:
+            # 로그 상태를 먼저 잡는다 — 읽는 도중 붙은 승인은 다음 확인 때 리로드
+            state = approved_state(source)
+            if source.exists():
+                # 열 저장소로 (상주 메모리 절감) — 일치하는 바이너리 스냅샷이 있으면 mmap
+                cases = load_cases(source)
+            approved = read_approved(source)
+            if approved:
+                cases = cases + approved if cases else compact_cases(approved)
+        self._version += 1
+        snap = build_snapshot(cases, version=self._version, source=source, mtime=mtime, log_state=state)
+        snap.approved_ids = _case_ids(approved)
+        snap.build_derived()
+        return snap
+
+    def load(self) -> CorpusSnapshot:
+        """강제 (재)로드 후 스냅샷 교체. 실패하면 기존 스냅샷을 유지한다."""
+        with self._lock:
+            start = time.perf_counter()
+            try:
+                snap = self._read()
+            except Exception:
+                logger.exception("case corpus load failed — keeping previous snapshot")
+                if self._snapshot is None:
+                    self._snapshot = build_snapshot([])
+                return self._snapshot
+
+            self._snapshot = snap
+            self._last_check = time.monotonic()
+            release_free_heap()
+            if snap.source is None:
+                logger.warning("No local case data found in %s", self.data_dir)
+            else:
+                logger.info(
+                    "Case corpus loaded: %d cases (real: %d) from %s in %.0fms (v%d)",
+                    len(snap),
+                    snap.real_count,
+                    snap.source.name,
+                    (time.perf_counter() - start) * 1000,
+                    snap.version,
+                )
+            return snap
+
+    def reload(self) -> CorpusSnapshot:
+        """명시적 reload 훅 (승인 직후, 운영 스크립트 등)."""
+        return self.load()
+
+    def source_state(self, source: Path) -> tuple:
+        """(통합 파일 mtime, 승인 로그 상태) — 승인 직전에 잡아 append(prior=...) 로 넘긴다."""
+        return self._mtime(Path(source)), approved_state(Path(source))
+
+    def append(
+        self,
+        cases: list[dict],
+        source: Optional[Path] = None,
+        prior: Optional[tuple] = None,
+    ) -> Optional[CorpusSnapshot]:
+        """
+        source 의 승인 로그에 cases 가 추가됐을 때 재파싱 없이 스냅샷 확장.
+
+        현재 스냅샷이 다른 파일에서 왔거나 아직 로드 전이면 아무것도 하지 않고
+        None 을 반환한다(다음 mtime 확인 때 전체 리로드).
+
+        새 스냅샷은 코퍼스 락만 잡고 만든 뒤 교체한다 — 읽는 쪽은 그동안 기존 스냅샷을 본다.
+        extend 함수가 없는 파생 인덱스는 다시 만들므로 호출자는 이벤트 루프나
+        CaseStorage 락 밖(스레드)에서 부른다.
+
+        Args:
+            cases: 이 프로세스가 방금 승인 로그에 쓴 케이스
+            source: 통합 JSON 경로
+            prior: 쓰기 직전의 source_state(). 스냅샷이 그 상태가 아니면 다른 프로세스
+                (수집 리더 등)가 그 사이 승인한 케이스가 있다는 뜻 — cases 만 붙이고
+                로그 상태는 옛것으로 둬 백그라운드 전체 리로드가 나머지를 읽게 한다.
+        """
+        with self._lock:
+            base = self._snapshot
+            if base is None or base.source is None:
+                return None
+            if source is not None and Path(source).resolve() != base.source.resolve():
+                return None
+            mtime = self._mtime(base.source)
+            state = approved_state(base.source)
+            # 그 사이 리로드로 이미 반영됐으면 중복 추가하지 않는다
+            if (mtime, state) == (base.mtime, base.log_state):
+                return base
+            # 리로드가 쓰기와 겹쳐 일부만 읽혔을 수 있다 — 이미 있는 id 는 건너뜀
+            cases = [c for c in cases if c.get("id") is None or c.get("id") not in base.approved_ids]
+            if not cases:
+                return base
+
+            # 스냅샷 이후 다른 쓰기가 있었으면 로그 상태를 올리지 않는다 (is_stale 유지)
+            unseen = prior != (base.mtime, base.log_state)
+            if unseen:
+                mtime, state = base.mtime, base.log_state
+
+            start = time.perf_counter()
+            self._version += 1
+            snap = extend_snapshot(base, cases, version=self._version, mtime=mtime, log_state=state)
+            self._snapshot = snap
+            logger.info(
+                "Case corpus appended: +%d cases → %d in %.0fms (v%d)%s",
+                len(cases),
+                len(snap),
+                (time.perf_counter() - start) * 1000,
+                snap.version,
+                " — reloading for approvals from other writers" if unseen else "",
+            )
+        if unseen:
+            self.refresh_in_background()
+        return snap
+
+    def is_stale(self) -> bool:
+        snap = self._snapshot
+        if snap is None:
+            return True
+        source = self.resolve_source()
+        if source != snap.source or self._mtime(source) != snap.mtime:
+            return True
+        return source is not None and approved_state(source) != snap.log_state
+
+    def refresh_in_background(self) -> bool:
+        """백그라운드 스레드에서 리로드. 이미 리로드 중이면 새로 시작하지 않고 False."""
+        with self._refresh_lock:
+            if self._lock.locked() or (self._refresh is not None and self._refresh.is_alive()):
+                return False
+            self._refresh = threading.Thread(target=self.load, name="case-corpus-reload", daemon=True)
+            self._refresh.start()
+            return True
+
+    def wait_for_refresh(self, timeout: Optional[float] = None) -> CorpusSnapshot:
+        """진행 중인 백그라운드 리로드를 기다린 뒤 현재 스냅샷 (운영 스크립트·테스트용)."""
+        refresh = self._refresh
+        if refresh is not None:
+            refresh.join(timeout)
+        return self._snapshot if self._snapshot is not None else self.load()
+
+    def snapshot(self) -> CorpusSnapshot:
+        """
+        현재 스냅샷. 최초 호출 시 로드, 이후 주기적으로 mtime 변경을 확인한다.
+        변경이 있으면 백그라운드 리로드를 걸고, 교체될 때까지는 기존 스냅샷을 돌려준다.
+        """
+        snap = self._snapshot
+        if snap is None:
+            return self.load()
+
+        now = time.monotonic()
+        if now - self._last_check >= self.RELOAD_CHECK_INTERVAL:
+            self._last_check = now
+            if self.is_stale():
+                self.refresh_in_background()
+        return snap
+
+    @property
+    def cases(self) -> Sequence[Mapping[str, Any]]:
+        return self.snapshot().cases
+
+
+_corpus: CaseCorpus | None = None
+
+
+def get_case_corpus() -> CaseCorpus:
+    global _corpus
+    if _corpus is None:
+        _corpus = CaseCorpus()
+    return _corpus
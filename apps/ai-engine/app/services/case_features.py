@@ -0,0 +1,226 @@
+"""
+치험례 스코어링 피처 테이블 — HybridScorer.score_batch 용.
+
+calculate_score 는 케이스마다 증상 정규화·집합 생성·문자열 비교를 반복한다.
+여기서는 코퍼스(또는 Pinecone 메타데이터 목록)에 대해 한 번만:
+- 주소증/제목/진단/처방명: 소문자 term 어휘 + n-gram 색인 (부분 문자열 판정)
+- 정규화 증상: 키 → doc_id 포스팅
+- 체질/성별: 어휘 코드 배열 (없으면 -1)
+- 나이: 정수 배열 + 유효 mask
+를 만들어 두고, 질의 쪽 판정은 어휘 단위로 한 번 계산한 뒤 doc 배열로 gather 한다.
+
+코퍼스 스냅샷 파생 인덱스(case_search 역색인 + case_features)의 이름과 등록, 점수 반올림(round1)도
+여기 둔다 — 검색 서비스와 처방 추천이 서로의 모듈을 import 하지 않도록.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from .case_corpus import register_derived
+from .case_search_index import CaseSearchIndex
+from .text_index import NgramIndex
+
+# 코퍼스 스냅샷 파생 인덱스 이름 — 검색(case_search_service)과 처방 추천(formula_recommender)이 함께 쓴다
+SEARCH_INDEX_NAME = 'case_search'
+FEATURES_NAME = 'case_features'
+
+
+def _codes(values: List, vocab: Dict[str, int]) -> np.ndarray:
+    """값 → 어휘 코드. 빈 값은 -1."""
+    out = np.full(len(values), -1, dtype=np.int32)
+    for i, v in enumerate(values):
+        if v:
+            code = vocab.get(v)
+            if code is None:
+                code = vocab[v] = len(vocab)
+            out[i] = code
+    return out
+
+
+def round1(values: np.ndarray) -> np.ndarray:
+    """
+    파이썬 round(x, 1) 과 같은 결과.
+    np.round 는 x*10 을 rint 하므로 .x5 경계 근처에서 round() 와 다를 수 있어,
+    그런 값만 파이썬 round 로 다시 계산한다.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    out = np.round(values, 1)
+    scaled = values * 10
+    near_tie = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+    for i in np.flatnonzero(near_tie).tolist():
+        out[i] = round(float(values[i]), 1)
+    return out
+
+
+@dataclass
+class CaseFeatures:
+    """케이스 피처 (doc_id = cases 리스트 위치)."""
+
+    size: int
+    chief: NgramIndex
+    chief_term: np.ndarray          # doc → chief term_id (빈 주소증은 -1)
+    title: NgramIndex
+    diagnosis: NgramIndex
+    formula: NgramIndex
+    symptom_postings: Dict[str, np.ndarray]
+    constitution: np.ndarray        # 어휘 코드 (없으면 -1)
+    gender: np.ndarray
+    age: np.ndarray                 # int64 (미상은 0)
+    age_known: np.ndarray           # bool
+    constitution_vocab: Dict[str, int] = field(default_factory=dict)
+    gender_vocab: Dict[str, int] = field(default_factory=dict)
+
+    @classmethod
+    def build(
+        cls,
+        cases: Sequence[Dict],
+        normalize: Callable[[str], str],
+        n: int = 3,
+        title: Optional[NgramIndex] = None,
+        symptom_postings: Optional[Dict[str, np.ndarray]] = None,
+    ) -> "CaseFeatures":
+        """
+        Args:
+            cases: 케이스 dict 목록
+            normalize: 증상 정규화 함수 (HybridScorer.normalize_symptom)
+            title / symptom_postings: CaseSearchIndex 가 이미 가진 같은 색인 (재사용)
+        """
+        chief = NgramIndex(n)
+        diagnosis = NgramIndex(n)
+        formula = NgramIndex(n)
+        build_title = title is None
+        if build_title:
+            title = NgramIndex(n)
+        postings: Dict[str, List[int]] = {}
+
+        constitutions: List = []
+        genders: List = []
+        ages = np.zeros(len(cases), dtype=np.int64)
+        age_known = np.zeros(len(cases), dtype=bool)
+
+        for i, case in enumerate(cases):
+            case_chief = (case.get('chief_complaint') or '').lower()
+            if case_chief:
+                chief.add(i, case_chief)
+            if build_title:
+                title.add(i, (case.get('title') or '').lower())
+            case_diagnosis = (case.get('diagnosis') or '').lower()
+            if case_diagnosis:
+                diagnosis.add(i, case_diagnosis)
+            case_formula = (case.get('formula_name') or '').lower()
+            if case_formula:
+                formula.add(i, case_formula)
+
+            if symptom_postings is None:
+                for s in (case.get('symptoms') or []) + (case.get('symptom_keywords') or []):
+                    if isinstance(s, str):
+                        docs = postings.setdefault(normalize(s).lower(), [])
+                        if not docs or docs[-1] != i:
+                            docs.append(i)
+
+            constitutions.append(case.get('patient_constitution'))
+            genders.append(case.get('patient_gender'))
+            case_age = case.get('patient_age')
+            if case_age:
+                try:
+                    ages[i] = int(case_age)
+                    age_known[i] = True
+                except (TypeError, ValueError):
+                    pass
+
+        chief.freeze()
+        diagnosis.freeze()
+        formula.freeze()
+        if build_title:
+            title.freeze()
+        if symptom_postings is None:
+            symptom_postings = {k: np.asarray(v, dtype=np.uint32) for k, v in postings.items()}
+
+        chief_term = np.fromiter(
+            (chief.term_id((case.get('chief_complaint') or '').lower()) for case in cases),
+            dtype=np.int32,
+            count=len(cases),
+        )
+        constitution_vocab: Dict[str, int] = {}
+        gender_vocab: Dict[str, int] = {}
+        return cls(
+            size=len(cases),
+            chief=chief,
+            chief_term=chief_term,
+            title=title,
+            diagnosis=diagnosis,
+            formula=formula,
+            symptom_postings=symptom_postings,
+            constitution=_codes(constitutions, constitution_vocab),
+            gender=_codes(genders, gender_vocab),
+            age=ages,
+            age_known=age_known,
+            constitution_vocab=constitution_vocab,
+            gender_vocab=gender_vocab,
+        )
+
+    def contains_mask(self, index: NgramIndex, query: str) -> np.ndarray:
+        """`query in term` 인 문서 bool mask (전체 크기)."""
+        mask = np.zeros(self.size, dtype=bool)
+        if query:
+            index.mark(query, mask)
+        return mask
+
+    def chief_masks(self, query_chief: str) -> tuple[np.ndarray, np.ndarray]:
+        """
+        주소증 정확 일치 / 부분 일치(양방향 포함) doc mask.
+        어휘(term) 단위로 한 번 판정한 뒤 chief_term 으로 gather 한다.
+        """
+        terms = len(self.chief)
+        exact_terms = np.zeros(terms + 1, dtype=bool)   # 마지막 칸 = 빈 주소증(-1)
+        partial_terms = np.zeros(terms + 1, dtype=bool)
+        if query_chief and terms:
+            tid = self.chief.term_id(query_chief)
+            if tid >= 0:
+                exact_terms[tid] = True
+            # query in case_chief
+            partial_terms[self.chief.match_terms(query_chief).astype(np.int64)] = True
+            # case_chief in query: 질의의 모든 부분 문자열 중 어휘에 있는 것
+            length = len(query_chief)
+            subs = {query_chief[i:j] for i in range(length) for j in range(i + 1, length + 1)}
+            for sub in subs:
+                sid = self.chief.term_id(sub)
+                if sid >= 0:
+                    partial_terms[sid] = True
+        doc_terms = self.chief_term
+        return exact_terms[doc_terms], partial_terms[doc_terms]
+
+
+@lru_cache(maxsize=1)
+def _symptom_scorer():
+    # hybrid_scorer 가 이 모듈을 import 하므로 처음 쓸 때 가져온다
+    from .hybrid_scorer import HybridScorer
+
+    return HybridScorer()
+
+
+def normalize_symptom(symptom: str) -> str:
+    """증상 정규화 (HybridScorer.normalize_symptom — 동의어 → 표준어)"""
+    return _symptom_scorer().normalize_symptom(symptom)
+
+
+# 코퍼스 로드/교체 시 검색 역색인과 스코어링 피처를 함께 빌드 (승인 append 때 역색인은 증분)
+register_derived(
+    SEARCH_INDEX_NAME,
+    lambda snap: CaseSearchIndex.build(snap.cases, normalize_symptom),
+    extend=lambda old, snap, start: old.extend(snap.cases[start:], start, normalize_symptom),
+)
+register_derived(
+    FEATURES_NAME,
+    lambda snap: CaseFeatures.build(
+        snap.cases,
+        normalize_symptom,
+        title=snap.derived(SEARCH_INDEX_NAME).title,
+        symptom_postings=snap.derived(SEARCH_INDEX_NAME).normalized_symptoms,
+    ),
+)
@@ -0,0 +1,217 @@
+"""
+치험례 증분 벡터 색인기.
+
+흐름:
+1. 코퍼스 케이스마다 case_embedding_text → 내용 해시
+2. EmbeddingStore 에 같은 해시가 있으면 재사용, 없거나 바뀐 케이스만 임베딩
+   — 배치를 프로세스 풀에 나눠 돌리되 동시에 떠 있는 배치 수를 제한하고,
+     끝난 배치부터 저장소에 기록한다(크래시 후 재실행 시 이어서 진행)
+3. 현재 코퍼스 케이스의 최신 벡터로 IVF-flat 색인을 다시 배치해 index_dir 에 교체 저장
+   — 증분 실행은 기존 IVF 중심을 재사용해 k-means 재학습을 생략한다
+
+인코더 설정(dim, IDF)은 저장소를 처음 만들 때(또는 full=True) 코퍼스 전체로 고정한다.
+설정이 바뀌면 저장된 벡터와 섞을 수 없으므로 전체 재임베딩한다.
+"""
+
+from __future__ import annotations
+
+import shutil
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from ..core.logger import get_logger
+from .embedding_store import EmbeddingStore, content_hash, encoder_fingerprint
+from .local_encoder import DEFAULT_DIM, ENCODER_VERSION, HashingEncoder, case_embedding_text
+from .vector_index import IVFFlatIndex
+
+logger = get_logger("case_indexer")
+
+DATA_DIR = Path(__file__).resolve().parents[2] / "data"
+DEFAULT_STORE_DIR = DATA_DIR / "embedding_store"
+
+# 증분 실행 시 케이스 수가 마지막 k-means 학습 때의 이 배수를 넘으면 중심을 다시 학습
+RETRAIN_GROWTH = 2.0
+# 저장소의 죽은 행(덮어쓰기/삭제) 비율이 이 값을 넘으면 compact
+COMPACT_GARBAGE_RATIO = 0.5
+
+_worker_encoder: Optional[HashingEncoder] = None
+_worker_key: Optional[str] = None
+
+
+def _encode_batch(fingerprint: str, dim: int, idf: Optional[List[float]], texts: List[str]) -> np.ndarray:
+    """
+    프로세스 풀 작업 함수 — 워커마다 인코더를 한 번만 만든다.
+
+    인코더는 저장소의 encoder_fingerprint(dim + IDF 전체)가 같을 때만 재사용한다.
+    """
+    global _worker_encoder, _worker_key
+    if _worker_encoder is None or _worker_key != fingerprint:
+        _worker_encoder = HashingEncoder(dim=dim, idf=None if idf is None else np.asarray(idf, np.float32))
+        _worker_key = fingerprint
+    return _worker_encoder.encode(texts)
+
+
+class CaseIndexer:
+    """EmbeddingStore + IVFFlatIndex 증분 빌더"""
+
+    def __init__(
+        self,
+        store_dir: Optional[Path] = None,
+        index_dir: Optional[Path] = None,
+        dim: int = DEFAULT_DIM,
+        batch_size: int = 512,
+        concurrency: int = 4,
+    ) -> None:
+        from .vector_service import DEFAULT_INDEX_DIR
+
+        self.store = EmbeddingStore(store_dir or DEFAULT_STORE_DIR)
+        self.index_dir = Path(index_dir or DEFAULT_INDEX_DIR)
+        self.dim = dim
+        self.batch_size = batch_size
+        self.concurrency = max(1, concurrency)
+
+    # ---------- 임베딩 ----------
+
+    def _prepare_store(self, texts: Sequence[str], full: bool) -> bool:
+        """저장소 열기/초기화. 새로 만들었으면 True."""
+        if not full and self.store.exists():
+            self.store.open()
+            if (
+                self.store.dim == self.dim
+                and self.store.encoder.get("version") == ENCODER_VERSION
+                and self.store.fingerprint == encoder_fingerprint({"dim": self.store.dim, **self.store.encoder})
+            ):
+                return False
+            logger.info("encoder config changed — re-embedding all cases")
+
+        encoder = HashingEncoder(dim=self.dim)
+        idf = encoder.fit_idf(texts)
+        self.store.reset(self.dim, {"type": "hashing", "version": ENCODER_VERSION, "idf": idf.tolist()})
+        return True
+
+    def _embed(self, pending: List[tuple[str, str, str]]) -> None:
+        """pending = [(case_id, hash, text)] 를 배치로 임베딩해 저장소에 기록."""
+        if not pending:
+            return
+        idf = self.store.encoder.get("idf")
+        fingerprint = self.store.fingerprint
+        batches = [pending[i:i + self.batch_size] for i in range(0, len(pending), self.batch_size)]
+
+        # 배치 하나면 프로세스 생성 비용이 더 크다
+        if len(batches) == 1 or self.concurrency == 1:
+            for batch in batches:
+                vectors = _encode_batch(fingerprint, self.dim, idf, [t for _, _, t in batch])
+                self.store.append([(cid, h) for cid, h, _ in batch], vectors)
+            return
+
+        with ProcessPoolExecutor(max_workers=self.concurrency) as pool:
+            in_flight: Dict[Future, list] = {}
+            queue = iter(batches)
+            done_count = 0
+            while True:
+                # 동시에 떠 있는 배치 수 제한 (메모리 상한)
+                while len(in_flight) < self.concurrency * 2:
+                    batch = next(queue, None)
+                    if batch is None:
+                        break
+                    future = pool.submit(_encode_batch, fingerprint, self.dim, idf, [t for _, _, t in batch])
+                    in_flight[future] = batch
+                if not in_flight:
+                    break
+                finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    batch = in_flight.pop(future)
+                    self.store.append([(cid, h) for cid, h, _ in batch], future.result())
+                    done_count += len(batch)
+                logger.info("embedded %d / %d", done_count, len(pending))
+
+    # ---------- 색인 ----------
+
+    def _existing_centroids(self, count: int) -> tuple[Optional[np.ndarray], int]:
+        """
+        재사용 가능한 기존 IVF 중심과 그 학습 시점 케이스 수.
+        없거나 인코더가 바뀌었거나 코퍼스가 많이 커졌으면 (None, count).
+        """
+        try:
+            old = IVFFlatIndex.load(self.index_dir)
+        except (OSError, ValueError, KeyError):
+            return None, count
+        trained = int(old.meta.get("trained_count", len(old)))
+        if (
+            old.dim != self.dim
+            or old.meta.get("store_fingerprint") != self.store.fingerprint
+            or not old.nlist
+            or count > trained * RETRAIN_GROWTH
+        ):
+            return None, count
+        return np.asarray(old.centroids), trained
+
+    def _write_index(self, index: IVFFlatIndex) -> None:
+        """임시 디렉터리에 저장 후 교체 (서버는 meta.json mtime 으로 다시 연다)."""
+        tmp = self.index_dir.with_name(self.index_dir.name + ".tmp")
+        old = self.index_dir.with_name(self.index_dir.name + ".old")
+        shutil.rmtree(tmp, ignore_errors=True)
+        index.save(tmp)
+        shutil.rmtree(old, ignore_errors=True)
+        if self.index_dir.exists():
+            self.index_dir.rename(old)
+        tmp.rename(self.index_dir)
+        shutil.rmtree(old, ignore_errors=True)
+
+    def run(self, cases: Sequence[Dict], full: bool = False) -> Dict:
+        """
+        증분 색인 실행
+
+        Args:
+            cases: 현재 코퍼스 케이스 (id 없는 케이스는 제외)
+            full: 저장소/중심을 버리고 전체 재빌드
+
+        Returns:
+            실행 통계
+        """
+        start = time.perf_counter()
+        cases = [c for c in cases if c.get('id')]
+        # 같은 id 가 여러 번 있으면 마지막 것을 쓴다
+        by_id: Dict[str, Dict] = {c['id']: c for c in cases}
+        ids = list(by_id)
+        texts = {cid: case_embedding_text(case) for cid, case in by_id.items()}
+
+        created = self._prepare_store(list(texts.values()), full)
+        pending = []
+        for cid in ids:
+            h = content_hash(texts[cid])
+            if not self.store.is_current(cid, h):
+                pending.append((cid, h, texts[cid]))
+        self._embed(pending)
+
+        if self.store.garbage_ratio(ids) > COMPACT_GARBAGE_RATIO:
+            self.store.compact(ids)
+
+        centroids, trained_count = (None, len(ids)) if (full or created) else self._existing_centroids(len(ids))
+        vectors = np.asarray(self.store.vectors()[self.store.rows_for(ids)]) if ids else \
+            np.zeros((0, self.dim), np.float32)
+        meta = {
+            "encoder": {"type": "hashing", "dim": self.dim, "idf": self.store.encoder.get("idf")},
+            "store_fingerprint": self.store.fingerprint,
+            "trained_count": trained_count,
+        }
+
+        index = IVFFlatIndex.build(
+            vectors, ids, [by_id[cid] for cid in ids], meta=meta, centroids=centroids,
+        )
+        self._write_index(index)
+
+        stats = {
+            "total": len(ids),
+            "embedded": len(pending),
+            "reused": len(ids) - len(pending),
+            "retrained": centroids is None,
+            "nlist": index.nlist,
+            "seconds": round(time.perf_counter() - start, 2),
+        }
+        logger.info("case index updated: %s", stats)
+        return stats
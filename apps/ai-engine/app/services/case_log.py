@@ -0,0 +1,194 @@
+"""
+승인 케이스 로그 — all_cases_combined.json 에 아직 병합되지 않은 승인 케이스.
+
+승인은 통합 JSON 을 다시 쓰지 않고 승인 로그에 붙인다. 저장 엔진은 둘 중 하나:
+- log: `all_cases_combined.log/` (SegmentLog, 케이스 id 키)
+- sqlite: `collector/collector.db` 의 approved 컬렉션 (SQLiteCollection)
+코퍼스와 수집기는 "통합 JSON + 승인 로그의 현재 값" 을 전체 케이스로 본다.
+코퍼스는 어느 엔진이 설정됐는지 모르므로 두 곳을 모두 읽는다.
+
+병합(fold): 로그가 충분히 쌓이면 백그라운드에서
+    1. 로그의 현재 세그먼트를 닫고(seal) 닫힌 세그먼트의 케이스를 모은다
+    2. 통합 JSON 을 마지막 `]` 직전까지 스트리밍 복사 + 케이스를 덧붙인 임시 파일을 만든다
+    3. 병합 표식(`all_cases_combined.folded.json`: 엔진 + seal 표식 + 새 JSON 크기)을
+       쓰고 임시 파일로 교체한다
+    4. 병합된 레코드(세그먼트 / seq 구간)와 표식을 지운다
+표식이 남아 있고 통합 JSON 크기가 표식과 같으면 3 과 4 사이에서 멈춘 것이므로, 읽는 쪽은
+표식의 레코드를 건너뛰고(이미 JSON 에 들어 있음) 쓰는 쪽은 열 때 4 를 마저 한다.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set
+
+from ..core.logger import get_logger
+from . import sqlite_store
+from .segment_log import log_state, read_values
+
+logger = get_logger("case_log")
+
+LOG_SUFFIX = ".log"
+FOLD_MARKER_SUFFIX = ".folded.json"
+APPROVED_COLLECTION = "approved"
+
+_TAIL_BYTES = 64 * 1024
+_COPY_BYTES = 1 << 20
+
+
+def approved_log_dir(source: Path) -> Path:
+    """통합 JSON 옆 승인 로그 디렉터리."""
+    source = Path(source)
+    return source.with_name(source.stem + LOG_SUFFIX)
+
+
+def approved_db_path(source: Path) -> Path:
+    """sqlite 엔진의 DB 경로 (CaseStorage 의 collector 디렉토리)."""
+    return Path(source).parent / "collector" / sqlite_store.DB_FILENAME
+
+
+def fold_marker_path(source: Path) -> Path:
+    source = Path(source)
+    return source.with_name(source.stem + FOLD_MARKER_SUFFIX)
+
+
+def approved_state(source: Path) -> tuple:
+    """
+    승인 로그(두 엔진)의 상태 — 코퍼스 변경 감지용.
+    sqlite 는 approved 컬렉션만 본다 (같은 DB 의 수집기 쓰기로 코퍼스가 다시 만들어지지 않도록).
+    """
+    return log_state(approved_log_dir(source)) + sqlite_store.collection_state(
+        approved_db_path(source), APPROVED_COLLECTION
+    )
+
+
+def _read_marker(source: Path) -> Optional[Dict[str, Any]]:
+    """유효한(교체까지 끝난) 병합 표식. 없거나 교체 전에 멈춘 표식이면 None."""
+    path = fold_marker_path(source)
+    try:
+        marker = json.loads(path.read_text(encoding="utf-8"))
+        size = Path(source).stat().st_size
+    except (OSError, ValueError):
+        return None
+    return marker if marker.get("size") == size else None
+
+
+def folded_marks(source: Path, kind: str) -> Set[int]:
+    """kind 엔진에서 통합 JSON 에 이미 들어간(아직 지워지지 않은) seal 표식."""
+    marker = _read_marker(source)
+    return set(marker["marks"]) if marker and marker.get("kind") == kind else set()
+
+
+def read_approved(source: Path) -> List[Dict[str, Any]]:
+    """통합 JSON 에 아직 병합되지 않은 승인 케이스 (읽기 전용, 두 엔진)."""
+    cases: List[Dict[str, Any]] = []
+    directory = approved_log_dir(source)
+    if directory.exists():
+        cases.extend(read_values(directory, exclude=folded_marks(source, "log")))
+    cases.extend(sqlite_store.read_values(
+        approved_db_path(source), APPROVED_COLLECTION, exclude=folded_marks(source, "sqlite")
+    ))
+    return cases
+
+
+def recover_fold(source: Path, log: Any) -> None:
+    """중단된 병합 정리 (쓰는 쪽이 승인 로그를 연 직후 호출)."""
+    source = Path(source)
+    for tmp in source.parent.glob(f".{source.name}.*.tmp"):
+        tmp.unlink()
+    marker_path = fold_marker_path(source)
+    if not marker_path.exists():
+        return
+    marker = _read_marker(source)
+    if marker and marker.get("kind") == log.kind:
+        logger.info("completing interrupted fold (%s %s)", marker["kind"], marker["marks"])
+        log.drop_segments(marker["marks"])
+    marker_path.unlink()
+
+
+def _json_array_end(source: Path) -> tuple:
+    """(닫는 `]` 위치, 배열이 비었는지)."""
+    size = source.stat().st_size
+    with open(source, "rb") as f:
+        f.seek(max(size - _TAIL_BYTES, 0))
+        tail = f.read()
+    body = tail.rstrip()
+    if not body.endswith(b"]"):
+        raise ValueError(f"{source.name} does not end with a JSON array")
+    end = size - len(tail) + len(body) - 1
+    inner = body[:-1].rstrip()
+    if not inner and size > len(tail):
+        raise ValueError(f"{source.name}: too much trailing whitespace")
+    return end, inner.endswith(b"[")
+
+
+def _write_appended(source: Path, cases: List[Dict[str, Any]], out: Path) -> int:
+    """source 배열 뒤에 cases 를 붙인 JSON 을 out 에 쓰고 크기를 반환."""
+    records = [json.dumps(case, ensure_ascii=False).encode("utf-8") for case in cases]
+    with open(out, "wb") as dst:
+        if source.exists():
+            end, empty = _json_array_end(source)
+            with open(source, "rb") as src:
+                remaining = end
+                while remaining:
+                    chunk = src.read(min(_COPY_BYTES, remaining))
+                    if not chunk:
+                        raise ValueError(f"{source.name} shrank while folding")
+                    dst.write(chunk)
+                    remaining -= len(chunk)
+            dst.write(b"\n" if empty else b",\n")
+        else:
+            dst.write(b"[\n")
+        dst.write(b",\n".join(records))
+        dst.write(b"\n]\n")
+        dst.flush()
+        os.fsync(dst.fileno())
+        return dst.tell()
+
+
+def fold_approved(source: Path, log: Any, lock: Any = None) -> int:
+    """
+    승인 로그의 닫힌 부분을 통합 JSON 에 병합한다 (단일 작성자 전제).
+
+    Args:
+        source: 통합 JSON 경로
+        log: 승인 로그 (SegmentLog 또는 SQLiteCollection — seal/values_in/drop_segments)
+        lock: 교체/세그먼트 삭제 구간에 잡을 락 (CaseStorage 의 쓰기 락)
+
+    Returns:
+        병합한 케이스 수
+    """
+    source = Path(source)
+    sealed = log.seal()
+    if not sealed:
+        return 0
+    cases = log.values_in(sealed)
+    if not cases:
+        log.drop_segments(sealed)
+        return 0
+
+    tmp = source.with_name(f".{source.name}.{os.getpid()}.tmp")
+    marker_path = fold_marker_path(source)
+    try:
+        # 복사는 락 밖에서 — 닫힌 부분은 더 바뀌지 않는다
+        size = _write_appended(source, cases, tmp)
+        if lock is not None:
+            lock.acquire()
+        try:
+            with open(marker_path, "w", encoding="utf-8") as f:
+                json.dump({"kind": log.kind, "marks": sealed, "size": size}, f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, source)
+            log.drop_segments(sealed)
+            marker_path.unlink()
+        finally:
+            if lock is not None:
+                lock.release()
+    finally:
+        if tmp.exists():
+            tmp.unlink()
+    logger.info("folded %d approved cases into %s", len(cases), source.name)
+    return len(cases)
@@ -0,0 +1,133 @@
+"""
+치험례 로컬 검색 역색인 — CaseSearchService._search_local 후보 추출용.
+
+기존 폴백 경로는 질의마다 전체 케이스를 돌며 chief_complaint/title/symptoms 를
+소문자화하고 `in` 검사를 했다(O(N·증상수)). 여기서는 코퍼스 로드 시 한 번
+색인을 만들어 두고, 질의마다 포스팅 교집합으로 후보만 뽑는다.
+
+후보 조건 (기존 선형 스캔과 동일 + 동의어 정확 일치 추가):
+1. 주소증이 case 주소증 또는 제목의 부분 문자열
+2. 질의 증상 하나가 case 증상 중 하나의 부분 문자열
+3. 주소증의 어절 하나가 제목의 부분 문자열
+4. (추가) 정규화된 질의 증상이 case 의 정규화 증상/symptom_keywords 와 정확 일치
+   — HybridScorer 가 증상 점수를 주는 조건이므로, 동의어로만 겹치는 케이스가
+     후보에서 빠지던 누락을 막는다.
+"""
+
+from __future__ import annotations
+
+from typing import Callable, Dict, Iterable, List, Sequence
+
+import numpy as np
+
+from .text_index import NgramIndex, mask_to_ids
+
+
+def _fields(case: Dict) -> tuple:
+    """(소문자 주소증, 소문자 제목, 소문자 증상 목록)"""
+    chief = (case.get('chief_complaint') or '').lower()
+    title = (case.get('title') or '').lower()
+    symptoms = [s.lower() for s in case.get('symptoms') or [] if isinstance(s, str)]
+    return chief, title, symptoms
+
+
+def _add_normalized(
+    normalized: Dict[str, List[int]], doc_id: int, case: Dict, normalize: Callable[[str], str]
+) -> None:
+    """정규화 증상/symptom_keywords → doc_id 포스팅 (doc_id 증가 순)"""
+    for s in (case.get('symptoms') or []) + (case.get('symptom_keywords') or []):
+        if isinstance(s, str):
+            docs = normalized.setdefault(normalize(s).lower(), [])
+            if not docs or docs[-1] != doc_id:
+                docs.append(doc_id)
+
+
+class CaseSearchIndex:
+    """주소증·제목·증상 n-gram 색인 + 정규화 증상 정확 일치 색인."""
+
+    def __init__(self, n: int = 3) -> None:
+        self.chief_or_title = NgramIndex(n)
+        self.title = NgramIndex(n)
+        self.symptoms = NgramIndex(n)
+        self.normalized_symptoms: Dict[str, np.ndarray] = {}
+        self.size = 0
+
+    @classmethod
+    def build(
+        cls,
+        cases: Sequence[Dict],
+        normalize: Callable[[str], str],
+        n: int = 3,
+    ) -> "CaseSearchIndex":
+        """
+        Args:
+            cases: 코퍼스 케이스 (doc_id = 리스트 위치)
+            normalize: 증상 정규화 함수 (HybridScorer.normalize_symptom)
+        """
+        index = cls(n)
+        normalized: Dict[str, List[int]] = {}
+        for i, case in enumerate(cases):
+            chief, title, symptoms = _fields(case)
+            index.chief_or_title.add(i, (chief, title))
+            index.title.add(i, title)
+            index.symptoms.add(i, symptoms)
+            _add_normalized(normalized, i, case, normalize)
+
+        index.chief_or_title.freeze()
+        index.title.freeze()
+        index.symptoms.freeze()
+        index.normalized_symptoms = {
+            k: np.asarray(v, dtype=np.uint32) for k, v in normalized.items()
+        }
+        index.size = len(cases)
+        return index
+
+    def extend(
+        self,
+        cases: Sequence[Dict],
+        start: int,
+        normalize: Callable[[str], str],
+    ) -> "CaseSearchIndex":
+        """
+        start 위치부터 붙은 케이스만 색인한 새 CaseSearchIndex (승인 시 스냅샷 증분 갱신).
+        기존 포스팅은 재사용하고, 새 케이스가 건드린 정규화 증상 포스팅만 이어 붙인다.
+        """
+        fields = [(start + offset, _fields(case)) for offset, case in enumerate(cases)]
+        index = CaseSearchIndex.__new__(CaseSearchIndex)
+        index.chief_or_title = self.chief_or_title.extend((i, (chief, title)) for i, (chief, title, _) in fields)
+        index.title = self.title.extend((i, title) for i, (_, title, _) in fields)
+        index.symptoms = self.symptoms.extend((i, symptoms) for i, (_, _, symptoms) in fields)
+
+        normalized: Dict[str, List[int]] = {}
+        for offset, case in enumerate(cases):
+            _add_normalized(normalized, start + offset, case, normalize)
+        index.normalized_symptoms = dict(self.normalized_symptoms)
+        for key, docs in normalized.items():
+            tail = np.asarray(docs, dtype=np.uint32)
+            old = index.normalized_symptoms.get(key)
+            index.normalized_symptoms[key] = tail if old is None else np.concatenate([old, tail])
+        index.size = start + len(cases)
+        return index
+
+    def candidates(
+        self,
+        query_chief: str,
+        query_symptoms: Iterable[str],
+        normalize: Callable[[str], str],
+    ) -> np.ndarray:
+        """후보 doc_id (오름차순 = 파일 순서)."""
+        query_chief = (query_chief or '').lower()
+        mask = np.zeros(self.size, dtype=bool)
+
+        if query_chief:
+            self.chief_or_title.mark(query_chief, mask)
+            for word in query_chief.split():
+                self.title.mark(word, mask)
+
+        for qs in query_symptoms:
+            self.symptoms.mark(qs.lower(), mask)
+            hit = self.normalized_symptoms.get(normalize(qs).lower())
+            if hit is not None:
+                mask[hit] = True
+
+        return mask_to_ids(mask)
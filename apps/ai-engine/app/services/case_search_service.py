@@ -7,11 +7,15 @@ from typing import List, Dict, Optional, Any
 from dataclasses import dataclass, field, asdict
 import asyncio
 from functools import partial
-import json
-from pathlib import Path
 
+import numpy as np
+
+from .case_corpus import get_case_corpus
+from .case_features import FEATURES_NAME, SEARCH_INDEX_NAME
+from .case_search_index import CaseSearchIndex
 from .vector_service import VectorService
 from .hybrid_scorer import HybridScorer, MatchScore, MatchGrade, MatchReason
+from .topk import top_k_indices
 from ..core.config import settings
 
 
@@ -68,38 +72,20 @@ class CaseSearchResponse:
     search_metadata: Dict[str, Any]
 
 
+# 로컬 폴백은 벡터 유사도가 없으므로 고정값 사용
+LOCAL_VECTOR_SIMILARITY = 0.5
+
+
 class CaseSearchService:
     """치험례 검색 서비스"""
 
     def __init__(self):
         self.vector_service = VectorService()
         self.scorer = HybridScorer()
-        self._local_cases: Optional[List[Dict]] = None
 
     def _load_local_cases(self) -> List[Dict]:
-        """로컬 케이스 데이터 로드 (Pinecone 없을 때 폴백)"""
-        if self._local_cases is not None:
-            return self._local_cases
-
-        # 통합 데이터 파일 우선 사용
-        data_file = Path(__file__).parent.parent.parent / "data" / "all_cases_combined.json"
-
-        # 통합 파일이 없으면 기존 파일 사용
-        if not data_file.exists():
-            data_file = Path(__file__).parent.parent.parent / "data" / "extracted_cases.json"
-
-        if data_file.exists():
-            with open(data_file, 'r', encoding='utf-8') as f:
-                self._local_cases = json.load(f)
-
-            # 실제 치험례 수 계산
-            real_count = sum(1 for c in self._local_cases if c.get('is_real_case'))
-            print(f"[INFO] Local case data loaded: {len(self._local_cases)} cases (real: {real_count})")
-        else:
-            self._local_cases = []
-            print("[WARN] No local case data found")
-
-        return self._local_cases
+        """로컬 케이스 데이터 (Pinecone 없을 때 폴백) — 프로세스 전역 코퍼스 공유"""
+        return get_case_corpus().snapshot().cases
 
     def _build_query_text(self, request: CaseSearchRequest) -> str:
         """검색 쿼리 텍스트 생성"""
@@ -187,24 +173,14 @@ class CaseSearchService:
         query_text = self._build_query_text(request)
         query_dict = self._build_query_dict(request)
 
-        # Pinecone 검색 시도
+        # Pinecone 검색 시도 — 두 경로 모두 상위 top_k 만 MatchedCase 로 만들어 반환
         if self.vector_service.index:
             results = await self._search_with_pinecone(
-                query_text, query_dict, request, top_k
+                query_text, query_dict, request, top_k, min_confidence
             )
         else:
             # 로컬 폴백 검색
-            results = await self._search_local(query_dict, top_k)
-
-        # 최소 신뢰도 필터링
-        if min_confidence > 0:
-            results = [r for r in results if r.match_score['total'] >= min_confidence]
-
-        # 점수순 정렬
-        results.sort(key=lambda x: x.match_score['total'], reverse=True)
-
-        # 상위 N개만 반환
-        results = results[:top_k]
+            results = await self._search_local(query_dict, top_k, min_confidence)
 
         processing_time = (time.time() - start_time) * 1000
 
@@ -218,12 +194,46 @@ class CaseSearchService:
             }
         )
 
+    def _to_matched_case(self, case: Dict, match_score: MatchScore, case_id: str) -> MatchedCase:
+        """케이스 dict + 점수 → 응답용 MatchedCase"""
+        return MatchedCase(
+            case_id=case_id,
+            title=case.get('title', ''),
+            formula_name=case.get('formula_name', ''),
+            formula_hanja=case.get('formula_hanja', ''),
+            chief_complaint=case.get('chief_complaint', ''),
+            symptoms=case.get('symptoms', []),
+            diagnosis=case.get('diagnosis', ''),
+            patient_age=case.get('patient_age'),
+            patient_gender=case.get('patient_gender'),
+            patient_constitution=case.get('patient_constitution'),
+            treatment_formula=case.get('treatment_formula', ''),
+            data_source=case.get('data_source', ''),
+            match_score={
+                'total': match_score.total,
+                'grade': match_score.grade.value,
+                'grade_label': match_score.grade_label,
+                'vector_similarity': match_score.vector_similarity,
+                'keyword_match': match_score.keyword_match,
+                'metadata_match': match_score.metadata_match,
+            },
+            match_reasons=[
+                {
+                    'type': r.type,
+                    'description': r.description,
+                    'contribution': r.contribution
+                }
+                for r in match_score.reasons
+            ]
+        )
+
     async def _search_with_pinecone(
         self,
         query_text: str,
         query_dict: Dict,
         request: CaseSearchRequest,
-        top_k: int
+        top_k: int,
+        min_confidence: float = 0
     ) -> List[MatchedCase]:
         """Pinecone 벡터 검색"""
         # 메타데이터 필터
@@ -235,134 +245,73 @@ class CaseSearchService:
             filter_dict=filter_dict,
             top_k=top_k * 3  # 리랭킹을 위해 더 많이 가져옴
         )
+        if not search_results:
+            return []
 
-        # 하이브리드 스코어링
-        matched_cases = []
-        for result in search_results:
-            metadata = result.get('metadata', {})
-            vector_score = result.get('score', 0.0)
+        # 하이브리드 스코어링 (일괄) → 상위 top_k 만 근거 포함해 materialize
+        metadatas = [result.get('metadata', {}) for result in search_results]
+        similarities = np.array([result.get('score', 0.0) for result in search_results], dtype=np.float64)
+        batch = self.scorer.score_batch(query_dict, metadatas, vector_similarity=similarities)
 
-            # 하이브리드 점수 계산
+        matched_cases = []
+        for _, pos in top_k_indices(batch.total, top_k, min_confidence):
+            metadata = metadatas[pos]
             match_score = self.scorer.calculate_score(
                 query=query_dict,
                 case=metadata,
-                vector_similarity=vector_score
-            )
-
-            matched_case = MatchedCase(
-                case_id=metadata.get('case_id', result.get('id', '')),
-                title=metadata.get('title', ''),
-                formula_name=metadata.get('formula_name', ''),
-                formula_hanja=metadata.get('formula_hanja', ''),
-                chief_complaint=metadata.get('chief_complaint', ''),
-                symptoms=metadata.get('symptoms', []),
-                diagnosis=metadata.get('diagnosis', ''),
-                patient_age=metadata.get('patient_age'),
-                patient_gender=metadata.get('patient_gender'),
-                patient_constitution=metadata.get('patient_constitution'),
-                treatment_formula=metadata.get('treatment_formula', ''),
-                data_source=metadata.get('data_source', ''),
-                match_score={
-                    'total': match_score.total,
-                    'grade': match_score.grade.value,
-                    'grade_label': match_score.grade_label,
-                    'vector_similarity': match_score.vector_similarity,
-                    'keyword_match': match_score.keyword_match,
-                    'metadata_match': match_score.metadata_match,
-                },
-                match_reasons=[
-                    {
-                        'type': r.type,
-                        'description': r.description,
-                        'contribution': r.contribution
-                    }
-                    for r in match_score.reasons
-                ]
+                vector_similarity=float(similarities[pos])
             )
-
-            matched_cases.append(matched_case)
+            case_id = metadata.get('case_id', search_results[pos].get('id', ''))
+            matched_cases.append(self._to_matched_case(metadata, match_score, case_id))
 
         return matched_cases
 
     async def _search_local(
         self,
         query_dict: Dict,
-        top_k: int
+        top_k: int,
+        min_confidence: float = 0
     ) -> List[MatchedCase]:
         """로컬 데이터 검색 (Pinecone 없을 때 폴백)"""
-        cases = self._load_local_cases()
+        snap = get_case_corpus().snapshot()
+        cases = snap.cases
 
         if not cases:
-            return self._get_dummy_results(query_dict)
+            dummy = [
+                r for r in self._get_dummy_results(query_dict)
+                if r.match_score['total'] >= min_confidence
+            ]
+            dummy.sort(key=lambda x: x.match_score['total'], reverse=True)
+            return dummy[:top_k]
+
+        # 코퍼스 로드 시 만든 역색인으로 후보만 추출 (전체 스캔 없음)
+        index: CaseSearchIndex = snap.derived(SEARCH_INDEX_NAME)
+        candidate_ids = index.candidates(
+            query_dict.get('chief_complaint', ''),
+            query_dict.get('symptoms', []),
+            self.scorer.normalize_symptom,
+        )
+
+        # 벡터 유사도 없이 키워드/메타데이터만으로 일괄 점수 계산
+        batch = self.scorer.score_batch(
+            query_dict,
+            snap.derived(FEATURES_NAME),
+            vector_similarity=LOCAL_VECTOR_SIMILARITY,
+            ids=candidate_ids,
+        )
 
+        # 전체 후보 중 상위 top_k (파일 순서와 무관, 동점은 파일 순서)
         matched_cases = []
-        query_chief = query_dict.get('chief_complaint', '').lower()
-        query_symptoms = [s.lower() for s in query_dict.get('symptoms', [])]
-
-        for case in cases:
-            # 간단한 키워드 매칭으로 후보 필터링
-            case_chief = case.get('chief_complaint', '').lower()
-            case_title = case.get('title', '').lower()
-            case_symptoms = [s.lower() for s in case.get('symptoms', [])]
-
-            # 주소증이나 증상이 하나라도 매칭되면 후보에 포함
-            is_candidate = False
-
-            if query_chief and (query_chief in case_chief or query_chief in case_title):
-                is_candidate = True
-
-            for qs in query_symptoms:
-                if any(qs in cs for cs in case_symptoms):
-                    is_candidate = True
-                    break
-
-            if not is_candidate and query_chief:
-                # 주소증이 제목에 포함되어 있는지 확인
-                if any(word in case_title for word in query_chief.split()):
-                    is_candidate = True
-
-            if is_candidate:
-                # 벡터 유사도 없이 키워드/메타데이터만으로 점수 계산
-                match_score = self.scorer.calculate_score(
-                    query=query_dict,
-                    case=case,
-                    vector_similarity=0.5  # 기본값
-                )
-
-                matched_case = MatchedCase(
-                    case_id=case.get('id', ''),
-                    title=case.get('title', ''),
-                    formula_name=case.get('formula_name', ''),
-                    formula_hanja=case.get('formula_hanja', ''),
-                    chief_complaint=case.get('chief_complaint', ''),
-                    symptoms=case.get('symptoms', []),
-                    diagnosis=case.get('diagnosis', ''),
-                    patient_age=case.get('patient_age'),
-                    patient_gender=case.get('patient_gender'),
-                    patient_constitution=case.get('patient_constitution'),
-                    treatment_formula=case.get('treatment_formula', ''),
-                    data_source=case.get('data_source', ''),
-                    match_score={
-                        'total': match_score.total,
-                        'grade': match_score.grade.value,
-                        'grade_label': match_score.grade_label,
-                        'vector_similarity': match_score.vector_similarity,
-                        'keyword_match': match_score.keyword_match,
-                        'metadata_match': match_score.metadata_match,
-                    },
-                    match_reasons=[
-                        {
-                            'type': r.type,
-                            'description': r.description,
-                            'contribution': r.contribution
-                        }
-                        for r in match_score.reasons
-                    ]
-                )
-
-                matched_cases.append(matched_case)
-
-        return matched_cases[:top_k * 3]
+        for _, pos in top_k_indices(batch.total, top_k, min_confidence):
+            case = cases[int(batch.ids[pos])]
+            match_score = self.scorer.calculate_score(
+                query=query_dict,
+                case=case,
+                vector_similarity=LOCAL_VECTOR_SIMILARITY
+            )
+            matched_cases.append(self._to_matched_case(case, match_score, case.get('id', '')))
+
+        return matched_cases
 
     def _get_dummy_results(self, query_dict: Dict) -> List[MatchedCase]:
         """테스트용 더미 결과"""
@@ -405,36 +354,7 @@ class CaseSearchService:
                 vector_similarity=0.7
             )
 
-            matched.append(MatchedCase(
-                case_id=case['case_id'],
-                title=case['title'],
-                formula_name=case['formula_name'],
-                formula_hanja=case['formula_hanja'],
-                chief_complaint=case['chief_complaint'],
-                symptoms=case['symptoms'],
-                diagnosis=case['diagnosis'],
-                patient_age=case['patient_age'],
-                patient_gender=case['patient_gender'],
-                patient_constitution=case['patient_constitution'],
-                treatment_formula=case['treatment_formula'],
-                data_source=case['data_source'],
-                match_score={
-                    'total': match_score.total,
-                    'grade': match_score.grade.value,
-                    'grade_label': match_score.grade_label,
-                    'vector_similarity': match_score.vector_similarity,
-                    'keyword_match': match_score.keyword_match,
-                    'metadata_match': match_score.metadata_match,
-                },
-                match_reasons=[
-                    {
-                        'type': r.type,
-                        'description': r.description,
-                        'contribution': r.contribution
-                    }
-                    for r in match_score.reasons
-                ]
-            ))
+            matched.append(self._to_matched_case(case, match_score, case['case_id']))
 
         return matched
 
@@ -0,0 +1,340 @@
+"""
+치험례 바이너리 스냅샷 — all_cases_combined.json 의 열 저장소(CaseStore)를 파일로 두고 mmap 으로 연다.
+
+원본(JSON)은 그대로 단일 진실 공급원이다. 스냅샷은 원본 옆
+(`all_cases_combined.cases.bin`)에 두는 파생 파일로:
+- 코퍼스 로드 시 원본과 일치하는 스냅샷이 있으면 JSON 파싱 대신 mmap 으로 연다.
+  열 배열/텍스트 버퍼는 복사 없이 mmap 위의 memoryview 라서, 같은 파일을 여는
+  워커들은 페이지 캐시를 공유하고 냉시작은 헤더 디코드 + mmap 이 전부다.
+- 일치하는 스냅샷이 없으면 JSON 을 파싱한 뒤 스냅샷을 새로 쓴다(임시 파일 + rename).
+  데이터 디렉토리를 읽기 전용으로 마운트한 프로세스(프로덕션 API)는 쓰지 않고 파싱 결과만 쓴다.
+- 승인 로그 병합(case_log.fold_approved)으로 원본이 바뀌면 병합한 프로세스(수집 리더)가
+  곧바로 스냅샷을 다시 만든다(rebuild_snapshot) — 읽기 전용 API 는 그것을 연다.
+
+파일 구조 (리틀/빅 엔디언은 헤더 byteorder 로 기록, 다르면 쓰지 않음):
+    MAGIC(8) | format(u32) | header_len(u64) | header JSON | 0 패딩(8바이트 정렬) | payload
+헤더에는 원본 지문(size, mtime_ns, sha256)과 payload sha256, 블록별 열 기술자
+(값 테이블 + payload 안 배열 위치)가 들어 있다.
+
+일치 판정: 원본 size + mtime_ns 가 같으면 그대로, size 만 같으면 원본 sha256 을 다시 계산해
+비교한다. payload 체크섬 / 행 단위 비교는 scripts/case_snapshot.py check 로 한다.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+import time
+from array import array
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..core.logger import get_logger
+from .case_store import CaseStore, _Block, _Categorical, _Json, _Tags, _Text, load_case_store
+
+logger = get_logger("case_snapshot")
+
+MAGIC = b"HMCASES\0"
+FORMAT_VERSION = 1
+SUFFIX = ".cases.bin"
+SNAPSHOT_ENABLED = os.getenv("CASE_SNAPSHOT_ENABLED", "1") == "1"
+
+_PREAMBLE = struct.Struct("<8sIQ")
+_ALIGN = 8
+
+
+class SnapshotError(ValueError):
+    """스냅샷 파일 형식/체크섬 오류."""
+
+
+def snapshot_path(source: Path) -> Path:
+    """원본 JSON 옆 스냅샷 경로."""
+    source = Path(source)
+    return source.with_name(source.stem + SUFFIX)
+
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def source_fingerprint(source: Path) -> Dict[str, Any]:
+    st = Path(source).stat()
+    return {
+        "name": Path(source).name,
+        "size": st.st_size,
+        "mtime_ns": st.st_mtime_ns,
+        "sha256": file_sha256(source),
+    }
+
+
+def matches_source(header: Dict[str, Any], source: Path) -> bool:
+    """스냅샷 헤더의 원본 지문이 현재 원본과 같은지."""
+    recorded = header.get("source") or {}
+    try:
+        st = Path(source).stat()
+    except OSError:
+        return False
+    if recorded.get("size") != st.st_size:
+        return False
+    if recorded.get("mtime_ns") == st.st_mtime_ns:
+        return True
+    # 복사/배포로 mtime 만 바뀐 경우 — 내용 해시로 확인
+    return recorded.get("sha256") == file_sha256(source)
+
+
+# ---------- 쓰기 ----------
+
+
+class _PayloadWriter:
+    """payload 배치 계산 — 조각은 원본 배열의 바이트 뷰로만 들고 있는다(복사 없음)."""
+
+    def __init__(self) -> None:
+        self.parts: List[Any] = []
+        self.size = 0
+
+    def add(self, data: Any) -> List[Any]:
+        """배열/버퍼 → payload 에 정렬해 추가, [offset, length, typecode] 반환."""
+        view = memoryview(data)
+        typecode = getattr(data, "typecode", None) or view.format
+        raw = view.cast("B") if view.format != "B" else view
+        pad = -self.size % _ALIGN
+        if pad:
+            self.parts.append(b"\0" * pad)
+            self.size += pad
+        offset = self.size
+        self.parts.append(raw)
+        self.size += len(raw)
+        return [offset, len(view), typecode]
+
+
+def _describe(column: Any, payload: _PayloadWriter) -> Dict[str, Any]:
+    if isinstance(column, _Categorical):
+        return {"kind": "cat", "values": column.values, "codes": payload.add(column.codes)}
+    if isinstance(column, _Tags):
+        return {
+            "kind": "tags",
+            "values": column.values,
+            "codes": payload.add(column.codes),
+            "offsets": payload.add(column.offsets),
+        }
+    if isinstance(column, _Text):
+        return {
+            "kind": "json" if isinstance(column, _Json) else "text",
+            "buffer": payload.add(column.buffer),
+            "offsets": payload.add(column.offsets),
+        }
+    raise TypeError(f"unknown column type: {type(column).__name__}")
+
+
+def write_snapshot(store: CaseStore, path: Path, source: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    store 를 스냅샷 파일로 저장 (임시 파일에 쓴 뒤 교체 — 읽는 쪽은 항상 완전한 파일만 본다).
+
+    Args:
+        store: 저장할 케이스
+        path: 스냅샷 경로
+        source: 원본 지문 (source_fingerprint)
+
+    Returns:
+        기록한 헤더
+    """
+    payload = _PayloadWriter()
+    blocks = []
+    for block in store.blocks:
+        blocks.append({
+            "size": block.size,
+            "shapes": [list(shape) for shape in block.shapes],
+            "shape_codes": payload.add(block.shape_codes),
+            "columns": {key: _describe(column, payload) for key, column in block.columns.items()},
+        })
+
+    digest = hashlib.sha256()
+    for part in payload.parts:
+        digest.update(part)
+    header = {
+        "format": FORMAT_VERSION,
+        "byteorder": sys.byteorder,
+        "count": len(store),
+        "created_at": time.time(),
+        "source": source or {},
+        "payload_size": payload.size,
+        "payload_sha256": digest.hexdigest(),
+        "blocks": blocks,
+    }
+    header_bytes = json.dumps(header, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    pad = -(_PREAMBLE.size + len(header_bytes)) % _ALIGN
+
+    path = Path(path)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    try:
+        with open(tmp, "wb") as f:
+            f.write(_PREAMBLE.pack(MAGIC, FORMAT_VERSION, len(header_bytes)))
+            f.write(header_bytes)
+            f.write(b"\0" * pad)
+            for part in payload.parts:
+                f.write(part)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    finally:
+        if tmp.exists():
+            tmp.unlink()
+    return header
+
+
+# ---------- 읽기 ----------
+
+
+def _read_header(buf: Any) -> Tuple[Dict[str, Any], int]:
+    if len(buf) < _PREAMBLE.size:
+        raise SnapshotError("snapshot file too short")
+    magic, version, header_len = _PREAMBLE.unpack_from(buf, 0)
+    if magic != MAGIC:
+        raise SnapshotError("not a case snapshot file")
+    if version != FORMAT_VERSION:
+        raise SnapshotError(f"unsupported snapshot format {version}")
+    end = _PREAMBLE.size + header_len
+    header = json.loads(bytes(buf[_PREAMBLE.size:end]).decode("utf-8"))
+    if header.get("byteorder") != sys.byteorder:
+        raise SnapshotError("snapshot byte order differs from this machine")
+    data_offset = end + (-end % _ALIGN)
+    if len(buf) - data_offset != header["payload_size"]:
+        raise SnapshotError("snapshot payload truncated")
+    return header, data_offset
+
+
+def _view(payload: memoryview, spec: List[Any]) -> memoryview:
+    offset, length, typecode = spec
+    itemsize = array(typecode).itemsize
+    part = payload[offset:offset + length * itemsize]
+    return part if typecode == "B" else part.cast(typecode)
+
+
+def _column(spec: Dict[str, Any], payload: memoryview) -> Any:
+    kind = spec["kind"]
+    if kind == "cat":
+        return _Categorical(spec["values"], _view(payload, spec["codes"]))
+    if kind == "tags":
+        return _Tags(spec["values"], _view(payload, spec["codes"]), _view(payload, spec["offsets"]))
+    cls = _Json if kind == "json" else _Text
+    return cls(_view(payload, spec["buffer"]), _view(payload, spec["offsets"]))
+
+
+def open_snapshot(path: Path) -> Tuple[CaseStore, Dict[str, Any]]:
+    """
+    스냅샷을 읽기 전용 mmap 으로 연다 (배열/버퍼 복사 없음).
+
+    Returns:
+        (CaseStore, 헤더)
+    """
+    with open(path, "rb") as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    buf = memoryview(mapped)
+    header, data_offset = _read_header(buf)
+    payload = buf[data_offset:]
+    blocks = [
+        _Block.from_parts(
+            spec["size"],
+            [tuple(shape) for shape in spec["shapes"]],
+            _view(payload, spec["shape_codes"]),
+            {key: _column(column, payload) for key, column in spec["columns"].items()},
+        )
+        for spec in header["blocks"]
+    ]
+    return CaseStore(blocks), header
+
+
+def verify_payload(path: Path) -> Dict[str, Any]:
+    """payload sha256 을 다시 계산해 헤더와 비교 (불일치 시 SnapshotError)."""
+    with open(path, "rb") as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    try:
+        with memoryview(mapped) as buf:
+            header, data_offset = _read_header(buf)
+            actual = hashlib.sha256(buf[data_offset:]).hexdigest()
+    finally:
+        mapped.close()
+    if actual != header["payload_sha256"]:
+        raise SnapshotError("snapshot payload checksum mismatch")
+    return header
+
+
+# ---------- 코퍼스 로드 ----------
+
+
+def _write_unchanged(store: CaseStore, path: Path, source: Path, fingerprint: Dict[str, Any]) -> Dict[str, Any]:
+    """파싱 전에 잰 원본 지문이 그대로일 때만 스냅샷을 쓴다."""
+    st = source.stat()
+    if (st.st_size, st.st_mtime_ns) != (fingerprint["size"], fingerprint["mtime_ns"]):
+        raise SnapshotError("source changed while building snapshot")
+    return write_snapshot(store, path, fingerprint)
+
+
+def build_snapshot_file(source: Path, path: Optional[Path] = None) -> Tuple[CaseStore, Dict[str, Any]]:
+    """원본 JSON 을 파싱해 스냅샷을 쓴다 (변환 CLI 용 — 실패는 예외로)."""
+    source = Path(source)
+    fingerprint = source_fingerprint(source)
+    store = load_case_store(source)
+    return store, _write_unchanged(store, Path(path) if path is not None else snapshot_path(source), source, fingerprint)
+
+
+def rebuild_snapshot(source: Path) -> None:
+    """
+    원본을 바꾼 쪽(승인 병합)이 곧바로 스냅샷을 다시 쓴다.
+    실패는 로그만 남긴다 — 다음 로드가 JSON 을 파싱한다.
+    """
+    if not SNAPSHOT_ENABLED:
+        return
+    source = Path(source)
+    t0 = time.perf_counter()
+    try:
+        store, _ = build_snapshot_file(source)
+    except (OSError, ValueError) as e:
+        logger.warning("case snapshot not rebuilt after %s changed (%s)", source.name, e)
+        return
+    logger.info(
+        "case snapshot rebuilt: %s (%d cases) in %.0fms",
+        snapshot_path(source).name, len(store), (time.perf_counter() - t0) * 1000,
+    )
+
+
+def load_cases(source: Path) -> CaseStore:
+    """
+    원본 JSON 의 케이스. 일치하는 스냅샷이 있으면 mmap, 없으면 파싱 후 스냅샷 생성.
+    스냅샷 관련 실패는 로그만 남기고 파싱 결과를 그대로 쓴다.
+    """
+    source = Path(source)
+    if not SNAPSHOT_ENABLED:
+        return load_case_store(source)
+
+    path = snapshot_path(source)
+    if path.exists():
+        try:
+            store, header = open_snapshot(path)
+            if matches_source(header, source):
+                logger.info("case snapshot opened: %s (%d cases)", path.name, len(store))
+                return store
+            logger.info("case snapshot %s is stale — rebuilding from %s", path.name, source.name)
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning("case snapshot %s unusable (%s) — rebuilding", path.name, e)
+
+    if not os.access(path.parent, os.W_OK):
+        # 읽기 전용 마운트 — 스냅샷은 병합하는 프로세스가 만든다
+        logger.info("case snapshot %s not written (read-only data dir) — parsing %s", path.name, source.name)
+        return load_case_store(source)
+
+    fingerprint = source_fingerprint(source)
+    store = load_case_store(source)
+    try:
+        _write_unchanged(store, path, source, fingerprint)
+    except (OSError, SnapshotError) as e:
+        logger.warning("case snapshot not written (%s)", e)
+    return store
@@ -0,0 +1,305 @@
+"""
+치험례 통계 엔진 — /statistics 엔드포인트용 사전 집계.
+
+코퍼스 로드 시 케이스를 한 번 순회해 모든 집계를 만든다:
+- 전체: 성별/체질/연령대 분포, 증상·진단·처방 빈도, 결과 기재 수
+- 처방별(formula_name 정확 일치): 증상/진단/체질/성별 히스토그램, 연령대 분포,
+  나이 합계, 결과 기재 수, 긍정 결과 수, 결과 샘플
+
+승인(CaseStorage.approve_cases)으로 케이스가 뒤에 붙으면 extend() 가 새 케이스만
+반영한 새 객체를 만든다(copy-on-write — 이전 스냅샷의 통계는 바뀌지 않는다).
+
+동점 순서:
+Counter.most_common 은 같은 빈도에서 처음 나온 순서를 유지한다. 처방 부분 일치
+질의(formula_index 로 처방명 집합으로 해석)는 여러 처방의 히스토그램을 합치므로, 키마다 코퍼스 전체 기준 첫 등장 순번을
+기록해 두고 합친 뒤에도 같은 순서를 재현한다.
+"""
+
+from __future__ import annotations
+
+import bisect
+import copy
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .case_corpus import AGE_BANDS, UNKNOWN, CorpusSnapshot, age_band, register_derived
+
+# 긍정적 결과 키워드
+POSITIVE_KEYWORDS = (
+    '완치', '호전', '개선', '낫', '좋아', '효과', '소실', '없어',
+    '회복', '정상', '감소', '치료', '치유', '쾌유'
+)
+
+# 처방명으로 보기 어려운 추출 오류 값 (top-formulas 에서 제외)
+INVALID_FORMULA_NAMES = frozenset({'사상', '감기의', '새로보는', '고령자채록모음', '빈용', '되고', '을', '의'})
+
+SAMPLE_RESULTS = 5
+
+
+def is_positive_result(result: str) -> bool:
+    result_lower = result.lower()
+    return any(kw in result_lower for kw in POSITIVE_KEYWORDS)
+
+
+class Histogram:
+    """빈도 + 첫 등장 순번. most_common 은 collections.Counter 와 같은 순서."""
+
+    __slots__ = ('counts', 'first', '_ranked')
+
+    def __init__(self) -> None:
+        self.counts: Dict[str, int] = {}
+        self.first: Dict[str, int] = {}
+        self._ranked: Optional[List[Tuple[str, int]]] = None
+
+    def __len__(self) -> int:
+        return len(self.counts)
+
+    def add(self, key, seq: int) -> None:
+        count = self.counts.get(key)
+        if count is None:
+            self.counts[key] = 1
+            self.first[key] = seq
+        else:
+            self.counts[key] = count + 1
+        self._ranked = None
+
+    def copy(self) -> "Histogram":
+        other = Histogram()
+        other.counts = dict(self.counts)
+        other.first = dict(self.first)
+        return other
+
+    def most_common(self, n: Optional[int] = None) -> List[Tuple[str, int]]:
+        if self._ranked is None:
+            # counts 의 삽입 순서 = 첫 등장 순서, sorted 는 안정 정렬
+            self._ranked = sorted(self.counts.items(), key=lambda kv: kv[1], reverse=True)
+        return self._ranked if n is None else self._ranked[:n]
+
+    def count_at_least(self, n: int) -> int:
+        """빈도가 n 이상인 키 수 (정렬된 빈도에서 이분 탐색)."""
+        ranked = self.most_common()
+        return bisect.bisect_right(ranked, -n, key=lambda kv: -kv[1])
+
+    def as_dict(self) -> Dict[str, int]:
+        return dict(self.counts)
+
+    @classmethod
+    def merge(cls, hists: Iterable["Histogram"]) -> "Histogram":
+        """여러 히스토그램 합산 (키 순서는 코퍼스 전체 첫 등장 순)."""
+        counts: Dict[str, int] = {}
+        first: Dict[str, int] = {}
+        for h in hists:
+            for key, count in h.counts.items():
+                if key in counts:
+                    counts[key] += count
+                    first[key] = min(first[key], h.first[key])
+                else:
+                    counts[key] = count
+                    first[key] = h.first[key]
+        merged = cls()
+        for key in sorted(counts, key=first.__getitem__):
+            merged.counts[key] = counts[key]
+            merged.first[key] = first[key]
+        return merged
+
+
+class FormulaAggregate:
+    """처방 하나(formula_name 정확 일치)의 집계."""
+
+    __slots__ = (
+        'name', 'case_count', 'symptoms', 'diagnoses', 'constitutions', 'genders',
+        'age_bands', 'age_sum', 'age_count', 'with_result', 'positive', 'samples',
+    )
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.case_count = 0
+        self.symptoms = Histogram()
+        self.diagnoses = Histogram()
+        self.constitutions = Histogram()
+        self.genders = Histogram()
+        self.age_bands: Dict[str, int] = {band: 0 for band in AGE_BANDS}
+        self.age_sum = 0
+        self.age_count = 0
+        self.with_result = 0
+        self.positive = 0
+        self.samples: List[Tuple[int, str]] = []  # (case 위치, 결과 앞 200자)
+
+    def __deepcopy__(self, memo) -> "FormulaAggregate":
+        other = FormulaAggregate(self.name)
+        other.case_count = self.case_count
+        other.symptoms = self.symptoms.copy()
+        other.diagnoses = self.diagnoses.copy()
+        other.constitutions = self.constitutions.copy()
+        other.genders = self.genders.copy()
+        other.age_bands = dict(self.age_bands)
+        other.age_sum = self.age_sum
+        other.age_count = self.age_count
+        other.with_result = self.with_result
+        other.positive = self.positive
+        other.samples = list(self.samples)
+        return other
+
+
+class CaseStats:
+    """코퍼스 전체 + 처방별 집계. 한 번 만든 객체는 수정하지 않는다."""
+
+    def __init__(self) -> None:
+        self.total_cases = 0
+        self.with_constitution = 0
+        self.with_diagnosis = 0
+        self.with_result = 0
+        self.age_bands: Dict[str, int] = {band: 0 for band in (*AGE_BANDS, UNKNOWN)}
+        self.genders = Histogram()
+        self.constitutions = Histogram()
+        self.symptoms = Histogram()
+        self.diagnoses = Histogram()
+        self.formula_counts = Histogram()        # 유효한 처방명만 (top-formulas)
+        self.formulas: Dict[str, FormulaAggregate] = {}
+        self._seq = 0
+
+    @classmethod
+    def build(cls, cases: Sequence[Dict]) -> "CaseStats":
+        stats = cls()
+        stats._add(cases, 0, touched=None)
+        return stats
+
+    def extend(self, cases: Sequence[Dict], start: int) -> "CaseStats":
+        """
+        start 위치부터 붙은 케이스를 반영한 새 CaseStats.
+        새 케이스가 건드린 처방 집계와 전체 히스토그램만 복사한다.
+        """
+        stats = copy.copy(self)
+        stats.age_bands = dict(self.age_bands)
+        for name in ('genders', 'constitutions', 'symptoms', 'diagnoses', 'formula_counts'):
+            setattr(stats, name, getattr(self, name).copy())
+        stats.formulas = dict(self.formulas)
+        stats._add(cases, start, touched=set())
+        return stats
+
+    def _formula(self, name: str, touched: Optional[set]) -> FormulaAggregate:
+        agg = self.formulas.get(name)
+        if agg is None:
+            agg = self.formulas[name] = FormulaAggregate(name)
+        elif touched is not None and name not in touched:
+            agg = self.formulas[name] = copy.deepcopy(agg)
+        if touched is not None:
+            touched.add(name)
+        return agg
+
+    def _add(self, cases: Sequence[Dict], start: int, touched: Optional[set]) -> None:
+        seq = self._seq
+        for offset, case in enumerate(cases):
+            idx = start + offset
+            formula = case.get('formula_name') or ''
+            constitution = case.get('patient_constitution') or UNKNOWN
+            gender = case.get('patient_gender') or UNKNOWN
+            diagnosis = case.get('diagnosis') or ''
+            result = case.get('result') or ''
+            symptoms = case.get('symptoms') or []
+            age = case.get('patient_age')
+            band = age_band(age)
+
+            self.total_cases += 1
+            self.age_bands[band] += 1
+            self.genders.add(gender, seq)
+            self.constitutions.add(constitution, seq)
+            if case.get('patient_constitution'):
+                self.with_constitution += 1
+            if diagnosis:
+                self.with_diagnosis += 1
+                self.diagnoses.add(diagnosis, seq)
+            if result:
+                self.with_result += 1
+            if formula and len(formula) >= 2 and formula not in INVALID_FORMULA_NAMES:
+                self.formula_counts.add(formula, seq)
+
+            agg = self._formula(formula, touched) if formula else None
+            if agg is not None:
+                agg.case_count += 1
+                agg.constitutions.add(constitution, seq)
+                agg.genders.add(gender, seq)
+                if diagnosis:
+                    agg.diagnoses.add(diagnosis, seq)
+                if band != UNKNOWN:
+                    agg.age_bands[band] += 1
+                    agg.age_sum += age if isinstance(age, (int, float)) else int(age)
+                    agg.age_count += 1
+                if result:
+                    agg.with_result += 1
+                    if is_positive_result(result):
+                        agg.positive += 1
+                    if len(agg.samples) < SAMPLE_RESULTS and len(result) > 10:
+                        agg.samples.append((idx, result[:200]))
+
+            for s in symptoms:
+                seq += 1
+                self.symptoms.add(s, seq)
+                if agg is not None:
+                    agg.symptoms.add(s, seq)
+            seq += 1
+        self._seq = seq
+
+    # ---------- 조회 ----------
+
+    @property
+    def formula_total(self) -> int:
+        """formula_name 이 있는 서로 다른 처방 수."""
+        return len(self.formulas)
+
+    def aggregates(self, names: Iterable[str]) -> List[FormulaAggregate]:
+        """처방명들의 집계 (부분 일치 해석은 formula_index.NameIndex 가 담당)."""
+        formulas = self.formulas
+        return [formulas[name] for name in names if name in formulas]
+
+    def formula_stats(self, names: Iterable[str]) -> Optional[Dict]:
+        """처방들의 합산 통계 (없으면 None)."""
+        aggs = self.aggregates(names)
+        if not aggs:
+            return None
+        if len(aggs) == 1:
+            agg = aggs[0]
+            symptoms, diagnoses = agg.symptoms, agg.diagnoses
+            constitutions, genders = agg.constitutions, agg.genders
+        else:
+            symptoms = Histogram.merge(a.symptoms for a in aggs)
+            diagnoses = Histogram.merge(a.diagnoses for a in aggs)
+            constitutions = Histogram.merge(a.constitutions for a in aggs)
+            genders = Histogram.merge(a.genders for a in aggs)
+
+        age_bands = {band: sum(a.age_bands[band] for a in aggs) for band in AGE_BANDS}
+        age_count = sum(a.age_count for a in aggs)
+        avg_age = sum(a.age_sum for a in aggs) / age_count if age_count else None
+        return {
+            'case_count': sum(a.case_count for a in aggs),
+            'top_symptoms': symptoms.most_common(10),
+            'top_diagnoses': diagnoses.most_common(5),
+            'constitution_distribution': constitutions.as_dict(),
+            'age_distribution': age_bands,
+            'avg_age': avg_age,
+            'gender_ratio': genders.as_dict(),
+        }
+
+    def effectiveness(self, names: Iterable[str]) -> Optional[Dict]:
+        """처방들의 결과 기재 케이스 효과 집계 (없으면 None)."""
+        aggs = [a for a in self.aggregates(names) if a.with_result]
+        if not aggs:
+            return None
+        samples = sorted(s for a in aggs for s in a.samples)[:SAMPLE_RESULTS]
+        return {
+            'total_cases_with_result': sum(a.with_result for a in aggs),
+            'positive_outcomes': sum(a.positive for a in aggs),
+            'sample_results': [text for _, text in samples],
+        }
+
+
+STATS_NAME = 'case_stats'
+register_derived(
+    STATS_NAME,
+    lambda snap: CaseStats.build(snap.cases),
+    extend=lambda stats, snap, start: stats.extend(snap.cases[start:], start),
+)
+
+
+def get_case_stats(snap: CorpusSnapshot) -> CaseStats:
+    """스냅샷의 통계 (로드/승인 시 미리 계산됨)."""
+    return snap.derived(STATS_NAME)
@@ -0,0 +1,347 @@
+"""
+치험례 열(column) 저장소 — 코퍼스 상주 메모리 절감.
+
+json.load 결과(list[dict])는 케이스마다 dict + 키 문자열 참조 + 값 객체를 따로 들고,
+같은 처방명/증상 문자열도 케이스마다 별도 객체다. 6만 건 합성 코퍼스 기준 약 170MB.
+512MB VM 에서 파생 인덱스·요청 처리까지 감당하려면 케이스 본문을 압축해 둬야 한다.
+
+구성 (블록 = 연속된 케이스 묶음, 생성 후 불변):
+- 범주형 열: 값 테이블(intern) + 케이스별 코드 (array)
+  처방명/체질/성별/나이/진단 등 중복이 많은 스칼라 값
+- 태그 열: 스칼라 리스트(증상 등) → 값 테이블 코드의 평탄화 배열 + 오프셋
+- 텍스트 열: 모든 값을 하나의 UTF-8 버퍼에 이어 붙이고 오프셋만 보관
+  (id/제목/원문 등 케이스마다 다른 문자열)
+- JSON 열: 그 밖의 값(약재 dict 리스트, 타입이 섞인 열) → JSON 문자열을 텍스트 버퍼에
+- 케이스별 키 순서(shape)도 intern 해 두어 없는 키 / 원래 키 순서를 그대로 재현한다.
+
+읽기는 CaseRow(__slots__ 뷰, Mapping) 로 한다. row.get(key) 호출 때만 해당 열 값을
+만들어 돌려주므로 원문 같은 큰 필드는 /list 등 실제로 필요한 응답에서만 디코드된다.
+값은 매번 새로 만든 객체라 수정해도 저장소에는 반영되지 않는다(읽기 전용).
+
+로드는 파일을 원소 단위로 디코드해 BLOCK_SIZE 건마다 블록으로 옮긴다(load_case_store).
+승인 append 는 기존 블록을 공유하고 새 블록만 붙인다(extended).
+"""
+
+from __future__ import annotations
+
+import ctypes
+import json
+import os
+import re
+from array import array
+from bisect import bisect_right
+from collections.abc import Mapping, Sequence
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+
+# 블록 하나의 케이스 수 — 로드 시 동시에 살아 있는 dict 수의 상한
+BLOCK_SIZE = int(os.getenv("CASE_STORE_BLOCK_SIZE", "4096"))
+# 서로 다른 값 수가 (값이 있는 케이스 수 × 이 비율) 이하이면 범주형으로 intern
+CATEGORICAL_MAX_RATIO = 0.5
+_SCALARS = (str, int, float, bool, type(None))
+_MISSING = object()
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+
+def _intern_key(value: Any) -> Any:
+    # True == 1 == 1.0 이 같은 dict 키가 되지 않도록 문자열 외에는 타입을 함께 쓴다
+    return value if type(value) is str else (type(value), value)
+
+
+class _Interner:
+    """값 → 코드 (첫 등장 순)."""
+
+    __slots__ = ("values", "_codes")
+
+    def __init__(self) -> None:
+        self.values: List[Any] = []
+        self._codes: Dict[Any, int] = {}
+
+    def code(self, value: Any) -> int:
+        key = value if type(value) is str else (type(value), value)
+        code = self._codes.get(key)
+        if code is None:
+            code = self._codes[key] = len(self.values)
+            self.values.append(value)
+        return code
+
+
+class _Categorical:
+    __slots__ = ("values", "codes")
+
+    def __init__(self, values: List[Any], codes: array) -> None:
+        self.values = values
+        self.codes = codes
+
+    def get(self, i: int) -> Any:
+        return self.values[self.codes[i]]
+
+
+class _Tags:
+    __slots__ = ("values", "codes", "offsets")
+
+    def __init__(self, values: List[Any], codes: array, offsets: array) -> None:
+        self.values = values
+        self.codes = codes
+        self.offsets = offsets
+
+    def get(self, i: int) -> List[Any]:
+        values, codes = self.values, self.codes
+        # 슬라이스 대신 인덱스 순회 — mmap memoryview 슬라이스는 array 보다 몇 배 느리다
+        return [values[codes[j]] for j in range(self.offsets[i], self.offsets[i + 1])]
+
+
+class _Text:
+    __slots__ = ("buffer", "offsets")
+
+    def __init__(self, buffer: bytes, offsets: array) -> None:
+        self.buffer = buffer
+        self.offsets = offsets
+
+    def get(self, i: int) -> str:
+        # buffer 는 bytes 또는 mmap 위의 memoryview (case_snapshot)
+        return str(self.buffer[self.offsets[i]:self.offsets[i + 1]], "utf-8")
+
+
+class _Json(_Text):
+    __slots__ = ()
+
+    def get(self, i: int) -> Any:
+        return json.loads(str(self.buffer[self.offsets[i]:self.offsets[i + 1]], "utf-8"))
+
+
+def _column(values: List[Any]) -> Any:
+    """
+    한 열의 값(없는 케이스는 _MISSING) → 가장 작은 표현.
+    """
+    present = [v for v in values if v is not _MISSING]
+    if all(isinstance(v, _SCALARS) for v in present):
+        distinct = {_intern_key(v) for v in present}
+        text_only = all(isinstance(v, str) for v in present)
+        if not text_only or len(distinct) <= max(1, len(present) * CATEGORICAL_MAX_RATIO):
+            interner = _Interner()
+            interner.code(None)  # 없는 케이스 자리
+            codes = array("I", (interner.code(None if v is _MISSING else v) for v in values))
+            return _Categorical(interner.values, codes)
+        return _text_column(values, lambda v: v.encode("utf-8"), _Text)
+
+    if all(isinstance(v, list) and all(isinstance(x, _SCALARS) for x in v) for v in present):
+        interner = _Interner()
+        codes, offsets = array("I"), array("Q", [0])
+        for v in values:
+            if v is not _MISSING:
+                codes.extend(interner.code(x) for x in v)
+            offsets.append(len(codes))
+        return _Tags(interner.values, codes, offsets)
+
+    return _text_column(
+        values, lambda v: json.dumps(v, ensure_ascii=False, separators=(",", ":")).encode("utf-8"), _Json,
+    )
+
+
+def _text_column(values: List[Any], encode, cls) -> _Text:
+    chunks: List[bytes] = []
+    offsets = array("Q", [0])
+    size = 0
+    for v in values:
+        if v is not _MISSING:
+            data = encode(v)
+            chunks.append(data)
+            size += len(data)
+        offsets.append(size)
+    return cls(b"".join(chunks), offsets)
+
+
+class _Block:
+    """케이스 묶음 하나의 열 저장소."""
+
+    __slots__ = ("size", "shapes", "shape_keys", "shape_codes", "columns")
+
+    def __init__(self, cases: Sequence[Mapping]) -> None:
+        self.size = len(cases)
+        shapes = _Interner()
+        self.shape_codes = array("I", (shapes.code(tuple(case)) for case in cases))
+        self.shapes: List[Tuple[str, ...]] = shapes.values
+        self.shape_keys = [frozenset(shape) for shape in self.shapes]
+
+        keys: Dict[str, None] = {}
+        for shape in self.shapes:
+            keys.update(dict.fromkeys(shape))
+        self.columns: Dict[str, Any] = {
+            key: _column([case.get(key, _MISSING) for case in cases])
+            for key in keys
+        }
+
+    @classmethod
+    def from_parts(
+        cls, size: int, shapes: List[Tuple[str, ...]], shape_codes: Sequence[int], columns: Dict[str, Any],
+    ) -> "_Block":
+        """이미 만든 열로 블록 구성 (스냅샷 파일 로드용)."""
+        block = cls.__new__(cls)
+        block.size = size
+        block.shapes = shapes
+        block.shape_keys = [frozenset(shape) for shape in shapes]
+        block.shape_codes = shape_codes
+        block.columns = columns
+        return block
+
+
+class CaseRow(Mapping):
+    """케이스 한 건의 읽기 전용 뷰 (dict 처럼 get / [] / in / items 사용)."""
+
+    __slots__ = ("_block", "_i", "_shape")
+
+    def __init__(self, block: _Block, i: int) -> None:
+        self._block = block
+        self._i = i
+        self._shape = block.shape_codes[i]
+
+    def get(self, key: str, default: Any = None) -> Any:
+        block = self._block
+        if key not in block.shape_keys[self._shape]:
+            return default
+        return block.columns[key].get(self._i)
+
+    def __getitem__(self, key: str) -> Any:
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._block.shape_keys[self._shape]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._block.shapes[self._shape])
+
+    def __len__(self) -> int:
+        return len(self._block.shapes[self._shape])
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {key: self.get(key) for key in self}
+
+    def __repr__(self) -> str:
+        return f"CaseRow({self.to_dict()!r})"
+
+
+class CaseStore(Sequence):
+    """열 저장소 케이스 목록. 인덱싱하면 CaseRow, 슬라이스하면 CaseRow 리스트."""
+
+    def __init__(self, blocks: Iterable[_Block] = ()) -> None:
+        self._blocks: List[_Block] = [b for b in blocks if b.size]
+        self._starts: List[int] = []
+        total = 0
+        for block in self._blocks:
+            self._starts.append(total)
+            total += block.size
+        self._size = total
+
+    @classmethod
+    def from_dicts(cls, cases: Sequence[Mapping]) -> "CaseStore":
+        return cls([_Block(cases)])
+
+    def extended(self, cases: Sequence[Mapping]) -> "CaseStore":
+        """기존 블록을 공유하고 cases 를 새 블록으로 붙인 저장소 (self 는 그대로)."""
+        return CaseStore([*self._blocks, _Block(cases)])
+
+    @property
+    def blocks(self) -> List[_Block]:
+        return list(self._blocks)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _row(self, i: int) -> CaseRow:
+        if len(self._blocks) == 1:
+            return CaseRow(self._blocks[0], i)
+        b = bisect_right(self._starts, i) - 1
+        return CaseRow(self._blocks[b], i - self._starts[b])
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self._row(j) for j in range(*i.indices(self._size))]
+        if i < 0:
+            i += self._size
+        if not 0 <= i < self._size:
+            raise IndexError("case index out of range")
+        return self._row(i)
+
+    def __iter__(self) -> Iterator[CaseRow]:
+        for block in self._blocks:
+            for i in range(block.size):
+                yield CaseRow(block, i)
+
+    def __add__(self, other: Sequence[Mapping]) -> "CaseStore":
+        return self.extended(other)
+
+
+def compact_cases(cases: Sequence[Mapping], block_size: int = BLOCK_SIZE) -> CaseStore:
+    """list[dict] → CaseStore (이미 CaseStore 면 그대로)."""
+    if isinstance(cases, CaseStore):
+        return cases
+    return CaseStore([_Block(cases[i:i + block_size]) for i in range(0, len(cases), block_size)])
+
+
+def _iter_json_array(text: str) -> Iterator[Any]:
+    """JSON 배열 문자열의 원소를 하나씩 디코드."""
+    decoder = json.JSONDecoder()
+    ws = _WHITESPACE.match
+    pos = ws(text, 0).end()
+    if text[pos:pos + 1] != "[":
+        raise ValueError("case file must contain a JSON array")
+    pos = ws(text, pos + 1).end()
+    if text[pos:pos + 1] == "]":
+        return
+    while True:
+        item, pos = decoder.raw_decode(text, pos)
+        yield item
+        pos = ws(text, pos).end()
+        sep = text[pos:pos + 1]
+        if sep == "]":
+            return
+        if sep != ",":
+            raise ValueError(f"unexpected {sep!r} at {pos} in case array")
+        pos = ws(text, pos + 1).end()
+
+
+def load_case_store(path: Path, block_size: int = BLOCK_SIZE) -> CaseStore:
+    """
+    JSON 배열 파일 → CaseStore.
+
+    json.load 로 전체 dict 목록을 만든 뒤 옮기면 그 dict 들이 쓰던 작은 객체 메모리가
+    해제 후에도 프로세스에 남아(RSS 유지) 절감 효과가 거의 없다. 원소를 하나씩 디코드해
+    block_size 건마다 블록으로 옮기므로 dict 는 한 블록 분량만 동시에 존재한다.
+    """
+    text = Path(path).read_text(encoding="utf-8")
+    blocks: List[_Block] = []
+    pending: List[Any] = []
+    for item in _iter_json_array(text):
+        pending.append(item)
+        if len(pending) >= block_size:
+            blocks.append(_Block(pending))
+            pending = []
+    if pending:
+        blocks.append(_Block(pending))
+    del text
+    return CaseStore(blocks)
+
+
+
+def release_free_heap() -> None:
+    """
+    해제된 힙 메모리를 OS 에 돌려준다 (glibc malloc_trim, 그 밖의 환경에서는 아무것도 안 함).
+
+    로드 중 임시 dict/배열이 쓰던 메모리는 해제 후에도 RSS 에 남는다. 코퍼스 교체 직후
+    한 번 호출하면 6만 건 합성 코퍼스 기준 RSS 가 100MB 이상 줄어든다.
+    """
+    global _malloc_trim
+    if _malloc_trim is None:
+        try:
+            _malloc_trim = ctypes.CDLL("libc.so.6").malloc_trim
+        except (OSError, AttributeError):
+            _malloc_trim = False
+    if _malloc_trim:
+        _malloc_trim(0)
+
+
+_malloc_trim: Any = None
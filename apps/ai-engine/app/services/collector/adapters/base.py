@@ -82,18 +82,36 @@ class BaseSourceAdapter(ABC):
         pass
 
     @abstractmethod
-    async def fetch_detail(self, article_id: str) -> Optional[ArticleDetail]:
+    async def fetch_detail(self, article_id: str, offline: bool = False) -> Optional[ArticleDetail]:
         """
-        논문 상세 정보 가져오기
+        논문 상세 정보 가져오기 (HTTP 캐시 경유)
 
         Args:
             article_id: 논문 ID
+            offline: 네트워크 없이 캐시된 응답으로만 (없으면 None — 실패 큐 재시도용)
 
         Returns:
             ArticleDetail: 논문 상세 정보 (실패시 None)
         """
         pass
 
+    def sequence_number(self, article_id: str) -> Optional[int]:
+        """
+        단조 증가하는 논문 번호 (증분 수집 high-water mark 용)
+
+        새 논문일수록 커지는 ID(PMID 등)를 쓰는 소스만 오버라이드한다.
+        None 이면 이 소스는 번호로 건너뛰지 않는다.
+        """
+        return None
+
+    def detail_ready(self, article_id: str) -> bool:
+        """
+        검색 단계에서 상세 정보까지 이미 받아 둔 논문인지
+
+        True 면 fetch_detail 이 요청 없이 돌려주므로 수집기가 요청 간격을 두지 않는다.
+        """
+        return False
+
     def get_rate_limit(self) -> float:
         """
         요청 간 대기 시간 (초)
@@ -1,6 +1,8 @@
 """
 KCI (한국학술지인용색인) 어댑터
 https://www.kci.go.kr
+
+HTML 파싱(클래스 메서드)은 수집기 프로세스 풀에서 실행한다. 요청은 http_cache 경유.
 """
 
 import asyncio
@@ -11,6 +13,8 @@ import re
 from urllib.parse import urljoin, quote
 
 from .base import BaseSourceAdapter, ArticleInfo, ArticleDetail
+from ..http_cache import get_http_cache
+from ..process_pool import run_in_process
 
 
 class KCIAdapter(BaseSourceAdapter):
@@ -79,31 +83,34 @@ class KCIAdapter(BaseSourceAdapter):
 
                 print(f"[KCI] Searching for '{keyword}'...")
 
-                async with self.session.get(search_url, params=params) as response:
-                    if response.status != 200:
-                        print(f"[KCI] Search failed for '{keyword}': {response.status}")
-                        continue
+                response = await get_http_cache().request(
+                    self.session, "GET", search_url, params=params, kind="search"
+                )
+                if response.status != 200:
+                    print(f"[KCI] Search failed for '{keyword}': {response.status}")
+                    continue
 
-                    html = await response.text()
-                    soup = BeautifulSoup(html, 'lxml')
+                html = response.text()
 
-                    # 검색 결과 파싱
-                    results = self._parse_search_results(soup)
-                    print(f"[KCI] Found {len(results)} articles for '{keyword}'")
+                # 검색 결과 파싱
+                results = await run_in_process(self._parse_search_results, html)
+                print(f"[KCI] Found {len(results)} articles for '{keyword}'")
 
-                    for article in results[:max_results]:
-                        yield article
+                for article in results[:max_results]:
+                    yield article
 
-                        # Rate limiting
-                        await asyncio.sleep(1.0)
+                    # Rate limiting
+                    await asyncio.sleep(1.0)
 
             except Exception as e:
                 print(f"[KCI] Error searching for '{keyword}': {e}")
                 continue
 
-    def _parse_search_results(self, soup: BeautifulSoup) -> List[ArticleInfo]:
+    @classmethod
+    def _parse_search_results(cls, html: str) -> List[ArticleInfo]:
         """검색 결과 HTML 파싱"""
         articles = []
+        soup = BeautifulSoup(html, 'lxml')
 
         # KCI 검색 결과 리스트
         result_items = soup.select('ul.list li, .list_search li, .resultList li')
@@ -128,7 +135,7 @@ class KCIAdapter(BaseSourceAdapter):
 
                 # 링크에서 article_id 추출
                 href = title_elem.get('href', '')
-                url = urljoin(self.base_url, href)
+                url = urljoin(cls.base_url, href)
 
                 # artiId 파라미터에서 ID 추출
                 article_id = ""
@@ -183,7 +190,12 @@ class KCIAdapter(BaseSourceAdapter):
 
         return articles
 
-    async def fetch_detail(self, article_id: str) -> Optional[ArticleDetail]:
+    def sequence_number(self, article_id: str) -> Optional[int]:
+        """artiId 번호 (ART002345678 → 2345678, 등록 순으로 증가)"""
+        match = re.fullmatch(r'ART(\d+)', article_id)
+        return int(match.group(1)) if match else None
+
+    async def fetch_detail(self, article_id: str, offline: bool = False) -> Optional[ArticleDetail]:
         """논문 상세 페이지에서 전문 가져오기"""
         if not self.session:
             await self.initialize()
@@ -197,27 +209,33 @@ class KCIAdapter(BaseSourceAdapter):
 
             print(f"[KCI] Fetching detail for {article_id}...")
 
-            async with self.session.get(detail_url, params=params) as response:
-                if response.status != 200:
-                    print(f"[KCI] Failed to fetch detail for {article_id}: {response.status}")
-                    return None
+            response = await get_http_cache().request(
+                self.session, "GET", detail_url, params=params, kind="detail", offline=offline
+            )
+            if response is None:
+                return None
+            if response.status != 200:
+                print(f"[KCI] Failed to fetch detail for {article_id}: {response.status}")
+                return None
 
-                html = await response.text()
-                soup = BeautifulSoup(html, 'lxml')
+            html = response.text()
+            url = response.url
 
-                return self._parse_article_detail(soup, article_id, str(response.url))
+            return await run_in_process(self._parse_article_detail, html, article_id, url)
 
         except Exception as e:
             print(f"[KCI] Error fetching detail for {article_id}: {e}")
             return None
 
+    @classmethod
     def _parse_article_detail(
-        self,
-        soup: BeautifulSoup,
+        cls,
+        html: str,
         article_id: str,
         url: str
     ) -> Optional[ArticleDetail]:
         """상세 페이지 파싱"""
+        soup = BeautifulSoup(html, 'lxml')
         try:
             # 제목
             title = ""
@@ -8,6 +8,7 @@ https://oasis.kiom.re.kr
 
 페이지는 eGov framework + plani 기반. 결과는 HTML 테이블 형태이며
 각 결과는 `<a href="javascript:paperDetailView('IDX')">` 로 연결.
+HTML 파싱(클래스 메서드)은 수집기 프로세스 풀에서 실행한다. 요청은 http_cache 경유.
 """
 
 import asyncio
@@ -19,6 +20,8 @@ import aiohttp
 from bs4 import BeautifulSoup
 
 from .base import ArticleDetail, ArticleInfo, BaseSourceAdapter
+from ..http_cache import get_http_cache
+from ..process_pool import run_in_process
 from ....core.logger import get_logger
 
 
@@ -86,17 +89,17 @@ class OASISAdapter(BaseSourceAdapter):
                     "pageIndex": "1",
                 }
                 url = f"{self.base_url}{self.search_action}?srch_menu_nix={self.srch_menu_nix}"
-                async with self.session.post(url, data=form) as resp:
-                    if resp.status != 200:
-                        logger.warning(
-                            "OASIS search failed for '%s': HTTP %s",
-                            keyword,
-                            resp.status,
-                        )
-                        continue
-                    html = await resp.text(errors="ignore")
+                resp = await get_http_cache().request(self.session, "POST", url, data=form, kind="search")
+                if resp.status != 200:
+                    logger.warning(
+                        "OASIS search failed for '%s': HTTP %s",
+                        keyword,
+                        resp.status,
+                    )
+                    continue
+                html = resp.text(errors="ignore")
 
-                items = self._parse_search_results(html, keyword)
+                items = await run_in_process(self._parse_search_results, html, keyword)
                 logger.info(
                     "OASIS keyword '%s': %d results", keyword, len(items)
                 )
@@ -113,7 +116,8 @@ class OASISAdapter(BaseSourceAdapter):
                 logger.exception("OASIS error on '%s': %s", keyword, e)
                 continue
 
-    def _parse_search_results(self, html: str, keyword: str) -> List[ArticleInfo]:
+    @classmethod
+    def _parse_search_results(cls, html: str, keyword: str) -> List[ArticleInfo]:
         """
         결과 행 추출:
         - 각 결과는 `<a href="javascript:paperDetailView('IDX')" title="...">제목</a>` 패턴
@@ -170,14 +174,19 @@ class OASISAdapter(BaseSourceAdapter):
                     authors=authors,
                     journal=journal[:200],
                     year=year,
-                    url=f"{self.base_url}{self.detail_action}?idx={idx}&srch_menu_nix={self.srch_menu_nix}",
+                    url=f"{cls.base_url}{cls.detail_action}?idx={idx}&srch_menu_nix={cls.srch_menu_nix}",
                     abstract="",
                 )
             )
 
         return results
 
-    async def fetch_detail(self, article_id: str) -> Optional[ArticleDetail]:
+    def sequence_number(self, article_id: str) -> Optional[int]:
+        """OASIS idx (등록 순으로 증가)"""
+        idx = article_id.replace("OASIS:", "")
+        return int(idx) if idx.isdigit() else None
+
+    async def fetch_detail(self, article_id: str, offline: bool = False) -> Optional[ArticleDetail]:
         if not self.session:
             await self.initialize()
 
@@ -187,21 +196,24 @@ class OASISAdapter(BaseSourceAdapter):
 
         url = f"{self.base_url}{self.detail_action}?idx={idx}&srch_menu_nix={self.srch_menu_nix}"
         try:
-            async with self.session.post(url, data={}) as resp:
-                if resp.status != 200:
-                    logger.warning(
-                        "OASIS detail fetch failed for %s: HTTP %s", idx, resp.status
-                    )
-                    return None
-                html = await resp.text(errors="ignore")
+            resp = await get_http_cache().request(self.session, "POST", url, data={}, kind="detail", offline=offline)
+            if resp is None:
+                return None
+            if resp.status != 200:
+                logger.warning(
+                    "OASIS detail fetch failed for %s: HTTP %s", idx, resp.status
+                )
+                return None
+            html = resp.text(errors="ignore")
         except Exception as e:
             logger.exception("OASIS detail error for %s: %s", idx, e)
             return None
 
-        return self._parse_detail(html, idx, url)
+        return await run_in_process(self._parse_detail, html, idx, url)
 
+    @classmethod
     def _parse_detail(
-        self, html: str, idx: str, url: str
+        cls, html: str, idx: str, url: str
     ) -> Optional[ArticleDetail]:
         soup = BeautifulSoup(html, "lxml")
 
@@ -223,7 +235,7 @@ class OASISAdapter(BaseSourceAdapter):
                 title = t.get_text(strip=True)
 
         # 모든 테이블 셀에서 라벨/값 매핑 추출
-        meta = self._extract_meta(soup)
+        meta = cls._extract_meta(soup)
 
         authors_raw = meta.get("저자") or meta.get("저자명") or ""
         authors = [a.strip() for a in re.split(r"[,;·]", authors_raw) if a.strip()][:20]
@@ -264,7 +276,8 @@ class OASISAdapter(BaseSourceAdapter):
             keywords=keywords,
         )
 
-    def _extract_meta(self, soup: BeautifulSoup) -> dict[str, str]:
+    @staticmethod
+    def _extract_meta(soup: BeautifulSoup) -> dict[str, str]:
         meta: dict[str, str] = {}
         for tr in soup.select("table tr"):
             th = tr.select_one("th")
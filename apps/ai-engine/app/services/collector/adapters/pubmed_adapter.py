@@ -1,15 +1,175 @@
 """
 PubMed E-utilities 어댑터
 한의학/한방 관련 증례보고 검색
+
+XML 파싱(정적 메서드)은 수집기 프로세스 풀에서 실행한다. 요청은 http_cache 경유.
+EFetch XML 은 lxml iterparse 로 스트리밍 파싱한다 — <PubmedArticle> 이 닫힐 때마다 논문 하나를
+만들고 그 요소를 비우므로, 트리 메모리는 배치 크기와 관계없이 논문 한 편 분량이다.
+NCBI 요청은 모두 공용 속도 제한(ncbi_limiter)을 거친다 — API key 없이 초당 3건, 있으면 10건.
+NCBI_API_KEY: API key (생성자 인자가 우선)
 """
 
 import asyncio
+import os
 import aiohttp
-from typing import List, Optional, AsyncIterator
-from bs4 import BeautifulSoup
+from contextlib import aclosing
+from typing import Dict, Iterator, List, Optional, AsyncIterator, Tuple, Union
+from aiolimiter import AsyncLimiter
+from lxml import etree
+import io
 import re
+import weakref
 
 from .base import BaseSourceAdapter, ArticleInfo, ArticleDetail
+from ..http_cache import get_http_cache
+from ..process_pool import run_in_process
+
+NCBI_RPS_DEFAULT = 3
+NCBI_RPS_WITH_KEY = 10
+
+# 이벤트 루프 → 초당 요청 수 → 토큰 버킷 (AsyncLimiter 는 루프 사이에 공유할 수 없다)
+_ncbi_limiters: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[int, AsyncLimiter]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def ncbi_limiter(api_key: Optional[str] = None) -> AsyncLimiter:
+    """NCBI E-utilities 공용 토큰 버킷 (이벤트 루프·초당 요청 수별 싱글톤)"""
+    rps = NCBI_RPS_WITH_KEY if api_key else NCBI_RPS_DEFAULT
+    limiters = _ncbi_limiters.setdefault(asyncio.get_running_loop(), {})
+    if rps not in limiters:
+        limiters[rps] = AsyncLimiter(rps, 1)
+    return limiters[rps]
+
+
+XmlSource = Union[str, bytes]
+
+
+def _as_bytes(xml: XmlSource) -> bytes:
+    return xml.encode("utf-8") if isinstance(xml, str) else xml
+
+
+def _text(elem: Optional[etree._Element]) -> str:
+    """요소 안의 모든 텍스트 (<i>, <sup> 같은 인라인 태그 포함)"""
+    return "".join(elem.itertext()) if elem is not None else ""
+
+
+def _article_detail(article: etree._Element, pmid: Optional[str] = None) -> Optional[ArticleDetail]:
+    """<PubmedArticle> 요소 → 상세 정보 (pmid 가 없으면 요소의 첫 PMID)"""
+    pmid = pmid or article.findtext(".//PMID")
+    if not pmid:
+        return None
+
+    # 제목
+    title = _text(article.find(".//ArticleTitle"))
+
+    # 저자
+    authors = []
+    for author in article.iterfind(".//Author"):
+        lastname = author.find(".//LastName")
+        forename = author.find(".//ForeName")
+        if lastname is not None:
+            name = _text(lastname)
+            if forename is not None:
+                name = f"{_text(forename)} {name}"
+            authors.append(name)
+
+    # 저널
+    journal = _text(article.find(".//Title"))
+
+    # 연도
+    year = None
+    year_elem = article.find(".//Year")
+    if year_elem is not None:
+        try:
+            year = int(_text(year_elem))
+        except ValueError:
+            pass
+
+    # DOI
+    doi = None
+    for id_elem in article.iterfind(".//ArticleId"):
+        if id_elem.get("IdType") == "doi":
+            doi = _text(id_elem)
+            break
+
+    # 초록 (전체)
+    abstract_parts = []
+    for abs_elem in article.iterfind(".//AbstractText"):
+        label = abs_elem.get("Label", "")
+        text = _text(abs_elem)
+        if label:
+            abstract_parts.append(f"{label}: {text}")
+        else:
+            abstract_parts.append(text)
+    abstract = "\n".join(abstract_parts)
+
+    # 키워드 + MeSH terms
+    keywords = [kw for kw in map(_text, article.iterfind(".//Keyword")) if kw]
+    keywords += [mesh for mesh in map(_text, article.iterfind(".//DescriptorName")) if mesh]
+
+    url = f"https://pubmed.ncbi.nlm.nih.gov/{pmid}/"
+
+    return ArticleDetail(
+        article_id=f"PMID:{pmid}",
+        title=title,
+        authors=authors[:20],
+        journal=journal,
+        year=year,
+        doi=doi,
+        url=url,
+        abstract=abstract,
+        full_text=abstract,  # PubMed는 보통 초록만 제공
+        keywords=keywords[:20],
+    )
+
+
+def iter_pubmed_articles(xml: XmlSource, pmid: Optional[str] = None) -> Iterator[ArticleDetail]:
+    """
+    EFetch XML 스트리밍 파싱 — <PubmedArticle> 이 닫힐 때마다 상세 정보 하나
+
+    처리한 요소와 앞선 형제 요소는 바로 지워 트리가 커지지 않는다. 깨진 논문 하나는
+    건너뛰고, XML 자체가 깨지면 그 앞까지만 돌려준다.
+
+    Args:
+        xml: EFetch 응답 본문
+        pmid: 지정하면 이 PMID 로 기록 (단건 상세 조회)
+    """
+    for detail, _ in _iter_articles(xml, pmid, keep_xml=False):
+        yield detail
+
+
+def _iter_articles(
+    xml: XmlSource, pmid: Optional[str], keep_xml: bool
+) -> Iterator[Tuple[ArticleDetail, Optional[bytes]]]:
+    """iter_pubmed_articles 본체 — keep_xml 이면 논문 하나만 담은 PubmedArticleSet XML 도 함께"""
+    context = etree.iterparse(
+        io.BytesIO(_as_bytes(xml)),
+        events=("end",),
+        tag="PubmedArticle",
+        resolve_entities=False,
+        no_network=True,
+        huge_tree=True,
+    )
+    try:
+        for _, article in context:
+            article_xml = None
+            try:
+                detail = _article_detail(article, pmid)
+                if detail and keep_xml:
+                    body = etree.tostring(article, with_tail=False)
+                    article_xml = b"<PubmedArticleSet>" + body + b"</PubmedArticleSet>"
+            except Exception as e:
+                print(f"[PubMed] Error parsing article: {e}")
+                detail = None
+            finally:
+                article.clear(keep_tail=True)
+                while article.getprevious() is not None:
+                    del article.getparent()[0]
+            if detail:
+                yield detail, article_xml
+    except etree.XMLSyntaxError as e:
+        print(f"[PubMed] Malformed EFetch XML: {e}")
 
 
 class PubMedAdapter(BaseSourceAdapter):
@@ -40,10 +200,16 @@ class PubMedAdapter(BaseSourceAdapter):
         f'{TRADITIONAL_MEDICINE_FILTER} AND "clinical case"[Title/Abstract]',
     ]
 
+    # EFetch 한 번에 받는 논문 수 (NCBI 권장 상한 안쪽)
+    EFETCH_BATCH = 200
+
     def __init__(self, api_key: Optional[str] = None):
         super().__init__()
         self.session: Optional[aiohttp.ClientSession] = None
-        self.api_key = api_key  # NCBI API key (선택사항, rate limit 완화)
+        # NCBI API key (선택사항, rate limit 완화)
+        self.api_key = api_key or os.getenv("NCBI_API_KEY") or None
+        # 배치 EFetch 로 받아 둔 상세 정보 (PMID:n → ArticleDetail, fetch_detail 이 꺼내 간다)
+        self._details: Dict[str, ArticleDetail] = {}
 
     async def initialize(self) -> None:
         """세션 초기화"""
@@ -56,6 +222,12 @@ class PubMedAdapter(BaseSourceAdapter):
         if self.session:
             await self.session.close()
             self.session = None
+        self._details.clear()
+
+    @property
+    def limiter(self) -> AsyncLimiter:
+        """NCBI 요청 공용 속도 제한 (이 프로세스의 모든 PubMed 어댑터가 같이 쓴다)"""
+        return ncbi_limiter(self.api_key)
 
     async def search(
         self,
@@ -67,10 +239,14 @@ class PubMedAdapter(BaseSourceAdapter):
         """
         PubMed에서 논문 검색
 
+        ESearch(usehistory=y)로 결과를 history server 에 올리고, EFetch 를 WebEnv/query_key 로
+        EFETCH_BATCH 건씩 받는다. 다음 배치 요청은 현재 배치를 파싱하는 동안 미리 보낸다.
+        초록까지 한 번에 받으므로 fetch_detail 은 추가 요청 없이 받아 둔 상세를 돌려준다.
+
         Args:
             keywords: 검색 키워드 (한국어 키워드는 영어로 변환됨)
-            date_from: 시작 날짜 (YYYY/MM/DD)
-            date_to: 종료 날짜 (YYYY/MM/DD)
+            date_from: 시작 날짜 (YYYY-MM-DD, PubMed 등록일 기준 — 증분 수집)
+            date_to: 종료 날짜 (YYYY-MM-DD)
             max_results: 최대 결과 수
         """
         if not self.session:
@@ -79,28 +255,40 @@ class PubMedAdapter(BaseSourceAdapter):
         # 키워드를 PubMed 쿼리로 변환
         search_queries = self._build_search_queries(keywords)
 
+        # 지난 검색에서 받아 두고 조회되지 않은 상세는 버린다
+        self._details.clear()
         seen_pmids = set()
 
         for query in search_queries:
             try:
-                # ESearch로 PMID 목록 가져오기
-                pmids = await self._esearch(query, max_results // len(search_queries))
-
-                # 중복 제거
-                new_pmids = [p for p in pmids if p not in seen_pmids]
-                seen_pmids.update(new_pmids)
-
-                if not new_pmids:
+                # ESearch 결과를 history server 에 저장
+                found = await self._esearch(query, max_results // len(search_queries), date_from, date_to)
+                if not found:
                     continue
+                pmids, webenv, query_key = found
 
-                print(f"[PubMed] Found {len(new_pmids)} articles for query")
-
-                # EFetch로 상세 정보 가져오기
-                articles = await self._efetch_articles(new_pmids)
+                if not any(p not in seen_pmids for p in pmids):
+                    continue
 
-                for article in articles:
-                    yield article
-                    await asyncio.sleep(0.5)  # Rate limiting
+                print(f"[PubMed] Found {len(pmids)} articles for query")
+
+                # 모두 앞 쿼리에서 본 PMID 인 배치는 요청하지 않는다
+                starts = [
+                    start for start in range(0, len(pmids), self.EFETCH_BATCH)
+                    if any(p not in seen_pmids for p in pmids[start:start + self.EFETCH_BATCH])
+                ]
+                # 수집기가 검색을 도중에 멈추면 미리 보낸 배치 요청도 취소된다
+                async with aclosing(self._efetch_batches(webenv, query_key, starts)) as batches:
+                    async for details in batches:
+                        for detail in details:
+                            pmid = detail.article_id.replace("PMID:", "")
+                            if pmid in seen_pmids:
+                                continue
+                            seen_pmids.add(pmid)
+                            self._details[detail.article_id] = detail
+                            yield self._article_info(detail)
+
+                seen_pmids.update(pmids)
 
             except Exception as e:
                 print(f"[PubMed] Error searching: {e}")
@@ -134,38 +322,92 @@ class PubMedAdapter(BaseSourceAdapter):
 
         return queries
 
-    async def _esearch(self, query: str, max_results: int) -> List[str]:
-        """ESearch API로 PMID 목록 검색"""
+    async def _esearch(
+        self,
+        query: str,
+        max_results: int,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+    ) -> Optional[Tuple[List[str], str, str]]:
+        """
+        ESearch API 로 검색하고 결과를 history server 에 저장 (date_from/date_to 는 등록일 edat 범위)
+
+        Returns:
+            (PMID 목록, WebEnv, query_key). 실패하면 None
+        """
         url = f"{self.base_url}/esearch.fcgi"
         params = {
             "db": "pubmed",
             "term": query,
-            "retmax": min(max_results, 200),
+            "retmax": min(max_results, 10000),
             "retmode": "xml",
             "sort": "date",
+            "usehistory": "y",
         }
 
+        if date_from or date_to:
+            # mindate/maxdate 는 둘 다 있어야 한다
+            params["datetype"] = "edat"
+            params["mindate"] = (date_from or "1900-01-01").replace("-", "/")
+            params["maxdate"] = (date_to or "3000-01-01").replace("-", "/")
+
         if self.api_key:
             params["api_key"] = self.api_key
 
-        async with self.session.get(url, params=params) as response:
-            if response.status != 200:
-                return []
+        # WebEnv 는 NCBI 세션에 묶여 있어 캐시하지 않는다
+        response = await get_http_cache().request(
+            self.session, "GET", url, params=params, kind=None, limiter=self.limiter
+        )
+        if response.status != 200:
+            return None
 
-            xml = await response.text()
-            soup = BeautifulSoup(xml, "xml")
+        return await run_in_process(self._parse_esearch, response.body)
 
-            return [id_tag.text for id_tag in soup.find_all("Id")]
+    @staticmethod
+    def _parse_esearch(xml: XmlSource) -> Optional[Tuple[List[str], str, str]]:
+        """ESearch 결과 XML → (PMID 목록, WebEnv, query_key)"""
+        root = etree.fromstring(_as_bytes(xml), parser=etree.XMLParser(resolve_entities=False, no_network=True))
+        webenv = root.findtext("WebEnv")
+        query_key = root.findtext("QueryKey")
+        if not webenv or not query_key:
+            return None
+        return [id_elem.text for id_elem in root.iterfind("IdList/Id") if id_elem.text], webenv, query_key
 
-    async def _efetch_articles(self, pmids: List[str]) -> List[ArticleInfo]:
-        """EFetch API로 논문 상세 정보 가져오기"""
-        if not pmids:
-            return []
+    async def _efetch_batches(
+        self, webenv: str, query_key: str, starts: List[int]
+    ) -> AsyncIterator[List[ArticleDetail]]:
+        """
+        history server 의 검색 결과를 retstart 마다 EFETCH_BATCH 건씩 받아 파싱
 
+        다음 배치 요청은 현재 배치를 파싱(프로세스 풀)하는 동안 진행된다.
+        논문마다 XML 을 PMID 단건 EFetch 키로 캐시에 나눠 둔다 — 실패 큐 재시도가
+        fetch_detail(offline=True) 로 다시 파싱할 수 있도록.
+        """
+        if not starts:
+            return
+        pending = asyncio.create_task(self._efetch_batch(webenv, query_key, starts[0]))
+        try:
+            for i in range(len(starts)):
+                xml = await pending
+                if i + 1 < len(starts):
+                    pending = asyncio.create_task(self._efetch_batch(webenv, query_key, starts[i + 1]))
+                if xml:
+                    records = await run_in_process(self._parse_efetch_xml, xml)
+                    await asyncio.to_thread(self._cache_articles, records)
+                    yield [detail for detail, _ in records]
+        finally:
+            if not pending.done():
+                pending.cancel()
+
+    async def _efetch_batch(self, webenv: str, query_key: str, retstart: int) -> Optional[bytes]:
+        """EFetch API 로 history server 의 결과 한 배치 (초록 포함 XML)"""
         url = f"{self.base_url}/efetch.fcgi"
         params = {
             "db": "pubmed",
-            "id": ",".join(pmids),
+            "WebEnv": webenv,
+            "query_key": query_key,
+            "retstart": retstart,
+            "retmax": self.EFETCH_BATCH,
             "retmode": "xml",
             "rettype": "abstract",
         }
@@ -173,199 +415,98 @@ class PubMedAdapter(BaseSourceAdapter):
         if self.api_key:
             params["api_key"] = self.api_key
 
-        async with self.session.get(url, params=params) as response:
-            if response.status != 200:
-                return []
+        response = await get_http_cache().request(
+            self.session, "GET", url, params=params, kind=None, limiter=self.limiter
+        )
+        if response.status != 200:
+            print(f"[PubMed] EFetch batch at {retstart} failed: HTTP {response.status}")
+            return None
+        return response.body
 
-            xml = await response.text()
-            return self._parse_pubmed_xml(xml)
+    def _detail_request(self, pmid: str) -> Tuple[str, Dict[str, str]]:
+        """PMID 단건 EFetch (URL, 파라미터) — 캐시 키가 fetch_detail 과 배치 저장에서 같도록"""
+        params = {
+            "db": "pubmed",
+            "id": pmid,
+            "retmode": "xml",
+            "rettype": "full",
+        }
 
-    def _parse_pubmed_xml(self, xml: str) -> List[ArticleInfo]:
-        """PubMed XML 파싱"""
-        articles = []
-        soup = BeautifulSoup(xml, "xml")
+        if self.api_key:
+            params["api_key"] = self.api_key
 
-        for article in soup.find_all("PubmedArticle"):
-            try:
-                # PMID
-                pmid_elem = article.find("PMID")
-                if not pmid_elem:
-                    continue
-                pmid = pmid_elem.text
-
-                # 제목
-                title_elem = article.find("ArticleTitle")
-                title = title_elem.text if title_elem else ""
-
-                # 저자
-                authors = []
-                for author in article.find_all("Author"):
-                    lastname = author.find("LastName")
-                    forename = author.find("ForeName")
-                    if lastname:
-                        name = lastname.text
-                        if forename:
-                            name = f"{forename.text} {name}"
-                        authors.append(name)
-
-                # 저널
-                journal_elem = article.find("Title")
-                journal = journal_elem.text if journal_elem else ""
-
-                # 연도
-                year = None
-                year_elem = article.find("Year")
-                if year_elem:
-                    try:
-                        year = int(year_elem.text)
-                    except ValueError:
-                        pass
-
-                # 초록
-                abstract_elem = article.find("AbstractText")
-                abstract = abstract_elem.text if abstract_elem else ""
-
-                # DOI
-                doi = None
-                for id_elem in article.find_all("ArticleId"):
-                    if id_elem.get("IdType") == "doi":
-                        doi = id_elem.text
-                        break
-
-                # URL
-                url = f"https://pubmed.ncbi.nlm.nih.gov/{pmid}/"
-
-                articles.append(ArticleInfo(
-                    article_id=f"PMID:{pmid}",
-                    title=title,
-                    authors=authors[:10],
-                    journal=journal,
-                    year=year,
-                    url=url,
-                    abstract=abstract[:1000],
-                ))
+        return f"{self.base_url}/efetch.fcgi", params
+
+    def _cache_articles(self, records: List[Tuple[ArticleDetail, bytes]]) -> None:
+        """배치로 받은 논문 XML 을 PMID 단건 상세 키로 저장"""
+        cache = get_http_cache()
+        for detail, article_xml in records:
+            url, params = self._detail_request(detail.article_id.replace("PMID:", ""))
+            cache.put("GET", url, article_xml, params=params, kind="detail")
+
+    @staticmethod
+    def _article_info(detail: ArticleDetail) -> ArticleInfo:
+        """받아 둔 상세 → 검색 결과 항목"""
+        return ArticleInfo(
+            article_id=detail.article_id,
+            title=detail.title,
+            authors=detail.authors[:10],
+            journal=detail.journal,
+            year=detail.year,
+            doi=detail.doi,
+            url=detail.url,
+            abstract=detail.abstract[:1000],
+        )
+
+    def sequence_number(self, article_id: str) -> Optional[int]:
+        """PMID (새로 등록된 논문일수록 크다)"""
+        pmid = article_id.replace("PMID:", "")
+        return int(pmid) if pmid.isdigit() else None
 
-            except Exception as e:
-                print(f"[PubMed] Error parsing article: {e}")
-                continue
+    def detail_ready(self, article_id: str) -> bool:
+        """배치 EFetch 로 이미 받은 논문"""
+        return article_id in self._details
 
-        return articles
+    async def fetch_detail(self, article_id: str, offline: bool = False) -> Optional[ArticleDetail]:
+        """
+        논문 상세 정보 가져오기
 
-    async def fetch_detail(self, article_id: str) -> Optional[ArticleDetail]:
-        """논문 상세 정보 가져오기"""
-        if not self.session:
+        검색에서 배치로 받아 둔 것이면 요청 없이 돌려준다. 그 밖의 논문(재시도 등)만
+        PMID 하나로 EFetch 한다 (배치로 받은 논문은 이 키로 캐시돼 있다).
+        """
+        detail = self._details.pop(article_id, None)
+        if detail is not None:
+            return detail
+
+        if not self.session and not offline:
             await self.initialize()
 
         # article_id에서 PMID 추출
         pmid = article_id.replace("PMID:", "")
 
         try:
-            url = f"{self.base_url}/efetch.fcgi"
-            params = {
-                "db": "pubmed",
-                "id": pmid,
-                "retmode": "xml",
-                "rettype": "full",
-            }
-
-            if self.api_key:
-                params["api_key"] = self.api_key
-
-            async with self.session.get(url, params=params) as response:
-                if response.status != 200:
-                    return None
+            url, params = self._detail_request(pmid)
+            response = await get_http_cache().request(
+                self.session, "GET", url, params=params, kind="detail", offline=offline, limiter=self.limiter
+            )
+            if response is None or response.status != 200:
+                return None
 
-                xml = await response.text()
-                return self._parse_detail_xml(xml, pmid)
+            return await run_in_process(self._parse_detail_xml, response.body, pmid)
 
         except Exception as e:
             print(f"[PubMed] Error fetching detail for {pmid}: {e}")
             return None
 
-    def _parse_detail_xml(self, xml: str, pmid: str) -> Optional[ArticleDetail]:
-        """상세 정보 XML 파싱"""
-        soup = BeautifulSoup(xml, "xml")
-        article = soup.find("PubmedArticle")
+    @staticmethod
+    def _parse_efetch_xml(xml: XmlSource) -> List[Tuple[ArticleDetail, bytes]]:
+        """배치 EFetch XML (PubmedArticleSet) → 논문별 (상세, 그 논문만 담은 XML)"""
+        return list(_iter_articles(xml, None, keep_xml=True))
 
-        if not article:
-            return None
-
-        try:
-            # 제목
-            title_elem = article.find("ArticleTitle")
-            title = title_elem.text if title_elem else ""
-
-            # 저자
-            authors = []
-            for author in article.find_all("Author"):
-                lastname = author.find("LastName")
-                forename = author.find("ForeName")
-                if lastname:
-                    name = lastname.text
-                    if forename:
-                        name = f"{forename.text} {name}"
-                    authors.append(name)
-
-            # 저널
-            journal_elem = article.find("Title")
-            journal = journal_elem.text if journal_elem else ""
-
-            # 연도
-            year = None
-            year_elem = article.find("Year")
-            if year_elem:
-                try:
-                    year = int(year_elem.text)
-                except ValueError:
-                    pass
-
-            # DOI
-            doi = None
-            for id_elem in article.find_all("ArticleId"):
-                if id_elem.get("IdType") == "doi":
-                    doi = id_elem.text
-                    break
-
-            # 초록 (전체)
-            abstract_parts = []
-            for abs_elem in article.find_all("AbstractText"):
-                label = abs_elem.get("Label", "")
-                text = abs_elem.text or ""
-                if label:
-                    abstract_parts.append(f"{label}: {text}")
-                else:
-                    abstract_parts.append(text)
-            abstract = "\n".join(abstract_parts)
-
-            # 키워드
-            keywords = []
-            for kw in article.find_all("Keyword"):
-                if kw.text:
-                    keywords.append(kw.text)
-
-            # MeSH terms
-            for mesh in article.find_all("DescriptorName"):
-                if mesh.text:
-                    keywords.append(mesh.text)
-
-            url = f"https://pubmed.ncbi.nlm.nih.gov/{pmid}/"
-
-            return ArticleDetail(
-                article_id=f"PMID:{pmid}",
-                title=title,
-                authors=authors[:20],
-                journal=journal,
-                year=year,
-                doi=doi,
-                url=url,
-                abstract=abstract,
-                full_text=abstract,  # PubMed는 보통 초록만 제공
-                keywords=keywords[:20],
-            )
-
-        except Exception as e:
-            print(f"[PubMed] Error parsing detail: {e}")
-            return None
+    @staticmethod
+    def _parse_detail_xml(xml: XmlSource, pmid: str) -> Optional[ArticleDetail]:
+        """상세 정보 XML 파싱 (첫 번째 <PubmedArticle>)"""
+        return next(iter_pubmed_articles(xml, pmid=pmid), None)
 
     def get_rate_limit(self) -> float:
         """PubMed는 API key 없이 초당 3요청, key 있으면 10요청"""
@@ -0,0 +1,198 @@
+"""
+수집기 프로세스 간 조정 — API 프로세스(들)와 수집 워커가 collector/ 디렉토리로 주고받는다
+
+- leader.lock: 스케줄링과 수집 파이프라인을 맡은 프로세스(리더)가 살아 있는 동안 잡는 락
+- collector.lock: run_collection 실행 중에 잡는 락 (한 번에 한 프로세스만 수집)
+- fold.lock: 승인 로그 병합/복구 구간
+- worker_status.json: 리더가 하트비트마다 쓰는 상태 (실행 여부, 마지막 결과, 다음 예정)
+- requests/*.json: 다른 프로세스가 남긴 요청 (수집 실행 / 실패 큐 재시도) — 리더가 가져가 실행
+
+락은 fcntl.flock 이라 잡은 프로세스가 죽으면 OS 가 풀어 준다 (남은 락 파일은 무해).
+케이스/실패 큐는 저장 엔진을 그대로 공유하므로 여러 프로세스가 쓰려면 sqlite 엔진이어야 한다.
+
+COLLECTOR_HEARTBEAT_SEC: 리더의 하트비트/요청 확인 주기 (기본 5초)
+"""
+
+import json
+import os
+import socket
+import threading
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows 개발 환경 — 프로세스 간 락 없이 동작
+    fcntl = None
+
+from ...core.logger import get_logger
+
+logger = get_logger("collector.coordination")
+
+HEARTBEAT_SEC = float(os.getenv("COLLECTOR_HEARTBEAT_SEC", "5"))
+# 하트비트가 이만큼(주기 배수) 밀리면 워커가 멈춘 것으로 본다
+STALE_HEARTBEATS = 3
+
+
+class FileLock:
+    """
+    flock 기반 프로세스 간 배타 락
+
+    같은 파일을 연 다른 인스턴스와는 같은 프로세스 안에서도 배타적이다.
+    이미 잡고 있는 인스턴스에서 acquire() 하면 바로 True (재진입).
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self._fd: Optional[int] = None
+        self._guard = threading.Lock()
+
+    @property
+    def held(self) -> bool:
+        return self._fd is not None
+
+    def acquire(self, blocking: bool = True) -> bool:
+        """락 획득. blocking=False 면 다른 쪽이 잡고 있을 때 바로 False"""
+        with self._guard:
+            if self._fd is not None:
+                return True
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+            if fcntl is not None:
+                try:
+                    fcntl.flock(fd, fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+                except BlockingIOError:
+                    os.close(fd)
+                    return False
+            # 누가 잡고 있는지 (운영 확인용)
+            os.ftruncate(fd, 0)
+            os.write(fd, f"{os.getpid()}@{socket.gethostname()}\n".encode())
+            self._fd = fd
+            return True
+
+    def release(self) -> None:
+        with self._guard:
+            if self._fd is None:
+                return
+            fd, self._fd = self._fd, None
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+            os.close(fd)
+
+    def __enter__(self) -> "FileLock":
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.release()
+
+
+def _write_json_atomic(path: Path, data: Any) -> None:
+    """임시 파일에 쓰고 교체 — 읽는 쪽은 항상 완전한 파일을 본다"""
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, default=str)
+    os.replace(tmp, path)
+
+
+def _read_json(path: Path) -> Optional[Any]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+class CollectorControl:
+    """리더 상태 파일 + 요청 디렉토리"""
+
+    STATUS_FILE = "worker_status.json"
+    REQUEST_DIR = "requests"
+
+    def __init__(self, collector_dir: Path) -> None:
+        self.collector_dir = Path(collector_dir)
+        self.status_file = self.collector_dir / self.STATUS_FILE
+        self.request_dir = self.collector_dir / self.REQUEST_DIR
+
+    # ---------- 상태 (리더 → 다른 프로세스) ----------
+
+    def publish_status(self, status: Dict[str, Any]) -> None:
+        """리더 상태 기록 (하트비트 시각/프로세스 정보를 붙인다)"""
+        _write_json_atomic(self.status_file, {
+            **status,
+            "pid": os.getpid(),
+            "host": socket.gethostname(),
+            "heartbeat": datetime.now().isoformat(),
+        })
+
+    def read_status(self) -> Optional[Dict[str, Any]]:
+        """리더가 마지막으로 쓴 상태 (+ alive: 하트비트가 살아 있는지)"""
+        status = _read_json(self.status_file)
+        if not isinstance(status, dict):
+            return None
+        try:
+            age = (datetime.now() - datetime.fromisoformat(status["heartbeat"])).total_seconds()
+        except (KeyError, TypeError, ValueError):
+            age = None
+        status["alive"] = age is not None and age < HEARTBEAT_SEC * STALE_HEARTBEATS
+        return status
+
+    # ---------- 요청 (다른 프로세스 → 리더) ----------
+
+    def submit(self, action: str, params: Dict[str, Any], unique: bool = False) -> Optional[str]:
+        """
+        요청 남기기
+
+        Args:
+            action: collect | retry_failed
+            params: 실행 인자
+            unique: 같은 action 요청이 이미 대기 중이면 남기지 않는다
+
+        Returns:
+            요청 ID (unique 로 거절되면 None)
+        """
+        if unique and any(r["action"] == action for r in self.pending()):
+            return None
+        self.request_dir.mkdir(parents=True, exist_ok=True)
+        request_id = f"{datetime.now().strftime('%Y%m%d%H%M%S%f')}-{uuid.uuid4().hex[:8]}"
+        _write_json_atomic(self.request_dir / f"{request_id}.json", {
+            "id": request_id,
+            "action": action,
+            "params": params,
+            "requested_at": datetime.now().isoformat(),
+        })
+        return request_id
+
+    def pending(self) -> List[Dict[str, Any]]:
+        """대기 중인 요청 (오래된 순)"""
+        if not self.request_dir.exists():
+            return []
+        requests = (_read_json(path) for path in sorted(self.request_dir.glob("*.json")))
+        return [r for r in requests if isinstance(r, dict)]
+
+    def claim(self) -> Optional[Dict[str, Any]]:
+        """
+        가장 오래된 요청을 가져온다 (rename 으로 선점 — 동시에 가져가도 한 쪽만 성공)
+        """
+        if not self.request_dir.exists():
+            return None
+        for path in sorted(self.request_dir.glob("*.json")):
+            claimed = path.with_suffix(".claimed")
+            try:
+                os.rename(path, claimed)
+            except FileNotFoundError:
+                continue
+            request = _read_json(claimed)
+            claimed.unlink()
+            if isinstance(request, dict):
+                return request
+            logger.warning("discarding unreadable collector request %s", path.name)
+        return None
+
+    def clear_claimed(self) -> None:
+        """이전 리더가 가져가다 죽은 요청 정리"""
+        if self.request_dir.exists():
+            for path in self.request_dir.glob("*.claimed"):
+                path.unlink()
@@ -1,24 +1,37 @@
 """
 치험례 추출기
 논문 텍스트에서 치험례 정보를 추출
+
+- 규칙 기반 추출: 동기, 네트워크 없음 (수집기 프로세스 풀 워커에서 실행)
+- LLM 폴백: AsyncOpenAI + LLMConcurrencyController.slot() — 이벤트 루프를 막지 않고,
+  추천 API 와 같은 동시 호출 한도를 나눠 쓴다
+- 배치 모드 (COLLECTOR_LLM_BATCH_SIZE > 1): 짧은 논문 여러 편을 구분자로 나눠 한 요청에 담아
+  요청 수와 요청마다 붙는 시스템 프롬프트 토큰을 줄인다 (LLMBatcher)
 """
 
+import asyncio
+import os
 import re
 import json
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Tuple
 from dataclasses import dataclass, field, asdict
 from datetime import datetime
 import hashlib
 
 try:
-    from openai import OpenAI
+    from openai import AsyncOpenAI
     from ....core.config import settings
     _OPENAI_AVAILABLE = True
 except Exception:
-    OpenAI = None  # type: ignore
+    AsyncOpenAI = None  # type: ignore
     settings = None  # type: ignore
     _OPENAI_AVAILABLE = False
 
+try:
+    from ....core.concurrency import get_llm_controller
+except Exception:
+    get_llm_controller = None  # type: ignore
+
 try:
     from ....core.logger import get_logger
     from ..metrics import llm_metrics
@@ -27,6 +40,63 @@ except Exception:
     _logger = None  # type: ignore
     llm_metrics = None  # type: ignore
 
+# LLM 폴백 호출 제한 시간 (초)
+LLM_TIMEOUT_SEC = 60.0
+# 배치 모드: 한 요청에 담을 논문 수 (1 이면 끔) / 배치에 넣을 수 있는 본문 길이 / 배치가 찰 때까지 기다리는 시간
+LLM_BATCH_SIZE = int(os.getenv("COLLECTOR_LLM_BATCH_SIZE", "1"))
+LLM_BATCH_ARTICLE_CHARS = int(os.getenv("COLLECTOR_LLM_BATCH_ARTICLE_CHARS", "2500"))
+LLM_BATCH_WAIT_SEC = float(os.getenv("COLLECTOR_LLM_BATCH_WAIT_SEC", "2.0"))
+
+LLM_SYSTEM_PROMPT = (
+    "당신은 한의학/전통의학(traditional Korean/Chinese medicine, herbal medicine, "
+    "acupuncture) 학술 논문에서 임상 치험례(case report)를 추출하는 전문 어시스턴트입니다. "
+    "**중요: 양방(서양의학)·수의학·외과수술·중재술 케이스는 절대 추출하지 말고 빈 배열을 "
+    "반환하세요.** 한약(○○탕/산/환/단/음/원/전), 침구, 약침, 전통의학 외용제 등 "
+    "한의학 치료가 명확히 사용된 케이스만 추출합니다. 반드시 JSON만 출력하세요."
+)
+
+_LLM_RULES = """추출 규칙:
+1. 다음 중 하나 이상이 명확한 경우 케이스로 인정 (광범위):
+   - 한약 처방 (○○탕/산/환/단/음/원/전/방/제 형식)
+   - 한약 단방 (당귀/인삼/황기 등 단일 약재 또는 추출물)
+   - 한방 통합치료 (Integrative Korean medicine, Korean medicine intervention)
+   - 침구, 약침, 봉약침, 부항, 뜸, 약침
+   - 전통중의학(TCM) 케이스 (한국어로 번역해 추출)
+2. 다음은 **반드시 제외**:
+   - 인공관절/혈액투석/혈관 중재/색전술 등 양방 시술이 주 치료인 케이스
+   - 동물(개/고양이/소 등) 수의학 케이스
+   - review article, meta-analysis (개별 환자 보고 아님)
+3. 영문 논문이면 모든 텍스트 필드는 한국어로 번역.
+4. **환자 정보 (patient_age, patient_gender, patient_constitution)는 본문에 명시적으로
+   언급된 경우만 입력하세요. 명시 안 된 정보는 절대 추측/생성하지 말고 반드시 null로 두세요.**
+   - 예: "45세 남자" 명시 → age=45, gender="M"
+   - 예: 나이/성별/체질 언급 없음 → age=null, gender=null, constitution=null
+   - 사상체질(소음인/태음인/소양인/태양인)은 본문에 명시될 때만, 추측 금지
+5. 처방명(formula_name) 자리:
+   - 한약 처방이면 한국식 표기 (보중익기탕)
+   - 단방이면 약재명 (당귀, 황기 등)
+   - 침구 위주면 "침치료" 또는 구체 치료명 (전침, 약침 등)
+   - 통합치료면 "한방 통합치료"
+6. 한의학 요소가 본문에 한 줄도 안 나오면 cases: [] 반환."""
+
+_LLM_CASE_SCHEMA = """{
+      "chief_complaint": "<본문의 주소증, 한 줄 요약>",
+      "symptoms": ["<증상1>", "<증상2>"],
+      "diagnosis": "<진단명/병명>",
+      "differentiation": "<변증, 한의학적, 본문에 있을 때만>",
+      "formula_name": "<처방명 또는 약재명 또는 한방 치료명>",
+      "formula_hanja": "<한자, 본문에 있을 때만 그렇지 않으면 빈 문자열>",
+      "patient_age": null,
+      "patient_gender": null,
+      "patient_constitution": null,
+      "treatment_principle": "<한의학적 치법, 본문에 있을 때만>",
+      "result": "<치료 결과 요약>",
+      "confidence": 0.85
+    }"""
+
+_LLM_NULL_NOTE = """위 스키마의 patient_age=null/patient_gender=null/patient_constitution=null는
+"본문에 명시되지 않으면 null" 의미. 본문에 명시된 경우만 실제 값으로 채우세요."""
+
 
 @dataclass
 class ExtractedCase:
@@ -149,11 +219,11 @@ class CaseExtractor:
         self._llm_client: Optional[Any] = None
         if use_llm_fallback and _OPENAI_AVAILABLE and settings and settings.OPENAI_API_KEY:
             try:
-                self._llm_client = OpenAI(api_key=settings.OPENAI_API_KEY)
+                self._llm_client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY, timeout=LLM_TIMEOUT_SEC)
             except Exception:
                 self._llm_client = None
 
-    def extract_cases(self, article_text: str, article_info: Dict) -> List[ExtractedCase]:
+    async def extract_cases(self, article_text: str, article_info: Dict) -> List[ExtractedCase]:
         """
         논문 텍스트에서 치험례 추출
 
@@ -164,9 +234,20 @@ class CaseExtractor:
         Returns:
             추출된 치험례 리스트
         """
-        cases: List[ExtractedCase] = []
-
         # 1차: 규칙 기반 추출 (한국어 케이스 보고서 형식)
+        cases = self.extract_rule_based(article_text, article_info)
+
+        # 2차: LLM 폴백 (규칙으로 못 잡은 경우)
+        if not cases and self.should_use_llm(article_text):
+            cases = await self.extract_with_llm(article_text, article_info)
+
+        return cases
+
+    def extract_rule_based(self, article_text: str, article_info: Dict) -> List[ExtractedCase]:
+        """
+        규칙 기반 추출만 (네트워크/전역 상태 없음 — 프로세스 풀 워커에서 실행 가능)
+        """
+        cases: List[ExtractedCase] = []
         if self._has_case_keywords(article_text):
             case_blocks = self._split_into_case_blocks(article_text) or [article_text]
 
@@ -176,114 +257,171 @@ class CaseExtractor:
                 case = self._extract_single_case(block, article_info, i + 1)
                 if case and self._is_valid_case(case):
                     cases.append(case)
-
-        # 2차: LLM 폴백 (규칙으로 못 잡은 경우)
-        if not cases and self._llm_client and len(article_text.strip()) >= 200:
-            llm_cases = self._extract_with_llm(article_text, article_info)
-            for case in llm_cases:
-                if self._is_valid_case(case):
-                    cases.append(case)
-
         return cases
 
-    def _extract_with_llm(
-        self,
-        article_text: str,
-        article_info: Dict,
-    ) -> List[ExtractedCase]:
-        """LLM (GPT-4o-mini)으로 임의 형식 텍스트에서 케이스 추출"""
+    def should_use_llm(self, article_text: str) -> bool:
+        """규칙 기반 추출이 0건일 때 LLM 폴백을 쓸지"""
+        return bool(self._llm_client) and len(article_text.strip()) >= 200
+
+    async def extract_with_llm(self, article_text: str, article_info: Dict) -> List[ExtractedCase]:
+        """LLM (GPT-4o-mini)으로 임의 형식 텍스트에서 케이스 추출 (유효한 케이스만, 실패 시 빈 리스트)"""
         if not self._llm_client:
             return []
 
         # 길이 제한 (토큰 절약)
         text_excerpt = article_text[:6000]
 
-        system_prompt = (
-            "당신은 한의학/전통의학(traditional Korean/Chinese medicine, herbal medicine, "
-            "acupuncture) 학술 논문에서 임상 치험례(case report)를 추출하는 전문 어시스턴트입니다. "
-            "**중요: 양방(서양의학)·수의학·외과수술·중재술 케이스는 절대 추출하지 말고 빈 배열을 "
-            "반환하세요.** 한약(○○탕/산/환/단/음/원/전), 침구, 약침, 전통의학 외용제 등 "
-            "한의학 치료가 명확히 사용된 케이스만 추출합니다. 반드시 JSON만 출력하세요."
-        )
-
         user_prompt = f"""다음 논문 본문에서 한의학 임상 치험례를 추출하세요.
 
-[논문 제목] {article_info.get('title', '')}
-[저널] {article_info.get('journal', '')}
-[연도] {article_info.get('year', '')}
+{self._article_header(article_info)}
 
 [본문]
 {text_excerpt}
 
-추출 규칙:
-1. 다음 중 하나 이상이 명확한 경우 케이스로 인정 (광범위):
-   - 한약 처방 (○○탕/산/환/단/음/원/전/방/제 형식)
-   - 한약 단방 (당귀/인삼/황기 등 단일 약재 또는 추출물)
-   - 한방 통합치료 (Integrative Korean medicine, Korean medicine intervention)
-   - 침구, 약침, 봉약침, 부항, 뜸, 약침
-   - 전통중의학(TCM) 케이스 (한국어로 번역해 추출)
-2. 다음은 **반드시 제외**:
-   - 인공관절/혈액투석/혈관 중재/색전술 등 양방 시술이 주 치료인 케이스
-   - 동물(개/고양이/소 등) 수의학 케이스
-   - review article, meta-analysis (개별 환자 보고 아님)
-3. 영문 논문이면 모든 텍스트 필드는 한국어로 번역.
-4. **환자 정보 (patient_age, patient_gender, patient_constitution)는 본문에 명시적으로
-   언급된 경우만 입력하세요. 명시 안 된 정보는 절대 추측/생성하지 말고 반드시 null로 두세요.**
-   - 예: "45세 남자" 명시 → age=45, gender="M"
-   - 예: 나이/성별/체질 언급 없음 → age=null, gender=null, constitution=null
-   - 사상체질(소음인/태음인/소양인/태양인)은 본문에 명시될 때만, 추측 금지
-5. 처방명(formula_name) 자리:
-   - 한약 처방이면 한국식 표기 (보중익기탕)
-   - 단방이면 약재명 (당귀, 황기 등)
-   - 침구 위주면 "침치료" 또는 구체 치료명 (전침, 약침 등)
-   - 통합치료면 "한방 통합치료"
-6. 한의학 요소가 본문에 한 줄도 안 나오면 cases: [] 반환.
+{_LLM_RULES}
 
 출력 JSON 스키마 (필드 값은 예시일 뿐, 실제 본문에서만 추출):
 {{
   "cases": [
+    {_LLM_CASE_SCHEMA}
+  ]
+}}
+
+{_LLM_NULL_NOTE}
+
+JSON만 출력:"""
+
+        response = await self._call_llm(user_prompt)
+        if response is None:
+            return []
+        parsed, usage = response
+        cases = self._build_llm_cases(parsed.get("cases", []), article_info, text_excerpt)
+        self._record_llm_success(usage, len(cases))
+        return [case for case in cases if self._is_valid_case(case)]
+
+    async def extract_batch_with_llm(
+        self,
+        articles: List[Tuple[str, Dict]],
+    ) -> List[List[ExtractedCase]]:
+        """
+        짧은 논문 여러 편을 한 요청으로 추출 (논문마다 구분자로 나누고 번호별로 결과를 받음)
+
+        Args:
+            articles: [(본문, 논문 메타정보)]
+
+        Returns:
+            논문별 유효 케이스 (입력 순서, 실패 시 모두 빈 리스트)
+        """
+        if len(articles) == 1:
+            return [await self.extract_with_llm(*articles[0])]
+        if not self._llm_client or not articles:
+            return [[] for _ in articles]
+
+        excerpts = [text[:LLM_BATCH_ARTICLE_CHARS] for text, _ in articles]
+        blocks = "\n\n".join(
+            f"<<<논문 {n}>>>\n{self._article_header(info)}\n\n[본문]\n{excerpt}\n<<<논문 {n} 끝>>>"
+            for n, ((_, info), excerpt) in enumerate(zip(articles, excerpts), start=1)
+        )
+        user_prompt = f"""다음 {len(articles)}편의 논문 본문 각각에서 한의학 임상 치험례를 추출하세요.
+논문은 <<<논문 N>>> ~ <<<논문 N 끝>>> 으로 구분됩니다. 논문끼리 내용을 섞지 마세요.
+
+{blocks}
+
+{_LLM_RULES}
+7. 각 케이스는 그 케이스가 나온 논문 번호(article) 항목에만 넣고, 케이스가 없는 논문도
+   cases: [] 로 포함하세요.
+
+출력 JSON 스키마 (필드 값은 예시일 뿐, 실제 본문에서만 추출):
+{{
+  "articles": [
     {{
-      "chief_complaint": "<본문의 주소증, 한 줄 요약>",
-      "symptoms": ["<증상1>", "<증상2>"],
-      "diagnosis": "<진단명/병명>",
-      "differentiation": "<변증, 한의학적, 본문에 있을 때만>",
-      "formula_name": "<처방명 또는 약재명 또는 한방 치료명>",
-      "formula_hanja": "<한자, 본문에 있을 때만 그렇지 않으면 빈 문자열>",
-      "patient_age": null,
-      "patient_gender": null,
-      "patient_constitution": null,
-      "treatment_principle": "<한의학적 치법, 본문에 있을 때만>",
-      "result": "<치료 결과 요약>",
-      "confidence": 0.85
+      "article": 1,
+      "cases": [
+        {_LLM_CASE_SCHEMA}
+      ]
     }}
   ]
 }}
 
-위 스키마의 patient_age=null/patient_gender=null/patient_constitution=null는
-"본문에 명시되지 않으면 null" 의미. 본문에 명시된 경우만 실제 값으로 채우세요.
+{_LLM_NULL_NOTE}
 
 JSON만 출력:"""
 
-        model = getattr(settings, "GPT_MODEL", "gpt-4o-mini") if settings else "gpt-4o-mini"
+        response = await self._call_llm(user_prompt, max_tokens=min(4096, 1024 * len(articles)))
+        results: List[List[ExtractedCase]] = [[] for _ in articles]
+        if response is None:
+            return results
+        parsed, usage = response
+
+        total = 0
+        entries = parsed.get("articles", [])
+        for entry in entries if isinstance(entries, list) else []:
+            if not isinstance(entry, dict):
+                continue
+            n = entry.get("article")
+            if not isinstance(n, int) or not 1 <= n <= len(articles) or results[n - 1]:
+                continue
+            cases = self._build_llm_cases(entry.get("cases", []), articles[n - 1][1], excerpts[n - 1])
+            total += len(cases)
+            results[n - 1] = [case for case in cases if self._is_valid_case(case)]
+        self._record_llm_success(usage, total)
+        return results
+
+    @staticmethod
+    def _article_header(article_info: Dict) -> str:
+        return (
+            f"[논문 제목] {article_info.get('title', '')}\n"
+            f"[저널] {article_info.get('journal', '')}\n"
+            f"[연도] {article_info.get('year', '')}"
+        )
+
+    @staticmethod
+    def _llm_model() -> str:
+        return getattr(settings, "GPT_MODEL", "gpt-4o-mini") if settings else "gpt-4o-mini"
+
+    async def _call_llm(
+        self,
+        user_prompt: str,
+        max_tokens: int = 2048,
+    ) -> Optional[Tuple[Dict[str, Any], Tuple[int, int]]]:
+        """
+        LLM 호출 (전역 동시성 슬롯 안에서). 실패하면 메트릭에 기록하고 None
+
+        Returns:
+            (응답 JSON dict, (prompt_tokens, completion_tokens))
+        """
+        model = self._llm_model()
         prompt_tokens = 0
         completion_tokens = 0
         try:
-            response = self._llm_client.chat.completions.create(
-                model=model,
-                max_tokens=2048,
-                temperature=0.1,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt},
-                ],
-                response_format={"type": "json_object"},
-            )
+            async def create() -> Any:
+                return await asyncio.wait_for(
+                    self._llm_client.chat.completions.create(
+                        model=model,
+                        max_tokens=max_tokens,
+                        temperature=0.1,
+                        messages=[
+                            {"role": "system", "content": LLM_SYSTEM_PROMPT},
+                            {"role": "user", "content": user_prompt},
+                        ],
+                        response_format={"type": "json_object"},
+                    ),
+                    timeout=LLM_TIMEOUT_SEC,
+                )
+
+            if get_llm_controller is not None:
+                async with get_llm_controller().slot():
+                    response = await create()
+            else:
+                response = await create()
             content = response.choices[0].message.content or "{}"
             usage = getattr(response, "usage", None)
             if usage is not None:
                 prompt_tokens = getattr(usage, "prompt_tokens", 0) or 0
                 completion_tokens = getattr(usage, "completion_tokens", 0) or 0
             parsed = json.loads(content)
+            if not isinstance(parsed, dict):
+                raise ValueError("LLM 응답이 JSON 객체가 아님")
         except Exception as e:
             if _logger:
                 _logger.warning("LLM 추출 실패: %s", e)
@@ -298,12 +436,30 @@ JSON만 출력:"""
                     error=str(e),
                     model=model,
                 )
-            return []
+            return None
+        return parsed, (prompt_tokens, completion_tokens)
+
+    def _record_llm_success(self, usage: Tuple[int, int], cases_extracted: int) -> None:
+        if llm_metrics:
+            prompt_tokens, completion_tokens = usage
+            llm_metrics.record_call(
+                success=True,
+                prompt_tokens=prompt_tokens,
+                completion_tokens=completion_tokens,
+                cases_extracted=cases_extracted,
+                model=self._llm_model(),
+            )
 
-        raw_cases = parsed.get("cases", []) if isinstance(parsed, dict) else []
+    def _build_llm_cases(
+        self,
+        raw_cases: Any,
+        article_info: Dict,
+        text_excerpt: str,
+    ) -> List[ExtractedCase]:
+        """LLM 응답의 cases → ExtractedCase (한의학 케이스만)"""
         results: List[ExtractedCase] = []
 
-        for idx, raw in enumerate(raw_cases):
+        for idx, raw in enumerate(raw_cases if isinstance(raw_cases, list) else []):
             if not isinstance(raw, dict):
                 continue
 
@@ -359,15 +515,6 @@ JSON만 출력:"""
 
             results.append(case)
 
-        if llm_metrics:
-            llm_metrics.record_call(
-                success=True,
-                prompt_tokens=prompt_tokens,
-                completion_tokens=completion_tokens,
-                cases_extracted=len(results),
-                model=model,
-            )
-
         return results
 
     def _has_case_keywords(self, text: str) -> bool:
@@ -704,3 +851,64 @@ JSON만 출력:"""
             return False
 
         return True
+
+
+class LLMBatcher:
+    """
+    LLM 폴백 요청 묶기 — 짧은 논문이 batch_size 편 모이거나 max_wait 초가 지나면 한 요청으로 보낸다
+
+    batch_size <= 1 이거나 본문이 LLM_BATCH_ARTICLE_CHARS 보다 길면 바로 단건 요청.
+    """
+
+    def __init__(
+        self,
+        extractor: CaseExtractor,
+        batch_size: int = LLM_BATCH_SIZE,
+        max_wait: float = LLM_BATCH_WAIT_SEC,
+    ) -> None:
+        self.extractor = extractor
+        self.batch_size = batch_size
+        self.max_wait = max_wait
+        self._pending: List[Tuple[str, Dict, "asyncio.Future[List[ExtractedCase]]"]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: set = set()
+
+    async def extract(self, article_text: str, article_info: Dict) -> List[ExtractedCase]:
+        """한 논문의 LLM 추출 결과 (배치로 보내졌으면 배치 응답 중 이 논문 몫)"""
+        if self.batch_size <= 1 or len(article_text.strip()) > LLM_BATCH_ARTICLE_CHARS:
+            return await self.extractor.extract_with_llm(article_text, article_info)
+
+        loop = asyncio.get_running_loop()
+        future: "asyncio.Future[List[ExtractedCase]]" = loop.create_future()
+        self._pending.append((article_text, article_info, future))
+        if len(self._pending) >= self.batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        items, self._pending = self._pending, []
+        if items:
+            task = asyncio.ensure_future(self._send(items))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _send(self, items: List[Tuple[str, Dict, "asyncio.Future[List[ExtractedCase]]"]]) -> None:
+        try:
+            results = await self.extractor.extract_batch_with_llm([(text, info) for text, info, _ in items])
+        except asyncio.CancelledError:
+            for _, _, future in items:
+                future.cancel()
+            raise
+        except Exception as e:
+            for _, _, future in items:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, _, future), cases in zip(items, results):
+            if not future.done():
+                future.set_result(cases)
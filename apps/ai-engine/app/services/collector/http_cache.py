@@ -0,0 +1,268 @@
+"""
+수집기 HTTP 응답 디스크 캐시 (OASIS / KCI / PubMed 어댑터 공용)
+
+- 키: 메서드 + URL(쿼리 파라미터 정렬) + 폼 본문
+- 종류별 TTL: search(검색 결과, 짧게) / detail(논문 상세·EFetch, 길게)
+- TTL 이 지난 항목은 ETag / Last-Modified 로 조건부 요청 — 304 면 저장된 본문을 그대로 쓴다
+- offline=True: 네트워크 없이 저장된 본문만 (실패 큐 재시도가 상세 페이지를 다시 파싱할 때)
+- put(): 묶음 응답을 항목별 요청 키로 나눠 저장 (PubMed 배치 EFetch → PMID 단건 키)
+- kind=None: 저장하지 않는 요청 (PubMed history server 처럼 응답이 세션에 묶인 경우)
+- limiter: 실제로 네트워크에 나갈 때만 거치는 속도 제한 (캐시 적중은 제한을 쓰지 않는다)
+
+항목은 data/collector/http_cache/<키 앞 2자>/<키>.body + .meta.json.
+본문을 먼저 쓰고 메타를 나중에 교체하므로 메타가 있으면 본문도 완전하다.
+
+COLLECTOR_HTTP_CACHE: 0 이면 캐시 없이 바로 요청
+COLLECTOR_HTTP_CACHE_TTL_SEARCH / COLLECTOR_HTTP_CACHE_TTL_DETAIL: TTL (초, 기본 1시간 / 30일)
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import time
+from contextlib import nullcontext
+from dataclasses import dataclass
+from pathlib import Path
+from threading import Lock
+from typing import Any, AsyncContextManager, Dict, Mapping, Optional, Tuple
+from urllib.parse import urlencode
+
+from ...core.logger import get_logger
+
+logger = get_logger("collector.http_cache")
+
+CACHE_ENABLED = os.getenv("COLLECTOR_HTTP_CACHE", "1") != "0"
+DEFAULT_TTLS = {
+    "search": float(os.getenv("COLLECTOR_HTTP_CACHE_TTL_SEARCH", str(60 * 60))),
+    "detail": float(os.getenv("COLLECTOR_HTTP_CACHE_TTL_DETAIL", str(30 * 24 * 60 * 60))),
+}
+
+
+@dataclass
+class CachedResponse:
+    """캐시를 거친 응답 (본문은 bytes — text() 로 디코딩)"""
+    status: int
+    body: bytes
+    url: str
+    encoding: str = "utf-8"
+    from_cache: bool = False
+
+    def text(self, errors: str = "strict") -> str:
+        return self.body.decode(self.encoding, errors=errors)
+
+
+def _encoding(response: Any) -> str:
+    try:
+        return response.get_encoding()
+    except Exception:
+        return "utf-8"
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+class HttpCache:
+    """디스크 HTTP 캐시"""
+
+    def __init__(
+        self,
+        cache_dir: Optional[Path] = None,
+        ttls: Optional[Dict[str, float]] = None,
+        enabled: bool = True,
+    ) -> None:
+        if cache_dir is None:
+            cache_dir = Path(__file__).resolve().parents[3] / "data" / "collector" / "http_cache"
+        self.cache_dir = Path(cache_dir)
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self.enabled = enabled
+
+    @staticmethod
+    def make_key(
+        method: str,
+        url: str,
+        params: Optional[Mapping[str, Any]] = None,
+        data: Optional[Mapping[str, Any]] = None,
+    ) -> str:
+        """메서드 + URL + 정렬한 쿼리/폼 → sha256"""
+        parts = [method.upper(), url]
+        if params:
+            parts.append(urlencode(sorted((k, str(v)) for k, v in params.items())))
+        parts.append(urlencode(sorted((k, str(v)) for k, v in (data or {}).items())))
+        return hashlib.sha256("\n".join(parts).encode("utf-8")).hexdigest()
+
+    def _paths(self, key: str) -> Tuple[Path, Path]:
+        directory = self.cache_dir / key[:2]
+        return directory / f"{key}.meta.json", directory / f"{key}.body"
+
+    def _load(self, key: str) -> Optional[Tuple[Dict[str, Any], bytes]]:
+        meta_path, body_path = self._paths(key)
+        try:
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+            return meta, body_path.read_bytes()
+        except (OSError, ValueError):
+            return None
+
+    def _store(self, key: str, meta: Dict[str, Any], body: Optional[bytes]) -> None:
+        meta_path, body_path = self._paths(key)
+        meta_path.parent.mkdir(parents=True, exist_ok=True)
+        if body is not None:
+            _write_atomic(body_path, body)
+        _write_atomic(meta_path, json.dumps(meta, ensure_ascii=False).encode("utf-8"))
+
+    async def request(
+        self,
+        session: Any,
+        method: str,
+        url: str,
+        *,
+        params: Optional[Mapping[str, Any]] = None,
+        data: Optional[Mapping[str, Any]] = None,
+        kind: Optional[str] = "detail",
+        offline: bool = False,
+        limiter: Optional[AsyncContextManager[Any]] = None,
+    ) -> Optional[CachedResponse]:
+        """
+        캐시를 거친 HTTP 요청
+
+        Args:
+            session: aiohttp.ClientSession
+            method: GET | POST
+            url: 요청 URL
+            params: 쿼리 파라미터
+            data: 폼 본문
+            kind: search | detail (TTL 종류), None 이면 캐시하지 않음
+            offline: 네트워크 없이 저장된 응답만 (TTL 무시)
+            limiter: 네트워크 요청을 감쌀 async 컨텍스트 (aiolimiter.AsyncLimiter 등)
+
+        Returns:
+            응답 (200 이 아닌 응답은 저장하지 않는다). offline 인데 저장된 것이 없으면 None
+        """
+        if (not self.enabled or kind is None) and not offline:
+            response, _ = await self._fetch(session, method, url, params, data, {}, limiter)
+            return response
+
+        key = self.make_key(method, url, params, data)
+        cached = await asyncio.to_thread(self._load, key)
+        if cached is not None:
+            meta, body = cached
+            hit = CachedResponse(meta["status"], body, meta["url"], meta.get("encoding", "utf-8"), from_cache=True)
+            if offline or time.time() - meta["stored_at"] < self.ttls.get(kind, self.ttls["detail"]):
+                return hit
+        if offline:
+            return None
+
+        # 만료된 항목은 조건부 요청으로 다시 확인
+        headers = {}
+        if cached is not None:
+            if meta.get("etag"):
+                headers["If-None-Match"] = meta["etag"]
+            if meta.get("last_modified"):
+                headers["If-Modified-Since"] = meta["last_modified"]
+
+        response, validators = await self._fetch(session, method, url, params, data, headers, limiter)
+        if response.status == 304 and cached is not None:
+            meta["stored_at"] = time.time()
+            await asyncio.to_thread(self._store, key, meta, None)
+            return hit
+        if response.status == 200:
+            await asyncio.to_thread(self._store, key, {
+                "method": method.upper(),
+                "url": response.url,
+                "status": response.status,
+                "encoding": response.encoding,
+                "kind": kind,
+                "stored_at": time.time(),
+                **validators,
+            }, response.body)
+        return response
+
+    def put(
+        self,
+        method: str,
+        url: str,
+        body: bytes,
+        *,
+        params: Optional[Mapping[str, Any]] = None,
+        data: Optional[Mapping[str, Any]] = None,
+        kind: str = "detail",
+        encoding: str = "utf-8",
+    ) -> None:
+        """
+        응답을 받은 것처럼 직접 저장 (묶음 응답을 항목별 요청 키로 나눠 둘 때 — PubMed 배치 EFetch)
+        이후 같은 요청은 TTL 동안 / offline 에서 이 본문을 돌려준다.
+        """
+        if not self.enabled:
+            return
+        self._store(self.make_key(method, url, params, data), {
+            "method": method.upper(),
+            "url": url,
+            "status": 200,
+            "encoding": encoding,
+            "kind": kind,
+            "stored_at": time.time(),
+        }, body)
+
+    @staticmethod
+    async def _fetch(
+        session: Any,
+        method: str,
+        url: str,
+        params: Optional[Mapping[str, Any]],
+        data: Optional[Mapping[str, Any]],
+        headers: Dict[str, str],
+        limiter: Optional[AsyncContextManager[Any]] = None,
+    ) -> Tuple[CachedResponse, Dict[str, Optional[str]]]:
+        """요청 → (응답, ETag/Last-Modified)"""
+        async with limiter if limiter is not None else nullcontext():
+            async with session.request(method, url, params=params, data=data, headers=headers) as resp:
+                body = await resp.read()
+                response = CachedResponse(resp.status, body, str(resp.url), _encoding(resp))
+                validators = {
+                    "etag": resp.headers.get("ETag"),
+                    "last_modified": resp.headers.get("Last-Modified"),
+                }
+        return response, validators
+
+    def prune(self, max_age: Optional[float] = None) -> int:
+        """
+        오래된 항목 삭제 (기본: 가장 긴 TTL 의 두 배보다 오래된 것)
+
+        Returns:
+            지운 항목 수
+        """
+        if max_age is None:
+            max_age = 2 * max(self.ttls.values())
+        if not self.cache_dir.exists():
+            return 0
+        cutoff = time.time() - max_age
+        removed = 0
+        for meta_path in self.cache_dir.glob("*/*.meta.json"):
+            try:
+                stored_at = json.loads(meta_path.read_text(encoding="utf-8"))["stored_at"]
+            except (OSError, ValueError, KeyError):
+                stored_at = 0
+            if stored_at < cutoff:
+                meta_path.unlink(missing_ok=True)
+                meta_path.with_name(meta_path.name.replace(".meta.json", ".body")).unlink(missing_ok=True)
+                removed += 1
+        if removed:
+            logger.info("pruned %d http cache entries", removed)
+        return removed
+
+
+_cache: Optional[HttpCache] = None
+_cache_lock = Lock()
+
+
+def get_http_cache() -> HttpCache:
+    """어댑터 공용 HTTP 캐시 (싱글톤)"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = HttpCache(enabled=CACHE_ENABLED)
+        return _cache
@@ -2,7 +2,10 @@
 LLM 호출 메트릭 트래커 — GPT-4o-mini 폴백 사용량 측정
 - 호출 횟수, 토큰 사용량, 실패율, 추정 비용
 - 일별 집계 + 누적
-- JSON 파일에 영구 저장 (data/collector/llm_metrics.json)
+- 수집기 저장 엔진의 llm_metrics 컬렉션에 영구 저장 (호출마다 바뀐 버킷만 기록)
+  키: totals / day:YYYY-MM-DD / meta (last_failure, last_updated)
+- API 와 수집 워커가 함께 기록할 수 있다: 저장소 상태가 바뀌었으면 다시 읽고,
+  기록(읽기-수정-쓰기)은 llm_metrics.lock 으로 프로세스 간에 직렬화
 """
 
 import json
@@ -11,6 +14,11 @@ from pathlib import Path
 from threading import Lock
 from typing import Any, Dict, Optional
 
+from .coordination import FileLock
+from .storage.backend import get_storage_backend
+
+DAY_PREFIX = "day:"
+
 
 # gpt-4o-mini 단가 (2025-01 기준, USD per 1M tokens)
 PRICE_PER_M_INPUT = 0.15
@@ -20,26 +28,53 @@ PRICE_PER_M_OUTPUT = 0.60
 class LLMMetrics:
     """LLM 호출 메트릭 누적 집계 (스레드 안전)"""
 
-    def __init__(self, data_dir: Optional[Path] = None) -> None:
+    def __init__(self, data_dir: Optional[Path] = None, backend: Optional[str] = None) -> None:
         if data_dir is None:
             data_dir = Path(__file__).resolve().parents[3] / "data" / "collector"
         self.data_dir = Path(data_dir)
-        self.data_dir.mkdir(parents=True, exist_ok=True)
         self.metrics_file = self.data_dir / "llm_metrics.json"
         self._lock = Lock()
+        self._file_lock = FileLock(self.data_dir / "llm_metrics.lock")
         self._cache: Optional[Dict[str, Any]] = None
+        self._state: Optional[tuple] = None
+        self._backend_kind = backend
+        self._records = None
+
+    def _collection(self):
+        # 모듈 import 시점(싱글톤 생성)에는 저장소를 열지 않는다
+        if self._records is None:
+            self.data_dir.mkdir(parents=True, exist_ok=True)
+            self._records = get_storage_backend(self.data_dir, self._backend_kind).collection("llm_metrics")
+        return self._records
 
     def _load(self) -> Dict[str, Any]:
-        if self._cache is not None:
+        records = self._collection()
+        # 다른 프로세스가 기록하지 않았으면 캐시 그대로
+        if self._cache is not None and records.state() == self._state:
             return self._cache
-        if self.metrics_file.exists():
+        data = self._empty()
+        if len(records):
+            for key, value in records.items():
+                if key == "totals":
+                    data["totals"].update(value)
+                elif key == "meta":
+                    data.update(value)
+                elif key.startswith(DAY_PREFIX):
+                    data["daily"][key[len(DAY_PREFIX):]] = value
+        elif self.metrics_file.exists():
+            # 이전 버전 JSON 파일 → 저장 엔진
             try:
                 with open(self.metrics_file, "r", encoding="utf-8") as f:
-                    self._cache = json.load(f)
+                    data = json.load(f)
             except Exception:
-                self._cache = self._empty()
-        else:
-            self._cache = self._empty()
+                data = self._empty()
+            else:
+                self._cache = data
+                self._save(list(data["daily"]))
+                records.sync()
+                self.metrics_file.rename(self.metrics_file.with_name(self.metrics_file.name + ".migrated"))
+        self._cache = data
+        self._state = records.state()
         return self._cache
 
     @staticmethod
@@ -60,13 +95,20 @@ class LLMMetrics:
             "last_updated": None,
         }
 
-    def _save(self) -> None:
+    def _save(self, days: list) -> None:
+        """totals/meta + 바뀐 일별 버킷만 기록"""
         if self._cache is None:
             return
-        tmp = self.metrics_file.with_suffix(".json.tmp")
-        with open(tmp, "w", encoding="utf-8") as f:
-            json.dump(self._cache, f, ensure_ascii=False, indent=2)
-        tmp.replace(self.metrics_file)
+        data = self._cache
+        records = self._collection()
+        records.put_many([
+            ("totals", data["totals"]),
+            *((DAY_PREFIX + day, data["daily"][day]) for day in days),
+            ("meta", {"last_failure": data["last_failure"], "last_updated": data["last_updated"]}),
+        ])
+        if records.garbage > 1000:
+            records.compact()
+        self._state = records.state()
 
     @staticmethod
     def _today_key() -> str:
@@ -82,7 +124,7 @@ class LLMMetrics:
         model: str = "gpt-4o-mini",
     ) -> None:
         """LLM 호출 1건 기록"""
-        with self._lock:
+        with self._lock, self._file_lock:
             data = self._load()
             t = data["totals"]
             day_key = self._today_key()
@@ -131,10 +173,12 @@ class LLMMetrics:
             # 일별 데이터 90일치만 유지
             if len(data["daily"]) > 90:
                 keys = sorted(data["daily"].keys())
-                for k in keys[: len(keys) - 90]:
+                expired = keys[: len(keys) - 90]
+                for k in expired:
                     data["daily"].pop(k, None)
+                self._collection().delete_many(DAY_PREFIX + k for k in expired)
 
-            self._save()
+            self._save([day_key])
 
     def get_summary(self) -> Dict[str, Any]:
         with self._lock:
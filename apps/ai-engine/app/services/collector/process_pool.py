@@ -0,0 +1,72 @@
+"""
+수집기 CPU 작업용 프로세스 풀
+- HTML/XML 파싱(BeautifulSoup/lxml)과 규칙 기반 치험례 추출을 API 이벤트 루프 밖, 여러 코어에서 실행
+- 작업 함수와 인자/결과는 pickle 가능해야 한다
+  (모듈 수준 함수 / 클래스·정적 메서드, str·dict·dataclass)
+
+COLLECTOR_PROCESS_WORKERS: 워커 수 (기본 min(4, CPU 수)). 0 이면 프로세스 대신 스레드에서 실행
+"""
+
+import asyncio
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from threading import Lock
+from typing import Any, Callable, Optional, TypeVar
+
+from ...core.logger import get_logger
+
+logger = get_logger("collector.process_pool")
+
+PROCESS_WORKERS = int(os.getenv("COLLECTOR_PROCESS_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+T = TypeVar("T")
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = Lock()
+
+
+def get_process_pool() -> Optional[ProcessPoolExecutor]:
+    """공유 프로세스 풀 (처음 쓸 때 생성, PROCESS_WORKERS <= 0 이면 None)"""
+    global _pool
+    if PROCESS_WORKERS <= 0:
+        return None
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=PROCESS_WORKERS)
+            logger.info("process pool started (%d workers)", PROCESS_WORKERS)
+        return _pool
+
+
+async def run_in_process(func: Callable[..., T], *args: Any) -> T:
+    """
+    func(*args) 를 프로세스 풀에서 실행하고 결과를 기다린다
+
+    워커가 죽어 풀이 깨지면 풀을 버리고(다음 호출에서 새로 만듦) 예외를 그대로 올린다.
+    """
+    pool = get_process_pool()
+    if pool is None:
+        return await asyncio.to_thread(func, *args)
+    try:
+        return await asyncio.get_running_loop().run_in_executor(pool, func, *args)
+    except BrokenProcessPool:
+        _discard(pool)
+        raise
+
+
+def _discard(pool: ProcessPoolExecutor) -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    logger.warning("process pool broken — restarting on next use")
+    pool.shutdown(cancel_futures=True)
+
+
+def shutdown_process_pool() -> None:
+    """풀 종료 (수집기 정리 시)"""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(cancel_futures=True)
@@ -1,13 +1,38 @@
 """
 치험례 수집 스케줄러
 APScheduler를 사용한 자동 수집 관리
+
+수집 파이프라인 (소스별로 동시에 실행):
+    검색 → [상세 조회 큐] → 상세 조회 작업자 fetch_concurrency 개
+         → [추출 큐] → 규칙 기반 추출·정규화·검증 (프로세스 풀)
+         → 0건이면 LLM 폴백 (AsyncOpenAI, 별도 태스크 — LLMBatcher 로 짧은 논문은 묶어서 요청)
+상세 조회 요청 간격은 소스별 토큰 버킷(aiolimiter)으로 get_rate_limit() 초마다 1건.
+검색에서 상세까지 받아 오는 어댑터(PubMed 배치 EFetch — adapter.detail_ready)는 요청 없이 넘긴다.
+증분 수집: (소스, 키워드 집합)별 표식(SourceWatermarks)의 날짜를 date_from 으로 넘기고,
+번호가 표식 이하이거나 이미 케이스로 들어온 URL / 재시도 대기 중인 논문은 상세 조회 전에
+건너뛴다. 처음 쓰는 키워드 조합은 표식이 없으므로 전체 검색.
+어댑터 요청은 디스크 HTTP 캐시(http_cache)를 거치고, 실패 큐 재시도는 캐시된 상세 응답을
+네트워크 없이 다시 파싱한다.
+HTML/XML 파싱(어댑터)과 규칙 기반 추출은 process_pool 에서 돌아 API 이벤트 루프를 막지 않는다.
+
+프로세스 구성 (coordination):
+- 스케줄링과 수집은 leader.lock 을 잡은 프로세스(리더) 하나만 한다. run_collection 자체도
+  collector.lock 으로 한 번에 한 프로세스만 실행된다.
+- COLLECTOR_MODE=embedded (기본): API 프로세스가 리더를 시도한다. uvicorn 워커가 여럿이면
+  하나만 리더가 되고 나머지는 위임 모드.
+- COLLECTOR_MODE=worker: API 는 항상 위임 모드, 수집은 `python -m app.collector_worker` 가 맡는다.
+- 위임 모드의 /collector/run, /failed/retry 는 요청 파일만 남기고, 리더가 하트비트마다 가져가
+  실행한다. 상태는 리더가 쓰는 worker_status.json 에서 읽는다.
 """
 
 import asyncio
-from datetime import datetime
-from typing import Optional, List, Dict, Any
+import os
+import threading
+from datetime import date, datetime
+from typing import Optional, List, Dict, Any, Tuple
 from pathlib import Path
 
+from aiolimiter import AsyncLimiter
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
 from apscheduler.triggers.interval import IntervalTrigger
@@ -16,17 +41,59 @@ from .adapters.base import BaseSourceAdapter, ArticleDetail
 from .adapters.oasis_adapter import OASISAdapter
 from .adapters.kci_adapter import KCIAdapter
 from .adapters.pubmed_adapter import PubMedAdapter
-from .extractors.case_extractor import CaseExtractor
+from .extractors.case_extractor import CaseExtractor, LLMBatcher
 from .processors.validator import CaseValidator
 from .processors.normalizer import CaseNormalizer
 from .processors.deduplicator import CaseDeduplicator
-from .storage.case_storage import CaseStorage
+from .storage.case_storage import DEFAULT_DATA_DIR, CaseStorage
 from .storage.failed_storage import FailedExtractionStorage
-from .metrics import llm_metrics
+from .storage.watermarks import SourceWatermarks
+from .metrics import LLMMetrics, llm_metrics
+from .coordination import HEARTBEAT_SEC, CollectorControl, FileLock
+from .http_cache import get_http_cache
+from . import process_pool
 from ...core.logger import get_logger
 
 logger = get_logger("collector.scheduler")
 
+COLLECTOR_MODE = os.getenv("COLLECTOR_MODE", "embedded")
+
+_worker_components: Optional[tuple] = None
+
+
+def _normalize_valid(
+    extracted: List[Any],
+    normalizer: CaseNormalizer,
+    validator: CaseValidator,
+) -> List[Dict[str, Any]]:
+    """추출 케이스 → 정규화 → 검증 통과분"""
+    valid = []
+    for case in extracted:
+        # 정규화
+        case_dict = normalizer.normalize(case.to_dict())
+
+        # 검증
+        validation = validator.validate(case_dict)
+        if validation.is_valid:
+            valid.append(case_dict)
+    return valid
+
+
+def _extract_article(article_text: str, article_dict: Dict[str, Any]) -> Tuple[int, List[Dict[str, Any]]]:
+    """
+    프로세스 풀 작업 함수 — 규칙 기반 추출 + 정규화 + 검증
+    (워커마다 추출기/정규화기/검증기를 한 번만 만든다)
+
+    Returns:
+        (추출 건수, 검증을 통과한 케이스 dict)
+    """
+    global _worker_components
+    if _worker_components is None:
+        _worker_components = (CaseExtractor(use_llm_fallback=False), CaseNormalizer(), CaseValidator())
+    extractor, normalizer, validator = _worker_components
+    extracted = extractor.extract_rule_based(article_text, article_dict)
+    return len(extracted), _normalize_valid(extracted, normalizer, validator)
+
 
 class CollectorScheduler:
     """
@@ -43,9 +110,10 @@ class CollectorScheduler:
         self,
         enabled: bool = True,
         collection_interval_hours: int = 6,
-        request_delay: float = 5.0,
+        request_delay: Optional[float] = None,
         auto_approve_threshold: float = 0.9,
         data_dir: Optional[Path] = None,
+        fetch_concurrency: int = 4,
     ):
         """
         초기화
@@ -53,19 +121,31 @@ class CollectorScheduler:
         Args:
             enabled: 자동 수집 활성화 여부
             collection_interval_hours: 수집 주기 (시간 단위, 기본 6시간)
-            request_delay: 요청 간 대기 시간 (초)
+            request_delay: 상세 조회 요청 간격 (초, None 이면 어댑터의 get_rate_limit())
             auto_approve_threshold: 자동 승인 신뢰도 임계값
             data_dir: 데이터 디렉토리
+            fetch_concurrency: 소스별 동시 상세 조회 수
         """
         self.enabled = enabled
         self.collection_interval_hours = collection_interval_hours
         self.request_delay = request_delay
         self.auto_approve_threshold = auto_approve_threshold
+        self.fetch_concurrency = max(1, fetch_concurrency)
+
+        # 저장소는 처음 쓸 때 연다 (storage / failed_storage / watermarks 프로퍼티) —
+        # 모듈 import(싱글톤 생성)만으로 데이터 디렉토리를 열거나 이관하지 않도록
+        self.data_dir = Path(data_dir) if data_dir is not None else DEFAULT_DATA_DIR
+        collector_dir = self.data_dir / "collector"
+        self._storage: Optional[CaseStorage] = None
+        self._failed_storage: Optional[FailedExtractionStorage] = None
+        self._watermarks: Optional[SourceWatermarks] = None
+        self._open_lock = threading.Lock()
+        # 수집 결과에 붙이는 LLM 메트릭 — data_dir 를 따로 주면 그 디렉토리 것을 읽는다
+        self.metrics = llm_metrics if data_dir is None else LLMMetrics(collector_dir)
 
         # 컴포넌트 초기화
-        self.storage = CaseStorage(data_dir)
-        self.failed_storage = FailedExtractionStorage()
         self.extractor = CaseExtractor()
+        self.llm_batcher = LLMBatcher(self.extractor)
         self.validator = CaseValidator()
         self.normalizer = CaseNormalizer()
         self.deduplicator: Optional[CaseDeduplicator] = None
@@ -84,21 +164,82 @@ class CollectorScheduler:
         self.is_running = False
         self.last_run: Optional[datetime] = None
         self.last_result: Optional[Dict] = None
+        self.last_retry: Optional[Dict] = None
+
+        # 프로세스 간 조정 (리더 락 / 실행 락 / 상태·요청 파일 — 모두 처음 쓸 때 만든다)
+        self.control = CollectorControl(collector_dir)
+        self.leader_lock = FileLock(collector_dir / "leader.lock")
+        self.run_lock = FileLock(collector_dir / "collector.lock")
+        # True 면 다른 프로세스(리더)가 수집을 맡고 여기서는 요청만 남긴다
+        self.delegated = False
+        self._request_task: Optional[asyncio.Task] = None
+
+    @property
+    def storage(self) -> CaseStorage:
+        """치험례 저장소 (처음 접근할 때 연다 — 복구·이전 JSON 이관도 이때)"""
+        if self._storage is None:
+            with self._open_lock:
+                if self._storage is None:
+                    self._storage = CaseStorage(self.data_dir)
+        return self._storage
+
+    @property
+    def failed_storage(self) -> FailedExtractionStorage:
+        """추출 실패 큐"""
+        if self._failed_storage is None:
+            collector_dir = self.storage.collector_dir
+            with self._open_lock:
+                if self._failed_storage is None:
+                    self._failed_storage = FailedExtractionStorage(collector_dir)
+        return self._failed_storage
+
+    @property
+    def watermarks(self) -> SourceWatermarks:
+        """증분 수집 표식"""
+        if self._watermarks is None:
+            collector_dir = self.storage.collector_dir
+            with self._open_lock:
+                if self._watermarks is None:
+                    self._watermarks = SourceWatermarks(collector_dir)
+        return self._watermarks
+
+    async def initialize(self, standalone: bool = False) -> None:
+        """
+        스케줄러 초기화
 
-    async def initialize(self) -> None:
-        """스케줄러 초기화"""
-        # 중복 제거기 초기화 (기존 케이스 로드)
-        existing_cases = self.storage.load_existing_cases()
+        Args:
+            standalone: 수집 워커 프로세스에서 호출 (COLLECTOR_MODE 와 관계없이 리더가 된다)
+        """
+        if COLLECTOR_MODE == "worker" and not standalone:
+            self.delegated = True
+        elif not self.leader_lock.acquire(blocking=False):
+            self.delegated = True
+        if self.delegated:
+            # 병합은 리더가 — 이 프로세스는 승인 로그에 붙이기만 한다
+            self.storage.fold_enabled = False
+            if self.storage.backend.kind != "sqlite":
+                logger.warning(
+                    "Collector delegated to another process but storage backend is %s "
+                    "— set COLLECTOR_STORAGE_BACKEND=sqlite to share storage",
+                    self.storage.backend.kind,
+                )
+            logger.info("Collector delegated to leader process (requests via %s)", self.control.request_dir)
+            return
+
+        # 중복 제거기 초기화 (기존 케이스 + 대기 케이스 — 다시 수집하지 않도록)
+        existing_cases = self.storage.load_existing_cases() + self.storage.load_pending_cases()
         self.deduplicator = CaseDeduplicator(existing_cases)
 
         # 어댑터 초기화
         for adapter in self.adapters.values():
             await adapter.initialize()
 
+        # 오래된 HTTP 캐시 정리
+        await asyncio.to_thread(get_http_cache().prune)
+
         # 스케줄러 설정
+        self.scheduler = AsyncIOScheduler()
         if self.enabled:
-            self.scheduler = AsyncIOScheduler()
-
             # 주기적 수집 (기본 6시간마다)
             self.scheduler.add_job(
                 self.run_collection,
@@ -108,7 +249,19 @@ class CollectorScheduler:
                 replace_existing=True,
             )
 
-            self.scheduler.start()
+        # 하트비트 + 다른 프로세스의 요청 확인
+        self.control.clear_claimed()
+        self.scheduler.add_job(
+            self.process_requests,
+            IntervalTrigger(seconds=HEARTBEAT_SEC),
+            id='collector_requests',
+            name='Collector Heartbeat / Requests',
+            replace_existing=True,
+        )
+
+        self.scheduler.start()
+        self._publish_status()
+        if self.enabled:
             logger.info(
                 "Scheduler started. Collection every %d hours",
                 self.collection_interval_hours,
@@ -119,14 +272,21 @@ class CollectorScheduler:
         if self.scheduler:
             self.scheduler.shutdown()
 
+        if self._request_task:
+            self._request_task.cancel()
+
         for adapter in self.adapters.values():
             await adapter.cleanup()
 
+        process_pool.shutdown_process_pool()
+        self.leader_lock.release()
+
     async def run_collection(
         self,
         sources: Optional[List[str]] = None,
         keywords: Optional[List[str]] = None,
         max_articles: int = 50,
+        incremental: bool = True,
     ) -> Dict[str, Any]:
         """
         수집 실행
@@ -135,15 +295,19 @@ class CollectorScheduler:
             sources: 수집할 소스 리스트 (None이면 전체)
             keywords: 검색 키워드 (None이면 기본값)
             max_articles: 최대 논문 수
+            incremental: 소스·키워드별 표식 이후만 검색 (False 면 전체 재검색 — 알려진 URL 은 그래도 건너뜀)
 
         Returns:
             수집 결과 통계
         """
         if self.is_running:
             return {'error': 'Collection already in progress'}
+        if not self.run_lock.acquire(blocking=False):
+            return {'error': 'Collection already in progress in another process'}
 
         self.is_running = True
         start_time = datetime.now()
+        self._publish_status()
 
         result = {
             'collection_id': f"COL-{start_time.strftime('%Y%m%d-%H%M%S')}",
@@ -152,6 +316,7 @@ class CollectorScheduler:
             'status': 'running',
             'statistics': {
                 'articles_searched': 0,
+                'articles_skipped_known': 0,
                 'articles_fetched': 0,
                 'cases_extracted': 0,
                 'cases_valid': 0,
@@ -173,25 +338,36 @@ class CollectorScheduler:
 
             all_new_cases = []
 
+            adapters = []
             for adapter_name in adapter_names:
                 adapter = self.adapters.get(adapter_name)
                 if not adapter:
                     result['errors'].append(f"Unknown adapter: {adapter_name}")
                     continue
+                adapters.append((adapter_name, adapter))
+
+            # 소스별 검색 및 수집을 동시에 (실패 큐 변경은 실행이 끝날 때 한 번에 기록)
+            with self.failed_storage.batch():
+                outcomes = await asyncio.gather(
+                    *(
+                        self._collect_from_source(
+                            adapter=adapter,
+                            keywords=search_keywords,
+                            max_articles=max_articles,
+                            result=result,
+                            incremental=incremental,
+                        )
+                        for _, adapter in adapters
+                    ),
+                    return_exceptions=True,
+                )
 
-                try:
-                    # 검색 및 수집
-                    cases_from_source = await self._collect_from_source(
-                        adapter=adapter,
-                        keywords=search_keywords,
-                        max_articles=max_articles,
-                        result=result,
-                    )
-                    all_new_cases.extend(cases_from_source)
-
-                except Exception as e:
-                    result['errors'].append(f"Error from {adapter_name}: {str(e)}")
-                    logger.exception("Error from adapter %s", adapter_name)
+            for (adapter_name, _), outcome in zip(adapters, outcomes):
+                if isinstance(outcome, BaseException):
+                    result['errors'].append(f"Error from {adapter_name}: {str(outcome)}")
+                    logger.error("Error from adapter %s", adapter_name, exc_info=outcome)
+                else:
+                    all_new_cases.extend(outcome)
 
             # 중복 제거
             if all_new_cases and self.deduplicator:
@@ -218,7 +394,8 @@ class CollectorScheduler:
 
                     # 자동 승인
                     if auto_approve:
-                        self.storage.approve_cases([c['id'] for c in auto_approve])
+                        # 코퍼스 스냅샷 확장은 이벤트 루프 밖에서
+                        await asyncio.to_thread(self.storage.approve_cases, [c['id'] for c in auto_approve])
                         result['statistics']['cases_auto_approved'] = len(auto_approve)
 
                     # 나머지는 대기열에 추가
@@ -234,6 +411,7 @@ class CollectorScheduler:
 
         finally:
             self.is_running = False
+            self.run_lock.release()
             self.last_run = start_time
             self.last_result = result
 
@@ -243,7 +421,7 @@ class CollectorScheduler:
 
             # LLM 메트릭 스냅샷 첨부
             try:
-                result['llm_metrics_snapshot'] = llm_metrics.get_summary()
+                result['llm_metrics_snapshot'] = self.metrics.get_summary()
             except Exception:
                 pass
 
@@ -266,107 +444,428 @@ class CollectorScheduler:
                 result['statistics'].get('cases_duplicate', 0),
                 duration,
             )
+            self._publish_status()
 
         return result
 
+    def _rate_limiter(self, adapter: BaseSourceAdapter) -> AsyncLimiter:
+        """소스별 상세 조회 토큰 버킷 — interval 초마다 1건"""
+        interval = self.request_delay if self.request_delay is not None else adapter.get_rate_limit()
+        return AsyncLimiter(1, max(interval, 0.001))
+
     async def _collect_from_source(
         self,
         adapter: BaseSourceAdapter,
         keywords: List[str],
         max_articles: int,
         result: Dict[str, Any],
+        incremental: bool = True,
     ) -> List[Dict[str, Any]]:
-        """단일 소스에서 수집"""
-        cases = []
-        articles_fetched = 0
-
-        # 검색
-        async for article_info in adapter.search(keywords, max_results=max_articles):
-            result['statistics']['articles_searched'] += 1
+        """
+        단일 소스에서 수집
 
-            if articles_fetched >= max_articles:
-                break
+        검색 결과를 상세 조회 작업자들이 동시에 가져오고(요청 간격은 토큰 버킷), 가져온
+        논문은 추출 단계가 순서대로 처리한다. 상세 조회가 max_articles 건 성공하면 검색을
+        멈춘다 (이미 진행 중인 조회 결과는 버림).
 
+        incremental 이면 표식 날짜부터 검색하고 표식 이하 번호는 조회하지 않는다. 검색을
+        끝까지 봤고 오류가 없을 때만 표식을 올린다.
+        """
+        stats = result['statistics']
+        stats.setdefault('articles_skipped_known', 0)
+        limiter = self._rate_limiter(adapter)
+        fetch_queue: asyncio.Queue = asyncio.Queue(maxsize=self.fetch_concurrency * 2)
+        process_queue: asyncio.Queue = asyncio.Queue(maxsize=self.fetch_concurrency * 2)
+        cases: List[Dict[str, Any]] = []
+        fetched = 0
+
+        searched_on = date.today().isoformat()
+        mark = self.watermarks.get(adapter.source_name, keywords) if incremental else {}
+        last_id = mark.get('last_id')
+        max_seen: Optional[int] = None
+        truncated = False
+        errors = 0
+
+        def record_error(article_info: Any, error: Exception) -> None:
+            nonlocal errors
+            errors += 1
+            self._record_processing_error(adapter, article_info, error)
+
+        async def search_stage() -> None:
+            nonlocal max_seen, truncated
+            queued = 0
             try:
-                # 상세 정보 가져오기
-                detail = await adapter.fetch_detail(article_info.article_id)
+                async for article_info in adapter.search(
+                    keywords, date_from=mark.get('searched_until'), max_results=max_articles
+                ):
+                    stats['articles_searched'] += 1
+                    if fetched >= max_articles:
+                        truncated = True
+                        break
+                    seq = adapter.sequence_number(article_info.article_id)
+                    if seq is not None:
+                        max_seen = seq if max_seen is None else max(max_seen, seq)
+                    # 알려진 논문은 상세 조회(HTTP) 없이 건너뜀
+                    if (last_id is not None and seq is not None and seq <= last_id) or self._is_known(article_info):
+                        stats['articles_skipped_known'] += 1
+                        continue
+                    queued += 1
+                    await fetch_queue.put(article_info)
+                # 새 논문이 한도만큼 나왔으면 검색 결과 밖에 더 있을 수 있다
+                truncated = truncated or queued >= max_articles
+            finally:
+                for _ in range(self.fetch_concurrency):
+                    await fetch_queue.put(None)
+
+        async def fetch_stage() -> None:
+            nonlocal fetched, truncated
+            while (article_info := await fetch_queue.get()) is not None:
+                if fetched >= max_articles:
+                    truncated = True
+                    continue
+                try:
+                    # 상세 정보 가져오기 (검색에서 함께 받은 것은 요청 없이)
+                    if adapter.detail_ready(article_info.article_id):
+                        detail = await adapter.fetch_detail(article_info.article_id)
+                    else:
+                        async with limiter:
+                            detail = await adapter.fetch_detail(article_info.article_id)
+                except Exception as e:
+                    record_error(article_info, e)
+                    continue
                 if not detail:
                     continue
+                if fetched >= max_articles:
+                    truncated = True
+                    continue
+                fetched += 1
+                stats['articles_fetched'] += 1
+                await process_queue.put((article_info, detail))
+
+        def finish(article_dict: Dict[str, Any], detail: ArticleDetail, extracted: int, valid: List[Dict[str, Any]]) -> None:
+            stats['cases_extracted'] += extracted
+            stats['cases_valid'] += len(valid)
+            cases.extend(valid)
+
+            # 추출 0건이면 실패 큐에 적재
+            if not extracted:
+                self.failed_storage.add_failure(
+                    article_info=article_dict,
+                    article_text=detail.full_text or "",
+                    reason="no_cases_extracted",
+                )
 
-                articles_fetched += 1
-                result['statistics']['articles_fetched'] += 1
+        async def llm_stage(article_info: Any, detail: ArticleDetail, article_dict: Dict[str, Any]) -> None:
+            try:
+                extracted, valid = await self._extract_with_llm(detail.full_text or "", article_dict)
+            except Exception as e:
+                record_error(article_info, e)
+                return
+            finish(article_dict, detail, extracted, valid)
 
-                # 치험례 추출
-                article_dict = {
-                    'url': detail.url,
-                    'title': detail.title,
-                    'authors': detail.authors,
-                    'journal': detail.journal,
-                    'year': detail.year,
-                    'doi': detail.doi,
-                    'source': adapter.source_name,
-                }
+        llm_tasks: List[asyncio.Task] = []
 
-                extracted = self.extractor.extract_cases(detail.full_text, article_dict)
-                result['statistics']['cases_extracted'] += len(extracted)
+        async def process_stage() -> None:
+            while (item := await process_queue.get()) is not None:
+                article_info, detail = item
+                try:
+                    article_dict = self._article_dict(adapter, detail)
+                    extracted, valid = await process_pool.run_in_process(
+                        _extract_article, detail.full_text or "", article_dict
+                    )
+                except Exception as e:
+                    record_error(article_info, e)
+                    continue
+
+                # LLM 폴백은 응답을 기다리는 동안 다음 논문을 추출하도록 태스크로
+                if not extracted and self.extractor.should_use_llm(detail.full_text or ""):
+                    llm_tasks.append(asyncio.create_task(llm_stage(article_info, detail, article_dict)))
+                    continue
+                finish(article_dict, detail, extracted, valid)
+
+        # 추출 작업자는 풀 워커 수만큼 (풀은 소스들이 함께 쓴다)
+        fetchers = [asyncio.create_task(fetch_stage()) for _ in range(self.fetch_concurrency)]
+        processors = [asyncio.create_task(process_stage()) for _ in range(max(1, process_pool.PROCESS_WORKERS))]
+        try:
+            await search_stage()
+            await asyncio.gather(*fetchers)
+            for _ in processors:
+                await process_queue.put(None)
+            await asyncio.gather(*processors)
+            await asyncio.gather(*llm_tasks)
+        finally:
+            for task in (*fetchers, *processors, *llm_tasks):
+                task.cancel()
+
+        if incremental and not truncated and not errors:
+            self.watermarks.advance(adapter.source_name, max_seen, searched_on, keywords)
+
+        return cases
+
+    def _is_known(self, article_info: Any) -> bool:
+        """이미 케이스로 들어왔거나(URL) 발췌와 함께 재시도 대기 중인 논문"""
+        url = getattr(article_info, 'url', '')
+        if url and self.deduplicator and url in self.deduplicator.existing_urls:
+            return True
+        return self.failed_storage.awaiting_retry({
+            'url': url,
+            'doi': getattr(article_info, 'doi', None),
+            'article_id': article_info.article_id,
+            'title': getattr(article_info, 'title', ''),
+        })
+
+    @staticmethod
+    def _article_dict(adapter: BaseSourceAdapter, detail: ArticleDetail) -> Dict[str, Any]:
+        """추출기에 넘길 논문 메타정보"""
+        return {
+            'article_id': detail.article_id,
+            'url': detail.url,
+            'title': detail.title,
+            'authors': detail.authors,
+            'journal': detail.journal,
+            'year': detail.year,
+            'doi': detail.doi,
+            'source': adapter.source_name,
+        }
+
+    async def extract_article(
+        self,
+        article_text: str,
+        article_dict: Dict[str, Any],
+    ) -> Tuple[int, List[Dict[str, Any]]]:
+        """
+        치험례 추출 + 정규화 + 검증
+
+        규칙 기반 추출은 프로세스 풀에서, 0건이면 LLM 폴백(비동기, 배치 가능)으로.
+
+        Returns:
+            (추출 건수, 검증을 통과한 케이스)
+        """
+        extracted, valid = await process_pool.run_in_process(_extract_article, article_text, article_dict)
+        if not extracted and self.extractor.should_use_llm(article_text):
+            extracted, valid = await self._extract_with_llm(article_text, article_dict)
+        return extracted, valid
+
+    async def _extract_with_llm(
+        self,
+        article_text: str,
+        article_dict: Dict[str, Any],
+    ) -> Tuple[int, List[Dict[str, Any]]]:
+        """LLM 폴백 추출 (LLMBatcher 경유) + 정규화 + 검증"""
+        extracted = await self.llm_batcher.extract(article_text, article_dict)
+        return len(extracted), _normalize_valid(extracted, self.normalizer, self.validator)
+
+    def _record_processing_error(
+        self,
+        adapter: BaseSourceAdapter,
+        article_info: Any,
+        error: Exception,
+    ) -> None:
+        """논문 처리 중 예외 → 실패 큐"""
+        logger.warning(
+            "Error processing article %s: %s",
+            article_info.article_id,
+            error,
+        )
+        try:
+            self.failed_storage.add_failure(
+                article_info={
+                    "url": getattr(article_info, "url", ""),
+                    "article_id": getattr(article_info, "article_id", ""),
+                    "title": getattr(article_info, "title", ""),
+                    "source": adapter.source_name,
+                },
+                article_text="",
+                reason=f"processing_error: {error}",
+            )
+        except Exception:
+            pass
+
+    async def retry_failed(self, keys: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        실패 큐 재시도
+
+        HTTP 캐시에 상세 응답이 있으면 네트워크 없이 다시 파싱한 전문으로, 없으면 저장된
+        article_text_excerpt 로 추출기를 재실행한다. 성공한 항목은 정상 파이프라인
+        (신뢰도 기준 자동 승인 / 대기열)으로 흘려보내고 큐에서 제거한다.
+
+        Args:
+            keys: 재시도할 항목 key 목록 (None이면 큐 전체)
+
+        Returns:
+            시도/성공/실패/새 케이스 건수
+        """
+        candidates = self.failed_storage.get_retry_candidates()
+        if keys:
+            keyset = set(keys)
+            candidates = [c for c in candidates if c.get("key") in keyset]
+
+        succeeded = 0
+        still_failing = 0
+        new_pending: List[Dict[str, Any]] = []
+
+        # 추출은 항목별로 동시에 (규칙 기반은 프로세스 풀, LLM 폴백은 배치로 묶일 수 있음)
+        texts = await asyncio.gather(*(self._retry_text(item) for item in candidates))
+        outcomes = await asyncio.gather(
+            *(
+                self.extract_article(text, item.get("article_info", {}))
+                for item, text in zip(candidates, texts)
+            ),
+            return_exceptions=True,
+        )
+
+        # 실패 큐 변경은 루프가 끝날 때 한 번에 기록
+        with self.failed_storage.batch():
+            for item, outcome in zip(candidates, outcomes):
+                article_info = item.get("article_info", {})
+                article_text = item.get("article_text_excerpt", "")
+                if isinstance(outcome, Exception):
+                    self.failed_storage.add_failure(article_info, article_text, f"retry_error: {outcome}")
+                    still_failing += 1
+                    continue
+                extracted, valid = outcome
 
-                # 추출 0건이면 실패 큐에 적재
                 if not extracted:
-                    self.failed_storage.add_failure(
-                        article_info=article_dict,
-                        article_text=detail.full_text or "",
-                        reason="no_cases_extracted",
-                    )
+                    self.failed_storage.add_failure(article_info, article_text, "retry_no_cases")
+                    still_failing += 1
+                    continue
 
-                # 검증 및 정규화
-                for case in extracted:
-                    case_dict = case.to_dict()
+                new_pending.extend(valid)
+
+                self.failed_storage.remove_success(item["key"])
+                succeeded += 1
+
+        if new_pending:
+            # 신뢰도 기준으로 자동 승인 / pending 분리
+            auto = [c for c in new_pending if c.get("confidence_score", 0) >= self.auto_approve_threshold]
+            pend = [c for c in new_pending if c.get("confidence_score", 0) < self.auto_approve_threshold]
+            if auto:
+                self.storage.add_to_pending(auto)
+                await asyncio.to_thread(self.storage.approve_cases, [c["id"] for c in auto])
+            if pend:
+                self.storage.add_to_pending(pend)
+
+        self.last_retry = {
+            "attempted": len(candidates),
+            "succeeded": succeeded,
+            "still_failing": still_failing,
+            "new_cases": len(new_pending),
+        }
+        return self.last_retry
+
+    async def _retry_text(self, item: Dict[str, Any]) -> str:
+        """재시도할 본문 — 캐시된 상세 응답(오프라인 파싱) 우선, 없으면 저장된 발췌"""
+        article_info = item.get("article_info", {})
+        adapter = self.adapters.get(article_info.get("source"))
+        article_id = article_info.get("article_id")
+        if adapter and article_id:
+            try:
+                detail = await adapter.fetch_detail(article_id, offline=True)
+            except Exception:
+                detail = None
+            if detail and detail.full_text:
+                return detail.full_text
+        return item.get("article_text_excerpt", "")
 
-                    # 정규화
-                    case_dict = self.normalizer.normalize(case_dict)
+    # ---------- 프로세스 간 조정 ----------
 
-                    # 검증
-                    validation = self.validator.validate(case_dict)
-                    if validation.is_valid:
-                        result['statistics']['cases_valid'] += 1
-                        cases.append(case_dict)
+    def request_collection(
+        self,
+        sources: Optional[List[str]] = None,
+        keywords: Optional[List[str]] = None,
+        max_articles: int = 50,
+        incremental: bool = True,
+    ) -> Optional[str]:
+        """
+        (위임 모드) 리더에게 수집 실행 요청
 
-                # Rate limiting
-                await asyncio.sleep(self.request_delay)
+        Returns:
+            요청 ID (이미 대기 중인 수집 요청이 있으면 None)
+        """
+        params = {'sources': sources, 'keywords': keywords, 'max_articles': max_articles, 'incremental': incremental}
+        return self.control.submit('collect', params, unique=True)
 
-            except Exception as e:
-                logger.warning(
-                    "Error processing article %s: %s",
-                    article_info.article_id,
-                    e,
-                )
-                try:
-                    self.failed_storage.add_failure(
-                        article_info={
-                            "url": getattr(article_info, "url", ""),
-                            "article_id": getattr(article_info, "article_id", ""),
-                            "title": getattr(article_info, "title", ""),
-                            "source": adapter.source_name,
-                        },
-                        article_text="",
-                        reason=f"processing_error: {e}",
-                    )
-                except Exception:
-                    pass
-                continue
+    def request_retry(self, keys: Optional[List[str]] = None) -> str:
+        """(위임 모드) 리더에게 실패 큐 재시도 요청. 요청 ID 반환"""
+        return self.control.submit('retry_failed', {'keys': keys})
 
-        return cases
+    async def process_requests(self) -> None:
+        """
+        (리더) 하트비트 — 상태를 기록하고, 다른 프로세스가 남긴 요청을 하나씩 실행
 
-    def get_status(self) -> Dict[str, Any]:
-        """현재 상태 조회"""
+        수집 중에는 요청을 가져가지 않는다 (끝난 뒤 다음 하트비트에서).
+        """
+        idle = self._request_task is None or self._request_task.done()
+        if idle and not self.is_running:
+            request = self.control.claim()
+            if request:
+                self._request_task = asyncio.create_task(self._run_request(request))
+        self._publish_status()
+
+    async def _run_request(self, request: Dict[str, Any]) -> None:
+        action, params = request.get('action'), request.get('params') or {}
+        logger.info("Running collector request %s (%s)", request.get('id'), action)
+        try:
+            if action == 'collect':
+                await self.run_collection(**params)
+            elif action == 'retry_failed':
+                await self.retry_failed(**params)
+            else:
+                logger.warning("Unknown collector request action: %s", action)
+        except Exception:
+            logger.exception("Collector request %s failed", request.get('id'))
+        finally:
+            self._publish_status()
+
+    def _snapshot(self) -> Dict[str, Any]:
+        """이 프로세스의 수집 상태 (리더가 상태 파일에 쓰는 내용)"""
         return {
             'enabled': self.enabled,
             'is_running': self.is_running,
             'last_run': self.last_run.isoformat() if self.last_run else None,
             'last_result': self.last_result,
+            'last_retry': self.last_retry,
             'next_run': self._get_next_run_time(),
             'registered_sources': list(self.adapters.keys()),
+        }
+
+    def _publish_status(self) -> None:
+        if self.delegated:
+            return
+        try:
+            self.control.publish_status(self._snapshot())
+        except Exception:
+            logger.exception("Failed to publish collector status")
+
+    def get_status(self) -> Dict[str, Any]:
+        """현재 상태 조회 (위임 모드면 리더가 기록한 상태 + 대기 중인 요청)"""
+        if not self.delegated:
+            return {
+                **self._snapshot(),
+                'mode': 'leader',
+                'storage_stats': self.storage.get_stats(),
+                'watermarks': self.watermarks.all(),
+            }
+
+        worker = self.control.read_status() or {}
+        return {
+            'enabled': worker.get('enabled', False),
+            'is_running': bool(worker.get('is_running')) and worker.get('alive', False),
+            'last_run': worker.get('last_run'),
+            'last_result': worker.get('last_result'),
+            'last_retry': worker.get('last_retry'),
+            'next_run': worker.get('next_run'),
+            'registered_sources': worker.get('registered_sources', list(self.adapters.keys())),
+            'mode': 'delegated',
+            'worker': {
+                'alive': worker.get('alive', False),
+                'pid': worker.get('pid'),
+                'host': worker.get('host'),
+                'heartbeat': worker.get('heartbeat'),
+            },
+            'pending_requests': self.control.pending(),
             'storage_stats': self.storage.get_stats(),
+            'watermarks': self.watermarks.all(),
         }
 
     def _get_next_run_time(self) -> Optional[str]:
@@ -0,0 +1,220 @@
+"""
+수집기 저장 엔진 — CaseStorage / FailedExtractionStorage / LLMMetrics 가 쓰는 컬렉션.
+
+COLLECTOR_STORAGE_BACKEND:
+- log (기본): 컬렉션마다 collector/<이름>/ 세그먼트 로그 (segment_log)
+- sqlite: collector/collector.db 한 파일 (sqlite_store, WAL + 색인 열)
+
+두 엔진의 컬렉션은 같은 메서드를 가진다 (Collection):
+put_many / append_many / get / delete_many / values / keys / page / find / count / compact
+(+ 승인 로그 병합용 seal / values_in / drop_segments).
+page(after=seq) 는 두 엔진 모두 순서 색인으로 커서 다음 위치를 바로 찾고, len() 은 쓰기 때
+갱신되는 건수라 전체를 읽지 않는다. find/count 필터는 sqlite 에서 색인 조회, log 에서는
+현재 값 스캔이다.
+
+이전 JSON 파일(pending_cases.json 등)은 import_legacy_json() 으로 한 번 옮기고
+.migrated 로 이름을 바꾼다. 엔진 간 이전은 scripts/migrate_collector_storage.py.
+"""
+
+import json
+import os
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Protocol, Tuple
+
+from ....core.logger import get_logger
+from ...case_log import APPROVED_COLLECTION, approved_db_path, approved_log_dir
+from ...segment_log import SegmentLog
+from ...sqlite_store import DB_FILENAME, SQLiteStore, matches
+
+logger = get_logger("collector.storage")
+
+BACKEND = os.getenv("COLLECTOR_STORAGE_BACKEND", "log")
+BACKENDS = ("log", "sqlite")
+
+
+class Collection(Protocol):
+    """저장 엔진 컬렉션 인터페이스"""
+
+    kind: str
+    keyed: bool
+    garbage: int
+
+    def put_many(self, items: Iterable[Tuple[Any, Any]]) -> None: ...
+    def put(self, key: Any, value: Any) -> None: ...
+    def delete_many(self, keys: Iterable[Any]) -> int: ...
+    def append_many(self, values: Iterable[Any]) -> None: ...
+    def append(self, value: Any) -> None: ...
+    def get(self, key: Any, default: Any = None) -> Any: ...
+    def values(self, start: int = 0, stop: Optional[int] = None) -> List[Any]: ...
+    def items(self) -> Iterator[Tuple[Any, Any]]: ...
+    def page(self, after: Optional[int] = None, limit: int = 50) -> List[Tuple[int, Any]]: ...
+    def keys(self) -> List[Any]: ...
+    def find(self, min_confidence: Optional[float] = None, source: Optional[str] = None,
+             status: Optional[str] = None, since: Optional[str] = None,
+             limit: Optional[int] = None, offset: int = 0) -> List[Any]: ...
+    def count(self, min_confidence: Optional[float] = None, source: Optional[str] = None,
+              status: Optional[str] = None, since: Optional[str] = None) -> int: ...
+    def compact(self, keep_last: Optional[int] = None) -> int: ...
+    def sync(self) -> None: ...
+    def state(self) -> tuple: ...
+    def close(self) -> None: ...
+    def __len__(self) -> int: ...
+    def __contains__(self, key: Any) -> bool: ...
+
+
+class LogCollection(SegmentLog):
+    """SegmentLog + find/count (현재 값 스캔)"""
+
+    def find(
+        self,
+        min_confidence: Optional[float] = None,
+        source: Optional[str] = None,
+        status: Optional[str] = None,
+        since: Optional[str] = None,
+        limit: Optional[int] = None,
+        offset: int = 0,
+    ) -> List[Any]:
+        found = [v for v in self.values() if matches(v, min_confidence, source, status, since)]
+        return found[offset:None if limit is None else offset + limit]
+
+    def count(
+        self,
+        min_confidence: Optional[float] = None,
+        source: Optional[str] = None,
+        status: Optional[str] = None,
+        since: Optional[str] = None,
+    ) -> int:
+        if (min_confidence, source, status, since) == (None, None, None, None):
+            return len(self)
+        return len(self.find(min_confidence, source, status, since))
+
+
+class StorageBackend(ABC):
+    """컬렉션을 여는 저장 엔진"""
+
+    kind: str = ""
+
+    def __init__(self, collector_dir: Path) -> None:
+        self.collector_dir = Path(collector_dir)
+        self.collector_dir.mkdir(parents=True, exist_ok=True)
+
+    @abstractmethod
+    def collection(self, name: str, keyed: bool = True) -> Collection:
+        """이름 있는 컬렉션 (keyed=False 면 순서대로 쌓는 목록)"""
+
+    @abstractmethod
+    def approved(self, combined_file: Path) -> Collection:
+        """통합 파일에 아직 병합되지 않은 승인 케이스 (case_log 가 읽는 위치)"""
+
+    def close(self) -> None:
+        """열린 파일/연결 정리"""
+
+
+class LogBackend(StorageBackend):
+    """세그먼트 로그 엔진"""
+
+    kind = "log"
+
+    def collection(self, name: str, keyed: bool = True) -> Collection:
+        return LogCollection(self.collector_dir / name, keyed=keyed)
+
+    def approved(self, combined_file: Path) -> Collection:
+        return LogCollection(approved_log_dir(combined_file))
+
+
+class SQLiteBackend(StorageBackend):
+    """SQLite(WAL) 엔진 — 모든 컬렉션이 collector.db 하나에"""
+
+    kind = "sqlite"
+
+    def __init__(self, collector_dir: Path) -> None:
+        super().__init__(collector_dir)
+        self.store = SQLiteStore(self.collector_dir / DB_FILENAME)
+        self._stores = [self.store]
+
+    def collection(self, name: str, keyed: bool = True) -> Collection:
+        return self.store.collection(name, keyed=keyed)
+
+    def approved(self, combined_file: Path) -> Collection:
+        path = approved_db_path(combined_file)
+        store = next((s for s in self._stores if s.path == path), None)
+        if store is None:
+            store = SQLiteStore(path)
+            self._stores.append(store)
+        return store.collection(APPROVED_COLLECTION)
+
+    def close(self) -> None:
+        for store in self._stores:
+            store.close()
+
+
+def get_storage_backend(collector_dir: Path, kind: Optional[str] = None) -> StorageBackend:
+    """
+    저장 엔진 생성
+
+    Args:
+        collector_dir: 수집기 데이터 디렉토리
+        kind: log | sqlite (None 이면 COLLECTOR_STORAGE_BACKEND)
+    """
+    kind = kind or BACKEND
+    if kind == "log":
+        return LogBackend(collector_dir)
+    if kind == "sqlite":
+        return SQLiteBackend(collector_dir)
+    raise ValueError(f"Unknown collector storage backend: {kind} (choose from {', '.join(BACKENDS)})")
+
+
+def import_legacy_json(
+    legacy: Path,
+    collection: Collection,
+    key: Optional[Callable[[Any], Any]] = None,
+) -> int:
+    """
+    이전 JSON 파일 내용을 컬렉션으로 옮기고 .migrated 로 이름을 바꾼다
+
+    Args:
+        legacy: JSON 리스트 파일
+        collection: 대상 컬렉션
+        key: keyed 컬렉션에서 항목 → 키
+
+    Returns:
+        옮긴 항목 수
+    """
+    if not legacy.exists():
+        return 0
+    with open(legacy, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    if collection.keyed:
+        collection.put_many((key(item), item) for item in data)
+    else:
+        collection.append_many(data)
+    collection.sync()
+    legacy.rename(legacy.with_name(legacy.name + ".migrated"))
+    logger.info("migrated %d records from %s", len(data), legacy.name)
+    return len(data)
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[int]:
+    """페이지 커서(마지막 항목의 seq) → int. 잘못된 커서는 ValueError"""
+    if cursor is None or cursor == "":
+        return None
+    seq = int(cursor)
+    if seq < 0:
+        raise ValueError(f"invalid cursor: {cursor}")
+    return seq
+
+
+def cursor_page(collection: Collection, cursor: Optional[str], limit: int) -> Tuple[List[Any], Optional[str]]:
+    """
+    커서 다음 limit 개
+
+    Returns:
+        (값 목록, 다음 커서 — 더 없으면 None)
+    """
+    after = decode_cursor(cursor)
+    if limit <= 0:
+        return [], cursor
+    rows = collection.page(after, limit + 1)
+    next_cursor = str(rows[limit - 1][0]) if len(rows) > limit else None
+    return [value for _, value in rows[:limit]], next_cursor
@@ -1,73 +1,146 @@
 """
 치험례 저장 관리
-JSON 파일 기반 영구 저장
+저장 엔진(backend: 세그먼트 로그 / SQLite) 기반 영구 저장
 """
 
 import json
+import os
+import threading
+import uuid
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime
-import asyncio
 from threading import Lock
 
+from ....core.logger import get_logger
+from ...case_corpus import get_case_corpus
+from ...case_log import fold_approved, recover_fold
+from ...case_snapshot import load_cases, rebuild_snapshot
+from ..coordination import FileLock
+from .backend import cursor_page, get_storage_backend, import_legacy_json
+
+logger = get_logger("case_storage")
+
+# 실제 프로그램 데이터 경로 (apps/ai-engine/data/)
+# case_storage.py -> storage -> collector -> services -> app -> ai-engine -> data
+DEFAULT_DATA_DIR = Path(__file__).parent.parent.parent.parent.parent / "data"
+
 
 class CaseStorage:
     """
-    치험례 저장 관리
-    - pending_cases.json: 검토 대기 케이스
-    - all_cases_combined.json: 승인된 케이스 (기존 데이터와 통합)
-    - collection_logs.json: 수집 로그
+    치험례 저장 관리 (컬렉션 위치는 backend — log: collector/<이름>/, sqlite: collector/collector.db)
+    - pending: 검토 대기 케이스 (id 키 — 추가/승인/거부가 레코드 단위 쓰기)
+    - all_cases_combined.json + 승인 로그: 승인된 케이스
+      (승인은 로그에 붙이고, 쌓이면 백그라운드에서 통합 파일에 병합)
+    - collection_logs, duplicates: 수집 로그 / 중복 아카이브
+
+    log 엔진은 한 데이터 디렉토리에 CaseStorage 하나만 쓴다 (단일 작성자).
+    API 와 수집 워커가 함께 쓰려면 sqlite 엔진 — 이때 통합 파일 병합은 fold_enabled 인
+    프로세스(수집 리더)만 하고, 병합/복구 구간은 fold.lock 으로 프로세스 간에 막는다.
+    쓰기는 즉시 flush 되고 fsync 는 SegmentLog 가 묶어서 한다.
     """
 
-    def __init__(self, data_dir: Optional[Path] = None):
+    # 보관 개수 (초과분은 압축 때 정리)
+    MAX_LOGS = 500
+    MAX_DUPLICATES = 1000
+    # 승인 로그를 통합 파일에 병합하는 기준 (케이스 수)
+    FOLD_THRESHOLD = int(os.getenv("CASE_LOG_FOLD_THRESHOLD", "1000"))
+    # 대기 로그 압축 기준 (덮어쓰기/삭제로 죽은 레코드 수)
+    COMPACT_GARBAGE = int(os.getenv("CASE_LOG_COMPACT_GARBAGE", "1000"))
+
+    def __init__(self, data_dir: Optional[Path] = None, backend: Optional[str] = None):
         """
         초기화
 
         Args:
             data_dir: 데이터 디렉토리 경로
+            backend: 저장 엔진 (log | sqlite, None 이면 COLLECTOR_STORAGE_BACKEND)
         """
-        if data_dir is None:
-            # 실제 프로그램 데이터 경로 사용 (apps/ai-engine/data/)
-            # case_storage.py -> storage -> collector -> services -> app -> ai-engine -> data
-            data_dir = Path(__file__).parent.parent.parent.parent.parent / "data"
-
-        self.data_dir = Path(data_dir)
+        self.data_dir = Path(data_dir) if data_dir is not None else DEFAULT_DATA_DIR
         self.data_dir.mkdir(parents=True, exist_ok=True)
 
         # 수집기 전용 디렉토리 (로그, 대기열 등)
         self.collector_dir = self.data_dir / "collector"
         self.collector_dir.mkdir(parents=True, exist_ok=True)
 
-        # 파일 경로 - 승인된 케이스는 메인 데이터 파일에 직접 추가
+        # 승인된 케이스는 메인 데이터 파일(+ 그 옆 승인 로그)에 추가
         self.combined_file = self.data_dir / "all_cases_combined.json"
-        self.pending_file = self.collector_dir / "pending_cases.json"
-        self.logs_file = self.collector_dir / "collection_logs.json"
-        self.duplicates_file = self.collector_dir / "duplicates_archive.json"
 
-        # 파일 잠금
+        # 파일 잠금 (여러 로그에 걸친 작업용 — 각 로그도 자체 락이 있음)
         self._lock = Lock()
+        self._compacting = Lock()
+        self._fold_lock = FileLock(self.collector_dir / "fold.lock")
+        # 승인 로그 → 통합 파일 병합 여부 (다른 프로세스가 병합을 맡으면 False)
+        self.fold_enabled = True
+
+        self.backend = get_storage_backend(self.collector_dir, backend)
+        self.pending = self.backend.collection("pending")
+        self.approved = self.backend.approved(self.combined_file)
+        self.logs = self.backend.collection("collection_logs", keyed=False)
+        self.duplicates = self.backend.collection("duplicates", keyed=False)
+        with self._fold_lock:
+            recover_fold(self.combined_file, self.approved)
+
+        # 이전 버전의 JSON 파일 → 저장 엔진
+        import_legacy_json(self.collector_dir / "pending_cases.json", self.pending, self._key)
+        import_legacy_json(self.collector_dir / "collection_logs.json", self.logs)
+        import_legacy_json(self.collector_dir / "duplicates_archive.json", self.duplicates)
+
+        # 통계용 건수: 통합 파일은 (크기, mtime) 이 바뀔 때만 다시 세고,
+        # 미병합 승인 케이스의 온라인 수집 건수는 승인/병합 때 갱신한다
+        self._combined_stamp: Optional[Tuple[int, int]] = None
+        self._combined_counts = (0, 0)
+        self._recount_approved()
+
+    def _recount_approved(self) -> None:
+        approved = self.approved.values()
+        self._approved_online = self._count_online(approved)
+        self._approved_seen = len(approved)
+
+    @staticmethod
+    def _key(case: Dict[str, Any]) -> str:
+        """대기 로그 키 (id 없는 케이스는 임의 키)"""
+        return case.get('id') or f"_{uuid.uuid4().hex}"
 
     def load_existing_cases(self) -> List[Dict[str, Any]]:
-        """기존 케이스 로드"""
-        if not self.combined_file.exists():
-            return []
+        """기존 케이스 로드 (통합 파일 + 아직 병합되지 않은 승인 케이스)"""
+        # 로그를 먼저 읽는다 — 그 사이 병합되면 누락 대신 중복이 생긴다 (중복 검사용이라 무해)
+        approved = self.approved.values()
+        cases = []
+        if self.combined_file.exists():
+            with open(self.combined_file, 'r', encoding='utf-8') as f:
+                cases = json.load(f)
+        return cases + approved
+
+    def load_pending_cases(self, offset: int = 0, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """대기 중인 케이스 로드 (offset/limit 로 일부만 읽을 수 있음)"""
+        return self.pending.values(offset, None if limit is None else offset + limit)
+
+    def load_pending_page(self, cursor: Optional[str] = None, limit: int = 50) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        대기 케이스 커서 페이지 (순서 색인으로 커서 위치부터 limit 개만 읽음)
 
-        with open(self.combined_file, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        Args:
+            cursor: 이전 페이지의 next_cursor (None 이면 처음부터)
+            limit: 페이지 크기
 
-    def load_pending_cases(self) -> List[Dict[str, Any]]:
-        """대기 중인 케이스 로드"""
-        if not self.pending_file.exists():
-            return []
+        Returns:
+            (케이스 리스트, 다음 커서 — 마지막 페이지면 None)
+        """
+        return cursor_page(self.pending, cursor, limit)
 
-        with open(self.pending_file, 'r', encoding='utf-8') as f:
-            return json.load(f)
+    def pending_count(self) -> int:
+        """대기 케이스 수"""
+        return len(self.pending)
 
     def save_pending_cases(self, cases: List[Dict[str, Any]]) -> None:
-        """대기 케이스 저장"""
+        """대기 케이스 저장 (대기 목록을 cases 로 교체)"""
         with self._lock:
-            with open(self.pending_file, 'w', encoding='utf-8') as f:
-                json.dump(cases, f, ensure_ascii=False, indent=2)
+            keys = [self._key(case) for case in cases]
+            kept = set(keys)
+            self.pending.delete_many(k for k in self.pending.keys() if k not in kept)
+            self.pending.put_many(zip(keys, cases))
+        self._maybe_compact()
 
     def add_to_pending(self, cases: List[Dict[str, Any]]) -> int:
         """
@@ -79,50 +152,49 @@ class CaseStorage:
         Returns:
             추가된 케이스 수
         """
-        with self._lock:
-            existing = self.load_pending_cases()
-            existing.extend(cases)
-
-            with open(self.pending_file, 'w', encoding='utf-8') as f:
-                json.dump(existing, f, ensure_ascii=False, indent=2)
-
-            return len(cases)
+        self.pending.put_many((self._key(case), case) for case in cases)
+        return len(cases)
 
     def approve_cases(self, case_ids: List[str]) -> int:
         """
-        케이스 승인 (pending → combined)
+        케이스 승인 (pending → 승인 로그)
 
         Args:
             case_ids: 승인할 케이스 ID 리스트
 
         Returns:
             승인된 케이스 수
+
+        코퍼스 스냅샷 확장까지 동기로 끝낸다 — 이벤트 루프에서는 asyncio.to_thread 로 부른다.
         """
         with self._lock:
-            pending = self.load_pending_cases()
-            combined = self.load_existing_cases()
-
+            keys = [key for key in dict.fromkeys(case_ids) if key in self.pending]
             approved = []
-            remaining = []
+            now = datetime.now().isoformat()
+            for key in keys:
+                case = self.pending.get(key)
+                case['approved_at'] = now
+                approved.append(case)
 
-            for case in pending:
-                if case.get('id') in case_ids:
-                    case['approved_at'] = datetime.now().isoformat()
-                    approved.append(case)
-                else:
-                    remaining.append(case)
+            # 쓰기 직전 승인 로그 상태 — 코퍼스가 다른 프로세스의 승인을 놓쳤는지 판단
+            corpus = get_case_corpus()
+            prior = corpus.source_state(self.combined_file) if approved else None
 
-            # 통합 파일에 추가
-            combined.extend(approved)
+            # 승인 로그에 먼저 쓰고 대기에서 지운다 (중간에 죽으면 다시 승인해도 같은 키)
+            self.approved.put_many(zip(keys, approved))
+            self.pending.delete_many(keys)
 
-            # 저장
-            with open(self.combined_file, 'w', encoding='utf-8') as f:
-                json.dump(combined, f, ensure_ascii=False, indent=2)
+            self._approved_online += self._count_online(approved)
+            self._approved_seen += len(approved)
 
-            with open(self.pending_file, 'w', encoding='utf-8') as f:
-                json.dump(remaining, f, ensure_ascii=False, indent=2)
+        # 서버 코퍼스/통계에 재파싱 없이 반영 (다른 파일을 보고 있으면 무시됨).
+        # 새 스냅샷은 저장소 락 밖에서 만든다 — 그동안 다른 승인/수집 쓰기를 막지 않고,
+        # 읽는 쪽은 교체될 때까지 기존 스냅샷을 본다
+        if approved:
+            corpus.append(approved, source=self.combined_file, prior=prior)
 
-            return len(approved)
+        self._maybe_compact()
+        return len(approved)
 
     def auto_approve_high_confidence(self, threshold: float = 0.9) -> int:
         """
@@ -134,11 +206,9 @@ class CaseStorage:
         Returns:
             승인된 케이스 수
         """
-        pending = self.load_pending_cases()
-
         auto_approve_ids = [
-            case['id'] for case in pending
-            if case.get('confidence_score', 0) >= threshold
+            case['id'] for case in self.pending.find(min_confidence=threshold)
+            if case.get('id')
         ]
 
         if auto_approve_ids:
@@ -158,80 +228,111 @@ class CaseStorage:
             거부된 케이스 수
         """
         with self._lock:
-            pending = self.load_pending_cases()
-
-            rejected = []
-            remaining = []
-
-            for case in pending:
-                if case.get('id') in case_ids:
-                    case['rejected_at'] = datetime.now().isoformat()
-                    case['rejection_reason'] = reason
-                    rejected.append(case)
-                else:
-                    remaining.append(case)
-
-            # 대기 목록 업데이트
-            with open(self.pending_file, 'w', encoding='utf-8') as f:
-                json.dump(remaining, f, ensure_ascii=False, indent=2)
-
-            return len(rejected)
+            count = self.pending.delete_many(case_ids)
+        self._maybe_compact()
+        return count
 
     def save_duplicates(self, duplicates: List[Dict[str, Any]]) -> None:
         """중복 케이스 아카이브"""
-        with self._lock:
-            existing = []
-            if self.duplicates_file.exists():
-                with open(self.duplicates_file, 'r', encoding='utf-8') as f:
-                    existing = json.load(f)
-
-            existing.extend(duplicates)
-
-            # 최대 1000개만 보관
-            if len(existing) > 1000:
-                existing = existing[-1000:]
-
-            with open(self.duplicates_file, 'w', encoding='utf-8') as f:
-                json.dump(existing, f, ensure_ascii=False, indent=2)
+        self.duplicates.append_many(duplicates)
+        self._maybe_compact()
 
     def log_collection(self, log_entry: Dict[str, Any]) -> None:
         """수집 로그 저장"""
-        with self._lock:
-            logs = []
-            if self.logs_file.exists():
-                with open(self.logs_file, 'r', encoding='utf-8') as f:
-                    logs = json.load(f)
-
-            logs.append(log_entry)
-
-            # 최대 500개 로그 보관
-            if len(logs) > 500:
-                logs = logs[-500:]
-
-            with open(self.logs_file, 'w', encoding='utf-8') as f:
-                json.dump(logs, f, ensure_ascii=False, indent=2)
+        self.logs.append(log_entry)
+        self._maybe_compact()
 
     def get_collection_logs(self, limit: int = 50) -> List[Dict[str, Any]]:
         """최근 수집 로그 조회"""
-        if not self.logs_file.exists():
-            return []
+        count = min(limit, self.MAX_LOGS)
+        return self.logs.values(max(len(self.logs) - count, 0))
+
+    # ---------- 압축 ----------
+
+    def _needs_compaction(self) -> bool:
+        return (
+            self.pending.garbage >= self.COMPACT_GARBAGE
+            or (self.fold_enabled and len(self.approved) >= self.FOLD_THRESHOLD)
+            or len(self.logs) > 2 * self.MAX_LOGS
+            or len(self.duplicates) > 2 * self.MAX_DUPLICATES
+        )
 
-        with open(self.logs_file, 'r', encoding='utf-8') as f:
-            logs = json.load(f)
+    def _maybe_compact(self) -> None:
+        """기준을 넘었으면 백그라운드 압축 시작 (이미 돌고 있으면 무시)"""
+        if self._needs_compaction() and not self._compacting.locked():
+            threading.Thread(target=self.compact, name="case-log-compact", daemon=True).start()
 
-        return logs[-limit:]
+    def compact(self) -> None:
+        """
+        로그 압축
+        - 대기 로그: 살아 있는 케이스만 남김
+        - 승인 로그: 통합 파일에 병합 (+ 바이너리 스냅샷 재생성)
+        - 수집 로그 / 중복 아카이브: 최근 MAX_* 개만 남김
+        """
+        if not self._compacting.acquire(blocking=False):
+            return
+        try:
+            if self.pending.garbage >= self.COMPACT_GARBAGE:
+                self.pending.compact()
+            if (
+                self.fold_enabled
+                and len(self.approved) >= self.FOLD_THRESHOLD
+                and self._fold_lock.acquire(blocking=False)
+            ):
+                try:
+                    if fold_approved(self.combined_file, self.approved, lock=self._lock):
+                        # 읽기 전용으로 마운트한 API 는 스냅샷을 직접 못 쓴다 — 병합한 쪽이 만든다
+                        rebuild_snapshot(self.combined_file)
+                finally:
+                    self._fold_lock.release()
+                with self._lock:
+                    self._recount_approved()
+            if len(self.logs) > 2 * self.MAX_LOGS:
+                self.logs.compact(keep_last=self.MAX_LOGS)
+            if len(self.duplicates) > 2 * self.MAX_DUPLICATES:
+                self.duplicates.compact(keep_last=self.MAX_DUPLICATES)
+        except Exception:
+            logger.exception("case log compaction failed")
+        finally:
+            self._compacting.release()
+
+    def close(self) -> None:
+        """쌓인 쓰기를 fsync 하고 파일을 닫는다"""
+        for log in (self.pending, self.approved, self.logs, self.duplicates):
+            log.close()
+        self.backend.close()
+
+    @staticmethod
+    def _count_online(cases: List[Dict[str, Any]]) -> int:
+        return sum(1 for c in cases if c.get('data_source') == 'online_collection')
+
+    def _combined_file_counts(self) -> Tuple[int, int]:
+        """통합 파일 (전체, 온라인 수집) 건수 — 파일이 바뀐 경우에만 다시 센다"""
+        try:
+            st = self.combined_file.stat()
+        except FileNotFoundError:
+            return 0, 0
+        stamp = (st.st_size, st.st_mtime_ns)
+        if stamp != self._combined_stamp:
+            # 일치하는 바이너리 스냅샷이 있으면 JSON 파싱 없이 mmap
+            cases = load_cases(self.combined_file)
+            self._combined_counts = (len(cases), self._count_online(cases))
+            self._combined_stamp = stamp
+        return self._combined_counts
 
     def get_stats(self) -> Dict[str, Any]:
         """저장소 통계"""
-        combined = self.load_existing_cases()
-        pending = self.load_pending_cases()
-
-        # 온라인 수집 케이스 수
-        online_cases = [c for c in combined if c.get('data_source') == 'online_collection']
+        with self._lock:
+            combined_total, combined_online = self._combined_file_counts()
+            approved_total = len(self.approved)
+            # 다른 프로세스가 승인/병합했으면 건수가 어긋난다 — 그때만 다시 센다
+            if approved_total != self._approved_seen:
+                self._recount_approved()
+            approved_online = self._approved_online
 
         return {
-            'total_cases': len(combined),
-            'pending_cases': len(pending),
-            'online_collected_cases': len(online_cases),
+            'total_cases': combined_total + approved_total,
+            'pending_cases': self.pending_count(),
+            'online_collected_cases': combined_online + approved_online,
             'combined_file_size_mb': self.combined_file.stat().st_size / (1024 * 1024) if self.combined_file.exists() else 0,
         }
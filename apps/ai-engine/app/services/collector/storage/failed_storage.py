@@ -2,28 +2,42 @@
 추출 실패 케이스 재처리 큐
 - 규칙 기반·LLM 폴백 모두 실패한 논문을 별도 저장
 - 재시도 횟수 추적, 최대 재시도 후 dead-letter
+- 수집 실행 중에는 batch() 로 변경을 메모리에 모았다가 끝날 때 한 번에 기록
 """
 
-import json
+from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
-from threading import Lock
-from typing import Any, Dict, List, Optional
+from threading import RLock
+from typing import Any, Dict, Iterator, List, Optional
+
+from .backend import cursor_page, get_storage_backend, import_legacy_json
 
 
 class FailedExtractionStorage:
-    """실패한 추출 작업의 영속 큐 (JSON 파일)"""
+    """실패한 추출 작업의 영속 큐 (저장 엔진: log | sqlite)"""
 
     MAX_RETRIES = 3
+    MAX_QUEUE = 500
+    MAX_DEAD = 1000
 
-    def __init__(self, data_dir: Optional[Path] = None) -> None:
+    def __init__(self, data_dir: Optional[Path] = None, backend: Optional[str] = None) -> None:
         if data_dir is None:
             data_dir = Path(__file__).resolve().parents[4] / "data" / "collector"
         self.data_dir = Path(data_dir)
         self.data_dir.mkdir(parents=True, exist_ok=True)
-        self.queue_file = self.data_dir / "failed_extractions.json"
-        self.dead_file = self.data_dir / "failed_extractions_dead.json"
-        self._lock = Lock()
+        self._lock = RLock()
+
+        # batch() 중 쌓인 변경 (키 → 항목, None 은 삭제) / dead-letter 로 옮길 항목
+        self._batch_depth = 0
+        self._staged: Dict[str, Optional[Dict[str, Any]]] = {}
+        self._staged_dead: List[Dict[str, Any]] = []
+
+        self.backend = get_storage_backend(self.data_dir, backend)
+        self.queue = self.backend.collection("failed_extractions")
+        self.dead = self.backend.collection("failed_extractions_dead", keyed=False)
+        import_legacy_json(self.data_dir / "failed_extractions.json", self.queue, lambda item: item.get("key"))
+        import_legacy_json(self.data_dir / "failed_extractions_dead.json", self.dead)
 
     @staticmethod
     def _make_key(article_info: Dict[str, Any]) -> str:
@@ -34,20 +48,58 @@ class FailedExtractionStorage:
             or article_info.get("title", "")[:120]
         )
 
-    def _load(self, file: Path) -> List[Dict[str, Any]]:
-        if not file.exists():
-            return []
-        try:
-            with open(file, "r", encoding="utf-8") as f:
-                return json.load(f)
-        except Exception:
-            return []
+    @contextmanager
+    def batch(self) -> Iterator["FailedExtractionStorage"]:
+        """
+        블록 안의 add_failure / remove_success 를 모았다가 끝날 때 한 번에 기록
 
-    def _save(self, file: Path, data: List[Dict[str, Any]]) -> None:
-        tmp = file.with_suffix(".json.tmp")
-        with open(tmp, "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
-        tmp.replace(file)
+        수집 실행처럼 실패가 연달아 나는 구간을 감싼다. 중첩되면 가장 바깥 블록에서 기록한다.
+        블록 안의 list_pending / get_stats 는 아직 기록되지 않은 변경을 보지 못한다.
+        """
+        with self._lock:
+            self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self._batch_depth -= 1
+                if not self._batch_depth:
+                    self.flush()
+
+    def flush(self) -> None:
+        """모아 둔 변경 기록 (upsert/삭제 한 번씩 + dead-letter 덧붙이기 + sync)"""
+        with self._lock:
+            staged, self._staged = self._staged, {}
+            dead, self._staged_dead = self._staged_dead, []
+            if not staged and not dead:
+                return
+
+            self.queue.put_many((key, item) for key, item in staged.items() if item is not None)
+            self.queue.delete_many([key for key, item in staged.items() if item is None])
+            if dead:
+                self.dead.append_many(dead)
+                # dead-letter 도 1000건만 유지
+                if len(self.dead) > 2 * self.MAX_DEAD:
+                    self.dead.compact(keep_last=self.MAX_DEAD)
+
+            # 큐 크기 제한 (오래된 항목 제거 — 순서 색인 앞부분만 읽음)
+            overflow = len(self.queue) - self.MAX_QUEUE
+            if overflow > 0:
+                self.queue.delete_many([item.get("key") for _, item in self.queue.page(None, overflow)])
+            if self.queue.garbage > 10 * self.MAX_QUEUE:
+                self.queue.compact()
+            self.queue.sync()
+            self.dead.sync()
+
+    def _get(self, key: str) -> Optional[Dict[str, Any]]:
+        if key in self._staged:
+            return self._staged[key]
+        return self.queue.get(key)
+
+    def _stage(self, key: str, item: Optional[Dict[str, Any]]) -> None:
+        self._staged[key] = item
+        if not self._batch_depth:
+            self.flush()
 
     def add_failure(
         self,
@@ -57,29 +109,24 @@ class FailedExtractionStorage:
     ) -> None:
         """실패 항목 추가 (이미 존재하면 retry_count + 1)"""
         with self._lock:
-            queue = self._load(self.queue_file)
             key = self._make_key(article_info)
             now = datetime.now().isoformat()
 
-            for item in queue:
-                if item.get("key") == key:
-                    item["retry_count"] = item.get("retry_count", 0) + 1
-                    item["last_attempted_at"] = now
-                    item["last_reason"] = reason[:300]
-                    if item["retry_count"] >= self.MAX_RETRIES:
-                        # dead-letter 로 이동
-                        queue.remove(item)
-                        dead = self._load(self.dead_file)
-                        item["dead_at"] = now
-                        dead.append(item)
-                        # dead-letter 도 1000건만 유지
-                        if len(dead) > 1000:
-                            dead = dead[-1000:]
-                        self._save(self.dead_file, dead)
-                    self._save(self.queue_file, queue)
-                    return
-
-            queue.append({
+            item = self._get(key)
+            if item is not None:
+                item["retry_count"] = item.get("retry_count", 0) + 1
+                item["last_attempted_at"] = now
+                item["last_reason"] = reason[:300]
+                if item["retry_count"] >= self.MAX_RETRIES:
+                    # dead-letter 로 이동 (덧붙이기만)
+                    item["dead_at"] = now
+                    self._staged_dead.append(item)
+                    self._stage(key, None)
+                else:
+                    self._stage(key, item)
+                return
+
+            self._stage(key, {
                 "key": key,
                 "article_info": article_info,
                 "article_text_excerpt": (article_text or "")[:4000],
@@ -88,54 +135,55 @@ class FailedExtractionStorage:
                 "retry_count": 1,
                 "last_reason": reason[:300],
             })
-            # 큐 크기 제한 (오래된 항목 제거)
-            if len(queue) > 500:
-                queue = queue[-500:]
-            self._save(self.queue_file, queue)
 
     def list_pending(
         self,
         limit: int = 50,
         offset: int = 0,
+        cursor: Optional[str] = None,
     ) -> Dict[str, Any]:
-        with self._lock:
-            queue = self._load(self.queue_file)
-            total = len(queue)
-            return {
-                "items": queue[offset : offset + limit],
-                "total": total,
-                "limit": limit,
-                "offset": offset,
-            }
+        """실패 큐 페이지 (offset 이 0 이면 커서 페이지 — next_cursor 로 다음 페이지)"""
+        next_cursor = None
+        if offset:
+            items = self.queue.values(offset, offset + limit)
+        else:
+            items, next_cursor = cursor_page(self.queue, cursor, limit)
+        return {
+            "items": items,
+            "total": len(self.queue),
+            "limit": limit,
+            "offset": offset,
+            "next_cursor": next_cursor,
+        }
 
     def list_dead(self, limit: int = 50) -> List[Dict[str, Any]]:
-        with self._lock:
-            dead = self._load(self.dead_file)
-            return dead[-limit:]
+        count = min(limit, self.MAX_DEAD)
+        return self.dead.values(max(len(self.dead) - count, 0))
 
     def get_retry_candidates(self) -> List[Dict[str, Any]]:
         """재시도 대상 (retry_count < MAX_RETRIES)"""
+        return [
+            item for item in self.queue.values()
+            if item.get("retry_count", 0) < self.MAX_RETRIES
+        ]
+
+    def awaiting_retry(self, article_info: Dict[str, Any]) -> bool:
+        """
+        본문 발췌와 함께 큐에 있는 항목인지 — 재시도가 발췌로 다시 처리하므로
+        수집 때 상세 조회를 다시 하지 않는다 (발췌 없는 조회 실패 항목은 False)
+        """
         with self._lock:
-            queue = self._load(self.queue_file)
-            return [
-                item for item in queue
-                if item.get("retry_count", 0) < self.MAX_RETRIES
-            ]
+            item = self._get(self._make_key(article_info))
+        return bool(item and item.get("article_text_excerpt"))
 
     def remove_success(self, key: str) -> None:
         """재시도 성공 시 큐에서 제거"""
         with self._lock:
-            queue = self._load(self.queue_file)
-            new_queue = [item for item in queue if item.get("key") != key]
-            if len(new_queue) != len(queue):
-                self._save(self.queue_file, new_queue)
+            self._stage(key, None)
 
     def get_stats(self) -> Dict[str, Any]:
-        with self._lock:
-            queue = self._load(self.queue_file)
-            dead = self._load(self.dead_file)
-            return {
-                "pending_count": len(queue),
-                "dead_letter_count": len(dead),
-                "max_retries": self.MAX_RETRIES,
-            }
+        return {
+            "pending_count": len(self.queue),
+            "dead_letter_count": min(len(self.dead), self.MAX_DEAD),
+            "max_retries": self.MAX_RETRIES,
+        }
@@ -0,0 +1,83 @@
+"""
+소스·검색어별 증분 수집 표식 (high-water mark)
+- 키: 소스 + 정규화한 키워드 집합 (mark_key). 키워드가 다르면 다른 검색이므로 표식도 따로 —
+  새 키워드로 돌린 수집이 다른 검색의 표식 때문에 예전 논문을 건너뛰지 않는다.
+- last_id: 지금까지 검색에서 본 가장 큰 논문 번호 (PMID, OASIS idx, KCI artiId — adapter.sequence_number)
+- searched_until: 마지막으로 끝까지 검색한 날짜 (다음 검색의 date_from)
+수집이 끊기거나 오류가 난 소스는 표식을 올리지 않는다 (다음 실행에서 다시 본다).
+"""
+
+import hashlib
+from datetime import datetime
+from pathlib import Path
+from threading import Lock
+from typing import Any, Dict, Iterable, List, Optional
+
+from .backend import get_storage_backend
+
+
+def normalize_keywords(keywords: Optional[Iterable[str]]) -> List[str]:
+    """중복·대소문자·앞뒤 공백을 무시한 정렬된 키워드"""
+    return sorted({k.strip().lower() for k in keywords or () if k and k.strip()})
+
+
+def mark_key(source: str, keywords: Optional[Iterable[str]] = None) -> str:
+    """표식 키 — 키워드가 없으면 소스 이름, 있으면 소스:키워드 집합 해시"""
+    normalized = normalize_keywords(keywords)
+    if not normalized:
+        return source
+    digest = hashlib.sha1("\n".join(normalized).encode("utf-8")).hexdigest()[:12]
+    return f"{source}:{digest}"
+
+
+class SourceWatermarks:
+    """(소스, 키워드 집합) → 표식 (저장 엔진: log | sqlite)"""
+
+    def __init__(self, data_dir: Optional[Path] = None, backend: Optional[str] = None) -> None:
+        if data_dir is None:
+            data_dir = Path(__file__).resolve().parents[4] / "data" / "collector"
+        self.data_dir = Path(data_dir)
+        self.data_dir.mkdir(parents=True, exist_ok=True)
+        self._lock = Lock()
+        self.backend = get_storage_backend(self.data_dir, backend)
+        self.marks = self.backend.collection("source_watermarks")
+
+    def get(self, source: str, keywords: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        """표식 (없으면 빈 dict)"""
+        return self.marks.get(mark_key(source, keywords)) or {}
+
+    def all(self) -> Dict[str, Dict[str, Any]]:
+        return dict(self.marks.items())
+
+    def advance(
+        self,
+        source: str,
+        last_id: Optional[int],
+        searched_until: str,
+        keywords: Optional[Iterable[str]] = None,
+    ) -> Dict[str, Any]:
+        """
+        표식 올리기 (번호는 작아지지 않는다)
+
+        Args:
+            source: 소스 이름
+            last_id: 이번 검색에서 본 가장 큰 논문 번호 (없으면 None)
+            searched_until: 이번 검색 날짜 (YYYY-MM-DD)
+            keywords: 이번 검색의 키워드 (표식 키의 일부)
+        """
+        keywords = normalize_keywords(keywords)
+        with self._lock:
+            mark = self.get(source, keywords)
+            if last_id is not None:
+                mark["last_id"] = max(mark.get("last_id") or last_id, last_id)
+            mark["source"] = source
+            mark["keywords"] = keywords
+            mark["searched_until"] = searched_until
+            mark["updated_at"] = datetime.now().isoformat()
+            self.marks.put(mark_key(source, keywords), mark)
+            self.marks.sync()
+            return mark
+
+    def close(self) -> None:
+        self.marks.close()
+        self.backend.close()
@@ -0,0 +1,233 @@
+"""
+임베딩 저장소 — case_id 별 내용 해시 + append-only 벡터 파일.
+
+증분 색인용. 어떤 케이스를 어떤 텍스트로 이미 임베딩했는지 기록해 두고,
+새 케이스나 내용이 바뀐 케이스만 다시 임베딩한다.
+
+파일 (store_dir/):
+- store.json            dim, 인코더 설정(IDF 포함), fingerprint, generation
+- vectors.<gen>.f32     float32 행 (dim 개씩) 을 이어 붙인 raw 파일 — memmap 으로 읽는다
+- manifest.<gen>.jsonl  {"id", "hash", "row"} 한 줄씩. 같은 id 가 다시 나오면 마지막 줄이 유효
+
+크래시 안전성:
+- 배치마다 벡터를 먼저 쓰고 fsync 한 뒤 manifest 줄을 쓴다.
+- 다시 열 때 manifest 에 없는 꼬리 행(벡터만 쓰고 죽은 경우)은 잘라내고,
+  깨진 마지막 manifest 줄은 무시한다. 따라서 재실행하면 끝나지 않은 배치만 다시 한다.
+- compact 는 다음 generation 파일을 다 쓴 뒤 store.json 교체로 전환한다.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ..core.logger import get_logger
+
+logger = get_logger("embedding_store")
+
+STORE_FILE = "store.json"
+
+
+def content_hash(text: str) -> str:
+    """임베딩 텍스트의 내용 해시."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:32]
+
+
+def encoder_fingerprint(config: Dict[str, Any]) -> str:
+    """인코더 설정 지문 — 바뀌면 저장된 벡터를 재사용할 수 없다."""
+    blob = json.dumps(config, sort_keys=True, ensure_ascii=False).encode("utf-8")
+    return hashlib.sha256(blob).hexdigest()[:16]
+
+
+class EmbeddingStore:
+    """case_id → (내용 해시, 벡터 행) 저장소."""
+
+    def __init__(self, store_dir: Path) -> None:
+        self.store_dir = Path(store_dir)
+        self.dim = 0
+        self.encoder: Dict[str, Any] = {}
+        self.fingerprint = ""
+        self.generation = 0
+        self.entries: Dict[str, Tuple[str, int]] = {}
+        self.rows = 0
+
+    @property
+    def _row_bytes(self) -> int:
+        return self.dim * 4
+
+    def _vectors_path(self, generation: Optional[int] = None) -> Path:
+        gen = self.generation if generation is None else generation
+        return self.store_dir / f"vectors.{gen}.f32"
+
+    def _manifest_path(self, generation: Optional[int] = None) -> Path:
+        gen = self.generation if generation is None else generation
+        return self.store_dir / f"manifest.{gen}.jsonl"
+
+    def exists(self) -> bool:
+        return (self.store_dir / STORE_FILE).exists()
+
+    # ---------- 열기 / 초기화 ----------
+
+    def open(self) -> "EmbeddingStore":
+        """기존 저장소를 연다 (크래시 잔여물 정리 포함)."""
+        meta = json.loads((self.store_dir / STORE_FILE).read_text(encoding="utf-8"))
+        self.dim = int(meta["dim"])
+        self.encoder = meta.get("encoder", {})
+        self.fingerprint = meta.get("fingerprint", "")
+        self.generation = int(meta.get("generation", 0))
+
+        vectors_path = self._vectors_path()
+        size = vectors_path.stat().st_size if vectors_path.exists() else 0
+        on_disk = size // self._row_bytes if self.dim else 0
+
+        entries: Dict[str, Tuple[str, int]] = {}
+        next_row = 0
+        manifest = self._manifest_path()
+        if manifest.exists():
+            data = manifest.read_bytes()
+            complete = data[:data.rfind(b"\n") + 1]
+            if len(complete) != len(data):
+                # 쓰다 만 마지막 줄 제거 — 남겨 두면 다음 append 와 한 줄로 붙는다
+                with open(manifest, "ab") as f:
+                    f.truncate(len(complete))
+            for line in complete.decode("utf-8", errors="replace").splitlines():
+                try:
+                    item = json.loads(line)
+                    row = int(item["row"])
+                except (ValueError, KeyError, TypeError):
+                    continue
+                if row >= on_disk:
+                    continue
+                entries[item["id"]] = (item["hash"], row)
+                next_row = max(next_row, row + 1)
+
+        # manifest 에 기록되지 않은 꼬리 벡터 제거
+        if on_disk > next_row or size != on_disk * self._row_bytes:
+            with open(vectors_path, "ab") as f:
+                f.truncate(next_row * self._row_bytes)
+            logger.info("embedding store: trimmed %d orphan rows", on_disk - next_row)
+
+        self.entries = entries
+        self.rows = next_row
+        return self
+
+    def reset(self, dim: int, encoder: Dict[str, Any]) -> "EmbeddingStore":
+        """빈 저장소 생성 (인코더 설정이 바뀌었거나 전체 재빌드)."""
+        self.store_dir.mkdir(parents=True, exist_ok=True)
+        old = self._existing_generation()
+        self.generation = old + 1
+        self._vectors_path().unlink(missing_ok=True)
+        self._manifest_path().unlink(missing_ok=True)
+        self.dim = dim
+        self.encoder = encoder
+        self.fingerprint = encoder_fingerprint({"dim": dim, **encoder})
+        self._write_meta()
+        self._remove_generation(old)
+        self.entries = {}
+        self.rows = 0
+        return self
+
+    def _existing_generation(self) -> int:
+        try:
+            meta = json.loads((self.store_dir / STORE_FILE).read_text(encoding="utf-8"))
+            return int(meta.get("generation", 0))
+        except (OSError, ValueError):
+            return 0
+
+    def _remove_generation(self, generation: int) -> None:
+        if generation != self.generation:
+            self._vectors_path(generation).unlink(missing_ok=True)
+            self._manifest_path(generation).unlink(missing_ok=True)
+
+    def _write_meta(self) -> None:
+        tmp = self.store_dir / (STORE_FILE + ".tmp")
+        tmp.write_text(
+            json.dumps({"dim": self.dim, "encoder": self.encoder, "fingerprint": self.fingerprint,
+                        "generation": self.generation}, ensure_ascii=False),
+            encoding="utf-8",
+        )
+        tmp.replace(self.store_dir / STORE_FILE)
+
+    # ---------- 조회 ----------
+
+    def is_current(self, case_id: str, text_hash: str) -> bool:
+        entry = self.entries.get(case_id)
+        return entry is not None and entry[0] == text_hash
+
+    def vectors(self) -> np.ndarray:
+        """전체 행 (memmap, 읽기 전용)."""
+        if not self.rows:
+            return np.zeros((0, self.dim), dtype=np.float32)
+        return np.memmap(self._vectors_path(), dtype=np.float32, mode="r",
+                         shape=(self.rows, self.dim))
+
+    def rows_for(self, case_ids: Iterable[str]) -> np.ndarray:
+        return np.fromiter((self.entries[cid][1] for cid in case_ids), dtype=np.int64)
+
+    # ---------- 쓰기 ----------
+
+    def append(self, items: Sequence[Tuple[str, str]], vectors: np.ndarray) -> None:
+        """
+        배치 추가. items = [(case_id, hash)], vectors = (len(items), dim).
+        벡터 → fsync → manifest 순서로 기록한다.
+        """
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        if vectors.shape != (len(items), self.dim):
+            raise ValueError(f"vector shape {vectors.shape} != ({len(items)}, {self.dim})")
+        if not items:
+            return
+
+        start = self.rows
+        with open(self._vectors_path(), "ab") as f:
+            f.write(vectors.tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+
+        lines = [
+            json.dumps({"id": cid, "hash": h, "row": start + i}, ensure_ascii=False)
+            for i, (cid, h) in enumerate(items)
+        ]
+        with open(self._manifest_path(), "a", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+        for i, (cid, h) in enumerate(items):
+            self.entries[cid] = (h, start + i)
+        self.rows = start + len(items)
+
+    def garbage_ratio(self, live_ids: Optional[Iterable[str]] = None) -> float:
+        """덮어써졌거나 삭제된 행 비율."""
+        live = len(self.entries) if live_ids is None else sum(1 for cid in live_ids if cid in self.entries)
+        return 0.0 if not self.rows else 1.0 - live / self.rows
+
+    def compact(self, live_ids: Iterable[str]) -> None:
+        """live_ids 의 최신 행만 남기고 파일을 다시 쓴다."""
+        live = [cid for cid in live_ids if cid in self.entries]
+        vectors = np.asarray(self.vectors()[self.rows_for(live)]) if live else np.zeros((0, self.dim), np.float32)
+        items: List[Tuple[str, str]] = [(cid, self.entries[cid][0]) for cid in live]
+
+        old = self.generation
+        new = old + 1
+        with open(self._vectors_path(new), "wb") as f:
+            f.write(np.ascontiguousarray(vectors, dtype=np.float32).tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+        with open(self._manifest_path(new), "w", encoding="utf-8") as f:
+            for i, (cid, h) in enumerate(items):
+                f.write(json.dumps({"id": cid, "hash": h, "row": i}, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+        # store.json 교체가 전환 시점 — 그 전에 죽으면 이전 generation 이 그대로 유효
+        self.generation = new
+        self._write_meta()
+        self._remove_generation(old)
+
+        self.entries = {cid: (h, i) for i, (cid, h) in enumerate(items)}
+        self.rows = len(items)
@@ -0,0 +1,132 @@
+"""
+처방명/진단명 조회 색인 — 부분 일치 질의를 케이스 순회 없이 이름 집합으로 해석.
+
+statistics(/formula, /effectiveness) 와 formula_recommendation(/by-diagnosis) 는
+`query in name` 판정을 케이스마다 반복했다. 이름 어휘는 케이스 수보다 훨씬 작으므로
+어휘에 대해서만 색인을 만들고, 해석된 이름 → 케이스 위치는 스냅샷의
+by_formula / by_diagnosis 포스팅을 그대로 쓴다.
+
+- containing(q): `q in name` — 소문자 이름의 문자 n-gram 색인. 처방명은 정규화
+  이름(한자 별칭 → 한글, 공백 제거)도 함께 색인하고 질의도 같은 방식으로 정규화해
+  두 형태 중 하나라도 맞으면 일치로 본다.
+- contained_in(q): `name in q` — 질의의 부분 문자열을 소문자 이름 map 에서 찾는다
+  (질의 길이 × 최대 이름 길이 회 조회).
+"""
+
+from __future__ import annotations
+
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from .case_corpus import CorpusSnapshot, register_derived
+from .text_index import NgramIndex
+
+# 처방 한자 → 한글 (GroundingService._aliases 와 같은 방식의 이름 단위 매핑)
+FORMULA_ALIASES = {
+    "理中湯": "이중탕", "補中益氣湯": "보중익기탕", "六君子湯": "육군자탕",
+    "四君子湯": "사군자탕", "四物湯": "사물탕", "八物湯": "팔물탕",
+    "十全大補湯": "십전대보탕", "歸脾湯": "귀비탕", "六味地黃湯": "육미지황탕",
+    "八味地黃湯": "팔미지황탕", "左歸飮": "좌귀음", "右歸飮": "우귀음",
+    "逍遙散": "소요산", "柴胡疏肝湯": "시호소간탕", "血府逐瘀湯": "혈부축어탕",
+    "桃核承氣湯": "도핵승기탕", "葛根湯": "갈근탕", "麻黃湯": "마황탕",
+    "桂枝湯": "계지탕", "半夏厚朴湯": "반하후박탕", "五苓散": "오령산",
+    "平胃散": "평위산", "二陳湯": "이진탕", "小柴胡湯": "소시호탕",
+    "大柴胡湯": "대시호탕", "半夏瀉心湯": "반하사심탕", "平陳湯": "평진탕",
+    "防風通聖散": "방풍통성산", "香砂六君子湯": "향사육군자탕",
+}
+
+
+def normalize_name(name: str, aliases: Optional[Dict[str, str]] = None) -> str:
+    """소문자 + 공백 제거 + 한자 별칭 부분 치환(긴 것부터)."""
+    n = "".join(str(name).split()).lower()
+    if aliases:
+        for hanja in sorted(aliases, key=len, reverse=True):
+            if hanja in n:
+                n = n.replace(hanja, aliases[hanja])
+    return n
+
+
+class NameIndex:
+    """이름 어휘(처방명/진단명) 부분 일치 색인. 결과는 names 의 순서를 따른다."""
+
+    def __init__(self, names: Iterable[str], aliases: Optional[Dict[str, str]] = None, n: int = 2) -> None:
+        self.names: List[str] = list(names)
+        self.aliases = aliases
+        self._grams = NgramIndex(n)
+        self._by_lower: Dict[str, List[int]] = {}
+        self._max_len = 0
+        for i, name in enumerate(self.names):
+            lower = name.lower()
+            terms = {lower, normalize_name(name, aliases)} if aliases is not None else lower
+            self._grams.add(i, terms)
+            self._by_lower.setdefault(lower, []).append(i)
+            self._max_len = max(self._max_len, len(lower))
+        self._grams.freeze()
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def _pick(self, mask: np.ndarray) -> List[str]:
+        names = self.names
+        return [names[i] for i in np.flatnonzero(mask).tolist()]
+
+    def containing(self, query: str) -> List[str]:
+        """`query in name` 인 이름 (한자/공백 차이는 정규화 후 비교)."""
+        mask = np.zeros(len(self.names), dtype=bool)
+        self._grams.mark(query.lower(), mask)
+        if self.aliases is not None:
+            normalized = normalize_name(query, self.aliases)
+            if normalized and normalized != query.lower():
+                self._grams.mark(normalized, mask)
+        return self._pick(mask)
+
+    def contained_in(self, query: str) -> List[str]:
+        """`name.lower() in query.lower()` 인 이름."""
+        q = query.lower()
+        mask = np.zeros(len(self.names), dtype=bool)
+        by_lower = self._by_lower
+        for start in range(len(q)):
+            for end in range(start + 1, min(len(q), start + self._max_len) + 1):
+                ids = by_lower.get(q[start:end])
+                if ids is not None:
+                    mask[ids] = True
+        return self._pick(mask)
+
+
+def _extend_names(old: NameIndex, keys: Dict[str, list], aliases: Optional[Dict[str, str]]) -> NameIndex:
+    """by_* 키는 추가만 되므로 새 이름이 없으면 기존 색인 재사용."""
+    if len(keys) == len(old):
+        return old
+    return NameIndex(keys, aliases)
+
+
+FORMULA_INDEX_NAME = 'formula_names'
+DIAGNOSIS_INDEX_NAME = 'diagnosis_names'
+register_derived(
+    FORMULA_INDEX_NAME,
+    lambda snap: NameIndex(snap.by_formula, FORMULA_ALIASES),
+    extend=lambda old, snap, start: _extend_names(old, snap.by_formula, FORMULA_ALIASES),
+)
+register_derived(
+    DIAGNOSIS_INDEX_NAME,
+    lambda snap: NameIndex(snap.by_diagnosis),
+    extend=lambda old, snap, start: _extend_names(old, snap.by_diagnosis, None),
+)
+
+
+def get_formula_index(snap: CorpusSnapshot) -> NameIndex:
+    """스냅샷의 처방명 색인 (이름 순서 = by_formula 첫 등장 순)."""
+    return snap.derived(FORMULA_INDEX_NAME)
+
+
+def get_diagnosis_index(snap: CorpusSnapshot) -> NameIndex:
+    """스냅샷의 진단명 색인."""
+    return snap.derived(DIAGNOSIS_INDEX_NAME)
+
+
+def case_ids_for(postings: Dict[str, list], names: Iterable[str]) -> List[int]:
+    """이름들의 케이스 위치 합집합 (코퍼스 순서)."""
+    ids = [i for name in names for i in postings.get(name, ())]
+    ids.sort()
+    return ids
@@ -0,0 +1,153 @@
+"""
+증상/체질/진단별 처방 순위표 — /formula-recommend/by-* 용.
+
+코퍼스 스냅샷마다 한 번:
+- 모든 체질
+- 케이스 빈도 상위 N 개 증상 (소문자 어휘)
+- 케이스 빈도 상위 N 개 진단명
+의 처방 순위표를 미리 만든다. 그 밖의 질의(롱테일)는 계산 후 LRU 에 넣는다.
+
+LRU 는 순위표 객체(= 스냅샷의 파생 인덱스)에 붙어 있으므로, 코퍼스가 교체되면
+(리로드/승인 append — 스냅샷 버전이 바뀜) 캐시도 함께 버려진다.
+
+순위는 Counter.most_common 과 같다: 건수 내림차순, 같은 건수는 일치 케이스 중
+처음 나온 순서.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Dict, Hashable, List, Tuple
+
+import numpy as np
+
+from .case_corpus import CorpusSnapshot, register_derived
+from .formula_index import case_ids_for, get_diagnosis_index
+from .formula_recommender import FormulaRecommendIndex, get_recommend_index
+
+TOP_SYMPTOMS = int(os.getenv("FORMULA_LEADERBOARD_TOP_SYMPTOMS", "200"))
+TOP_DIAGNOSES = int(os.getenv("FORMULA_LEADERBOARD_TOP_DIAGNOSES", "200"))
+CACHE_SIZE = int(os.getenv("FORMULA_LEADERBOARD_CACHE_SIZE", "1024"))
+
+
+@dataclass(frozen=True)
+class Leaderboard:
+    """처방 순위표 (전체 순위 — 응답 시 top_k 만 자른다)."""
+
+    formulas: List[Tuple[str, int]]
+    total: int
+
+    def top(self, k: int) -> List[Dict]:
+        return [{"formula": f, "count": c} for f, c in self.formulas[:k]]
+
+
+class FormulaLeaderboards:
+    """스냅샷 하나의 by-symptom / by-constitution / by-diagnosis 순위표 + 롱테일 LRU."""
+
+    def __init__(
+        self,
+        snap: CorpusSnapshot,
+        recommend: FormulaRecommendIndex,
+        top_symptoms: int = TOP_SYMPTOMS,
+        top_diagnoses: int = TOP_DIAGNOSES,
+        cache_size: int = CACHE_SIZE,
+    ) -> None:
+        self.snap = snap
+        self.recommend = recommend
+        self.cache_size = cache_size
+        self._cache: OrderedDict[Hashable, Leaderboard] = OrderedDict()
+        self._lock = threading.Lock()
+
+        self._constitutions = {c: self._compute_constitution(c) for c in snap.by_constitution}
+
+        symptoms = recommend.symptoms
+        by_freq = sorted(range(len(symptoms)), key=lambda t: -len(symptoms.term_docs(t)))
+        self._symptoms = {
+            symptoms.term(t): self._compute_symptom(symptoms.term(t)) for t in by_freq[:top_symptoms]
+        }
+
+        self._diagnoses: Dict[str, Leaderboard] = {}
+        for name in sorted(snap.by_diagnosis, key=lambda d: -len(snap.by_diagnosis[d]))[:top_diagnoses]:
+            key = name.lower()
+            if key not in self._diagnoses:
+                self._diagnoses[key] = self._compute_diagnosis(key)
+
+    # ---------- 계산 ----------
+
+    def _rank(self, rows: np.ndarray) -> Leaderboard:
+        """케이스 위치(오름차순) → 처방 순위표."""
+        codes = self.recommend.formula_code[rows]
+        valid = codes >= 0
+        rows, codes = rows[valid], codes[valid]
+        if not len(codes):
+            return Leaderboard([], 0)
+        size = len(self.recommend.formulas)
+        counts = np.bincount(codes, minlength=size)
+        first = np.full(size, len(self.recommend), dtype=np.int64)
+        np.minimum.at(first, codes, rows)
+        present = np.flatnonzero(counts)
+        order = present[np.lexsort((first[present], -counts[present]))]
+        names = self.recommend.formulas
+        return Leaderboard([(names[c], int(counts[c])) for c in order.tolist()], int(len(codes)))
+
+    def _compute_symptom(self, symptom_lower: str) -> Leaderboard:
+        return self._rank(np.flatnonzero(self.recommend.symptom_mask(symptom_lower)))
+
+    def _compute_constitution(self, constitution: str) -> Leaderboard:
+        return self._rank(np.asarray(self.snap.by_constitution.get(constitution, ()), dtype=np.int64))
+
+    def _compute_diagnosis(self, diagnosis_lower: str) -> Leaderboard:
+        index = get_diagnosis_index(self.snap)
+        names = set(index.containing(diagnosis_lower)) | set(index.contained_in(diagnosis_lower))
+        return self._rank(np.asarray(case_ids_for(self.snap.by_diagnosis, names), dtype=np.int64))
+
+    def _cached(self, key: Hashable, compute: Callable[[], Leaderboard]) -> Leaderboard:
+        with self._lock:
+            board = self._cache.get(key)
+            if board is not None:
+                self._cache.move_to_end(key)
+                return board
+        board = compute()
+        with self._lock:
+            self._cache[key] = board
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return board
+
+    # ---------- 조회 ----------
+
+    def by_symptom(self, symptom: str) -> Leaderboard:
+        key = symptom.lower()
+        board = self._symptoms.get(key)
+        if board is None:
+            board = self._cached(('symptom', key), lambda: self._compute_symptom(key))
+        return board
+
+    def by_constitution(self, constitution: str) -> Leaderboard:
+        board = self._constitutions.get(constitution)
+        # 코퍼스에 없는 체질은 빈 순위표 (캐시할 필요 없음)
+        return board if board is not None else Leaderboard([], 0)
+
+    def by_diagnosis(self, diagnosis: str) -> Leaderboard:
+        key = diagnosis.lower()
+        board = self._diagnoses.get(key)
+        if board is None:
+            board = self._cached(('diagnosis', key), lambda: self._compute_diagnosis(key))
+        return board
+
+
+LEADERBOARD_NAME = 'formula_leaderboards'
+register_derived(
+    LEADERBOARD_NAME,
+    lambda snap: FormulaLeaderboards(snap, get_recommend_index(snap)),
+)
+
+
+def get_formula_leaderboards(snap: CorpusSnapshot) -> FormulaLeaderboards:
+    """스냅샷의 처방 순위표."""
+    return snap.derived(LEADERBOARD_NAME)
+
@@ -0,0 +1,296 @@
+"""
+치험례 전문(full text) 색인 — GET /cases/list 검색·필터용.
+
+기존 /list 는 페이지 요청마다 모든 케이스의 주소증·처방명·진단·변증·제목·원문
+(최대 2천 자)을 소문자화해 `q in text` 로 걸렀다. 여기서는 코퍼스 로드 시 한 번:
+
+- 문서별 필드 문자의 1-gram / 2-gram 을 코드포인트 정수 키로 만들어
+  키 → 정렬된 doc_id 포스팅(CSR, numpy)을 만든다. 필드 경계를 넘는 gram 은 만들지 않는다.
+
+검색 (`q in field` 를 그대로 보존):
+- 길이 1: 1-gram 포스팅이 곧 정답
+- 길이 2: 2-gram 포스팅이 곧 정답
+- 길이 ≥ 3: 질의 2-gram 포스팅 교집합(짧은 것부터) 후 후보 문서만 원문 검증
+
+승인으로 케이스가 뒤에 붙으면 새 문서의 gram 포스팅만 만들어 기존 CSR 에 끼워 넣는다 (extend).
+
+NgramIndex(text_index.py)는 같은 문자열을 term 하나로 합치는 어휘 색인이라
+문서마다 다른 긴 원문에는 맞지 않아 별도로 둔다.
+"""
+
+from __future__ import annotations
+
+import copy
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .case_corpus import CorpusSnapshot, register_derived
+
+EMPTY = np.empty(0, dtype=np.uint32)
+_SHIFT = 21  # 유니코드 코드포인트 최대 0x10FFFF < 2**21
+_CHUNK_BITS = 11
+_CHUNK = 1 << _CHUNK_BITS
+
+
+def _codepoints(text: str) -> np.ndarray:
+    return np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32).astype(np.int64)
+
+
+def _bigrams(cps: np.ndarray) -> np.ndarray:
+    return (cps[:-1] << _SHIFT) | cps[1:]
+
+
+def _sorted_unique(values: np.ndarray) -> np.ndarray:
+    """정렬 + 인접 중복 제거 (np.unique 의 해시 경로보다 이 규모에서 훨씬 빠르다)."""
+    values = np.sort(values)
+    if len(values):
+        values = values[np.r_[True, values[1:] != values[:-1]]]
+    return values
+
+
+class _Postings:
+    """정수 키 → 정렬된 doc_id (CSR)."""
+
+    def __init__(self, keys: List[np.ndarray], docs: List[np.ndarray]) -> None:
+        if keys:
+            all_keys = np.concatenate(keys)
+            all_docs = np.concatenate(docs)
+        else:
+            all_keys = np.empty(0, dtype=np.int64)
+            all_docs = EMPTY
+        # 묶음은 문서 순서, 묶음 안은 (키, 문서) 정렬이므로 안정 정렬이면 키 안의 doc_id 도 오름차순
+        order = np.argsort(all_keys, kind="stable")
+        all_keys = all_keys[order]
+        self.docs = all_docs[order]
+        starts = np.flatnonzero(np.r_[True, all_keys[1:] != all_keys[:-1]]) if len(all_keys) else \
+            np.empty(0, dtype=np.int64)
+        self.keys = all_keys[starts]
+        self.offsets = np.r_[starts, len(all_keys)].astype(np.int64)
+
+    def append(self, other: "_Postings") -> "_Postings":
+        """
+        other 의 doc_id 가 모두 self 보다 큰 두 포스팅을 합친 새 _Postings (self 는 그대로).
+        키마다 기존 구간 끝에 새 doc 을 끼워 넣는다 — 전체를 다시 정렬하지 않는다.
+        """
+        if not len(other.keys):
+            return self
+        merged = copy.copy(self)
+        old_lengths = np.diff(self.offsets)
+        new_lengths = np.diff(other.offsets)
+        # 기존 docs 에서 각 새 키 구간이 들어갈 위치: 있는 키면 그 구간 끝, 없는 키면 들어갈 자리
+        at = np.searchsorted(self.keys, other.keys)
+        found = at < len(self.keys)
+        found[found] = self.keys[at[found]] == other.keys[found]
+        insert_at = self.offsets[at + found]
+        merged.docs = np.insert(self.docs, np.repeat(insert_at, new_lengths), other.docs)
+
+        merged.keys = np.union1d(self.keys, other.keys)
+        lengths = np.zeros(len(merged.keys), dtype=np.int64)
+        lengths[np.searchsorted(merged.keys, self.keys)] += old_lengths
+        lengths[np.searchsorted(merged.keys, other.keys)] += new_lengths
+        merged.offsets = np.r_[0, np.cumsum(lengths)].astype(np.int64)
+        return merged
+
+    def get(self, key: int) -> np.ndarray:
+        i = int(np.searchsorted(self.keys, key))
+        if i >= len(self.keys) or self.keys[i] != key:
+            return EMPTY
+        return self.docs[self.offsets[i]:self.offsets[i + 1]]
+
+
+def _gram_postings(
+    start: int, size: int, fields: Callable[[int], Sequence[str]], lower: bool,
+) -> Tuple[_Postings, _Postings]:
+    """doc_id start ~ size-1 의 1-gram / 2-gram 포스팅"""
+    uni_keys, uni_docs, bi_keys, bi_docs = [], [], [], []
+    # 문서 묶음 단위로 한 번에 코드포인트화: 필드/문서 사이는 NUL 로 잇고 NUL 이 낀 gram 은 버린다
+    for chunk in range(start, size, _CHUNK):
+        docs = range(chunk, min(size, chunk + _CHUNK))
+        texts = ["\0".join(fields(i)) + "\0" for i in docs]
+        if lower:
+            # 소문자화로 길이가 바뀌는 문자(İ 등)가 있어도 문서 경계가 맞도록 문서별로
+            texts = [t.lower() for t in texts]
+        cps = _codepoints("".join(texts))
+        local = np.repeat(np.arange(len(texts), dtype=np.int64), [len(t) for t in texts])
+        valid = cps != 0
+        pair = valid[:-1] & valid[1:]
+        for keys, owner, out_keys, out_docs in (
+            (cps[valid], local[valid], uni_keys, uni_docs),
+            (_bigrams(cps)[pair], local[:-1][pair], bi_keys, bi_docs),
+        ):
+            # (키, 문서) 쌍 중복 제거 — 키 < 2**42, 묶음 안 문서 < 2**11
+            packed = _sorted_unique((keys << _CHUNK_BITS) | owner)
+            out_keys.append(packed >> _CHUNK_BITS)
+            out_docs.append(((packed & (_CHUNK - 1)) + chunk).astype(np.uint32))
+    return _Postings(uni_keys, uni_docs), _Postings(bi_keys, bi_docs)
+
+
+class FullTextIndex:
+    """문서(필드 묶음) 부분 문자열 색인. doc_id = 입력 순서."""
+
+    def __init__(
+        self,
+        size: int,
+        unigrams: _Postings,
+        bigrams: _Postings,
+        fields: Callable[[int], Sequence[str]],
+        lower: bool,
+    ) -> None:
+        self.size = size
+        self.unigrams = unigrams
+        self.bigrams = bigrams
+        self.fields = fields
+        self.lower = lower
+
+    @classmethod
+    def build(
+        cls,
+        size: int,
+        fields: Callable[[int], Sequence[str]],
+        lower: bool = True,
+    ) -> "FullTextIndex":
+        """
+        Args:
+            size: 문서 수
+            fields: doc_id → 검색 대상 필드 문자열들 (검증 때도 다시 호출)
+            lower: 소문자 기준으로 색인/비교 (`q.lower() in field.lower()`)
+        """
+        unigrams, bigrams = _gram_postings(0, size, fields, lower)
+        return cls(size, unigrams, bigrams, fields, lower)
+
+    def extend(self, size: int, fields: Callable[[int], Sequence[str]]) -> "FullTextIndex":
+        """
+        self.size 이후 문서(~size)를 더한 새 색인 (self 는 그대로 — 승인 시 스냅샷 증분 갱신).
+        새 문서의 gram 포스팅만 만들어 기존 포스팅에 이어 붙인다.
+        """
+        unigrams, bigrams = _gram_postings(self.size, size, fields, self.lower)
+        return FullTextIndex(
+            size, self.unigrams.append(unigrams), self.bigrams.append(bigrams), fields, self.lower,
+        )
+
+    def search(self, query: str) -> np.ndarray:
+        """`query in field` 인 필드가 하나라도 있는 doc_id (오름차순)."""
+        q = query.lower() if self.lower else query
+        if not q:
+            return np.arange(self.size, dtype=np.uint32)
+        cps = _codepoints(q)
+        if len(cps) == 1:
+            return self.unigrams.get(int(cps[0]))
+
+        lists = [self.bigrams.get(int(k)) for k in np.unique(_bigrams(cps)).tolist()]
+        lists.sort(key=len)
+        cands = lists[0]
+        for p in lists[1:]:
+            if not len(cands):
+                break
+            cands = np.intersect1d(cands, p, assume_unique=True)
+        if len(cps) == 2 or not len(cands):
+            return cands
+
+        lower = self.lower
+        fields = self.fields
+        keep = [
+            doc for doc in cands.tolist()
+            if any(q in (text.lower() if lower else text) for text in fields(doc) if text)
+        ]
+        return np.asarray(keep, dtype=np.uint32)
+
+
+# ---------- /cases/list ----------
+
+LIST_SEARCH_FIELDS = ("chief_complaint", "formula_name", "diagnosis", "differentiation", "title", "full_text")
+LIST_CACHE_SIZE = int(os.getenv("CASE_LIST_CACHE_SIZE", "256"))
+
+
+def _text_fields(cases: Sequence) -> Callable[[int], Sequence[str]]:
+    return lambda i: [cases[i].get(f) or "" for f in LIST_SEARCH_FIELDS]
+
+
+def _result_fields(cases: Sequence) -> Callable[[int], Sequence[str]]:
+    return lambda i: (cases[i].get("result") or "",)
+
+
+class CaseListIndex:
+    """
+    /cases/list 필터 → 정렬된 doc_id.
+    - search: LIST_SEARCH_FIELDS 소문자 부분 일치
+    - constitution: by_constitution 정확 일치
+    - outcome: result 부분 일치 (대소문자 구분 — 기존 동작)
+    같은 필터로 페이지를 넘길 때 다시 계산하지 않도록 결과 id 배열을 LRU 에 둔다
+    (스냅샷별 객체라 코퍼스 교체 시 함께 버려짐).
+    """
+
+    def __init__(
+        self,
+        snap: CorpusSnapshot,
+        cache_size: int = LIST_CACHE_SIZE,
+        text: Optional[FullTextIndex] = None,
+        result: Optional[FullTextIndex] = None,
+    ) -> None:
+        cases = snap.cases
+        self.snap = snap
+        self.text = text or FullTextIndex.build(len(cases), _text_fields(cases))
+        self.result = result or FullTextIndex.build(len(cases), _result_fields(cases), lower=False)
+        self.cache_size = cache_size
+        self._cache: OrderedDict[Tuple, np.ndarray] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def extend(self, snap: CorpusSnapshot) -> "CaseListIndex":
+        """
+        스냅샷 뒤에 붙은 케이스만 색인해 새 스냅샷용 CaseListIndex (승인 시 증분 갱신).
+        필터 결과 LRU 는 새 객체라 비어 있다.
+        """
+        cases = snap.cases
+        return CaseListIndex(
+            snap,
+            self.cache_size,
+            text=self.text.extend(len(cases), _text_fields(cases)),
+            result=self.result.extend(len(cases), _result_fields(cases)),
+        )
+
+    def _compute(self, search: Optional[str], constitution: Optional[str], outcome: Optional[str]) -> np.ndarray:
+        ids: Optional[np.ndarray] = None
+        if constitution:
+            ids = np.asarray(self.snap.by_constitution.get(constitution, ()), dtype=np.uint32)
+        if outcome and (ids is None or len(ids)):
+            found = self.result.search(outcome)
+            ids = found if ids is None else np.intersect1d(ids, found, assume_unique=True)
+        if search and (ids is None or len(ids)):
+            found = self.text.search(search)
+            ids = found if ids is None else np.intersect1d(ids, found, assume_unique=True)
+        if ids is None:
+            ids = np.arange(len(self.snap.cases), dtype=np.uint32)
+        return ids
+
+    def query(
+        self,
+        search: Optional[str] = None,
+        constitution: Optional[str] = None,
+        outcome: Optional[str] = None,
+    ) -> np.ndarray:
+        """필터를 모두 만족하는 doc_id (오름차순 = 파일 순서)."""
+        key = (search or None, constitution or None, outcome or None)
+        with self._lock:
+            ids = self._cache.get(key)
+            if ids is not None:
+                self._cache.move_to_end(key)
+                return ids
+        ids = self._compute(*key)
+        with self._lock:
+            self._cache[key] = ids
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return ids
+
+
+CASE_LIST_NAME = 'case_list'
+register_derived(CASE_LIST_NAME, CaseListIndex, extend=lambda old, snap, start: old.extend(snap))
+
+
+def get_case_list_index(snap: CorpusSnapshot) -> CaseListIndex:
+    """스냅샷의 /cases/list 색인."""
+    return snap.derived(CASE_LIST_NAME)
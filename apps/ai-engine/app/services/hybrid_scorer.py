@@ -4,10 +4,14 @@
 """
 
 from dataclasses import dataclass, field
-from typing import List, Dict, Optional, Literal
+from typing import List, Dict, Optional, Literal, Sequence, Union
 from enum import Enum
 import re
 
+import numpy as np
+
+from .case_features import CaseFeatures, round1
+
 
 class MatchGrade(str, Enum):
     """매칭 등급"""
@@ -38,6 +42,23 @@ class MatchScore:
     reasons: List[MatchReason] = field(default_factory=list)
 
 
+@dataclass
+class BatchScores:
+    """
+    score_batch 결과 (배열 위치 i ↔ ids[i]).
+    각 점수는 calculate_score 의 같은 필드와 값이 동일하다 (round 1자리).
+    """
+    ids: np.ndarray
+    total: np.ndarray
+    vector_similarity: np.ndarray
+    keyword_match: np.ndarray
+    metadata_match: np.ndarray
+    raw_total: np.ndarray  # 반올림 전 (등급 판정용)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+
 # 가중치 설정
 WEIGHTS = {
     "vector": 0.4,      # 벡터 유사도 40%
@@ -157,6 +178,119 @@ class HybridScorer:
             reasons=reasons
         )
 
+    def build_features(self, cases: Sequence[Dict]) -> CaseFeatures:
+        """score_batch 용 케이스 피처 테이블 생성 (코퍼스는 로드 시 한 번)."""
+        return CaseFeatures.build(cases, self.normalize_symptom)
+
+    def score_batch(
+        self,
+        query: Dict,
+        cases: Union[CaseFeatures, Sequence[Dict]],
+        vector_similarity: Union[float, np.ndarray] = 0.5,
+        ids: Optional[np.ndarray] = None,
+    ) -> BatchScores:
+        """
+        여러 케이스의 종합 점수를 한 번에 계산 (calculate_score 와 수치 동일).
+
+        MatchReason 은 만들지 않는다. 최종 top-k 만 calculate_score 로 근거를 만든다.
+
+        Args:
+            query: 검색 쿼리
+            cases: CaseFeatures 또는 케이스 dict 목록 (목록이면 즉석에서 피처 생성)
+            vector_similarity: 벡터 유사도 (0-1), 스칼라 또는 ids 와 같은 길이 배열
+            ids: 점수를 계산할 doc_id (None 이면 전체)
+
+        Returns:
+            BatchScores
+        """
+        features = cases if isinstance(cases, CaseFeatures) else self.build_features(cases)
+        if ids is None:
+            ids = np.arange(features.size, dtype=np.int64)
+        else:
+            ids = np.asarray(ids, dtype=np.int64)
+
+        vector_score = np.broadcast_to(
+            np.asarray(vector_similarity, dtype=np.float64) * 100, ids.shape
+        )
+        keyword_score = self._keyword_scores(query, features, ids)
+        metadata_score = self._metadata_scores(query, features, ids)
+
+        total = (
+            vector_score * WEIGHTS["vector"] +
+            keyword_score * WEIGHTS["keyword"] +
+            metadata_score * WEIGHTS["metadata"]
+        )
+
+        return BatchScores(
+            ids=ids,
+            total=round1(total),
+            vector_similarity=round1(vector_score),
+            keyword_match=round1(keyword_score),
+            metadata_match=round1(metadata_score),
+            raw_total=total,
+        )
+
+    def _keyword_scores(self, query: Dict, features: CaseFeatures, ids: np.ndarray) -> np.ndarray:
+        """_calculate_keyword_score 의 벡터화 버전 (정규화된 0-100 점수)."""
+        score = np.zeros(len(ids), dtype=np.float64)
+
+        # 주소증 매칭: 정확 > 부분(양방향) > 제목 포함
+        query_chief = (query.get('chief_complaint') or '').lower()
+        if query_chief:
+            exact, partial = features.chief_masks(query_chief)
+            in_title = features.contains_mask(features.title, query_chief)
+            has_chief = features.chief_term[ids] >= 0
+            exact = exact[ids]
+            partial = partial[ids]
+            in_title = in_title[ids]
+            score += np.where(
+                has_chief & exact, KEYWORD_SCORES["chief_complaint_exact"],
+                np.where(has_chief & (partial | in_title), KEYWORD_SCORES["chief_complaint_partial"], 0),
+            )
+
+        # 증상 매칭 (질의 증상 하나당, 중복 포함)
+        counts = np.zeros(features.size, dtype=np.int64)
+        for s in query.get('symptoms', []):
+            hit = features.symptom_postings.get(self.normalize_symptom(s).lower())
+            if hit is not None:
+                counts[hit] += 1
+        score += counts[ids] * KEYWORD_SCORES["symptom"]
+
+        # 진단 / 처방명 부분 일치
+        query_diagnosis = (query.get('diagnosis') or '').lower()
+        if query_diagnosis:
+            score += features.contains_mask(features.diagnosis, query_diagnosis)[ids] * KEYWORD_SCORES["diagnosis"]
+        query_formula = (query.get('formula') or '').lower()
+        if query_formula:
+            score += features.contains_mask(features.formula, query_formula)[ids] * KEYWORD_SCORES["formula"]
+
+        return np.minimum(100.0, (score / 50.0) * 100)
+
+    def _metadata_scores(self, query: Dict, features: CaseFeatures, ids: np.ndarray) -> np.ndarray:
+        """_calculate_metadata_score 의 벡터화 버전 (정규화된 0-100 점수)."""
+        score = np.zeros(len(ids), dtype=np.float64)
+
+        query_constitution = query.get('patient_constitution', '') or query.get('constitution', '')
+        if query_constitution:
+            code = features.constitution_vocab.get(query_constitution, -2)
+            score += (features.constitution[ids] == code) * METADATA_SCORES["constitution"]
+
+        query_age = query.get('patient_age') or query.get('age')
+        if query_age:
+            age_diff = np.abs(int(query_age) - features.age[ids])
+            known = features.age_known[ids]
+            score += np.where(
+                known & (age_diff <= 5), METADATA_SCORES["age_exact"],
+                np.where(known & (age_diff <= 15), METADATA_SCORES["age_close"], 0),
+            )
+
+        query_gender = query.get('patient_gender') or query.get('gender')
+        if query_gender:
+            code = features.gender_vocab.get(query_gender, -2)
+            score += (features.gender[ids] == code) * METADATA_SCORES["gender"]
+
+        return np.minimum(100.0, (score / 35.0) * 100)
+
     def _calculate_keyword_score(
         self,
         query: Dict,
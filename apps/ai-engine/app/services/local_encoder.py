@@ -0,0 +1,123 @@
+"""
+로컬 결정적 텍스트 인코더 — 네트워크 없이 치험례/질의 임베딩 생성.
+
+OpenAI 임베딩 대신 feature hashing 을 쓴다:
+- 어절(소문자) + 어절 내부 문자 2/3-gram 을 특징으로 뽑는다
+  (한국어는 조사·어미가 붙어도 2/3-gram 이 겹치므로 형태소 분석 없이도 잘 맞는다)
+- zlib.crc32 로 차원/부호를 정한다 (파이썬 hash() 와 달리 프로세스마다 같다)
+- 1 + log(tf) 가중 후, 선택적으로 오프라인에서 학습한 IDF 를 곱하고 L2 정규화
+
+같은 입력 + 같은 설정(dim, idf)이면 어디서 돌려도 같은 벡터가 나온다.
+"""
+
+from __future__ import annotations
+
+import re
+import zlib
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+DEFAULT_DIM = 512
+# 특징 추출 규칙이 바뀌면 올린다 — 저장된 벡터와 호환되지 않음을 표시
+ENCODER_VERSION = 1
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+# 케이스/질의 텍스트 양쪽에 항상 붙는 라벨 — 유사도에 기여하지 않도록 제외
+_LABELS = frozenset({"제목", "주소증", "증상", "진단", "처방", "결과", "환자"})
+
+
+def case_embedding_text(case: Dict) -> str:
+    """케이스 → 임베딩용 텍스트 (예전 Pinecone 색인과 같은 구성)."""
+    parts = []
+    if case.get('title'):
+        parts.append(f"제목: {case['title']}")
+    if case.get('chief_complaint'):
+        parts.append(f"주소증: {case['chief_complaint']}")
+    symptoms = case.get('symptoms') or []
+    if symptoms:
+        parts.append(f"증상: {', '.join(str(s) for s in symptoms)}")
+    if case.get('diagnosis'):
+        parts.append(f"진단: {case['diagnosis']}")
+    if case.get('treatment_formula'):
+        parts.append(f"처방: {case['treatment_formula']}")
+    if case.get('result'):
+        parts.append(f"결과: {str(case['result'])[:500]}")
+    return '\n'.join(parts)
+
+
+class HashingEncoder:
+    """feature hashing 기반 결정적 인코더."""
+
+    def __init__(self, dim: int = DEFAULT_DIM, idf: Optional[np.ndarray] = None) -> None:
+        if dim < 8:
+            raise ValueError("dim must be >= 8")
+        self.dim = dim
+        self.idf = None if idf is None else np.asarray(idf, dtype=np.float32)
+        if self.idf is not None and self.idf.shape != (dim,):
+            raise ValueError(f"idf shape {self.idf.shape} != ({dim},)")
+        self._feature_cache: Dict[str, tuple[int, float]] = {}
+
+    @staticmethod
+    def features(text: str) -> List[str]:
+        """텍스트 → 특징 문자열 목록 (중복 포함)."""
+        out: List[str] = []
+        for word in _WORD_RE.findall((text or "").lower()):
+            if word in _LABELS:
+                continue
+            out.append("w:" + word)
+            length = len(word)
+            for size in (2, 3):
+                for i in range(length - size + 1):
+                    out.append("g:" + word[i:i + size])
+        return out
+
+    def _slot(self, feature: str) -> tuple[int, float]:
+        """특징 → (차원, 부호). 자주 나오는 특징이 많아 캐시한다."""
+        slot = self._feature_cache.get(feature)
+        if slot is None:
+            h = zlib.crc32(feature.encode("utf-8"))
+            slot = (h % self.dim, 1.0 if (h >> 31) & 1 else -1.0)
+            if len(self._feature_cache) < 1_000_000:
+                self._feature_cache[feature] = slot
+        return slot
+
+    def _raw(self, text: str) -> np.ndarray:
+        tf: Dict[int, float] = {}
+        for feature in self.features(text):
+            d, sign = self._slot(feature)
+            tf[d] = tf.get(d, 0.0) + sign
+        vec = np.zeros(self.dim, dtype=np.float32)
+        if tf:
+            dims = np.fromiter(tf.keys(), dtype=np.int64, count=len(tf))
+            vals = np.fromiter(tf.values(), dtype=np.float32, count=len(tf))
+            # 부호 유지 sublinear tf
+            vec[dims] = np.sign(vals) * (1.0 + np.log(np.maximum(np.abs(vals), 1.0)))
+        return vec
+
+    def encode(self, texts: Sequence[str]) -> np.ndarray:
+        """텍스트 목록 → (n, dim) float32, 행별 L2 정규화."""
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for i, text in enumerate(texts):
+            out[i] = self._raw(text)
+        if self.idf is not None:
+            out *= self.idf
+        norms = np.linalg.norm(out, axis=1, keepdims=True)
+        np.divide(out, norms, out=out, where=norms > 0)
+        return out
+
+    def encode_one(self, text: str) -> np.ndarray:
+        return self.encode([text])[0]
+
+    def fit_idf(self, texts: Iterable[str]) -> np.ndarray:
+        """차원별 문서 빈도로 IDF 학습 (오프라인 인덱스 빌드 시 1회)."""
+        df = np.zeros(self.dim, dtype=np.float64)
+        n = 0
+        for text in texts:
+            dims = {self._slot(f)[0] for f in self.features(text)}
+            if dims:
+                df[np.fromiter(dims, dtype=np.int64, count=len(dims))] += 1
+            n += 1
+        self.idf = np.log((1.0 + n) / (1.0 + df)).astype(np.float32) + 1.0
+        return self.idf
@@ -0,0 +1,437 @@
+"""
+추가 전용(append-only) JSONL 세그먼트 로그 — 전체 파일 재작성 없는 영속 저장.
+
+기존 수집기 저장소는 변경마다 JSON 파일 전체를 읽고, 리스트를 고치고, indent=2 로
+통째로 다시 썼다(승인 1건에 통합 코퍼스 전체 재작성). 여기서는:
+
+- 디렉터리 안의 `seg-000001.jsonl` … 세그먼트에 레코드를 한 줄씩 덧붙인다.
+  마지막 세그먼트가 SEGMENT_BYTES 를 넘으면 다음 세그먼트로 넘어간다.
+- keyed 로그: {"k": key, "v": value, "s": seq} = put, {"k": key, "d": 1} = delete.
+  메모리에는 key → (세그먼트, 오프셋, 길이) 색인만 두고 값은 읽을 때 pread 로 가져온다.
+  seq 는 키가 처음 들어올 때 매기는 순서 번호로, 덮어써도 압축해도 유지된다
+  → page(after=seq) 커서 페이지가 재시작/압축 후에도 같은 위치를 가리킨다.
+- 키 없는 로그(수집 로그 등): {"v": value} 를 순서대로 쌓는다.
+- 쓰기는 매번 flush(다른 프로세스에 바로 보임)하고 fsync 는 묶어서 한다:
+  FSYNC_BATCH 건이 쌓이거나 FSYNC_INTERVAL 초가 지나면(타이머 포함) 한 번.
+  fsync_interval=0 이면 쓰기마다 fsync.
+- compact(): 살아 있는 레코드만 체크포인트 세그먼트로 옮기고 이전 세그먼트를 지운다.
+- 프로세스가 쓰는 도중 죽어 마지막 줄이 잘렸으면 열 때 그 줄을 잘라낸다.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import threading
+import time
+from bisect import bisect_right, insort
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from ..core.logger import get_logger
+
+logger = get_logger("segment_log")
+
+SEGMENT_BYTES = int(os.getenv("SEGMENT_LOG_SEGMENT_BYTES", str(16 * 1024 * 1024)))
+FSYNC_INTERVAL = float(os.getenv("SEGMENT_LOG_FSYNC_INTERVAL", "1.0"))
+FSYNC_BATCH = int(os.getenv("SEGMENT_LOG_FSYNC_BATCH", "256"))
+
+_SEGMENT_RE = re.compile(r"^seg-(\d{6,})\.jsonl$")
+
+# (세그먼트 번호, 오프셋, 길이)
+Location = Tuple[int, int, int]
+
+
+def _dumps(record: Dict[str, Any]) -> bytes:
+    return (json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
+
+
+def list_segments(directory: Path) -> List[int]:
+    """디렉터리의 세그먼트 번호 (오름차순)."""
+    try:
+        names = os.listdir(directory)
+    except FileNotFoundError:
+        return []
+    return sorted(int(m.group(1)) for m in map(_SEGMENT_RE.match, names) if m)
+
+
+def log_state(directory: Path) -> Tuple[Tuple[int, int], ...]:
+    """(세그먼트 번호, 크기) 목록 — 다른 프로세스의 변경 감지용."""
+    state = []
+    for seg in list_segments(directory):
+        try:
+            state.append((seg, (Path(directory) / f"seg-{seg:06d}.jsonl").stat().st_size))
+        except FileNotFoundError:
+            continue
+    return tuple(state)
+
+
+class SegmentLog:
+    """JSONL 세그먼트 로그 + 메모리 색인. 스레드 안전."""
+
+    kind = "log"
+
+    def __init__(
+        self,
+        directory: Path,
+        keyed: bool = True,
+        segment_bytes: int = SEGMENT_BYTES,
+        fsync_interval: float = FSYNC_INTERVAL,
+        fsync_batch: int = FSYNC_BATCH,
+    ) -> None:
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.keyed = keyed
+        self.segment_bytes = segment_bytes
+        self.fsync_interval = fsync_interval
+        self.fsync_batch = fsync_batch
+
+        self._lock = threading.RLock()
+        self._index: Dict[Any, Location] = {}
+        self._entries: List[Location] = []
+        self._readers: Dict[int, int] = {}
+        self._writer = None
+        self._segment = 0
+        self._size = 0
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        self._timer: Optional[threading.Timer] = None
+        # 파일에는 있지만 더 이상 살아 있지 않은 레코드 수 (압축 시점 판단용)
+        self.garbage = 0
+        # 순서 색인 (keyed): key ↔ seq, 오름차순 seq 목록 (지운 seq 는 나중에 한꺼번에 정리)
+        self._seq_of: Dict[Any, int] = {}
+        self._by_seq: Dict[int, Any] = {}
+        self._order: List[int] = []
+        self._next_seq = 1
+        self._replay()
+
+    # ---------- 경로 / 재생 ----------
+
+    def _path(self, seg: int) -> Path:
+        return self.directory / f"seg-{seg:06d}.jsonl"
+
+    def _replay(self) -> None:
+        # 압축 도중 죽고 남은 임시 파일 (rename 전이라 반영되지 않은 것)
+        for tmp in self.directory.glob("seg-*.tmp"):
+            tmp.unlink()
+        segments = list_segments(self.directory)
+        for n, seg in enumerate(segments):
+            path = self._path(seg)
+            offset = 0
+            with open(path, "rb") as f:
+                for line in f:
+                    try:
+                        if not line.endswith(b"\n"):
+                            raise ValueError("torn record")
+                        record = json.loads(line)
+                    except ValueError:
+                        if n == len(segments) - 1:
+                            # 마지막 쓰기 도중 중단 — 잘린 꼬리를 버린다
+                            logger.warning("truncating torn record in %s at %d", path.name, offset)
+                            os.truncate(path, offset)
+                            break
+                        raise
+                    if record.get("c"):
+                        # 압축 체크포인트 — 이전 세그먼트 내용은 이 세그먼트에 모두 들어 있다
+                        self._index, self._entries = {}, []
+                        self._seq_of, self._by_seq, self._order = {}, {}, []
+                        self.garbage = 0
+                    else:
+                        self._apply(record, (seg, offset, len(line)))
+                    offset += len(line)
+        self._segment = segments[-1] if segments else 1
+        self._size = self._path(self._segment).stat().st_size if segments else 0
+
+    def _apply(self, record: Dict[str, Any], loc: Location) -> None:
+        if not self.keyed:
+            self._entries.append(loc)
+        elif record.get("d"):
+            if self._index.pop(record["k"], None) is not None:
+                self.garbage += 2
+                self._forget(record["k"])
+        else:
+            key = record["k"]
+            if key in self._index:
+                self.garbage += 1
+            else:
+                # "s" 없는 레코드는 이전 형식 — 재생 순서대로 번호를 매긴다
+                seq = record.get("s") or self._next_seq
+                self._seq_of[key] = seq
+                self._by_seq[seq] = key
+                if self._order and seq < self._order[-1]:
+                    insort(self._order, seq)
+                else:
+                    self._order.append(seq)
+                self._next_seq = max(self._next_seq, seq + 1)
+            self._index[key] = loc
+
+    def _forget(self, key: Any) -> None:
+        seq = self._seq_of.pop(key, None)
+        if seq is not None:
+            del self._by_seq[seq]
+        if len(self._order) > 2 * len(self._by_seq) + 64:
+            self._order = [s for s in self._order if s in self._by_seq]
+
+    # ---------- 쓰기 ----------
+
+    def _write(self, records: List[Dict[str, Any]]) -> None:
+        for record in records:
+            if self.keyed and not record.get("d"):
+                record["s"] = self._seq_of.get(record["k"], self._next_seq)
+            data = _dumps(record)
+            if self._size and self._size + len(data) > self.segment_bytes:
+                self._rotate()
+            if self._writer is None:
+                self._writer = open(self._path(self._segment), "ab")
+            self._writer.write(data)
+            self._apply(record, (self._segment, self._size, len(data)))
+            self._size += len(data)
+        if self._writer is not None:
+            self._writer.flush()
+        self._unsynced += len(records)
+        self._maybe_sync()
+
+    def _rotate(self) -> None:
+        """현재 세그먼트를 닫고 다음 번호로 넘어간다."""
+        if self._writer is not None:
+            self._writer.flush()
+            os.fsync(self._writer.fileno())
+            self._writer.close()
+            self._writer = None
+        self._segment += 1
+        self._size = 0
+
+    def _maybe_sync(self) -> None:
+        if not self._unsynced:
+            return
+        if (
+            self.fsync_interval <= 0
+            or self._unsynced >= self.fsync_batch
+            or time.monotonic() - self._last_sync >= self.fsync_interval
+        ):
+            self._sync_locked()
+        elif self._timer is None:
+            self._timer = threading.Timer(self.fsync_interval, self.sync)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _sync_locked(self) -> None:
+        if self._writer is not None and self._unsynced:
+            os.fsync(self._writer.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def sync(self) -> None:
+        """쌓인 쓰기를 디스크에 fsync."""
+        with self._lock:
+            self._timer = None
+            self._sync_locked()
+
+    def put_many(self, items: Iterable[Tuple[Any, Any]]) -> None:
+        with self._lock:
+            self._write([{"k": key, "v": value} for key, value in items])
+
+    def put(self, key: Any, value: Any) -> None:
+        self.put_many([(key, value)])
+
+    def delete_many(self, keys: Iterable[Any]) -> int:
+        """있는 키만 지운다. 지운 수 반환."""
+        with self._lock:
+            records = [{"k": key, "d": 1} for key in dict.fromkeys(keys) if key in self._index]
+            if records:
+                self._write(records)
+            return len(records)
+
+    def delete(self, key: Any) -> bool:
+        return self.delete_many([key]) == 1
+
+    def append_many(self, values: Iterable[Any]) -> None:
+        with self._lock:
+            self._write([{"v": value} for value in values])
+
+    def append(self, value: Any) -> None:
+        self.append_many([value])
+
+    # ---------- 읽기 ----------
+
+    def _read(self, loc: Location) -> Any:
+        seg, offset, length = loc
+        fd = self._readers.get(seg)
+        if fd is None:
+            fd = self._readers[seg] = os.open(self._path(seg), os.O_RDONLY)
+        return json.loads(os.pread(fd, length, offset))["v"]
+
+    def __len__(self) -> int:
+        return len(self._index) if self.keyed else len(self._entries)
+
+    def __contains__(self, key: Any) -> bool:
+        return key in self._index
+
+    def keys(self) -> List[Any]:
+        with self._lock:
+            return list(self._index)
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        with self._lock:
+            loc = self._index.get(key)
+            return default if loc is None else self._read(loc)
+
+    def values(self, start: int = 0, stop: Optional[int] = None) -> List[Any]:
+        """현재 값 (삽입 순서). start/stop 으로 일부만 읽을 수 있다."""
+        with self._lock:
+            locs = list(self._index.values()) if self.keyed else self._entries
+            return [self._read(loc) for loc in locs[start:stop]]
+
+    def items(self) -> Iterator[Tuple[Any, Any]]:
+        with self._lock:
+            return iter([(key, self._read(loc)) for key, loc in self._index.items()])
+
+    def page(self, after: Optional[int] = None, limit: int = 50) -> List[Tuple[int, Any]]:
+        """
+        seq 가 after 보다 큰 값 limit 개 (삽입 순서) — 커서 페이지.
+
+        Returns:
+            [(seq, value)] — 다음 페이지 커서는 마지막 seq
+        """
+        with self._lock:
+            page: List[Tuple[int, Any]] = []
+            order = self._order
+            i = bisect_right(order, after or 0)
+            while i < len(order) and len(page) < limit:
+                key = self._by_seq.get(order[i])
+                if key is not None:
+                    page.append((order[i], self._read(self._index[key])))
+                i += 1
+            return page
+
+    def state(self) -> Tuple[Tuple[int, int], ...]:
+        return log_state(self.directory)
+
+    # ---------- 압축 ----------
+
+    def compact(self, keep_last: Optional[int] = None) -> int:
+        """
+        살아 있는 레코드만 새 세그먼트로 옮기고 이전 세그먼트를 지운다.
+
+        새 세그먼트는 체크포인트 레코드로 시작하고 임시 파일에 다 쓴 뒤 rename 하므로,
+        어느 시점에 죽어도 재생 결과는 압축 전 또는 후 상태 중 하나다.
+
+        Args:
+            keep_last: 키 없는 로그에서 최근 N 건만 남긴다
+
+        Returns:
+            지운 세그먼트 수
+        """
+        with self._lock:
+            old = list_segments(self.directory)
+            if self.keyed:
+                records = [
+                    {"k": key, "v": self._read(loc), "s": self._seq_of[key]}
+                    for key, loc in self._index.items()
+                ]
+            else:
+                entries = self._entries[-keep_last:] if keep_last else self._entries
+                records = [{"v": self._read(loc)} for loc in entries]
+
+            self._rotate()
+            seg = self._segment
+            index: Dict[Any, Location] = {}
+            entries_new: List[Location] = []
+            tmp = self._path(seg).with_suffix(".tmp")
+            with open(tmp, "wb") as f:
+                offset = f.write(_dumps({"c": 1}))
+                for record in records:
+                    data = _dumps(record)
+                    loc = (seg, offset, len(data))
+                    if self.keyed:
+                        index[record["k"]] = loc
+                    else:
+                        entries_new.append(loc)
+                    offset += f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self._path(seg))
+            self._index, self._entries = index, entries_new
+            self._order = sorted(self._by_seq)
+            self.garbage = 0
+            self._size = offset
+            self._unsynced = 0
+            self._drop(old)
+            return len(old)
+
+    def values_in(self, segments: Iterable[int]) -> List[Any]:
+        """현재 값 중 주어진 세그먼트에 있는 것 (삽입 순서)."""
+        segments = set(segments)
+        with self._lock:
+            locs = self._index.values() if self.keyed else self._entries
+            return [self._read(loc) for loc in locs if loc[0] in segments]
+
+    def drop_segments(self, segments: Iterable[int]) -> None:
+        """닫힌 세그먼트를 지우고 그 레코드를 색인에서 뺀다 (다른 저장소로 옮긴 뒤)."""
+        with self._lock:
+            segments = set(segments) - {self._segment}
+            for key in [k for k, loc in self._index.items() if loc[0] in segments]:
+                del self._index[key]
+                self._forget(key)
+            self._entries = [loc for loc in self._entries if loc[0] not in segments]
+            self._drop(segments)
+
+    def seal(self) -> List[int]:
+        """현재 세그먼트를 닫는다. 닫힌(이후 바뀌지 않는) 세그먼트 번호 반환."""
+        with self._lock:
+            if self._size:
+                self._rotate()
+            return [seg for seg in list_segments(self.directory) if seg != self._segment]
+
+    def _drop(self, segments: Iterable[int]) -> None:
+        for seg in segments:
+            fd = self._readers.pop(seg, None)
+            if fd is not None:
+                os.close(fd)
+            try:
+                self._path(seg).unlink()
+            except FileNotFoundError:
+                pass
+
+    def close(self) -> None:
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            self._sync_locked()
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+            for fd in self._readers.values():
+                os.close(fd)
+            self._readers.clear()
+
+
+def read_values(directory: Path, keyed: bool = True, exclude: Iterable[int] = ()) -> List[Any]:
+    """
+    로그 디렉터리의 현재 값 (읽기 전용 — 잘린 꼬리도 고치지 않고 건너뛴다).
+
+    Args:
+        exclude: 건너뛸 세그먼트 번호 (이미 다른 저장소로 옮겨진 것)
+    """
+    exclude = set(exclude)
+    index: Dict[Any, Any] = {}
+    entries: List[Any] = []
+    for seg in list_segments(directory):
+        if seg in exclude:
+            continue
+        with open(Path(directory) / f"seg-{seg:06d}.jsonl", "rb") as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                record = json.loads(line)
+                if record.get("c"):
+                    index, entries = {}, []
+                elif not keyed:
+                    entries.append(record["v"])
+                elif record.get("d"):
+                    index.pop(record["k"], None)
+                else:
+                    index[record["k"]] = record["v"]
+    return list(index.values()) if keyed else entries
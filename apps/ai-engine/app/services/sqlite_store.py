@@ -0,0 +1,439 @@
+"""
+SQLite(WAL) 레코드 저장소 — SegmentLog 와 같은 컬렉션 API 의 다른 엔진.
+
+한 DB 파일(`collector.db`)의 records 테이블에 여러 컬렉션(pending, approved,
+collection_logs, failed …)을 담는다. 값은 JSON 텍스트로 두고, 자주 거르는 필드는
+열로 뽑아 색인한다:
+    confidence_score, source, status, created_at (+ collection, key, seq)
+그래서 페이지 조회(ORDER BY seq LIMIT/OFFSET), 임계값 이상 신뢰도 조회, 건수 집계가
+전체 로드 없이 색인으로 끝난다.
+
+- seq(AUTOINCREMENT)가 삽입 순서다. 같은 키를 다시 put 하면 값만 바뀌고 순서는 유지된다
+  (SegmentLog 재생 결과와 같은 의미). page(after=seq) 는 seq 색인으로 바로 다음 페이지를 찾는다.
+- 컬렉션별 건수는 collection_counts 테이블을 트리거가 쓰기마다 갱신한다 (COUNT(*) 스캔 없음).
+- journal_mode=WAL + synchronous=NORMAL: 커밋은 WAL 에 쓰이고 fsync 는 체크포인트 때
+  묶어서 한다. 읽는 쪽(다른 프로세스의 코퍼스)은 쓰기와 동시에 읽을 수 있다.
+- 연결 하나를 스레드들이 RLock 으로 나눠 쓴다.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from ..core.logger import get_logger
+
+logger = get_logger("sqlite_store")
+
+DB_FILENAME = "collector.db"
+BUSY_TIMEOUT = float(os.getenv("SQLITE_STORE_BUSY_TIMEOUT", "5"))
+
+# SQLite 변수 개수 제한 아래로 IN (...) 을 나눈다
+_IN_CHUNK = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS records (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    collection TEXT NOT NULL,
+    key TEXT,
+    value TEXT NOT NULL,
+    confidence_score REAL,
+    source TEXT,
+    status TEXT,
+    created_at TEXT,
+    updated_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS records_order ON records(collection);
+CREATE UNIQUE INDEX IF NOT EXISTS records_key ON records(collection, key);
+CREATE INDEX IF NOT EXISTS records_confidence ON records(collection, confidence_score);
+CREATE INDEX IF NOT EXISTS records_source ON records(collection, source);
+CREATE INDEX IF NOT EXISTS records_status ON records(collection, status);
+CREATE INDEX IF NOT EXISTS records_created ON records(collection, created_at);
+CREATE TABLE IF NOT EXISTS collection_counts (
+    collection TEXT PRIMARY KEY,
+    n INTEGER NOT NULL
+);
+CREATE TRIGGER IF NOT EXISTS records_count_insert AFTER INSERT ON records BEGIN
+    INSERT INTO collection_counts (collection, n) VALUES (new.collection, 1)
+    ON CONFLICT(collection) DO UPDATE SET n = n + 1;
+END;
+CREATE TRIGGER IF NOT EXISTS records_count_delete AFTER DELETE ON records BEGIN
+    UPDATE collection_counts SET n = n - 1 WHERE collection = old.collection;
+END;
+"""
+
+# 1: collection_counts 도입 — 그 전 DB 는 열 때 한 번 다시 센다
+_SCHEMA_VERSION = 1
+
+_COLUMNS = "collection, key, value, confidence_score, source, status, created_at, updated_at"
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+
+def record_columns(value: Any) -> Tuple[Optional[float], Optional[str], Optional[str], Optional[str]]:
+    """값 → (confidence_score, source, status, created_at) 색인 열."""
+    if not isinstance(value, dict):
+        return None, None, None, None
+    confidence = value.get("confidence_score")
+    if not isinstance(confidence, (int, float)) or isinstance(confidence, bool):
+        confidence = None
+    source = value.get("source_name") or value.get("data_source") or value.get("sources")
+    if isinstance(source, list):
+        source = ",".join(map(str, source))
+    status = value.get("status")
+    created = (
+        value.get("collection_date")
+        or value.get("timestamp")
+        or value.get("first_failed_at")
+    )
+    return (
+        float(confidence) if confidence is not None else None,
+        str(source) if source else None,
+        str(status) if status else None,
+        str(created) if created else None,
+    )
+
+
+def matches(
+    value: Any,
+    min_confidence: Optional[float] = None,
+    source: Optional[str] = None,
+    status: Optional[str] = None,
+    since: Optional[str] = None,
+) -> bool:
+    """find() 필터를 값 하나에 적용 (색인 없는 엔진의 스캔용)."""
+    confidence, value_source, value_status, created = record_columns(value)
+    if min_confidence is not None and (confidence is None or confidence < min_confidence):
+        return False
+    if source is not None and value_source != source:
+        return False
+    if status is not None and value_status != status:
+        return False
+    if since is not None and (created is None or created < since):
+        return False
+    return True
+
+
+_STATE_SQL = (
+    "SELECT (SELECT n FROM collection_counts WHERE collection = ?), MAX(seq), MAX(updated_at) "
+    "FROM records WHERE collection = ?"
+)
+
+
+def _collection_state(conn: sqlite3.Connection, collection: str) -> Tuple[Any, ...]:
+    n, last_seq, updated = conn.execute(_STATE_SQL, (collection, collection)).fetchone()
+    return (collection, n or 0, last_seq or 0, updated or "")
+
+
+def collection_state(path: Path, collection: str) -> Tuple[Tuple[Any, ...], ...]:
+    """
+    컬렉션 하나의 (이름, 건수, 마지막 seq, 마지막 수정 시각) — 다른 프로세스의 변경 감지용.
+
+    DB 파일 전체가 아니라 해당 컬렉션만 본다. 같은 DB 의 다른 컬렉션(pending, failed,
+    수집 로그, LLM 지표 …)에 쓰는 것으로는 바뀌지 않는다. DB 가 없으면 ().
+    """
+    path = Path(path)
+    if not path.exists():
+        return ()
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True, timeout=BUSY_TIMEOUT)
+    try:
+        return (_collection_state(conn, collection),)
+    except sqlite3.OperationalError:
+        # 스키마 생성 전
+        return ()
+    finally:
+        conn.close()
+
+
+class SQLiteStore:
+    """records 테이블 하나를 여러 컬렉션이 나눠 쓰는 SQLite 저장소. 스레드 안전."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(
+            str(self.path), timeout=BUSY_TIMEOUT, isolation_level=None, check_same_thread=False
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        if self._conn.execute("PRAGMA user_version").fetchone()[0] < _SCHEMA_VERSION:
+            with self.transaction() as conn:
+                conn.execute("DELETE FROM collection_counts")
+                conn.execute(
+                    "INSERT INTO collection_counts (collection, n) "
+                    "SELECT collection, COUNT(*) FROM records GROUP BY collection"
+                )
+                conn.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
+
+    def collection(self, name: str, keyed: bool = True) -> "SQLiteCollection":
+        return SQLiteCollection(self, name, keyed)
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conn
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def query(self, sql: str, params: Iterable[Any] = ()) -> List[tuple]:
+        with self._lock:
+            return self._conn.execute(sql, tuple(params)).fetchall()
+
+    def checkpoint(self) -> None:
+        """WAL 을 DB 파일에 반영하고 fsync."""
+        with self._lock:
+            self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    def collection_state(self, collection: str) -> Tuple[Tuple[Any, ...], ...]:
+        with self._lock:
+            return (_collection_state(self._conn, collection),)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class SQLiteCollection:
+    """SQLiteStore 의 컬렉션 하나 — SegmentLog 와 같은 메서드."""
+
+    kind = "sqlite"
+    # 압축할 죽은 레코드가 없다 (SQLite 가 페이지를 재사용)
+    garbage = 0
+
+    def __init__(self, store: SQLiteStore, name: str, keyed: bool = True) -> None:
+        self.store = store
+        self.name = name
+        self.keyed = keyed
+
+    # ---------- 쓰기 ----------
+
+    def _rows(self, items: Iterable[Tuple[Any, Any]]) -> List[tuple]:
+        now = datetime.now().isoformat()
+        rows = []
+        for key, value in items:
+            confidence, source, status, created = record_columns(value)
+            rows.append((self.name, key, _dumps(value), confidence, source, status, created or now, now))
+        return rows
+
+    def put_many(self, items: Iterable[Tuple[Any, Any]]) -> None:
+        rows = self._rows(items)
+        if not rows:
+            return
+        with self.store.transaction() as conn:
+            conn.executemany(
+                f"INSERT INTO records ({_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(collection, key) DO UPDATE SET value = excluded.value, "
+                "confidence_score = excluded.confidence_score, source = excluded.source, "
+                "status = excluded.status, updated_at = excluded.updated_at",
+                rows,
+            )
+
+    def put(self, key: Any, value: Any) -> None:
+        self.put_many([(key, value)])
+
+    def delete_many(self, keys: Iterable[Any]) -> int:
+        """있는 키만 지운다. 지운 수 반환."""
+        keys = list(dict.fromkeys(keys))
+        deleted = 0
+        if not keys:
+            return 0
+        with self.store.transaction() as conn:
+            for i in range(0, len(keys), _IN_CHUNK):
+                chunk = keys[i:i + _IN_CHUNK]
+                cursor = conn.execute(
+                    f"DELETE FROM records WHERE collection = ? AND key IN ({','.join('?' * len(chunk))})",
+                    (self.name, *chunk),
+                )
+                deleted += cursor.rowcount
+        return deleted
+
+    def delete(self, key: Any) -> bool:
+        return self.delete_many([key]) == 1
+
+    def append_many(self, values: Iterable[Any]) -> None:
+        self.put_many((None, value) for value in values)
+
+    def append(self, value: Any) -> None:
+        self.append_many([value])
+
+    def sync(self) -> None:
+        """커밋은 이미 WAL 에 있다 — 체크포인트로 DB 파일까지 fsync."""
+        self.store.checkpoint()
+
+    # ---------- 읽기 ----------
+
+    def __len__(self) -> int:
+        rows = self.store.query("SELECT n FROM collection_counts WHERE collection = ?", (self.name,))
+        return rows[0][0] if rows else 0
+
+    def __contains__(self, key: Any) -> bool:
+        return bool(self.store.query(
+            "SELECT 1 FROM records WHERE collection = ? AND key = ?", (self.name, key)
+        ))
+
+    def keys(self) -> List[Any]:
+        rows = self.store.query("SELECT key FROM records WHERE collection = ? ORDER BY seq", (self.name,))
+        return [key for key, in rows]
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        rows = self.store.query(
+            "SELECT value FROM records WHERE collection = ? AND key = ?", (self.name, key)
+        )
+        return json.loads(rows[0][0]) if rows else default
+
+    def values(self, start: int = 0, stop: Optional[int] = None) -> List[Any]:
+        """현재 값 (삽입 순서). start/stop 으로 일부만 읽을 수 있다 (음수 가능)."""
+        if start < 0 or (stop is not None and stop < 0):
+            start, stop, _ = slice(start, stop).indices(len(self))
+        limit = -1 if stop is None else max(stop - start, 0)
+        rows = self.store.query(
+            "SELECT value FROM records WHERE collection = ? ORDER BY seq LIMIT ? OFFSET ?",
+            (self.name, limit, start),
+        )
+        return [json.loads(value) for value, in rows]
+
+    def items(self) -> Iterator[Tuple[Any, Any]]:
+        rows = self.store.query(
+            "SELECT key, value FROM records WHERE collection = ? ORDER BY seq", (self.name,)
+        )
+        return iter([(key, json.loads(value)) for key, value in rows])
+
+    def page(self, after: Optional[int] = None, limit: int = 50) -> List[Tuple[int, Any]]:
+        """seq 가 after 보다 큰 값 limit 개 (삽입 순서) — [(seq, value)]."""
+        rows = self.store.query(
+            "SELECT seq, value FROM records WHERE collection = ? AND seq > ? ORDER BY seq LIMIT ?",
+            (self.name, after or 0, limit),
+        )
+        return [(seq, json.loads(value)) for seq, value in rows]
+
+    @staticmethod
+    def _where(
+        min_confidence: Optional[float],
+        source: Optional[str],
+        status: Optional[str],
+        since: Optional[str],
+    ) -> Tuple[str, List[Any]]:
+        clauses, params = [], []
+        for clause, param in (
+            ("confidence_score >= ?", min_confidence),
+            ("source = ?", source),
+            ("status = ?", status),
+            ("created_at >= ?", since),
+        ):
+            if param is not None:
+                clauses.append(clause)
+                params.append(param)
+        return "".join(f" AND {c}" for c in clauses), params
+
+    def find(
+        self,
+        min_confidence: Optional[float] = None,
+        source: Optional[str] = None,
+        status: Optional[str] = None,
+        since: Optional[str] = None,
+        limit: Optional[int] = None,
+        offset: int = 0,
+    ) -> List[Any]:
+        """색인 열로 거른 값 (삽입 순서)."""
+        where, params = self._where(min_confidence, source, status, since)
+        rows = self.store.query(
+            f"SELECT value FROM records WHERE collection = ?{where} ORDER BY seq LIMIT ? OFFSET ?",
+            (self.name, *params, -1 if limit is None else limit, offset),
+        )
+        return [json.loads(value) for value, in rows]
+
+    def count(
+        self,
+        min_confidence: Optional[float] = None,
+        source: Optional[str] = None,
+        status: Optional[str] = None,
+        since: Optional[str] = None,
+    ) -> int:
+        if (min_confidence, source, status, since) == (None, None, None, None):
+            return len(self)
+        where, params = self._where(min_confidence, source, status, since)
+        return self.store.query(
+            f"SELECT COUNT(*) FROM records WHERE collection = ?{where}", (self.name, *params)
+        )[0][0]
+
+    def state(self) -> Tuple[Tuple[Any, ...], ...]:
+        """이 컬렉션의 변경 감지 상태 (collection_state 와 같은 값)"""
+        return self.store.collection_state(self.name)
+
+    # ---------- 압축 / 병합 ----------
+
+    def compact(self, keep_last: Optional[int] = None) -> int:
+        """키 없는 컬렉션에서 최근 keep_last 건만 남긴다. 지운 수 반환."""
+        if self.keyed or not keep_last:
+            return 0
+        with self.store.transaction() as conn:
+            cursor = conn.execute(
+                "DELETE FROM records WHERE collection = ? AND seq NOT IN "
+                "(SELECT seq FROM records WHERE collection = ? ORDER BY seq DESC LIMIT ?)",
+                (self.name, self.name, keep_last),
+            )
+            return cursor.rowcount
+
+    def seal(self) -> List[int]:
+        """지금까지의 레코드를 가리키는 표식 [마지막 seq] (비었으면 [])."""
+        rows = self.store.query("SELECT MAX(seq) FROM records WHERE collection = ?", (self.name,))
+        return [rows[0][0]] if rows[0][0] is not None else []
+
+    def values_in(self, marks: Iterable[int]) -> List[Any]:
+        """seal() 표식까지의 현재 값 (삽입 순서)."""
+        marks = list(marks)
+        if not marks:
+            return []
+        rows = self.store.query(
+            "SELECT value FROM records WHERE collection = ? AND seq <= ? ORDER BY seq",
+            (self.name, max(marks)),
+        )
+        return [json.loads(value) for value, in rows]
+
+    def drop_segments(self, marks: Iterable[int]) -> None:
+        """seal() 표식까지의 레코드를 지운다 (다른 저장소로 옮긴 뒤)."""
+        marks = list(marks)
+        if marks:
+            with self.store.transaction() as conn:
+                conn.execute("DELETE FROM records WHERE collection = ? AND seq <= ?", (self.name, max(marks)))
+
+    def close(self) -> None:
+        """연결은 SQLiteStore 가 관리한다."""
+
+
+def read_values(path: Path, collection: str, exclude: Iterable[int] = ()) -> List[Any]:
+    """
+    DB 의 컬렉션 값 (읽기 전용 연결).
+
+    Args:
+        exclude: seal() 표식 — 그 seq 까지는 건너뛴다 (이미 다른 저장소로 옮겨진 것)
+    """
+    path = Path(path)
+    if not path.exists():
+        return []
+    after = max(exclude, default=0)
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True, timeout=BUSY_TIMEOUT)
+    try:
+        rows = conn.execute(
+            "SELECT value FROM records WHERE collection = ? AND seq > ? ORDER BY seq", (collection, after)
+        ).fetchall()
+    except sqlite3.OperationalError:
+        # 스키마 생성 전
+        return []
+    finally:
+        conn.close()
+    return [json.loads(value) for value, in rows]
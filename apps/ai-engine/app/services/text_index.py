@@ -0,0 +1,232 @@
+"""
+문자 n-gram 역색인 — 한국어 부분 문자열 검색용.
+
+형태소 분석 없이 `q in term` 의미를 그대로 보존한다.
+
+구조 (2단):
+- 어휘(term) 단위: 같은 문자열(증상명, 주소증 등)은 문서가 달라도 term 하나로 합친다.
+  term → 정렬된 doc_id 포스팅 (numpy uint32).
+- term 의 1-gram ~ n-gram → term_id 포스팅.
+
+검색:
+- 질의 길이 ≤ n: 해당 gram 포스팅이 곧 `q in term` 인 term 집합 (검증 불필요).
+- 질의 길이 > n: 질의 n-gram 포스팅 교집합 후 term 원문에 `in` 검증.
+- 일치 term 들의 doc 포스팅을 한 번의 벡터 gather 로 모아 문서 mask 에 표시한다.
+  (term 수천 개의 작은 배열을 np.unique 로 합치는 것보다 훨씬 싸다)
+
+실데이터의 증상·주소증은 어휘가 문서 수보다 훨씬 작아서, 검증 비용이
+코퍼스 크기가 아니라 어휘 크기에 비례한다.
+"""
+
+from __future__ import annotations
+
+from typing import Iterable, Union
+
+import numpy as np
+
+EMPTY = np.empty(0, dtype=np.uint32)
+
+
+def mask_to_ids(mask: np.ndarray) -> np.ndarray:
+    """bool 문서 mask → 정렬된 doc_id 배열."""
+    return np.flatnonzero(mask).astype(np.uint32, copy=False)
+
+
+class NgramIndex:
+    """term 어휘 + 문자 n-gram 역색인."""
+
+    def __init__(self, n: int = 3) -> None:
+        if n < 1:
+            raise ValueError("n must be >= 1")
+        self.n = n
+        self._term_ids: dict[str, int] = {}
+        self._terms: list[str] = []
+        self._term_docs: list[list[int]] = []
+        # freeze 후: term 별 doc 포스팅을 이어 붙인 배열 + term 시작 오프셋 (CSR)
+        self._docs_flat: np.ndarray = EMPTY
+        self._offsets: np.ndarray = np.zeros(1, dtype=np.int64)
+        self._grams: dict[str, list[int] | np.ndarray] = {}
+        self.doc_count = 0  # max doc_id + 1
+        self._frozen = False
+
+    def __len__(self) -> int:
+        return len(self._terms)
+
+    def _add_term(self, term: str) -> int:
+        tid = len(self._terms)
+        self._term_ids[term] = tid
+        self._terms.append(term)
+        self._term_docs.append([])
+        grams = self._grams
+        length = len(term)
+        seen: set[str] = set()
+        for size in range(1, self.n + 1):
+            for i in range(length - size + 1):
+                g = term[i:i + size]
+                if g not in seen:
+                    seen.add(g)
+                    lst = grams.get(g)
+                    if lst is None:
+                        grams[g] = [tid]
+                    else:
+                        lst.append(tid)
+        return tid
+
+    def add(self, doc_id: int, terms: Union[str, Iterable[str]]) -> None:
+        """문서에 term(들) 추가. doc_id 는 증가 순으로 넣는다."""
+        if self._frozen:
+            raise RuntimeError("index is frozen")
+        if isinstance(terms, str):
+            terms = (terms,)
+        if doc_id >= self.doc_count:
+            self.doc_count = doc_id + 1
+        for term in terms:
+            tid = self._term_ids.get(term)
+            if tid is None:
+                tid = self._add_term(term)
+            docs = self._term_docs[tid]
+            if not docs or docs[-1] != doc_id:
+                docs.append(doc_id)
+
+    def freeze(self) -> "NgramIndex":
+        """포스팅을 numpy 배열로 압축. 이후 add 불가."""
+        if not self._frozen:
+            lengths = np.fromiter((len(d) for d in self._term_docs), dtype=np.int64,
+                                  count=len(self._term_docs))
+            self._offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+            np.cumsum(lengths, out=self._offsets[1:])
+            self._docs_flat = np.fromiter(
+                (doc for docs in self._term_docs for doc in docs),
+                dtype=np.uint32,
+                count=int(self._offsets[-1]),
+            )
+            self._term_docs = []
+            self._grams = {g: np.asarray(t, dtype=np.uint32) for g, t in self._grams.items()}
+            self._frozen = True
+        return self
+
+    def extend(self, docs: Iterable[tuple[int, Union[str, Iterable[str]]]]) -> "NgramIndex":
+        """
+        frozen 색인 뒤에 문서를 붙인 새 frozen 색인 (self 는 그대로 — 스냅샷 증분 갱신용).
+
+        docs = [(doc_id, term(들))], doc_id 는 기존 doc_count 이상 증가 순.
+        기존 term 의 n-gram 포스팅은 그대로 쓰고 새 term 의 gram 만 더하며,
+        doc 포스팅(CSR)은 term 구간마다 새 doc 을 뒤에 붙여 한 번에 다시 배치한다.
+        """
+        if not self._frozen:
+            raise RuntimeError("index is not frozen")
+        new = NgramIndex(self.n)
+        new._term_ids = dict(self._term_ids)
+        new._terms = list(self._terms)
+        new.doc_count = self.doc_count
+        old_terms = len(self._terms)
+
+        # 새 term 은 _add_term 으로 (gram 은 new._grams 에 list 로 쌓인다)
+        added: dict[int, list[int]] = {}
+        for doc_id, terms in docs:
+            if isinstance(terms, str):
+                terms = (terms,)
+            if doc_id >= new.doc_count:
+                new.doc_count = doc_id + 1
+            for term in terms:
+                tid = new._term_ids.get(term)
+                if tid is None:
+                    tid = new._add_term(term)
+                lst = added.setdefault(tid, [])
+                if not lst or lst[-1] != doc_id:
+                    lst.append(doc_id)
+
+        # gram 포스팅: 새 term_id 는 모두 기존보다 커서 뒤에 붙여도 정렬 유지
+        grams = dict(self._grams)
+        for g, tids in new._grams.items():
+            old = grams.get(g)
+            tail = np.asarray(tids, dtype=np.uint32)
+            grams[g] = tail if old is None else np.concatenate([old, tail])
+        new._grams = grams
+        new._term_docs = []
+
+        # CSR: term 구간 = 기존 doc 포스팅 + 새 doc
+        lengths = np.zeros(len(new._terms), dtype=np.int64)
+        lengths[:old_terms] = np.diff(self._offsets)
+        extra = np.zeros(len(new._terms), dtype=np.int64)
+        for tid, lst in added.items():
+            extra[tid] = len(lst)
+        new._offsets = np.zeros(len(new._terms) + 1, dtype=np.int64)
+        np.cumsum(lengths + extra, out=new._offsets[1:])
+        flat = np.empty(int(new._offsets[-1]), dtype=np.uint32)
+        old_lengths = lengths[:old_terms]
+        old_total = int(self._offsets[-1])
+        if old_total:
+            shift = np.repeat(new._offsets[:old_terms] - self._offsets[:-1], old_lengths)
+            flat[np.arange(old_total, dtype=np.int64) + shift] = self._docs_flat
+        for tid, lst in added.items():
+            at = int(new._offsets[tid] + lengths[tid])
+            flat[at:at + len(lst)] = lst
+        new._docs_flat = flat
+        new._frozen = True
+        return new
+
+    def term(self, term_id: int) -> str:
+        return self._terms[term_id]
+
+    def term_id(self, term: str) -> int:
+        """term 의 id. 없으면 -1."""
+        return self._term_ids.get(term, -1)
+
+    def term_docs(self, term_id: int) -> np.ndarray:
+        return self._docs_flat[self._offsets[term_id]:self._offsets[term_id + 1]]
+
+    def exact(self, term: str) -> np.ndarray:
+        """term 정확 일치 doc_id."""
+        tid = self._term_ids.get(term)
+        return EMPTY if tid is None else self.term_docs(tid)
+
+    def gather(self, term_ids: np.ndarray) -> np.ndarray:
+        """여러 term 의 doc 포스팅을 한 번에 모은다 (정렬/중복 제거 안 됨)."""
+        term_ids = np.asarray(term_ids, dtype=np.int64)
+        if not len(term_ids):
+            return EMPTY
+        if len(term_ids) == 1:
+            return self.term_docs(int(term_ids[0]))
+        starts = self._offsets[term_ids]
+        lengths = self._offsets[term_ids + 1] - starts
+        total = int(lengths.sum())
+        if not total:
+            return EMPTY
+        # 각 term 구간 [start, start+len) 을 이어 붙인 flat 인덱스
+        shift = np.repeat(starts - (np.cumsum(lengths) - lengths), lengths)
+        return self._docs_flat[np.arange(total, dtype=np.int64) + shift]
+
+    def match_terms(self, query: str) -> np.ndarray:
+        """`query in term` 인 term_id 배열."""
+        if not query:
+            return np.arange(len(self._terms), dtype=np.uint32)
+        n = self.n
+        grams = self._grams
+        if len(query) <= n:
+            return grams.get(query, EMPTY)
+
+        lists = []
+        for i in range(len(query) - n + 1):
+            p = grams.get(query[i:i + n])
+            if p is None or not len(p):
+                return EMPTY
+            lists.append(p)
+        lists.sort(key=len)
+        cands = lists[0]
+        for p in lists[1:]:
+            cands = np.intersect1d(cands, p, assume_unique=True)
+            if not len(cands):
+                return EMPTY
+        terms = self._terms
+        return np.asarray([t for t in cands.tolist() if query in terms[t]], dtype=np.uint32)
+
+    def mark(self, query: str, mask: np.ndarray) -> None:
+        """`query in term` 인 문서를 mask 에 True 로 표시 (mask 길이 ≥ doc_count)."""
+        mask[self.gather(self.match_terms(query))] = True
+
+    def search(self, query: str) -> np.ndarray:
+        """`query in term` 인 term 을 하나라도 가진 doc_id (정렬된 배열)."""
+        mask = np.zeros(self.doc_count, dtype=bool)
+        self.mark(query, mask)
+        return mask_to_ids(mask)
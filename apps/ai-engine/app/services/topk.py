@@ -0,0 +1,70 @@
+"""
+상위 k 개 선택 — 크기 k 로 제한된 최소 힙.
+
+응답 객체를 모든 후보에 대해 만들고 전체 정렬하는 대신,
+(점수, 위치) 튜플만 힙에 유지하고 승자만 나중에 materialize 한다.
+
+정렬 규칙: 점수 내림차순, 동점이면 위치(입력 순서) 오름차순
+— 기존 `list.sort(key=score, reverse=True)` 의 안정 정렬 결과와 같다.
+"""
+
+from __future__ import annotations
+
+import heapq
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+
+class TopK:
+    """스트리밍 top-k 선택기. push 는 O(log k), 메모리는 O(k)."""
+
+    def __init__(self, k: int) -> None:
+        self.k = max(0, int(k))
+        self._heap: List[Tuple[float, int]] = []  # (score, -index) 최소 힙
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def push(self, score: float, index: int) -> None:
+        if not self.k:
+            return
+        item = (score, -index)
+        heap = self._heap
+        if len(heap) < self.k:
+            heapq.heappush(heap, item)
+        elif item > heap[0]:
+            heapq.heapreplace(heap, item)
+
+    def results(self) -> List[Tuple[float, int]]:
+        """[(score, index)] 점수 내림차순 (동점은 index 오름차순)."""
+        return [(score, -neg) for score, neg in sorted(self._heap, reverse=True)]
+
+
+def top_k_indices(
+    scores: np.ndarray,
+    k: int,
+    min_score: Optional[float] = None,
+) -> List[Tuple[float, int]]:
+    """
+    점수 배열에서 상위 k 개 (score, 배열 위치).
+
+    k 번째 점수 이상인 위치만 np.partition 으로 먼저 걸러낸 뒤 힙에 넣으므로
+    후보가 수만 개여도 파이썬 루프는 대략 k 개(동점 포함)만 돈다.
+    """
+    scores = np.asarray(scores, dtype=np.float64)
+    positions = np.arange(len(scores))
+    if min_score is not None and min_score > 0:
+        keep = scores >= min_score
+        scores, positions = scores[keep], positions[keep]
+    if k <= 0 or not len(scores):
+        return []
+    if len(scores) > k:
+        kth = np.partition(scores, len(scores) - k)[len(scores) - k]
+        keep = scores >= kth
+        scores, positions = scores[keep], positions[keep]
+
+    selector = TopK(k)
+    for score, pos in zip(scores.tolist(), positions.tolist()):
+        selector.push(score, pos)
+    return selector.results()
@@ -0,0 +1,279 @@
+"""
+로컬 ANN 색인 — IVF-flat (numpy) + memory-mapped 벡터 파일.
+
+구조:
+- 구면 k-means 로 nlist 개 중심을 학습하고, 벡터를 소속 리스트 순서로 재배열해
+  vectors.npy 에 저장한다. 각 리스트는 파일에서 연속 구간이므로 검색 시
+  memmap 슬라이스 몇 개만 읽는다.
+- 질의: 중심과의 내적 상위 nprobe 리스트 → 해당 구간 벡터와 내적 → top-k.
+- 필터: Pinecone filter_dict 의 `$eq` / `$and` (체질, 처방명) 를 코드 배열 mask 로
+  평가한다. 필터가 좁으면(일치 행이 적으면) 리스트 탐색 대신 일치 행 전체를
+  정확 검색한다 — IVF 탐색 범위에 일치 행이 없어 결과가 비는 것을 막는다.
+
+저장 디렉터리:
+- vectors.npy  (N, dim) float32, 리스트 순서
+- index.npz    중심, 리스트 오프셋, case_id, 필터 코드
+- meta.json    dim, nlist, 필터 어휘, 인코더 IDF 등
+"""
+
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .topk import top_k_indices
+
+# filter_dict 로 거를 수 있는 메타데이터 필드
+FILTER_FIELDS = ("patient_constitution", "formula_name")
+
+VECTORS_FILE = "vectors.npy"
+INDEX_FILE = "index.npz"
+META_FILE = "meta.json"
+
+
+def _normalize_rows(x: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(x, axis=1, keepdims=True)
+    return np.divide(x, norms, out=np.zeros_like(x), where=norms > 0)
+
+
+def train_kmeans(
+    vectors: np.ndarray,
+    nlist: int,
+    iterations: int = 10,
+    sample_size: int = 50_000,
+    seed: int = 0,
+) -> np.ndarray:
+    """구면 k-means (내적 기준). 재현 가능하도록 seed 고정."""
+    rng = np.random.default_rng(seed)
+    n = len(vectors)
+    sample = vectors if n <= sample_size else vectors[np.sort(rng.choice(n, sample_size, replace=False))]
+    sample = np.asarray(sample, dtype=np.float32)
+    nlist = max(1, min(nlist, len(sample)))
+    centroids = sample[rng.choice(len(sample), nlist, replace=False)].copy()
+
+    for _ in range(iterations):
+        assign = assign_lists(sample, centroids)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assign, sample)
+        empty = np.bincount(assign, minlength=nlist) == 0
+        # 빈 리스트는 임의 샘플로 다시 시작
+        if empty.any():
+            sums[empty] = sample[rng.choice(len(sample), int(empty.sum()))]
+        centroids = _normalize_rows(sums)
+    return centroids
+
+
+def assign_lists(vectors: np.ndarray, centroids: np.ndarray, chunk: int = 8192) -> np.ndarray:
+    """각 벡터의 최근접(최대 내적) 중심 번호."""
+    out = np.empty(len(vectors), dtype=np.int32)
+    for start in range(0, len(vectors), chunk):
+        block = np.asarray(vectors[start:start + chunk], dtype=np.float32)
+        out[start:start + len(block)] = np.argmax(block @ centroids.T, axis=1)
+    return out
+
+
+@dataclass
+class IVFFlatIndex:
+    """IVF-flat 색인. vectors 는 memmap 일 수 있다 (읽기 전용)."""
+
+    vectors: np.ndarray                 # (N, dim), 리스트 순서
+    centroids: np.ndarray               # (nlist, dim)
+    list_offsets: np.ndarray            # (nlist + 1,) vectors 내 리스트 구간
+    ids: np.ndarray                     # (N,) case_id (vectors 와 같은 순서)
+    filter_codes: Dict[str, np.ndarray] = field(default_factory=dict)
+    filter_vocab: Dict[str, Dict[str, int]] = field(default_factory=dict)
+    meta: Dict[str, Any] = field(default_factory=dict)
+
+    # 필터 일치 행이 이 수 이하이면 IVF 대신 정확 검색
+    EXACT_FILTER_MAX = 20_000
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def dim(self) -> int:
+        return int(self.centroids.shape[1]) if len(self.centroids) else 0
+
+    @property
+    def nlist(self) -> int:
+        return len(self.centroids)
+
+    # ---------- 빌드 / 저장 ----------
+
+    @classmethod
+    def build(
+        cls,
+        vectors: np.ndarray,
+        ids: Sequence[str],
+        metadatas: Sequence[Dict],
+        nlist: Optional[int] = None,
+        seed: int = 0,
+        meta: Optional[Dict[str, Any]] = None,
+        centroids: Optional[np.ndarray] = None,
+    ) -> "IVFFlatIndex":
+        """
+        Args:
+            vectors: (N, dim) L2 정규화된 임베딩
+            ids: case_id
+            metadatas: 필터 필드를 가진 메타데이터 (케이스 dict)
+            nlist: 리스트 수 (기본 4·√N)
+            centroids: 기존 중심 재사용 (증분 색인 — k-means 재학습 생략)
+        """
+        vectors = np.asarray(vectors, dtype=np.float32)
+        n = len(vectors)
+        if nlist is None:
+            nlist = max(1, int(4 * np.sqrt(n)))
+        if centroids is not None:
+            centroids = np.asarray(centroids, dtype=np.float32)
+        elif n:
+            centroids = train_kmeans(vectors, nlist, seed=seed)
+        else:
+            centroids = np.zeros((0, vectors.shape[1]), np.float32)
+        assign = assign_lists(vectors, centroids) if n else np.zeros(0, dtype=np.int32)
+        order = np.argsort(assign, kind="stable")
+        counts = np.bincount(assign, minlength=len(centroids))
+        list_offsets = np.zeros(len(centroids) + 1, dtype=np.int64)
+        np.cumsum(counts, out=list_offsets[1:])
+
+        filter_vocab: Dict[str, Dict[str, int]] = {}
+        filter_codes: Dict[str, np.ndarray] = {}
+        for name in FILTER_FIELDS:
+            vocab: Dict[str, int] = {}
+            codes = np.full(n, -1, dtype=np.int32)
+            for i, md in enumerate(metadatas):
+                value = md.get(name)
+                if value:
+                    codes[i] = vocab.setdefault(value, len(vocab))
+            filter_vocab[name] = vocab
+            filter_codes[name] = codes[order]
+
+        return cls(
+            vectors=vectors[order],
+            centroids=centroids,
+            list_offsets=list_offsets,
+            ids=np.asarray(list(ids), dtype=str)[order],
+            filter_codes=filter_codes,
+            filter_vocab=filter_vocab,
+            meta=dict(meta or {}),
+        )
+
+    def save(self, directory: Path) -> None:
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        np.save(directory / VECTORS_FILE, np.ascontiguousarray(self.vectors, dtype=np.float32))
+        np.savez(
+            directory / INDEX_FILE,
+            centroids=self.centroids,
+            list_offsets=self.list_offsets,
+            ids=self.ids,
+            **{f"filter_{name}": codes for name, codes in self.filter_codes.items()},
+        )
+        meta = dict(self.meta)
+        meta.update(count=len(self), dim=self.dim, nlist=self.nlist, filter_vocab=self.filter_vocab)
+        (directory / META_FILE).write_text(json.dumps(meta, ensure_ascii=False), encoding="utf-8")
+
+    @classmethod
+    def load(cls, directory: Path, mmap: bool = True) -> "IVFFlatIndex":
+        """저장된 색인 로드. 벡터는 기본적으로 memory-map (페이지 캐시 공유)."""
+        directory = Path(directory)
+        meta = json.loads((directory / META_FILE).read_text(encoding="utf-8"))
+        vectors = np.load(directory / VECTORS_FILE, mmap_mode="r" if mmap else None)
+        with np.load(directory / INDEX_FILE) as data:
+            filter_codes = {
+                key[len("filter_"):]: data[key] for key in data.files if key.startswith("filter_")
+            }
+            return cls(
+                vectors=vectors,
+                centroids=data["centroids"],
+                list_offsets=data["list_offsets"],
+                ids=data["ids"],
+                filter_codes=filter_codes,
+                filter_vocab=meta.pop("filter_vocab", {}),
+                meta=meta,
+            )
+
+    # ---------- 필터 ----------
+
+    def filter_mask(self, filter_dict: Optional[Dict]) -> Optional[np.ndarray]:
+        """
+        Pinecone 식 filter_dict → 행 bool mask (None 이면 필터 없음).
+
+        지원: {"field": {"$eq": v}}, {"field": v}, {"$and": [...]}
+        """
+        if not filter_dict:
+            return None
+        mask = np.ones(len(self), dtype=bool)
+        for key, cond in filter_dict.items():
+            if key == "$and":
+                for sub in cond:
+                    sub_mask = self.filter_mask(sub)
+                    if sub_mask is not None:
+                        mask &= sub_mask
+                continue
+            if key not in self.filter_codes:
+                raise ValueError(f"unsupported filter field: {key}")
+            if isinstance(cond, dict):
+                unsupported = set(cond) - {"$eq"}
+                if unsupported:
+                    raise ValueError(f"unsupported filter operator: {sorted(unsupported)}")
+                value = cond.get("$eq")
+            else:
+                value = cond
+            code = self.filter_vocab.get(key, {}).get(value, -2)
+            mask &= self.filter_codes[key] == code
+        return mask
+
+    # ---------- 검색 ----------
+
+    def _probe_rows(self, query: np.ndarray, nprobe: int) -> np.ndarray:
+        """질의와 가까운 nprobe 개 리스트의 행 번호."""
+        nprobe = max(1, min(nprobe, self.nlist))
+        sims = self.centroids @ query
+        lists = np.argpartition(-sims, nprobe - 1)[:nprobe] if nprobe < self.nlist else np.arange(self.nlist)
+        lists.sort()  # 파일 순서대로 읽기
+        offsets = self.list_offsets
+        return np.concatenate(
+            [np.arange(offsets[l], offsets[l + 1]) for l in lists.tolist()]
+        ) if len(lists) else np.zeros(0, dtype=np.int64)
+
+    def search(
+        self,
+        query: np.ndarray,
+        top_k: int = 10,
+        nprobe: int = 8,
+        filter_dict: Optional[Dict] = None,
+    ) -> List[Tuple[str, float]]:
+        """[(case_id, 코사인 유사도)] 유사도 내림차순."""
+        if not len(self) or top_k <= 0:
+            return []
+        query = np.asarray(query, dtype=np.float32)
+        mask = self.filter_mask(filter_dict)
+
+        if mask is not None and int(mask.sum()) <= self.EXACT_FILTER_MAX:
+            rows = np.flatnonzero(mask)
+        else:
+            rows = self._probe_rows(query, nprobe)
+            if mask is not None:
+                rows = rows[mask[rows]]
+        if not len(rows):
+            return []
+
+        scores = self._dot(rows, query)
+        return [(str(self.ids[rows[pos]]), float(score)) for score, pos in top_k_indices(scores, top_k)]
+
+    def _dot(self, rows: np.ndarray, query: np.ndarray) -> np.ndarray:
+        """rows(정렬) 벡터와 질의의 내적. 연속 구간은 슬라이스로 읽는다."""
+        if len(rows) == rows[-1] - rows[0] + 1:
+            return np.asarray(self.vectors[rows[0]:rows[-1] + 1]) @ query
+        return np.asarray(self.vectors[rows]) @ query
+
+    def exact_search(self, query: np.ndarray, top_k: int = 10) -> List[Tuple[str, float]]:
+        """전수 검색 (재현율 측정 기준)."""
+        if not len(self):
+            return []
+        scores = np.asarray(self.vectors) @ np.asarray(query, dtype=np.float32)
+        return [(str(self.ids[pos]), float(score)) for score, pos in top_k_indices(scores, top_k)]
@@ -1,16 +1,135 @@
 """
-Vector Service - 비활성화됨
+Vector Service — 로컬 벡터 검색
 
-Pinecone 벡터 DB가 제거되었습니다.
-모든 처방 추천은 GPT-4o-mini를 통해 직접 수행됩니다.
+Pinecone 벡터 DB 는 제거되었고, 대신 프로세스 내 IVF-flat 색인
+(services/vector_index.py) 을 쓴다. 색인은 scripts/index_cases.py (증분) 로
+오프라인에서 만들고, 임베딩은 로컬 결정적 인코더(services/local_encoder.py)로
+생성하므로 검색 경로 전체가 네트워크 없이 동작한다.
+
+색인 파일이 없으면 index = None 이고, 호출 측은 기존처럼 키워드 폴백을 탄다.
 """
 
+import os
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from ..core.logger import get_logger
+from .case_corpus import get_case_corpus, register_derived
+from .local_encoder import HashingEncoder
+from .vector_index import IVFFlatIndex
+
+logger = get_logger("vector_service")
+
+DEFAULT_INDEX_DIR = Path(__file__).resolve().parents[2] / "data" / "vector_index"
+DEFAULT_NPROBE = int(os.getenv("VECTOR_INDEX_NPROBE", "16"))
+# 색인 파일 변경 확인 주기 (초) — 증분 색인기가 디렉터리를 교체하면 다시 연다
+RELOAD_CHECK_INTERVAL = float(os.getenv("VECTOR_INDEX_RELOAD_CHECK_SECONDS", "5"))
+
+# 코퍼스 스냅샷별 case_id → 위치 (검색 결과 메타데이터 조회용)
+CASE_ID_MAP_NAME = 'case_id_map'
+register_derived(
+    CASE_ID_MAP_NAME,
+    lambda snap: {case.get('id'): i for i, case in enumerate(snap.cases) if case.get('id')},
+)
+
+
 class VectorService:
-    """Deprecated: Pinecone 벡터 서비스 (비활성화)"""
-    
-    def __init__(self):
-        self.index = None  # Pinecone index is disabled
-        # print("[INFO] VectorService is disabled. Use GPT-based recommendations.")
-    
-    async def search(self, query: str, **kwargs):
-        return []
+    """로컬 IVF-flat 벡터 검색 서비스"""
+
+    def __init__(self, index_dir: Optional[Path] = None, nprobe: int = DEFAULT_NPROBE):
+        self.index_dir = Path(index_dir or os.getenv("VECTOR_INDEX_DIR") or DEFAULT_INDEX_DIR)
+        self.nprobe = nprobe
+        self._index: Optional[IVFFlatIndex] = None
+        self.encoder: Optional[HashingEncoder] = None
+        self._loaded_mtime = 0.0
+        self._last_check = time.monotonic()
+        self.load()
+
+    @property
+    def index(self) -> Optional[IVFFlatIndex]:
+        """현재 색인. 주기적으로 meta.json mtime 을 확인해 바뀌었으면 다시 연다."""
+        now = time.monotonic()
+        if now - self._last_check >= RELOAD_CHECK_INTERVAL:
+            self._last_check = now
+            if self._meta_mtime() != self._loaded_mtime:
+                self.load()
+        return self._index
+
+    @index.setter
+    def index(self, value: Optional[IVFFlatIndex]) -> None:
+        self._index = value
+
+    def _meta_mtime(self) -> float:
+        try:
+            return (self.index_dir / "meta.json").stat().st_mtime
+        except OSError:
+            return 0.0
+
+    def load(self) -> bool:
+        """색인 (재)로드. 파일이 없거나 깨졌으면 index = None."""
+        mtime = self._meta_mtime()
+        self._loaded_mtime = mtime
+        if not mtime:
+            self._index = None
+            return False
+        try:
+            index = IVFFlatIndex.load(self.index_dir)
+            encoder_cfg = index.meta.get("encoder", {})
+            idf = encoder_cfg.get("idf")
+            encoder = HashingEncoder(
+                dim=index.dim,
+                idf=np.asarray(idf, dtype=np.float32) if idf is not None else None,
+            )
+        except Exception:
+            logger.exception("vector index load failed: %s", self.index_dir)
+            self._index = None
+            return False
+
+        self._index, self.encoder = index, encoder
+        logger.info(
+            "Vector index loaded: %d vectors, dim=%d, nlist=%d (%s)",
+            len(index), index.dim, index.nlist, self.index_dir,
+        )
+        return True
+
+    async def search(
+        self,
+        query: str,
+        filter_dict: Optional[Dict] = None,
+        top_k: int = 10,
+        **kwargs,
+    ) -> List[Dict]:
+        """
+        유사 치험례 검색
+
+        Returns:
+            [{"id", "score", "metadata"}] — Pinecone 응답과 같은 형태
+        """
+        index, encoder = self.index, self.encoder
+        if index is None or encoder is None:
+            return []
+
+        query_vector = encoder.encode_one(query)
+        hits = index.search(
+            query_vector,
+            top_k=top_k,
+            nprobe=kwargs.get('nprobe', self.nprobe),
+            filter_dict=filter_dict,
+        )
+
+        snap = get_case_corpus().snapshot()
+        positions = snap.derived(CASE_ID_MAP_NAME)
+        results = []
+        for case_id, score in hits:
+            pos = positions.get(case_id)
+            metadata = snap.cases[pos] if pos is not None else {'case_id': case_id}
+            results.append({
+                'id': case_id,
+                # 코사인 유사도 → Pinecone 처럼 0-1 범위
+                'score': min(1.0, max(0.0, score)),
+                'metadata': metadata,
+            })
+        return results
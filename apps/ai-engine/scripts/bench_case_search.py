@@ -0,0 +1,103 @@
+"""
+치험례 로컬 검색 후보 추출 벤치마크 — 선형 스캔 vs 역색인.
+
+사용:
+    cd apps/ai-engine
+    python scripts/bench_case_search.py                     # 6k, 60k, 600k
+    python scripts/bench_case_search.py --sizes 6000 60000  # 일부만
+    python scripts/bench_case_search.py --queries 1000
+
+선형 스캔은 600k 에서 너무 느려 --linear-max 이하 크기에서만 측정한다.
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from app.services.case_search_index import CaseSearchIndex  # noqa: E402
+from app.services.hybrid_scorer import HybridScorer  # noqa: E402
+from synthetic_cases import generate_cases, generate_queries  # noqa: E402
+
+
+def linear_candidates(cases, query_dict):
+    """기존 CaseSearchService._search_local 의 후보 판정 (비교 기준)."""
+    out = []
+    query_chief = query_dict.get('chief_complaint', '').lower()
+    query_symptoms = [s.lower() for s in query_dict.get('symptoms', [])]
+    for i, case in enumerate(cases):
+        case_chief = case.get('chief_complaint', '').lower()
+        case_title = case.get('title', '').lower()
+        case_symptoms = [s.lower() for s in case.get('symptoms', [])]
+        is_candidate = False
+        if query_chief and (query_chief in case_chief or query_chief in case_title):
+            is_candidate = True
+        for qs in query_symptoms:
+            if any(qs in cs for cs in case_symptoms):
+                is_candidate = True
+                break
+        if not is_candidate and query_chief:
+            if any(word in case_title for word in query_chief.split()):
+                is_candidate = True
+        if is_candidate:
+            out.append(i)
+    return out
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    k = max(0, min(len(values) - 1, int(round(pct / 100 * (len(values) - 1)))))
+    return values[k]
+
+
+def measure(fn, queries):
+    timings = []
+    sizes = []
+    for q in queries:
+        t0 = time.perf_counter()
+        result = fn(q)
+        timings.append((time.perf_counter() - t0) * 1000)
+        sizes.append(len(result))
+    return timings, sizes
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="case search candidate benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[6_000, 60_000, 600_000])
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--linear-max", type=int, default=60_000)
+    args = parser.parse_args()
+
+    scorer = HybridScorer()
+    queries = generate_queries(args.queries)
+
+    print(f"{'cases':>8} {'build_s':>8} {'mode':>7} {'p50_ms':>8} {'p99_ms':>8} {'avg_cands':>10}")
+    for n in args.sizes:
+        cases = generate_cases(n)
+        t0 = time.perf_counter()
+        index = CaseSearchIndex.build(cases, scorer.normalize_symptom)
+        build_s = time.perf_counter() - t0
+
+        timings, sizes = measure(
+            lambda q: index.candidates(q['chief_complaint'], q['symptoms'], scorer.normalize_symptom),
+            queries,
+        )
+        print(f"{n:>8} {build_s:>8.2f} {'index':>7} {percentile(timings, 50):>8.3f} "
+              f"{percentile(timings, 99):>8.3f} {statistics.mean(sizes):>10.0f}")
+
+        if n <= args.linear_max:
+            lin_queries = queries[: max(20, len(queries) // 10)]
+            timings, sizes = measure(lambda q: linear_candidates(cases, q), lin_queries)
+            print(f"{n:>8} {'-':>8} {'linear':>7} {percentile(timings, 50):>8.3f} "
+                  f"{percentile(timings, 99):>8.3f} {statistics.mean(sizes):>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
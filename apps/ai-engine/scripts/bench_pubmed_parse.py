@@ -0,0 +1,136 @@
+"""
+PubMed EFetch XML 파싱 벤치마크 — BeautifulSoup 전체 트리 vs lxml iterparse 스트리밍.
+
+사용:
+    cd apps/ai-engine
+    python scripts/bench_pubmed_parse.py                      # 200, 1000, 5000 편
+    python scripts/bench_pubmed_parse.py --sizes 200 20000
+    python scripts/bench_pubmed_parse.py --fixture saved_efetch.xml
+
+저장된 EFetch 응답(기본: tests/fixtures/pubmed_efetch.xml)의 <PubmedArticle> 을 PMID 만 바꿔
+반복해 배치를 만든다. 측정마다 새 프로세스에서 돌려 최대 RSS 증가분(파싱 전 대비)을 잰다.
+"""
+
+from __future__ import annotations
+
+import argparse
+import multiprocessing
+import re
+import resource
+import statistics
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from bs4 import BeautifulSoup  # noqa: E402
+
+from app.services.collector.adapters.base import ArticleDetail  # noqa: E402
+from app.services.collector.adapters.pubmed_adapter import iter_pubmed_articles  # noqa: E402
+
+DEFAULT_FIXTURE = ROOT / "tests" / "fixtures" / "pubmed_efetch.xml"
+ARTICLE_RE = re.compile(rb"<PubmedArticle>.*?</PubmedArticle>", re.S)
+PMID_RE = re.compile(rb"<PMID( [^>]*)?>\d+</PMID>")
+
+
+def soup_parse(xml: bytes) -> list:
+    """기존 BeautifulSoup 파서 (비교 기준) — 배치 전체를 트리로 만든 뒤 논문별로 읽는다."""
+    details = []
+    for article in BeautifulSoup(xml, "xml").find_all("PubmedArticle"):
+        pmid_elem = article.find("PMID")
+        if not pmid_elem:
+            continue
+        title_elem = article.find("ArticleTitle")
+        authors = []
+        for author in article.find_all("Author"):
+            lastname = author.find("LastName")
+            forename = author.find("ForeName")
+            if lastname:
+                authors.append(f"{forename.text} {lastname.text}" if forename else lastname.text)
+        journal_elem = article.find("Title")
+        year_elem = article.find("Year")
+        doi = next((e.text for e in article.find_all("ArticleId") if e.get("IdType") == "doi"), None)
+        abstract = "\n".join(
+            f"{e.get('Label')}: {e.text}" if e.get("Label") else e.text for e in article.find_all("AbstractText")
+        )
+        keywords = [k.text for k in article.find_all("Keyword") if k.text]
+        keywords += [m.text for m in article.find_all("DescriptorName") if m.text]
+        details.append(ArticleDetail(
+            article_id=f"PMID:{pmid_elem.text}",
+            title=title_elem.text if title_elem else "",
+            authors=authors[:20],
+            journal=journal_elem.text if journal_elem else "",
+            year=int(year_elem.text) if year_elem and year_elem.text.isdigit() else None,
+            doi=doi,
+            url=f"https://pubmed.ncbi.nlm.nih.gov/{pmid_elem.text}/",
+            abstract=abstract,
+            full_text=abstract,
+            keywords=keywords[:20],
+        ))
+    return details
+
+
+def stream_parse(xml: bytes) -> list:
+    return list(iter_pubmed_articles(xml))
+
+
+PARSERS = {"soup": soup_parse, "stream": stream_parse}
+
+
+def make_batch(fixture: bytes, n: int) -> bytes:
+    """픽스처의 논문들을 PMID 를 바꿔 가며 n 편으로 늘린 PubmedArticleSet."""
+    articles = ARTICLE_RE.findall(fixture)
+    if not articles:
+        raise SystemExit("fixture has no <PubmedArticle>")
+    start = fixture.index(articles[0])
+    end = fixture.rindex(articles[-1]) + len(articles[-1])
+    body = [
+        PMID_RE.sub(f"<PMID>{40_000_000 + i}</PMID>".encode(), articles[i % len(articles)], count=1)
+        for i in range(n)
+    ]
+    return fixture[:start] + b"\n".join(body) + fixture[end:]
+
+
+def _run(parser: str, xml: bytes, repeat: int, out) -> None:
+    """자식 프로세스: 반복 측정 → (중간 시간, 논문 수, 최대 RSS 증가 KB)."""
+    base_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    timings = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        count = len(PARSERS[parser](xml))
+        timings.append(time.perf_counter() - t0)
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - base_rss
+    out.send((statistics.median(timings), count, peak))
+
+
+def measure(parser: str, xml: bytes, repeat: int):
+    recv, send = multiprocessing.Pipe(duplex=False)
+    proc = multiprocessing.Process(target=_run, args=(parser, xml, repeat, send))
+    proc.start()
+    result = recv.recv()
+    proc.join()
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="PubMed EFetch XML parse benchmark")
+    parser.add_argument("--fixture", type=Path, default=DEFAULT_FIXTURE)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[200, 1_000, 5_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    fixture = args.fixture.read_bytes()
+    print(f"{'articles':>8} {'xml_MB':>7} {'parser':>7} {'ms':>9} {'art/s':>9} {'peak_MB':>8}")
+    for n in args.sizes:
+        xml = make_batch(fixture, n)
+        for name in PARSERS:
+            seconds, count, peak_kb = measure(name, xml, args.repeat)
+            assert count == n, f"{name}: parsed {count} of {n}"
+            print(f"{n:>8} {len(xml) / 1e6:>7.1f} {name:>7} {seconds * 1000:>9.1f} "
+                  f"{n / seconds:>9.0f} {peak_kb / 1024:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
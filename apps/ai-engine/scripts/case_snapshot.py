@@ -0,0 +1,104 @@
+"""
+치험례 바이너리 스냅샷 변환/검증 스크립트
+
+all_cases_combined.json(원본) 옆에 all_cases_combined.cases.bin 을 만들고,
+원본과 일치하는지 확인한다. 서버도 로드 시 스냅샷이 없거나 낡았으면 스스로 만들고
+(데이터 디렉토리가 쓰기 가능할 때), 수집 워커는 승인 병합 직후 다시 만들지만,
+배포 이미지에 미리 넣어 두면 첫 기동부터 JSON 파싱 없이 mmap 으로 시작한다.
+
+사용:
+    cd apps/ai-engine
+    python scripts/case_snapshot.py build                  # data/ 원본 → 스냅샷
+    python scripts/case_snapshot.py check                  # 원본 지문 + payload 체크섬
+    python scripts/case_snapshot.py check --deep           # + 모든 케이스를 원본 JSON 과 비교
+    python scripts/case_snapshot.py build --source /tmp/c/all_cases_combined.json
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from app.services.case_corpus import CaseCorpus  # noqa: E402
+from app.services.case_snapshot import (  # noqa: E402
+    SnapshotError,
+    build_snapshot_file,
+    matches_source,
+    open_snapshot,
+    snapshot_path,
+    verify_payload,
+)
+
+
+def resolve(args) -> tuple:
+    source = args.source or CaseCorpus().resolve_source()
+    if source is None:
+        print("Error: 원본 케이스 파일이 없습니다.")
+        sys.exit(1)
+    return Path(source), Path(args.out) if args.out else snapshot_path(Path(source))
+
+
+def build(args) -> None:
+    source, path = resolve(args)
+    t0 = time.perf_counter()
+    store, header = build_snapshot_file(source, path)
+    print(f"스냅샷: {path} ({len(store)}건, {path.stat().st_size / 1e6:.1f}MB, "
+          f"{time.perf_counter() - t0:.2f}s)")
+    print(f"  원본 sha256 {header['source']['sha256']}")
+
+
+def check(args) -> None:
+    source, path = resolve(args)
+    if not path.exists():
+        print(f"Error: 스냅샷이 없습니다: {path}")
+        sys.exit(1)
+    try:
+        header = verify_payload(path)
+    except SnapshotError as e:
+        print(f"FAIL payload: {e}")
+        sys.exit(1)
+    print(f"OK   payload sha256 ({header['count']}건)")
+
+    if not matches_source(header, source):
+        print(f"FAIL 원본 불일치: {source.name} 이 스냅샷 이후 바뀌었습니다 — build 로 다시 만드세요.")
+        sys.exit(1)
+    print(f"OK   원본 지문 ({source.name})")
+
+    if args.deep:
+        t0 = time.perf_counter()
+        with open(source, "r", encoding="utf-8") as f:
+            cases = json.load(f)
+        json_seconds = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        store, _ = open_snapshot(path)
+        mmap_seconds = time.perf_counter() - t0
+        if len(store) != len(cases):
+            print(f"FAIL 케이스 수 {len(store)} != {len(cases)}")
+            sys.exit(1)
+        for i, (row, case) in enumerate(zip(store, cases)):
+            if row != case or list(row) != list(case):
+                print(f"FAIL 케이스 #{i} ({case.get('id')}) 불일치")
+                sys.exit(1)
+        print(f"OK   전체 케이스 일치 (json.load {json_seconds:.2f}s / mmap open {mmap_seconds * 1000:.1f}ms)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='치험례 바이너리 스냅샷 변환/검증')
+    parser.add_argument('command', choices=['build', 'check'])
+    parser.add_argument('--source', type=Path, default=None, help='원본 JSON (기본: data/ 통합 파일)')
+    parser.add_argument('--out', type=Path, default=None, help='스냅샷 경로 (기본: 원본 옆 .cases.bin)')
+    parser.add_argument('--deep', action='store_true', help='check: 모든 케이스를 원본과 비교')
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        build(args)
+    else:
+        check(args)
+
+
+if __name__ == "__main__":
+    main()
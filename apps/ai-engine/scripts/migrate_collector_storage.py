@@ -0,0 +1,92 @@
+"""
+수집기 저장소 이전 스크립트 (JSON 파일 / 세그먼트 로그 → SQLite 등)
+
+1. data/collector/ 의 이전 JSON 파일(pending_cases.json, collection_logs.json,
+   duplicates_archive.json, failed_extractions*.json, llm_metrics.json)을 대상 엔진으로
+   옮기고 .migrated 로 이름을 바꾼다.
+2. --from 엔진에 이미 쌓인 컬렉션(승인 로그 포함)을 대상 엔진으로 복사한 뒤 원본에서 지운다.
+   (코퍼스는 두 엔진의 승인 로그를 모두 읽으므로 남겨 두면 중복된다)
+
+서버/수집기를 멈춘 상태에서 실행하고, 이후 COLLECTOR_STORAGE_BACKEND 를 대상 엔진으로 설정한다.
+
+사용:
+    cd apps/ai-engine
+    python scripts/migrate_collector_storage.py --to sqlite              # JSON 파일 → SQLite
+    python scripts/migrate_collector_storage.py --from log --to sqlite   # + 세그먼트 로그 → SQLite
+    python scripts/migrate_collector_storage.py --from sqlite --to log --data-dir /srv/hanmed/data
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from app.services.collector.metrics import LLMMetrics  # noqa: E402
+from app.services.collector.storage.backend import BACKENDS, get_storage_backend  # noqa: E402
+from app.services.collector.storage.case_storage import CaseStorage  # noqa: E402
+from app.services.collector.storage.failed_storage import FailedExtractionStorage  # noqa: E402
+
+
+def move(source, target) -> int:
+    """source 컬렉션 → target (append), 옮긴 뒤 source 를 비운다."""
+    if source.keyed:
+        items = list(source.items())
+        target.put_many(items)
+    else:
+        items = source.values()
+        target.append_many(items)
+    target.sync()
+    source.drop_segments(source.seal())
+    return len(items)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='수집기 저장소 이전')
+    parser.add_argument('--to', choices=BACKENDS, required=True, help='대상 저장 엔진')
+    parser.add_argument('--from', dest='source', choices=BACKENDS, default=None,
+                        help='기존 저장 엔진 (이미 쌓인 컬렉션도 옮김)')
+    parser.add_argument('--data-dir', type=Path, default=ROOT / "data", help='데이터 디렉토리')
+    args = parser.parse_args()
+
+    if args.source == args.to:
+        print("Error: --from 과 --to 가 같습니다.")
+        sys.exit(1)
+
+    data_dir = args.data_dir
+    collector_dir = data_dir / "collector"
+
+    # 1) 이전 JSON 파일 — 각 저장소가 열 때 옮긴다
+    storage = CaseStorage(data_dir, backend=args.to)
+    failed = FailedExtractionStorage(collector_dir, backend=args.to)
+    metrics = LLMMetrics(collector_dir, backend=args.to)
+    metrics.get_summary()
+    print(f"JSON → {args.to}: 대기 {storage.pending_count()}건, "
+          f"실패 큐 {failed.get_stats()['pending_count']}건")
+
+    # 2) 기존 엔진의 컬렉션 (이름 → 이미 열린 대상 컬렉션)
+    if args.source:
+        source = get_storage_backend(collector_dir, args.source)
+        targets = {
+            "pending": storage.pending,
+            "collection_logs": storage.logs,
+            "duplicates": storage.duplicates,
+            "failed_extractions": failed.queue,
+            "failed_extractions_dead": failed.dead,
+            "llm_metrics": metrics._collection(),
+        }
+        for name, target in targets.items():
+            count = move(source.collection(name, keyed=target.keyed), target)
+            print(f"  {name}: {count}건")
+        count = move(source.approved(storage.combined_file), storage.approved)
+        print(f"  approved (통합 파일 미병합 승인): {count}건")
+        source.close()
+
+    storage.close()
+    failed.backend.close()
+    print(f"완료 — COLLECTOR_STORAGE_BACKEND={args.to} 로 설정하세요.")
+
+
+if __name__ == "__main__":
+    main()
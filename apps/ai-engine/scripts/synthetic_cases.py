@@ -0,0 +1,103 @@
+"""
+벤치마크용 합성 치험례 생성기.
+
+실데이터(all_cases_combined.json)와 같은 필드 구성을 흉내낸다.
+증상/처방/진단 어휘는 실제 분포처럼 소수 상위 항목에 몰리도록(Zipf 유사) 뽑는다.
+
+사용:
+    from synthetic_cases import generate_cases, generate_queries
+"""
+
+from __future__ import annotations
+
+import random
+from typing import Dict, List
+
+SYMPTOMS = [
+    "두통", "어지러움", "소화불량", "요통", "불면", "변비", "설사", "기침", "피로",
+    "구역감", "복통", "식욕부진", "수족냉증", "흉통", "심계", "불안", "우울", "이명",
+    "안면홍조", "한출", "도한", "口渴", "부종", "관절통", "견비통", "슬통", "요슬산연",
+    "월경통", "월경불순", "대하", "소변불리", "빈뇨", "야간뇨", "천식", "가래", "인후통",
+    "비색", "비염", "피부소양", "습진", "두드러기", "탈모", "구내염", "반신마비",
+    "언어장애", "구안와사", "손떨림", "건망", "식은땀", "상열감",
+]
+MODIFIERS = ["", "", "", "심한 ", "만성 ", "간헐적 ", "야간 ", "급성 "]
+FORMULAS = [
+    "보중익기탕", "육군자탕", "사군자탕", "사물탕", "팔물탕", "십전대보탕", "귀비탕",
+    "육미지황탕", "팔미지황탕", "소요산", "가미소요산", "시호소간탕", "혈부축어탕",
+    "갈근탕", "마황탕", "계지탕", "반하후박탕", "오령산", "평위산", "이진탕",
+    "반하백출천마탕", "소속명탕", "온담탕", "향사육군자탕", "곽향정기산", "소청룡탕",
+    "보허탕", "독활기생탕", "방풍통성산", "청상견통탕",
+]
+DIAGNOSES = [
+    "기허", "혈허", "음허", "양허", "간기울결", "비위허약", "담음", "어혈", "습열",
+    "풍한", "풍열", "신허", "심비양허", "간양상항", "담음두통", "중풍", "허로",
+]
+CONSTITUTIONS = ["소음인", "태음인", "소양인", "태양인", None, None]
+GENDERS = ["M", "F", None]
+RESULTS = ["완치", "호전", "개선되었다", "변화 없음", "증상 소실", "", ""]
+
+
+def _zipf_choice(rng: random.Random, items: List, skew: float = 1.1):
+    weights = [1.0 / ((i + 1) ** skew) for i in range(len(items))]
+    return rng.choices(items, weights=weights, k=1)[0]
+
+
+def generate_cases(n: int, seed: int = 42) -> List[Dict]:
+    rng = random.Random(seed)
+    cases: List[Dict] = []
+    for i in range(n):
+        k = rng.randint(2, 6)
+        # dict 로 중복 제거 — set 은 PYTHONHASHSEED 에 따라 순서가 달라 실행마다 결과가 바뀐다
+        symptoms = list(dict.fromkeys(
+            _zipf_choice(rng, MODIFIERS, 0.5) + _zipf_choice(rng, SYMPTOMS)
+            for _ in range(k)
+        ))
+        chief = symptoms[0]
+        formula = _zipf_choice(rng, FORMULAS)
+        diagnosis = _zipf_choice(rng, DIAGNOSES) if rng.random() < 0.7 else ""
+        age = rng.randint(3, 90) if rng.random() < 0.8 else None
+        result = rng.choice(RESULTS)
+        title = f"{chief}, {symptoms[-1]} 치험례 {i}"
+        full_text = (
+            f"주소증: {chief}\n증상: {', '.join(symptoms)}\n진단: {diagnosis}\n"
+            f"처방: {formula}\n결과: {result}\n" + "경과 관찰 기록. " * rng.randint(10, 60)
+        )
+        cases.append({
+            "id": f"syn-{i:07d}",
+            "title": title,
+            "formula_name": formula,
+            "formula_hanja": "",
+            "chief_complaint": chief,
+            "symptoms": symptoms,
+            "symptom_keywords": [s.split()[-1] for s in symptoms],
+            "diagnosis": diagnosis,
+            "differentiation": "",
+            "patient_age": age,
+            "patient_gender": rng.choice(GENDERS),
+            "patient_constitution": rng.choice(CONSTITUTIONS),
+            "treatment_formula": formula,
+            "result": result,
+            "full_text": full_text,
+            "data_source": "synthetic",
+            "is_real_case": rng.random() < 0.3,
+        })
+    return cases
+
+
+def generate_queries(n: int, seed: int = 7) -> List[Dict]:
+    """CaseSearchService._build_query_dict 형식의 질의."""
+    rng = random.Random(seed)
+    queries = []
+    for _ in range(n):
+        symptoms = [_zipf_choice(rng, SYMPTOMS, 0.8) for _ in range(rng.randint(1, 3))]
+        queries.append({
+            "chief_complaint": symptoms[0],
+            "symptoms": symptoms,
+            "diagnosis": _zipf_choice(rng, DIAGNOSES) if rng.random() < 0.3 else "",
+            "formula": "",
+            "patient_age": rng.randint(10, 80),
+            "patient_gender": rng.choice(["M", "F"]),
+            "patient_constitution": rng.choice(CONSTITUTIONS),
+        })
+    return queries
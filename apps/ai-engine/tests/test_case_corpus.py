@@ -0,0 +1,88 @@
+"""
+CaseCorpus — 1회 로드 / 인덱스 / mtime 기반 교체 테스트.
+"""
+
+import json
+import os
+
+from app.services.case_corpus import CaseCorpus, age_band
+
+
+CASES = [
+    {"id": "c1", "formula_name": "보중익기탕", "symptoms": ["피로", " 식욕부진 "],
+     "patient_constitution": "소음인", "diagnosis": "기허", "patient_age": 45, "is_real_case": True},
+    {"id": "c2", "formula_name": "보중익기탕", "symptoms": ["피로"],
+     "patient_constitution": "태음인", "diagnosis": "", "patient_age": None},
+    {"id": "c3", "formula_name": "", "symptoms": [], "patient_age": 8},
+]
+
+
+def _write(path, cases):
+    path.write_text(json.dumps(cases, ensure_ascii=False), encoding="utf-8")
+
+
+def test_indexes_built_once(tmp_path):
+    _write(tmp_path / "all_cases_combined.json", CASES)
+    corpus = CaseCorpus(tmp_path)
+    snap = corpus.snapshot()
+
+    assert len(snap) == 3
+    assert snap.real_count == 1
+    assert snap.by_formula == {"보중익기탕": [0, 1]}
+    assert snap.by_symptom["피로"] == [0, 1]
+    assert snap.by_symptom["식욕부진"] == [0]
+    assert snap.by_constitution == {"소음인": [0], "태음인": [1]}
+    assert snap.by_diagnosis == {"기허": [0]}
+    assert snap.by_age_band["40-59"] == [0]
+    assert snap.by_age_band["0-12"] == [2]
+    assert snap.by_age_band["미상"] == [1]
+    # 같은 스냅샷 재사용 (다시 파싱하지 않음)
+    assert corpus.snapshot() is snap
+
+
+def test_fallback_to_extracted_cases(tmp_path):
+    _write(tmp_path / "extracted_cases.json", CASES[:1])
+    snap = CaseCorpus(tmp_path).snapshot()
+    assert snap.source.name == "extracted_cases.json"
+    assert len(snap) == 1
+
+
+def test_mtime_change_swaps_snapshot(tmp_path):
+    path = tmp_path / "all_cases_combined.json"
+    _write(path, CASES[:1])
+    corpus = CaseCorpus(tmp_path)
+    corpus.RELOAD_CHECK_INTERVAL = 0
+    old = corpus.snapshot()
+
+    _write(path, CASES)
+    st = path.stat()
+    os.utime(path, (st.st_atime, st.st_mtime + 10))
+
+    # 리로드는 백그라운드 — 끝날 때까지 기존 스냅샷으로 응답
+    assert corpus.snapshot() is old
+    new = corpus.wait_for_refresh()
+    assert corpus.snapshot() is new
+    assert new is not old
+    assert len(new) == 3 and new.version > old.version
+    # 이전 스냅샷은 그대로 (읽는 쪽이 들고 있어도 안전)
+    assert len(old) == 1
+
+
+def test_broken_reload_keeps_previous(tmp_path):
+    path = tmp_path / "all_cases_combined.json"
+    _write(path, CASES)
+    corpus = CaseCorpus(tmp_path)
+    snap = corpus.snapshot()
+
+    path.write_text("{not json", encoding="utf-8")
+    assert corpus.reload() is snap
+
+
+def test_age_band():
+    assert age_band(None) == "미상"
+    assert age_band(0) == "미상"
+    assert age_band(12) == "0-12"
+    assert age_band(19) == "13-19"
+    assert age_band(39) == "20-39"
+    assert age_band(59) == "40-59"
+    assert age_band(60) == "60+"
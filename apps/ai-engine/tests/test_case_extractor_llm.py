@@ -0,0 +1,106 @@
+"""
+CaseExtractor LLM 폴백 — AsyncOpenAI 경로, 동시성 슬롯, 배치 요청/응답 분배.
+"""
+
+import asyncio
+import json
+import re
+from types import SimpleNamespace
+
+import pytest
+
+from app.core.concurrency import LLMConcurrencyController
+from app.services.collector.extractors import case_extractor
+from app.services.collector.extractors.case_extractor import CaseExtractor, LLMBatcher
+
+
+def _article(n, length=400):
+    text = f"논문 {n} 본문. 환자는 소화불량으로 내원하였다. " + "경과 관찰 기록. " * (length // 10)
+    return text[:length], {"title": f"논문 {n}", "url": f"u{n}", "source": "pubmed"}
+
+
+def _raw_case(n):
+    return {"chief_complaint": f"소화불량 {n}", "formula_name": "반하사심탕", "result": "호전", "confidence": 0.8}
+
+
+class FakeCompletions:
+    def __init__(self):
+        self.prompts = []
+        self.active = 0
+        self.peak = 0
+
+    async def create(self, model, max_tokens, temperature, messages, response_format):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(0.02)
+            prompt = messages[1]["content"]
+            self.prompts.append(prompt)
+            numbers = [int(n) for n in re.findall(r"<<<논문 (\d+)>>>", prompt)]
+            if numbers:
+                # 2번 논문은 케이스 없음 — 응답 순서도 섞는다
+                body = {"articles": [{"article": n, "cases": [] if n == 2 else [_raw_case(n)]} for n in reversed(numbers)]}
+            else:
+                body = {"cases": [_raw_case(0)]}
+            return SimpleNamespace(
+                choices=[SimpleNamespace(message=SimpleNamespace(content=json.dumps(body, ensure_ascii=False)))],
+                usage=SimpleNamespace(prompt_tokens=100 * (len(numbers) or 1), completion_tokens=10),
+            )
+        finally:
+            self.active -= 1
+
+
+@pytest.fixture
+def extractor(monkeypatch):
+    calls = []
+    monkeypatch.setattr(case_extractor, "llm_metrics", SimpleNamespace(record_call=lambda **kw: calls.append(kw)))
+    controller = LLMConcurrencyController(max_concurrency=1)
+    monkeypatch.setattr(case_extractor, "get_llm_controller", lambda: controller)
+    extractor = CaseExtractor(use_llm_fallback=False)
+    completions = FakeCompletions()
+    extractor._llm_client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    extractor.metrics_calls = calls
+    extractor.completions = completions
+    return extractor
+
+
+async def test_llm_fallback_is_async_and_uses_concurrency_slot(extractor):
+    text, info = _article(0)
+    assert extractor.should_use_llm(text)
+    results = await asyncio.gather(*(extractor.extract_with_llm(text, info) for _ in range(3)))
+    assert [len(cases) for cases in results] == [1, 1, 1]
+    assert results[0][0].formula_name == "반하사심탕" and results[0][0].data_source == "online_collection_llm"
+    assert extractor.completions.peak == 1  # 슬롯 1개 — 호출이 겹치지 않는다
+    assert [c["success"] for c in extractor.metrics_calls] == [True, True, True]
+
+
+async def test_batcher_packs_short_articles_into_one_request(extractor):
+    batcher = LLMBatcher(extractor, batch_size=3, max_wait=0.05)
+    articles = [_article(n) for n in range(1, 5)] + [_article(9, length=case_extractor.LLM_BATCH_ARTICLE_CHARS + 100)]
+
+    results = await asyncio.gather(*(batcher.extract(text, info) for text, info in articles))
+
+    # 3편 묶음 + 타이머로 보낸 1편 + 긴 논문 단건
+    assert len(extractor.completions.prompts) == 3
+    batched = [p for p in extractor.completions.prompts if "<<<논문 1>>>" in p]
+    assert len(batched) == 1 and "<<<논문 3 끝>>>" in batched[0] and "<<<논문 4>>>" not in batched[0]
+    assert [[c.chief_complaint for c in cases] for cases in results] == [
+        ["소화불량 1"], [], ["소화불량 3"], ["소화불량 0"], ["소화불량 0"],
+    ]
+    assert results[0][0].source_url == "u1" and results[2][0].source_url == "u3"
+    # 묶음 요청은 메트릭에 1건 (케이스 수는 묶음 합계)
+    assert sorted(c["cases_extracted"] for c in extractor.metrics_calls) == [1, 1, 2]
+
+
+async def test_llm_failure_is_recorded_and_returns_empty(extractor):
+    async def boom(**kwargs):
+        raise RuntimeError("rate limited")
+
+    extractor.completions.create = boom
+    batcher = LLMBatcher(extractor, batch_size=2, max_wait=0.01)
+    results = await asyncio.gather(*(batcher.extract(*_article(n)) for n in (1, 2)))
+    assert results == [[], []]
+    assert extractor.metrics_calls == [{
+        "success": False, "prompt_tokens": 0, "completion_tokens": 0, "cases_extracted": 0,
+        "error": "rate limited", "model": extractor._llm_model(),
+    }]
@@ -0,0 +1,110 @@
+"""
+증분 벡터 색인기 / 임베딩 저장소 — 재사용·재개·compact 테스트.
+"""
+
+import json
+
+import numpy as np
+
+from app.services.case_indexer import CaseIndexer, _encode_batch
+from app.services.embedding_store import EmbeddingStore, encoder_fingerprint
+from app.services.local_encoder import HashingEncoder, case_embedding_text
+from app.services.vector_index import IVFFlatIndex
+from app.services.vector_service import VectorService
+
+
+def _cases(n, start=0, suffix=""):
+    return [
+        {"id": f"c{i}", "title": f"두통 치험례 {i}{suffix}", "chief_complaint": "두통",
+         "symptoms": ["두통", "어지러움" if i % 2 else "요통"], "formula_name": "반하백출천마탕"}
+        for i in range(start, start + n)
+    ]
+
+
+def _indexer(tmp_path, **kwargs):
+    kwargs.setdefault("concurrency", 1)
+    return CaseIndexer(store_dir=tmp_path / "store", index_dir=tmp_path / "index", dim=64, **kwargs)
+
+
+def test_incremental_run_embeds_only_new_and_changed(tmp_path):
+    cases = _cases(120)
+    first = _indexer(tmp_path, batch_size=32, concurrency=2).run(cases)
+    assert first["embedded"] == 120 and first["retrained"]
+
+    again = _indexer(tmp_path).run(cases)
+    assert again["embedded"] == 0 and again["reused"] == 120 and not again["retrained"]
+
+    changed = cases[:-1] + _cases(1, start=119, suffix=" (수정)") + _cases(50, start=120)
+    third = _indexer(tmp_path).run(changed)
+    assert third["embedded"] == 51
+    assert third["total"] == 170
+
+    index = IVFFlatIndex.load(tmp_path / "index")
+    assert sorted(index.ids.tolist()) == sorted(c["id"] for c in changed)
+
+    # 저장된 벡터는 같은 인코더 설정으로 새로 임베딩한 것과 같다
+    store = EmbeddingStore(tmp_path / "store").open()
+    encoder = HashingEncoder(dim=64, idf=np.asarray(store.encoder["idf"], np.float32))
+    case = changed[119]
+    stored = store.vectors()[store.entries[case["id"]][1]]
+    assert np.allclose(stored, encoder.encode_one(case_embedding_text(case)))
+
+
+def test_store_recovers_from_crash_mid_batch(tmp_path):
+    store = EmbeddingStore(tmp_path / "store").reset(4, {"type": "hashing"})
+    store.append([("a", "h1"), ("b", "h2")], np.ones((2, 4), np.float32))
+    # 벡터만 쓰고 manifest 를 다 쓰기 전에 죽은 상황
+    with open(store._vectors_path(), "ab") as f:
+        f.write(np.full((3, 4), 7, np.float32).tobytes())
+    with open(store._manifest_path(), "a", encoding="utf-8") as f:
+        f.write('{"id": "c", "ha')
+
+    reopened = EmbeddingStore(tmp_path / "store").open()
+    assert reopened.rows == 2
+    assert set(reopened.entries) == {"a", "b"}
+    reopened.append([("c", "h3")], np.full((1, 4), 3, np.float32))
+
+    again = EmbeddingStore(tmp_path / "store").open()
+    assert again.entries["c"] == ("h3", 2)
+    assert again.vectors()[2].tolist() == [3, 3, 3, 3]
+
+
+def test_compact_switches_generation(tmp_path):
+    store = EmbeddingStore(tmp_path / "store").reset(4, {"type": "hashing"})
+    for i in range(4):
+        store.append([("a", f"h{i}")], np.full((1, 4), i, np.float32))
+    store.append([("b", "x")], np.full((1, 4), 9, np.float32))
+    assert store.garbage_ratio() == 0.6
+
+    store.compact(["b", "a"])
+    reopened = EmbeddingStore(tmp_path / "store").open()
+    assert reopened.rows == 2
+    assert reopened.vectors()[reopened.entries["a"][1]].tolist() == [3, 3, 3, 3]
+    assert reopened.vectors()[reopened.entries["b"][1]].tolist() == [9, 9, 9, 9]
+    assert sorted(p.name for p in (tmp_path / "store").iterdir()) == [
+        "manifest.2.jsonl", "store.json", "vectors.2.f32"]
+
+
+def test_vector_service_picks_up_rebuilt_index(tmp_path, monkeypatch):
+    from app.services import vector_service as module
+
+    monkeypatch.setattr(module, "RELOAD_CHECK_INTERVAL", 0)
+    _indexer(tmp_path).run(_cases(30))
+    service = VectorService(index_dir=tmp_path / "index")
+    assert len(service.index) == 30
+
+    _indexer(tmp_path).run(_cases(40))
+    meta = json.loads((tmp_path / "index" / "meta.json").read_text(encoding="utf-8"))
+    assert meta["count"] == 40
+    assert len(service.index) == 40
+
+
+def test_worker_encoder_is_keyed_on_full_idf():
+    # 앞 8개 IDF 가 같은 두 저장소 — 캐시된 인코더를 잘못 재사용하면 안 된다
+    texts = ["두통 어지러움 요통"]
+    first = [1.0] * 64
+    second = [1.0] * 8 + [3.0] * 56
+    a = _encode_batch(encoder_fingerprint({"dim": 64, "idf": first}), 64, first, texts)
+    b = _encode_batch(encoder_fingerprint({"dim": 64, "idf": second}), 64, second, texts)
+    assert np.array_equal(a, HashingEncoder(dim=64, idf=np.asarray(first, np.float32)).encode(texts))
+    assert np.array_equal(b, HashingEncoder(dim=64, idf=np.asarray(second, np.float32)).encode(texts))
@@ -0,0 +1,121 @@
+"""
+로컬 검색 역색인 — 기존 선형 스캔 후보 판정과의 동등성 테스트.
+"""
+
+import random
+
+from app.services.case_search_index import CaseSearchIndex
+from app.services.hybrid_scorer import HybridScorer
+from app.services.text_index import NgramIndex
+
+WORDS = ["두통", "어지러움", "소화불량", "요통", "불면", "머리아픔", "현훈", "기침", "a", "Headache"]
+
+
+def _linear(cases, chief, symptoms):
+    """기존 CaseSearchService._search_local 의 후보 판정"""
+    out = []
+    qc = chief.lower()
+    qss = [s.lower() for s in symptoms]
+    for i, case in enumerate(cases):
+        cc = case.get("chief_complaint", "").lower()
+        ct = case.get("title", "").lower()
+        cs = [s.lower() for s in case.get("symptoms", [])]
+        hit = bool(qc) and (qc in cc or qc in ct)
+        hit = hit or any(any(q in s for s in cs) for q in qss)
+        hit = hit or (bool(qc) and any(w in ct for w in qc.split()))
+        if hit:
+            out.append(i)
+    return out
+
+
+def _cases(n=300, seed=1):
+    rng = random.Random(seed)
+    cases = []
+    for i in range(n):
+        syms = [rng.choice(WORDS) + rng.choice(["", " 심함", "증"]) for _ in range(rng.randint(0, 4))]
+        cases.append({
+            "chief_complaint": rng.choice(WORDS + [""]),
+            "title": " ".join(rng.sample(WORDS, 2)) + f" {i}",
+            "symptoms": syms,
+            "symptom_keywords": [rng.choice(WORDS)] if rng.random() < 0.3 else [],
+        })
+    return cases
+
+
+def test_candidates_superset_of_linear_scan():
+    scorer = HybridScorer()
+    cases = _cases()
+    index = CaseSearchIndex.build(cases, scorer.normalize_symptom)
+    rng = random.Random(2)
+    for _ in range(200):
+        chief = rng.choice(WORDS + ["두통 요통", "통", "어지", ""])
+        symptoms = rng.sample(WORDS, rng.randint(0, 2))
+        linear = _linear(cases, chief, symptoms)
+        got = index.candidates(chief, symptoms, scorer.normalize_symptom).tolist()
+        assert got == sorted(got)
+        assert set(linear) <= set(got)
+        # 추가 후보는 정규화 증상 정확 일치로만 들어와야 한다
+        extra = set(got) - set(linear)
+        for i in extra:
+            keys = {scorer.normalize_symptom(s).lower()
+                    for s in cases[i]["symptoms"] + cases[i]["symptom_keywords"]}
+            assert any(scorer.normalize_symptom(q).lower() in keys for q in symptoms)
+
+
+def test_synonym_only_match_is_candidate():
+    scorer = HybridScorer()
+    cases = [{"chief_complaint": "", "title": "", "symptoms": ["머리아픔"]}]
+    index = CaseSearchIndex.build(cases, scorer.normalize_symptom)
+    # '편두통' 은 부분 문자열로는 안 걸리지만 두 표현 모두 '두통' 으로 정규화된다
+    assert index.candidates("", ["편두통"], scorer.normalize_symptom).tolist() == [0]
+
+
+def test_ngram_index_substring_semantics():
+    idx = NgramIndex(2)
+    idx.add(0, ["반신마비", "언어장애"])
+    idx.add(1, "마비감")
+    idx.add(2, "반신마비")
+    idx.freeze()
+    assert len(idx) == 3  # '반신마비' 는 term 하나로 공유
+    assert idx.search("마비").tolist() == [0, 1, 2]
+    assert idx.search("신마비").tolist() == [0, 2]
+    assert idx.search("마").tolist() == [0, 1, 2]
+    # term 경계를 넘는 부분 문자열은 매칭되지 않는다
+    assert idx.search("마비언어").tolist() == []
+    assert idx.search("없음").tolist() == []
+    assert idx.exact("마비감").tolist() == [1]
+
+
+def test_extend_matches_full_rebuild_and_keeps_base():
+    scorer = HybridScorer()
+    cases = _cases(400, seed=3)
+    base = CaseSearchIndex.build(cases[:300], scorer.normalize_symptom)
+    before = base.candidates("두통", ["현훈"], scorer.normalize_symptom).tolist()
+    extended = base.extend(cases[300:], 300, scorer.normalize_symptom)
+    rebuilt = CaseSearchIndex.build(cases, scorer.normalize_symptom)
+
+    rng = random.Random(4)
+    for _ in range(200):
+        chief = rng.choice(WORDS + ["두통 요통", "통", "어지", "새말", ""])
+        symptoms = rng.sample(WORDS, rng.randint(0, 2))
+        assert (extended.candidates(chief, symptoms, scorer.normalize_symptom).tolist()
+                == rebuilt.candidates(chief, symptoms, scorer.normalize_symptom).tolist())
+    assert extended.normalized_symptoms.keys() == rebuilt.normalized_symptoms.keys()
+    for key, docs in rebuilt.normalized_symptoms.items():
+        assert extended.normalized_symptoms[key].tolist() == docs.tolist()
+    # 기존 색인은 그대로 (이전 스냅샷을 들고 있는 요청)
+    assert base.size == 300
+    assert base.candidates("두통", ["현훈"], scorer.normalize_symptom).tolist() == before
+
+
+def test_ngram_index_extend_adds_new_terms_and_docs():
+    idx = NgramIndex(2)
+    idx.add(0, ["반신마비", "언어장애"])
+    idx.add(1, "마비감")
+    idx.freeze()
+    grown = idx.extend([(2, ["반신마비", "구안와사"]), (4, "마비감"), (4, "마비감")])
+    assert grown.search("마비").tolist() == [0, 1, 2, 4]
+    assert grown.search("와사").tolist() == [2]
+    assert grown.exact("마비감").tolist() == [1, 4]
+    assert grown.doc_count == 5 and len(grown) == 4
+    assert idx.search("마비").tolist() == [0, 1] and idx.search("와사").tolist() == []
@@ -0,0 +1,66 @@
+"""
+상위 k 선택 + CaseSearchService 로컬 검색 정렬 테스트.
+"""
+
+import json
+import random
+
+import numpy as np
+
+from app.services import case_search_service as module
+from app.services.case_corpus import CaseCorpus
+from app.services.case_search_service import (
+    CaseSearchRequest,
+    CaseSearchService,
+    PatientInfo,
+    Symptom,
+)
+from app.services.topk import TopK, top_k_indices
+
+
+def test_top_k_matches_stable_sort():
+    rng = random.Random(0)
+    for _ in range(200):
+        scores = [rng.choice([10.0, 20.5, 33.3, 50.0, 71.2]) for _ in range(rng.randint(0, 60))]
+        k = rng.randint(0, 15)
+        expected = sorted(enumerate(scores), key=lambda x: x[1], reverse=True)[:k]
+        assert top_k_indices(np.array(scores), k) == [(s, i) for i, s in expected]
+
+
+def test_top_k_min_score_and_streaming():
+    scores = [5.0, 40.0, 39.9, 40.0, 80.0]
+    assert top_k_indices(np.array(scores), 10, min_score=40.0) == [(80.0, 4), (40.0, 1), (40.0, 3)]
+
+    selector = TopK(2)
+    for i, s in enumerate(scores):
+        selector.push(s, i)
+    assert selector.results() == [(80.0, 4), (40.0, 1)]
+
+
+async def test_local_search_is_not_biased_by_file_order(tmp_path, monkeypatch):
+    # 부분 일치 케이스 40건 뒤에 정확 일치 케이스가 있어도 상위로 와야 한다
+    cases = [
+        {"id": f"weak-{i}", "title": f"치험례 {i}", "chief_complaint": "만성 두통",
+         "symptoms": ["두통"], "patient_age": 70}
+        for i in range(40)
+    ]
+    cases.append({"id": "best", "title": "두통 치험례", "chief_complaint": "두통",
+                  "symptoms": ["두통", "어지러움"], "patient_age": 52,
+                  "patient_gender": "F", "patient_constitution": "태음인"})
+    (tmp_path / "all_cases_combined.json").write_text(json.dumps(cases, ensure_ascii=False), encoding="utf-8")
+    corpus = CaseCorpus(tmp_path)
+    monkeypatch.setattr(module, "get_case_corpus", lambda: corpus)
+
+    service = CaseSearchService()
+    request = CaseSearchRequest(
+        patient_info=PatientInfo(age=50, gender="F", constitution="태음인"),
+        chief_complaint="두통",
+        symptoms=[Symptom(name="두통"), Symptom(name="현훈")],
+        options={"top_k": 3},
+    )
+
+    response = await service.search(request)
+    ids = [r.case_id for r in response.results]
+    assert ids == ["best", "weak-0", "weak-1"]
+    assert response.total_found == 3
+    assert response.results[0].match_reasons  # 승자만 근거 포함해 materialize
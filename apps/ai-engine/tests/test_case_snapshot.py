@@ -0,0 +1,113 @@
+"""
+치험례 바이너리 스냅샷 — 왕복 일치 / mmap 로드 / 원본 변경·손상 시 재생성 테스트.
+"""
+
+import json
+import os
+
+import pytest
+
+from app.services import case_snapshot
+from app.services.case_corpus import CaseCorpus
+from app.services.case_snapshot import (
+    SnapshotError,
+    open_snapshot,
+    snapshot_path,
+    source_fingerprint,
+    verify_payload,
+    write_snapshot,
+)
+from app.services.case_store import compact_cases
+from app.services.collector.storage.case_storage import CaseStorage
+
+CASES = [
+    {"id": "c1", "formula_name": "보중익기탕", "symptoms": ["피로", "식욕부진"], "patient_age": 45,
+     "is_real_case": True, "medications": [{"name": "황기", "amount": "6g"}], "full_text": "원문 一 text"},
+    {"formula_name": "보중익기탕", "id": "c2", "symptoms": [], "patient_age": None, "is_real_case": 1},
+    {"id": "c3", "patient_age": 1.5, "symptoms": ["피로", 3], "progress": "서술형"},
+]
+
+
+def _write(path, cases):
+    path.write_text(json.dumps(cases, ensure_ascii=False, indent=2), encoding="utf-8")
+
+
+def test_roundtrip_through_mmap(tmp_path):
+    source = tmp_path / "all_cases_combined.json"
+    _write(source, CASES)
+    path = tmp_path / "cases.bin"
+    write_snapshot(compact_cases(CASES, block_size=2), path, source_fingerprint(source))
+
+    store, header = open_snapshot(path)
+    assert header["count"] == 3 and len(store.blocks) == 2
+    for row, case in zip(store, CASES):
+        assert row == case and list(row) == list(case)
+    assert all(isinstance(b.shape_codes, memoryview) for b in store.blocks)
+    assert verify_payload(path)["source"]["sha256"] == source_fingerprint(source)["sha256"]
+
+    data = bytearray(path.read_bytes())
+    data[-1] ^= 0xFF
+    path.write_bytes(bytes(data))
+    with pytest.raises(SnapshotError):
+        verify_payload(path)
+
+
+def test_corpus_uses_snapshot_and_rebuilds_when_stale(tmp_path, monkeypatch):
+    source = tmp_path / "all_cases_combined.json"
+    _write(source, CASES)
+    first = CaseCorpus(tmp_path).snapshot()
+    assert snapshot_path(source).exists()
+
+    parse = case_snapshot.load_case_store
+    monkeypatch.setattr(case_snapshot, "load_case_store", lambda p: (_ for _ in ()).throw(AssertionError("parsed")))
+    second = CaseCorpus(tmp_path).snapshot()
+    assert list(second.cases) == list(first.cases) == CASES
+    assert second.by_formula == {"보중익기탕": [0, 1]}
+
+    # 배포 복사 등으로 mtime 만 바뀌면 내용 해시로 그대로 사용
+    st = source.stat()
+    os.utime(source, (st.st_atime, st.st_mtime + 10))
+    assert len(CaseCorpus(tmp_path).snapshot()) == 3
+
+    # 원본이 바뀌면 다시 파싱하고 스냅샷도 새로 쓴다
+    monkeypatch.setattr(case_snapshot, "load_case_store", parse)
+    _write(source, CASES[:2])
+    assert len(CaseCorpus(tmp_path).snapshot()) == 2
+    store, header = open_snapshot(snapshot_path(source))
+    assert header["count"] == 2 and list(store) == CASES[:2]
+
+    # 손상된 스냅샷은 무시하고 재생성
+    snapshot_path(source).write_bytes(b"garbage")
+    assert len(CaseCorpus(tmp_path).snapshot()) == 2
+    assert open_snapshot(snapshot_path(source))[1]["count"] == 2
+
+
+def test_fold_rebuilds_snapshot_for_read_only_readers(tmp_path, monkeypatch):
+    source = tmp_path / "all_cases_combined.json"
+    _write(source, CASES)
+    monkeypatch.setattr("app.services.collector.storage.case_storage.get_case_corpus", lambda: CaseCorpus(tmp_path))
+    storage = CaseStorage(data_dir=tmp_path, backend="sqlite")
+    storage.pending.put("c4", {"id": "c4", "formula_name": "소시호탕"})
+    storage.approve_cases(["c4"])
+    storage.FOLD_THRESHOLD = 1
+    storage.compact()
+    storage.close()
+
+    # 병합한 쪽(수집 리더)이 새 원본 지문으로 스냅샷을 다시 썼다
+    store, header = open_snapshot(snapshot_path(source))
+    assert header["count"] == 4 and list(store)[-1]["id"] == "c4"
+    assert header["source"]["sha256"] == source_fingerprint(source)["sha256"]
+
+    # 읽기 전용으로 마운트한 API: 쓰기를 시도하지 않고 스냅샷을 연다
+    monkeypatch.setattr(case_snapshot.os, "access", lambda path, mode: False)
+    monkeypatch.setattr(case_snapshot, "write_snapshot", lambda *a: (_ for _ in ()).throw(AssertionError("written")))
+    monkeypatch.setattr(case_snapshot, "load_case_store", lambda p: (_ for _ in ()).throw(AssertionError("parsed")))
+    assert len(case_snapshot.load_cases(source)) == 4
+
+    # 스냅샷이 낡았으면 파싱만 한다
+    _write(source, CASES)
+    monkeypatch.undo()
+    monkeypatch.setattr(case_snapshot.os, "access", lambda path, mode: False)
+    monkeypatch.setattr(case_snapshot, "write_snapshot", lambda *a: (_ for _ in ()).throw(AssertionError("written")))
+    assert list(case_snapshot.load_cases(source)) == CASES
+    assert open_snapshot(snapshot_path(source))[1]["count"] == 4
@@ -0,0 +1,140 @@
+"""
+사전 집계 통계 엔진 — 기존 Counter 계산과의 일치 + 승인 시 증분 반영 테스트.
+"""
+
+import json
+import random
+from collections import Counter
+
+from app.api.v1 import statistics as module
+from app.services.case_corpus import CaseCorpus
+from app.services.case_stats import CaseStats, is_positive_result
+from app.services.collector.storage.case_storage import CaseStorage
+from app.services.formula_index import FORMULA_ALIASES, NameIndex
+
+FORMULAS = ["소시호탕", "대시호탕", "시호계지탕", "반하사심탕", "사상", "을", "보중익기탕", ""]
+SYMPTOMS = ["두통", "요통", "불면", "식욕부진", "어지러움", "구갈", "변비"]
+DIAGNOSES = ["간기울결", "비위허약", "", "소양병"]
+RESULTS = ["", "2주 후 두통이 완전히 소실되었다", "변화 없음 — 경과 관찰 필요함", "호전", "불면이 개선되어 숙면을 취함"]
+
+
+def _random_cases(n, seed=0, start=0):
+    rng = random.Random(seed)
+    return [
+        {
+            "id": f"c{i}",
+            "formula_name": rng.choice(FORMULAS),
+            "symptoms": rng.sample(SYMPTOMS, rng.randint(0, 4)),
+            "diagnosis": rng.choice(DIAGNOSES),
+            "patient_age": rng.choice([None, 0, 8, 16, 35, 47, 72]),
+            "patient_gender": rng.choice(["male", "female", "", None]),
+            "patient_constitution": rng.choice(["소양인", "태음인", "", None]),
+            "result": rng.choice(RESULTS),
+        }
+        for i in range(start, start + n)
+    ]
+
+
+def _expected_formula(cases, name):
+    """기존 /formula/{name} 계산"""
+    matched = [c for c in cases if c.get("formula_name") and name.lower() in c["formula_name"].lower()]
+    ages = [c["patient_age"] for c in matched if c.get("patient_age")]
+    return {
+        "case_count": len(matched),
+        "top_symptoms": Counter(s for c in matched for s in c["symptoms"]).most_common(10),
+        "top_diagnoses": Counter(c["diagnosis"] for c in matched if c["diagnosis"]).most_common(5),
+        "constitution_distribution": dict(Counter(c["patient_constitution"] or "미상" for c in matched)),
+        "gender_ratio": dict(Counter(c["patient_gender"] or "미상" for c in matched)),
+        "avg_age": sum(ages) / len(ages) if ages else None,
+    }
+
+
+def _corpus(tmp_path, cases):
+    (tmp_path / "all_cases_combined.json").write_text(json.dumps(cases, ensure_ascii=False), encoding="utf-8")
+    return CaseCorpus(data_dir=tmp_path)
+
+
+def test_formula_stats_match_counter_computation():
+    cases = _random_cases(400)
+    stats = CaseStats.build(cases)
+    index = NameIndex(stats.formulas, FORMULA_ALIASES)
+    for name in ["시호", "소시호탕", "탕", "사심", "없는처방"]:
+        agg = stats.formula_stats(index.containing(name))
+        expected = _expected_formula(cases, name)
+        if not expected["case_count"]:
+            assert agg is None
+            continue
+        for key, value in expected.items():
+            assert agg[key] == value, (name, key)
+        # dict 순서(첫 등장 순)까지 같다
+        assert list(agg["constitution_distribution"]) == list(expected["constitution_distribution"])
+
+        with_result = [c for c in cases if c["formula_name"] and name in c["formula_name"] and c["result"]]
+        eff = stats.effectiveness(index.containing(name))
+        assert eff["total_cases_with_result"] == len(with_result)
+        assert eff["positive_outcomes"] == sum(is_positive_result(c["result"]) for c in with_result)
+        assert eff["sample_results"] == [c["result"][:200] for c in with_result if len(c["result"]) > 10][:5]
+
+
+def test_global_histograms_match_counter_order():
+    cases = _random_cases(300, seed=3)
+    stats = CaseStats.build(cases)
+    assert stats.symptoms.most_common(5) == Counter(s for c in cases for s in c["symptoms"]).most_common(5)
+    formulas = Counter(c["formula_name"] for c in cases if len(c["formula_name"]) >= 2 and c["formula_name"] != "사상")
+    assert stats.formula_counts.most_common() == formulas.most_common()
+    for n in (1, 40, 60, 1000):
+        assert stats.formula_counts.count_at_least(n) == sum(1 for v in formulas.values() if v >= n)
+
+
+def test_extend_equals_full_rebuild_and_keeps_old_snapshot():
+    base, extra = _random_cases(200, seed=1), _random_cases(60, seed=2, start=200)
+    old = CaseStats.build(base)
+    siho = ["소시호탕", "대시호탕", "시호계지탕"]
+    before = old.formula_stats(siho)
+    extended = old.extend(extra, len(base))
+    rebuilt = CaseStats.build(base + extra)
+
+    for names in [siho, FORMULAS, ["보중익기탕"]]:
+        assert extended.formula_stats(names) == rebuilt.formula_stats(names)
+        assert extended.effectiveness(names) == rebuilt.effectiveness(names)
+    assert extended.symptoms.most_common() == rebuilt.symptoms.most_common()
+    assert extended.age_bands == rebuilt.age_bands
+    assert old.formula_stats(siho) == before
+
+
+async def test_endpoints_follow_approval_without_reparse(tmp_path, monkeypatch):
+    corpus = _corpus(tmp_path, _random_cases(100))
+    corpus.load()
+    monkeypatch.setattr(module, "get_case_corpus", lambda: corpus)
+    monkeypatch.setattr("app.services.collector.storage.case_storage.get_case_corpus", lambda: corpus)
+
+    storage = CaseStorage(data_dir=tmp_path)
+    storage.add_to_pending(_random_cases(20, seed=9, start=100))
+    monkeypatch.setattr(CaseCorpus, "_read", lambda self: (_ for _ in ()).throw(AssertionError("reparsed")))
+
+    approved = storage.approve_cases([f"c{i}" for i in range(100, 110)])
+    assert approved == 10
+    snap = corpus.snapshot()
+    assert len(snap) == 110 and snap.version == 2
+
+    overview = await module.get_overview_stats()
+    cases = snap.cases
+    assert overview.total_cases == 110
+    assert overview.gender_distribution == dict(Counter(c.get("patient_gender") or "미상" for c in cases))
+    assert overview.total_with_result == sum(1 for c in cases if c.get("result"))
+
+    top = await module.get_top_formulas(top_k=3, min_cases=1)
+    assert [f["formula"] for f in top["top_formulas"]] == [
+        f for f, _ in Counter(
+            c["formula_name"] for c in cases if len(c["formula_name"]) >= 2 and c["formula_name"] != "사상"
+        ).most_common(3)
+    ]
+    with_result = [c for c in cases if "시호" in c["formula_name"] and c["result"]]
+    eff = await module.analyze_formula_effectiveness("시호")
+    assert eff.total_cases_with_result == len(with_result)
+    assert eff.positive_outcomes == sum(is_positive_result(c["result"]) for c in with_result)
+
+    formula = await module.get_formula_stats("시호")
+    expected = _expected_formula(cases, "시호")
+    assert formula.case_count == expected["case_count"]
+    assert [(d["symptom"], d["count"]) for d in formula.top_symptoms] == expected["top_symptoms"]
@@ -0,0 +1,56 @@
+"""
+CaseStore — dict 목록과 같은 값/키 순서 재현 + 블록 append 테스트.
+"""
+
+import json
+
+from app.services.case_corpus import CaseCorpus
+from app.services.case_store import CaseRow, CaseStore, compact_cases, load_case_store
+
+CASES = [
+    {"id": "c1", "formula_name": "보중익기탕", "symptoms": ["피로", "식욕부진"], "patient_age": 45,
+     "is_real_case": True, "medications": [{"name": "황기", "amount": "6g"}], "full_text": "원문 一 text"},
+    {"formula_name": "보중익기탕", "id": "c2", "symptoms": [], "patient_age": None, "is_real_case": 1,
+     "full_text": ""},
+    {"id": "c3", "patient_age": 1.0, "symptoms": ["피로", 3], "progress": "서술형", "score": 0.25},
+    {"id": "c4", "formula_name": None, "patient_age": "45세", "progress": [{"day": 1}]},
+]
+
+
+def test_rows_equal_source_dicts():
+    store = compact_cases(CASES, block_size=3)
+    assert len(store) == len(CASES)
+    for row, case in zip(store, CASES):
+        assert isinstance(row, CaseRow)
+        assert row == case
+        assert list(row) == list(case)
+        assert row.to_dict() == case
+        for key, value in case.items():
+            assert type(row[key]) is type(value)
+    assert store[1].get("patient_gender", "미상") == "미상"
+    assert "symptoms" not in store[3]
+    assert store[-1]["id"] == "c4"
+    assert [r["id"] for r in store[1:3]] == ["c2", "c3"]
+
+
+def test_extended_shares_blocks_and_keeps_base():
+    base = compact_cases(CASES[:2])
+    extended = base + [CASES[2], CASES[3]]
+    assert isinstance(extended, CaseStore)
+    assert len(base) == 2 and len(extended) == 4
+    assert [r["id"] for r in extended] == ["c1", "c2", "c3", "c4"]
+    assert extended[0]._block is base[0]._block
+
+
+def test_corpus_loads_columnar_store(tmp_path):
+    (tmp_path / "all_cases_combined.json").write_text(json.dumps(CASES, ensure_ascii=False), encoding="utf-8")
+    assert list(load_case_store(tmp_path / "all_cases_combined.json", block_size=2)) == CASES
+
+    corpus = CaseCorpus(tmp_path)
+    snap = corpus.snapshot()
+    assert isinstance(snap.cases, CaseStore)
+    assert snap.by_formula == {"보중익기탕": [0, 1]}
+    assert snap.real_count == 2
+
+    (tmp_path / "empty.json").write_text(" [ ] ", encoding="utf-8")
+    assert len(load_case_store(tmp_path / "empty.json")) == 0
@@ -0,0 +1,101 @@
+"""
+수집기 프로세스 간 조정 — 파일 락, 리더/위임 모드, 요청 파일 → 리더 실행, 공유 상태.
+"""
+
+from app.services.case_corpus import CaseCorpus
+from app.services.collector import scheduler as scheduler_module
+from app.services.collector.coordination import CollectorControl, FileLock
+from app.services.collector.metrics import LLMMetrics
+from app.services.collector.scheduler import CollectorScheduler
+from app.services.collector.storage import backend as backend_module
+
+
+def test_file_lock_is_exclusive_between_instances(tmp_path):
+    first, second = FileLock(tmp_path / "x.lock"), FileLock(tmp_path / "x.lock")
+    assert first.acquire(blocking=False) and first.acquire(blocking=False)
+    assert not second.acquire(blocking=False)
+    first.release()
+    with second:
+        assert second.held and not first.acquire(blocking=False)
+    assert first.acquire(blocking=False)
+    first.release()
+
+
+def test_request_claimed_once(tmp_path):
+    control = CollectorControl(tmp_path)
+    assert control.submit("collect", {}, unique=True)
+    assert control.submit("collect", {}, unique=True) is None
+    retry_id = control.submit("retry_failed", {"keys": None})
+    assert [r["action"] for r in control.pending()] == ["collect", "retry_failed"]
+
+    assert control.claim()["action"] == "collect"
+    assert CollectorControl(tmp_path).claim()["id"] == retry_id
+    assert control.claim() is None and control.pending() == []
+
+
+def test_constructing_scheduler_leaves_data_dir_untouched(tmp_path):
+    # 모듈 싱글톤과 같은 생성 — 저장소는 처음 쓸 때 열린다
+    data_dir = tmp_path / "data"
+    scheduler = CollectorScheduler(enabled=False, data_dir=data_dir)
+    LLMMetrics(data_dir / "collector")
+    assert not data_dir.exists()
+    assert scheduler.leader_lock.path == data_dir / "collector" / "leader.lock"
+
+    assert scheduler.watermarks.all() == {}
+    assert scheduler.storage.collector_dir == data_dir / "collector"
+    assert (data_dir / "collector" / "fold.lock").exists()
+    scheduler.storage.close()
+
+
+async def test_run_collection_skips_when_another_process_holds_run_lock(tmp_path):
+    scheduler = CollectorScheduler(enabled=False, data_dir=tmp_path)
+    scheduler.adapters = {}
+    other = FileLock(scheduler.run_lock.path)
+    assert other.acquire(blocking=False)
+    try:
+        result = await scheduler.run_collection()
+    finally:
+        other.release()
+    assert result == {"error": "Collection already in progress in another process"}
+    assert (await scheduler.run_collection())["status"] == "completed"
+    scheduler.storage.close()
+
+
+async def test_delegated_api_hands_runs_to_leader_through_shared_storage(tmp_path, monkeypatch):
+    monkeypatch.setattr(backend_module, "BACKEND", "sqlite")
+    monkeypatch.setattr("app.services.collector.storage.case_storage.get_case_corpus", lambda: CaseCorpus(tmp_path))
+    leader = CollectorScheduler(enabled=False, data_dir=tmp_path)
+    leader.adapters = {}
+    assert leader.leader_lock.acquire(blocking=False)
+
+    api = CollectorScheduler(enabled=False, data_dir=tmp_path)
+    await api.initialize()
+    assert api.delegated and not api.storage.fold_enabled
+
+    assert api.request_collection(max_articles=3)
+    assert api.request_collection() is None  # 이미 대기 중
+    assert api.request_retry(["nope"])
+    assert len(api.get_status()["pending_requests"]) == 2
+
+    # 리더 하트비트: 요청을 하나씩 가져가 실행하고 상태를 기록
+    await leader.process_requests()
+    await leader._request_task
+    await leader.process_requests()
+    await leader._request_task
+
+    status = api.get_status()
+    assert status["mode"] == "delegated" and status["pending_requests"] == []
+    assert status["worker"]["alive"] and not status["is_running"]
+    assert status["last_result"]["status"] == "completed"
+    assert status["last_retry"] == {"attempted": 0, "succeeded": 0, "still_failing": 0, "new_cases": 0}
+    assert api.storage.get_collection_logs()[-1]["collection_id"] == status["last_result"]["collection_id"]
+
+    # COLLECTOR_MODE=worker 면 락이 비어 있어도 API 는 위임 모드
+    leader.leader_lock.release()
+    monkeypatch.setattr(scheduler_module, "COLLECTOR_MODE", "worker")
+    worker_mode_api = CollectorScheduler(enabled=False, data_dir=tmp_path)
+    await worker_mode_api.initialize()
+    assert worker_mode_api.delegated and not worker_mode_api.leader_lock.held
+
+    for s in (leader, api, worker_mode_api):
+        s.storage.close()
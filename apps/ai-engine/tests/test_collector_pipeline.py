@@ -0,0 +1,199 @@
+"""
+수집 파이프라인 — 소스 동시 실행, 소스별 요청 간격, 동시 상세 조회, 실패 적재, 프로세스 풀 추출,
+증분 수집 표식과 상세 조회 전 중복 확인.
+"""
+
+import asyncio
+import time
+from datetime import date
+
+import pytest
+
+from app.services.collector import process_pool, scheduler as scheduler_module
+from app.services.collector.adapters.base import ArticleDetail, ArticleInfo, BaseSourceAdapter
+from app.services.collector.adapters.pubmed_adapter import PubMedAdapter
+from app.services.collector.extractors.case_extractor import CaseExtractor
+from app.services.collector.processors.deduplicator import CaseDeduplicator
+from app.services.collector.scheduler import CollectorScheduler
+
+CASE_TEXT = """치험례
+환자: 45세 여자. 주소증: 불면, 두통, 소화불량.
+현병력: 3개월 전부터 스트레스 후 불면과 두통이 발생하였다.
+변증: 간기울결. 치료: 소요산 가미방을 2주간 투여하였다.
+치료 결과 불면과 두통이 호전되었다. 소요산 투여 후 VAS 7에서 2로 감소하였다."""
+
+
+class FakeAdapter(BaseSourceAdapter):
+    def __init__(self, name, count, latency=0.1, broken=()):
+        super().__init__()
+        self.source_name = name
+        self.count = count
+        self.latency = latency
+        self.broken = set(broken)
+        self.started = []
+        self.active = 0
+        self.peak = 0
+
+    async def initialize(self):
+        pass
+
+    async def cleanup(self):
+        pass
+
+    async def search(self, keywords, date_from=None, date_to=None, max_results=100):
+        for i in range(self.count):
+            yield ArticleInfo(article_id=f"{self.source_name}-{i}", title=f"논문 {i}")
+
+    async def fetch_detail(self, article_id):
+        self.started.append(time.monotonic())
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(self.latency)
+            if article_id in self.broken:
+                raise RuntimeError("HTTP 500")
+            return ArticleDetail(article_id=article_id, title=article_id, url=article_id, full_text=article_id)
+        finally:
+            self.active -= 1
+
+
+class NumberedAdapter(FakeAdapter):
+    """번호가 커질수록 새 논문, 검색은 최신순"""
+
+    def __init__(self, ids):
+        super().__init__("pubmed", 0, latency=0.0)
+        self.ids = ids
+        self.date_from = []
+        self.fetched = []
+
+    async def search(self, keywords, date_from=None, date_to=None, max_results=100):
+        self.date_from.append(date_from)
+        for n in sorted(self.ids, reverse=True):
+            yield ArticleInfo(article_id=f"PMID:{n}", title=f"논문 {n}", url=f"https://pubmed/{n}")
+
+    def sequence_number(self, article_id):
+        return int(article_id.split(":")[1])
+
+    async def fetch_detail(self, article_id):
+        self.fetched.append(article_id)
+        n = self.sequence_number(article_id)
+        return ArticleDetail(article_id=article_id, title=article_id, url=f"https://pubmed/{n}", full_text=article_id)
+
+
+def fake_extract(text, article_info):
+    return (0, []) if text.endswith("-0") else (1, [{"id": text}])
+
+
+@pytest.fixture
+def make_scheduler(tmp_path, monkeypatch):
+    # 추출은 스레드에서 가짜 함수로 (풀 자체는 아래 테스트에서)
+    monkeypatch.setattr(process_pool, "PROCESS_WORKERS", 0)
+    monkeypatch.setattr(scheduler_module, "_extract_article", fake_extract)
+    return lambda **kwargs: CollectorScheduler(enabled=False, data_dir=tmp_path, **kwargs)
+
+
+async def test_source_pipeline_fetches_concurrently_within_rate_limit(make_scheduler):
+    scheduler = make_scheduler(request_delay=0.05, fetch_concurrency=4)
+    adapter = FakeAdapter("kci", 8, latency=0.2, broken={"kci-3"})
+    result = {"statistics": {"articles_searched": 0, "articles_fetched": 0, "cases_extracted": 0, "cases_valid": 0}}
+
+    start = time.monotonic()
+    with scheduler.failed_storage.batch():
+        cases = await scheduler._collect_from_source(adapter, ["치험례"], max_articles=6, result=result)
+    elapsed = time.monotonic() - start
+
+    # 순차라면 (0.2 + 0.05) * 7 초 — 조회는 겹치고 시작 간격은 토큰 버킷이 지킨다
+    assert elapsed < 1.0 and adapter.peak > 1
+    gaps = [b - a for a, b in zip(adapter.started, adapter.started[1:])]
+    assert min(gaps) >= 0.04
+    assert result["statistics"]["articles_fetched"] == 6
+    assert sorted(c["id"] for c in cases) == ["kci-1", "kci-2", "kci-4", "kci-5", "kci-6"]
+    assert result["statistics"]["cases_valid"] == 5
+    failed = {item["key"]: item["last_reason"] for item in scheduler.failed_storage.list_pending()["items"]}
+    assert failed == {"kci-0": "no_cases_extracted", "kci-3": "processing_error: HTTP 500"}
+    scheduler.storage.close()
+
+
+async def test_run_collection_runs_sources_in_parallel(make_scheduler):
+    scheduler = make_scheduler(fetch_concurrency=2)
+    scheduler.adapters = {name: FakeAdapter(name, 3, latency=0.2) for name in ("oasis", "kci", "pubmed")}
+    for adapter in scheduler.adapters.values():
+        adapter.get_rate_limit = lambda: 0.01
+
+    start = time.monotonic()
+    result = await scheduler.run_collection(sources=["oasis", "kci", "pubmed", "없음"], max_articles=3)
+    elapsed = time.monotonic() - start
+
+    assert result["status"] == "completed"
+    assert result["errors"] == ["Unknown adapter: 없음"]
+    assert result["statistics"]["articles_fetched"] == 9
+    assert result["statistics"]["cases_valid"] == 6
+    assert elapsed < 0.9  # 소스를 차례로 돌면 3 * 2 * 0.2 초 이상
+    assert scheduler.failed_storage.get_stats()["pending_count"] == 3
+    scheduler.storage.close()
+
+
+async def test_parsing_and_extraction_run_in_process_pool(monkeypatch):
+    monkeypatch.setattr(process_pool, "PROCESS_WORKERS", 2)
+    info = {"title": "소요산 치험례", "url": "u1", "source": "kci"}
+    xml = (
+        "<PubmedArticleSet><PubmedArticle><MedlineCitation><PMID>7</PMID><Article>"
+        "<ArticleTitle>Soyo-san case</ArticleTitle><Abstract><AbstractText>insomnia</AbstractText></Abstract>"
+        "</Article></MedlineCitation></PubmedArticle></PubmedArticleSet>"
+    )
+    try:
+        detail, (extracted, valid) = await asyncio.gather(
+            process_pool.run_in_process(PubMedAdapter()._parse_detail_xml, xml, "7"),
+            process_pool.run_in_process(scheduler_module._extract_article, CASE_TEXT, info),
+        )
+        assert process_pool.get_process_pool() is not None
+    finally:
+        process_pool.shutdown_process_pool()
+
+    assert detail.article_id == "PMID:7" and detail.full_text == "insomnia"
+    expected = CaseExtractor(use_llm_fallback=False).extract_rule_based(CASE_TEXT, info)
+    assert extracted == len(expected) == 1
+    assert valid[0]["formula_name"] == "소요산" and valid[0]["patient_age"] == 45
+
+
+async def test_incremental_collection_skips_known_articles_before_fetch(make_scheduler):
+    scheduler = make_scheduler(request_delay=0.001, fetch_concurrency=1)
+    adapter = NumberedAdapter([1, 2, 3])
+
+    async def collect(max_articles=10, keywords=("case",)):
+        result = {"statistics": {"articles_searched": 0, "articles_fetched": 0, "cases_extracted": 0, "cases_valid": 0}}
+        with scheduler.failed_storage.batch():
+            await scheduler._collect_from_source(adapter, list(keywords), max_articles=max_articles, result=result)
+        fetched, adapter.fetched = adapter.fetched, []
+        return sorted(fetched), result["statistics"]
+
+    fetched, _ = await collect()
+    today = date.today().isoformat()
+    assert fetched == ["PMID:1", "PMID:2", "PMID:3"] and adapter.date_from == [None]
+    assert scheduler.watermarks.get("pubmed", ["case"])["last_id"] == 3
+
+    # 4: 발췌와 함께 재시도 대기, 5: 이미 케이스로 들어온 URL, 1~3: 표식 이하 → 6 만 조회
+    adapter.ids = [1, 2, 3, 4, 5, 6]
+    scheduler.failed_storage.add_failure({"url": "https://pubmed/4"}, "본문 발췌", "no_cases_extracted")
+    scheduler.deduplicator = CaseDeduplicator([{"source_url": "https://pubmed/5"}])
+    fetched, stats = await collect()
+    assert fetched == ["PMID:6"] and stats["articles_skipped_known"] == 5
+    assert adapter.date_from[-1] == today
+    mark = scheduler.watermarks.get("pubmed", ["case"])
+    assert (mark["last_id"], mark["searched_until"]) == (6, today)
+
+    # 한도에 걸려 끊긴 검색은 표식을 올리지 않는다 (남은 새 논문을 다음 실행에서)
+    adapter.ids = list(range(1, 11))
+    fetched, _ = await collect(max_articles=2)
+    assert fetched == ["PMID:10", "PMID:9"]
+    assert scheduler.watermarks.get("pubmed", ["case"])["last_id"] == 6
+    fetched, _ = await collect()
+    assert fetched == ["PMID:10", "PMID:7", "PMID:8", "PMID:9"]
+    assert scheduler.watermarks.get("pubmed", ["case"])["last_id"] == 10
+
+    # 다른 키워드는 다른 검색 — 표식 없이 처음부터 (같은 집합이면 대소문자·순서 무관)
+    fetched, _ = await collect(keywords=["acupuncture"])
+    assert adapter.date_from[-1] is None and len(fetched) == 8
+    assert scheduler.watermarks.get("pubmed", [" Acupuncture", "acupuncture"])["last_id"] == 10
+    assert sorted(m["keywords"] for m in scheduler.watermarks.all().values()) == [["acupuncture"], ["case"]]
+    scheduler.storage.close()
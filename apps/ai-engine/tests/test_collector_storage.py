@@ -0,0 +1,268 @@
+"""
+수집기 저장 엔진 (log / sqlite) — 같은 동작 + JSON/엔진 간 이전 테스트.
+"""
+
+import json
+import sys
+import threading
+
+import pytest
+
+from app.api.v1 import collector as collector_api
+from app.services import case_log
+from app.services.case_corpus import CaseCorpus
+from app.services.collector.metrics import LLMMetrics
+from app.services.collector.storage import case_storage as case_storage_module
+from app.services.collector.storage.case_storage import CaseStorage
+from app.services.collector.storage.failed_storage import FailedExtractionStorage
+from scripts import migrate_collector_storage
+
+
+def _case(i, confidence=0.5):
+    return {"id": f"c{i}", "formula_name": "소시호탕", "source_name": "kci" if i % 2 else "oasis",
+            "confidence_score": confidence, "collection_date": f"2026-01-{i % 28 + 1:02d}"}
+
+
+@pytest.mark.parametrize("backend", ["log", "sqlite"])
+def test_case_storage_backends_behave_alike(tmp_path, monkeypatch, backend):
+    (tmp_path / "all_cases_combined.json").write_text(json.dumps([_case(i) for i in range(3)]), encoding="utf-8")
+    corpus = CaseCorpus(data_dir=tmp_path)
+    corpus.load()
+    monkeypatch.setattr("app.services.collector.storage.case_storage.get_case_corpus", lambda: corpus)
+
+    storage = CaseStorage(data_dir=tmp_path, backend=backend)
+    storage.add_to_pending([_case(i, confidence=i / 20) for i in range(3, 20)])
+    storage.add_to_pending([_case(5, confidence=0.99)])  # 같은 id — 값만 교체, 순서 유지
+    assert storage.pending_count() == 17
+    assert [c["id"] for c in storage.load_pending_cases(1, 3)] == ["c4", "c5", "c6"]
+    assert [c["id"] for c in storage.pending.find(min_confidence=0.8)] == ["c5", "c16", "c17", "c18", "c19"]
+    assert storage.pending.count(source="kci") == 9
+    assert [c["id"] for c in storage.pending.find(source="oasis", since="2026-01-10", limit=2, offset=1)] == ["c12", "c14"]
+
+    assert storage.auto_approve_high_confidence(0.8) == 5
+    assert storage.reject_cases(["c3", "c4", "없음"]) == 2
+    assert storage.approve_cases(["c6"]) == 1
+    assert storage.pending_count() == 9
+    for i in range(3):
+        storage.log_collection({"run": i, "status": "completed"})
+    storage.save_duplicates([_case(99)])
+    assert storage.get_collection_logs(2) == [{"run": 1, "status": "completed"}, {"run": 2, "status": "completed"}]
+
+    ids = ["c0", "c1", "c2", "c5", "c16", "c17", "c18", "c19", "c6"]
+    assert [c["id"] for c in corpus.snapshot().cases] == ids
+    stats = storage.get_stats()
+    assert stats["total_cases"] == 9 and stats["pending_cases"] == 9
+    storage.close()
+
+    fresh = CaseCorpus(data_dir=tmp_path)
+    assert [c["id"] for c in fresh.load().cases] == ids
+    storage = CaseStorage(data_dir=tmp_path, backend=backend)
+    assert case_log.fold_approved(storage.combined_file, storage.approved) == 6
+    assert len(storage.approved) == 0 and storage.pending_count() == 9
+    assert [c["id"] for c in json.loads(storage.combined_file.read_text(encoding="utf-8"))] == ids
+    assert [c["id"] for c in CaseCorpus(data_dir=tmp_path).load().cases] == ids
+    storage.close()
+
+
+@pytest.mark.parametrize("backend", ["log", "sqlite"])
+def test_pending_cursor_pages_and_counters(tmp_path, monkeypatch, backend):
+    (tmp_path / "all_cases_combined.json").write_text(json.dumps(
+        [dict(_case(i), data_source="online_collection" if i else "book") for i in range(3)]
+    ), encoding="utf-8")
+    monkeypatch.setattr("app.services.collector.storage.case_storage.get_case_corpus", lambda: CaseCorpus(tmp_path))
+    storage = CaseStorage(data_dir=tmp_path, backend=backend)
+    storage.add_to_pending([_case(i) for i in range(10, 20)])
+
+    page, cursor = storage.load_pending_page(limit=4)
+    assert [c["id"] for c in page] == ["c10", "c11", "c12", "c13"]
+    # 이미 본 항목이 지워져도 다음 페이지가 밀리지 않는다
+    storage.reject_cases(["c11", "c12"])
+    storage.add_to_pending([_case(13, confidence=0.9)])
+    storage.pending.compact()
+    storage.close()
+
+    storage = CaseStorage(data_dir=tmp_path, backend=backend)
+    assert storage.pending_count() == 8
+    page, cursor = storage.load_pending_page(cursor, limit=4)
+    assert [c["id"] for c in page] == ["c14", "c15", "c16", "c17"]
+    page, cursor = storage.load_pending_page(cursor, limit=4)
+    assert [c["id"] for c in page] == ["c18", "c19"] and cursor is None
+    with pytest.raises(ValueError):
+        storage.load_pending_page("abc")
+
+    # 통계는 통합 파일이 바뀌지 않으면 다시 읽지 않는다
+    calls = []
+    real_load = case_storage_module.load_cases
+    monkeypatch.setattr(case_storage_module, "load_cases", lambda path: calls.append(path) or real_load(path))
+    storage.approve_cases(["c10", "c14"])
+    storage.approve_cases([])
+    for _ in range(3):
+        stats = storage.get_stats()
+    assert stats["total_cases"] == 5 and stats["online_collected_cases"] == 2 and stats["pending_cases"] == 6
+    storage.pending.put("c15", dict(_case(15), data_source="online_collection"))
+    storage.approve_cases(["c15"])
+    assert storage.get_stats()["online_collected_cases"] == 3
+    assert len(calls) == 1
+    storage.close()
+
+
+def test_failed_queue_and_metrics_on_sqlite(tmp_path):
+    (tmp_path / "failed_extractions.json").write_text(json.dumps([
+        {"key": "old", "article_info": {"url": "old"}, "retry_count": 2},
+    ]), encoding="utf-8")
+    failed = FailedExtractionStorage(tmp_path, backend="sqlite")
+    assert (tmp_path / "failed_extractions.json.migrated").exists()
+    failed.add_failure({"url": "a"}, "본문", "timeout")
+    failed.add_failure({"url": "old"}, "", "again")
+    failed.add_failure({"url": "a"}, "본문", "timeout")
+    assert failed.get_stats() == {"pending_count": 1, "dead_letter_count": 1, "max_retries": 3}
+    assert failed.list_pending(limit=5)["items"][0]["retry_count"] == 2
+    failed.add_failure({"url": "b"}, "본문", "timeout")
+    first = failed.list_pending(limit=1)
+    assert failed.list_pending(limit=1, cursor=first["next_cursor"])["items"][0]["key"] == "b"
+    failed.remove_success("b")
+    assert failed.list_dead()[0]["key"] == "old"
+    failed.remove_success("a")
+    assert failed.list_pending()["total"] == 0
+
+    (tmp_path / "llm_metrics.json").write_text(json.dumps({
+        "totals": {"calls": 5, "successes": 5, "failures": 0, "prompt_tokens": 100, "completion_tokens": 10,
+                   "total_tokens": 110, "estimated_cost_usd": 0.001, "cases_extracted": 2},
+        "daily": {"2026-01-01": {"calls": 5}}, "last_failure": None, "last_updated": "2026-01-01",
+    }), encoding="utf-8")
+    metrics = LLMMetrics(tmp_path, backend="sqlite")
+    metrics.record_call(False, prompt_tokens=10, completion_tokens=5, error="boom")
+    summary = LLMMetrics(tmp_path, backend="sqlite").get_summary()
+    assert summary["totals"]["calls"] == 6 and summary["totals"]["failures"] == 1
+    assert summary["last_failure"]["error"] == "boom"
+    assert summary["daily_history_days"] == 2
+    assert (tmp_path / "llm_metrics.json.migrated").exists()
+
+
+def test_corpus_ignores_collector_writes_outside_approved_collection(tmp_path, monkeypatch):
+    (tmp_path / "all_cases_combined.json").write_text(json.dumps([_case(0)]), encoding="utf-8")
+    corpus = CaseCorpus(data_dir=tmp_path)
+    monkeypatch.setattr("app.services.collector.storage.case_storage.get_case_corpus", lambda: corpus)
+    storage = CaseStorage(data_dir=tmp_path, backend="sqlite")
+    failed = FailedExtractionStorage(storage.collector_dir, backend="sqlite")
+    corpus.load()
+
+    # 같은 collector.db 의 다른 컬렉션 쓰기 — 코퍼스는 그대로
+    storage.add_to_pending([_case(1), _case(2)])
+    failed.add_failure({"url": "a"}, "본문", "timeout")
+    storage.log_collection({"run": 0})
+    storage.approved.sync()
+    assert not corpus.is_stale()
+
+    assert storage.approve_cases(["c1"]) == 1
+    assert [c["id"] for c in corpus.snapshot().cases] == ["c0", "c1"] and not corpus.is_stale()
+    # 다른 프로세스의 승인 (코퍼스를 거치지 않는 쓰기) 은 감지
+    storage.approved.put("c2", _case(2))
+    assert corpus.is_stale()
+    storage.close()
+
+
+def test_append_does_not_hide_approvals_from_other_writers(tmp_path, monkeypatch):
+    (tmp_path / "all_cases_combined.json").write_text(json.dumps([_case(0)]), encoding="utf-8")
+    corpus, leader_corpus = CaseCorpus(data_dir=tmp_path), CaseCorpus(data_dir=tmp_path)
+    api = CaseStorage(data_dir=tmp_path, backend="sqlite")
+    monkeypatch.setattr("app.services.collector.storage.case_storage.get_case_corpus", lambda: leader_corpus)
+    leader = CaseStorage(data_dir=tmp_path, backend="sqlite")
+    leader.add_to_pending([_case(1), _case(2)])
+    corpus.load()
+
+    # 리더 프로세스가 자동 승인한 뒤 API 가 승인
+    assert leader.approve_cases(["c1"]) == 1
+    monkeypatch.setattr("app.services.collector.storage.case_storage.get_case_corpus", lambda: corpus)
+    assert api.approve_cases(["c2"]) == 1
+
+    assert [c["id"] for c in corpus.snapshot().cases] == ["c0", "c2"]
+    assert [c["id"] for c in corpus.wait_for_refresh().cases] == ["c0", "c1", "c2"]
+    assert not corpus.is_stale()
+
+    # 쓰기 전 상태를 잡은 리로드가 방금 쓴 케이스까지 읽었으면 다시 붙이지 않는다
+    prior = corpus.source_state(api.combined_file)
+    api.approved.put("c3", _case(3))
+    with monkeypatch.context() as m:
+        m.setattr("app.services.case_corpus.approved_state", lambda source: prior[1])
+        corpus.load()
+    assert corpus.append([_case(3)], source=api.combined_file, prior=prior) is corpus.snapshot()
+    assert [c["id"] for c in corpus.snapshot().cases] == ["c0", "c1", "c2", "c3"]
+    api.close()
+    leader.close()
+
+
+@pytest.mark.parametrize("backend", ["log", "sqlite"])
+def test_failed_queue_batch_flushes_once(tmp_path, monkeypatch, backend):
+    failed = FailedExtractionStorage(tmp_path, backend=backend)
+    failed.add_failure({"url": "dead"}, "", "x")
+    failed.add_failure({"url": "dead"}, "", "x")
+    writes = []
+    monkeypatch.setattr(failed.queue, "put_many", lambda items, real=failed.queue.put_many: writes.append(1) or real(items))
+
+    with failed.batch():
+        for i in range(600):
+            failed.add_failure({"url": f"u{i}"}, "본문", "timeout")
+        failed.add_failure({"url": "u599"}, "본문", "timeout")
+        failed.add_failure({"url": "dead"}, "", "x")
+        failed.remove_success("u598")
+        assert len(failed.queue) == 1 and len(failed.dead) == 0  # 아직 기록 전
+
+    assert writes == [1]
+    assert len(failed.queue) == FailedExtractionStorage.MAX_QUEUE
+    assert [i["key"] for i in failed.list_pending(limit=2)["items"]] == ["u99", "u100"]
+    assert failed.queue.get("u599")["retry_count"] == 2 and "u598" not in failed.queue
+    assert [i["key"] for i in failed.list_dead()] == ["dead"]
+    failed.backend.close()
+
+
+def test_migration_script_moves_json_and_log_to_sqlite(tmp_path, monkeypatch):
+    collector = tmp_path / "collector"
+    collector.mkdir()
+    (tmp_path / "all_cases_combined.json").write_text(json.dumps([_case(0)]), encoding="utf-8")
+    (collector / "duplicates_archive.json").write_text(json.dumps([{"id": "d"}]), encoding="utf-8")
+    monkeypatch.setattr("app.services.collector.storage.case_storage.get_case_corpus", lambda: CaseCorpus(tmp_path))
+
+    storage = CaseStorage(data_dir=tmp_path, backend="log")
+    storage.add_to_pending([_case(i) for i in range(1, 5)])
+    storage.approve_cases(["c1", "c2"])
+    storage.log_collection({"run": 1})
+    storage.close()
+    (collector / "pending_cases.json").write_text(json.dumps([_case(7)]), encoding="utf-8")
+
+    monkeypatch.setattr(sys, "argv", ["migrate", "--from", "log", "--to", "sqlite", "--data-dir", str(tmp_path)])
+    migrate_collector_storage.main()
+
+    storage = CaseStorage(data_dir=tmp_path, backend="sqlite")
+    assert [c["id"] for c in storage.load_pending_cases()] == ["c7", "c3", "c4"]
+    assert [c["id"] for c in storage.approved.values()] == ["c1", "c2"]
+    assert storage.get_collection_logs() == [{"run": 1}]
+    assert len(storage.duplicates) == 1
+    assert [c["id"] for c in CaseCorpus(data_dir=tmp_path).load().cases] == ["c0", "c1", "c2"]
+    storage.close()
+
+
+async def test_route_approval_extends_corpus_off_loop_and_outside_storage_lock(tmp_path, monkeypatch):
+    (tmp_path / "all_cases_combined.json").write_text(json.dumps([_case(i) for i in range(3)]), encoding="utf-8")
+    corpus = CaseCorpus(data_dir=tmp_path)
+    corpus.load()
+    monkeypatch.setattr("app.services.collector.storage.case_storage.get_case_corpus", lambda: corpus)
+    storage = CaseStorage(data_dir=tmp_path)
+    storage.add_to_pending([_case(i) for i in range(3, 6)])
+    monkeypatch.setattr(collector_api.collector_scheduler, "_storage", storage)
+
+    calls = []
+    append = corpus.append
+
+    def checked_append(cases, **kwargs):
+        # 스냅샷 확장 중에도 저장소 락은 풀려 있고, 이벤트 루프 스레드가 아니다
+        calls.append((storage._lock.locked(), threading.current_thread() is threading.main_thread()))
+        return append(cases, **kwargs)
+
+    monkeypatch.setattr(corpus, "append", checked_append)
+    body = await collector_api.approve_cases(collector_api.ApproveRequest(case_ids=["c3", "c4"]))
+    assert body["approved_count"] == 2
+    assert (await collector_api.auto_approve_high_confidence(0.5))["approved_count"] == 1
+    assert calls == [(False, False), (False, False)]
+    assert [c["id"] for c in corpus.snapshot().cases] == ["c0", "c1", "c2", "c3", "c4", "c5"]
+    storage.close()
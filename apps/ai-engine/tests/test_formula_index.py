@@ -0,0 +1,63 @@
+"""
+처방명/진단명 조회 색인 — 부분 일치 해석 + by-diagnosis 엔드포인트 테스트.
+"""
+
+import json
+import random
+from collections import Counter
+
+from app.api.v1 import formula_recommendation as module
+from app.services.case_corpus import CaseCorpus
+from app.services.formula_index import FORMULA_ALIASES, NameIndex, get_formula_index
+
+SYLLABLES = list("소대시호탕계지반하사심보중익기산환음간울결비위허약")
+
+
+def _names(n, seed=0):
+    rng = random.Random(seed)
+    return list(dict.fromkeys("".join(rng.choices(SYLLABLES, k=rng.randint(2, 6))) for _ in range(n)))
+
+
+def test_containing_and_contained_in_match_brute_force():
+    names = _names(500) + ["Ssanghwa-tang", "SSANGHWA"]
+    index = NameIndex(names)
+    rng = random.Random(1)
+    queries = ["탕", "시호", "ssang", "대시호탕", "없는"] + [
+        name[rng.randint(0, 1):] for name in rng.sample(names, 30)
+    ]
+    for q in queries:
+        assert index.containing(q) == [n for n in names if q.lower() in n.lower()], q
+        assert index.contained_in(q) == [n for n in names if n.lower() in q.lower()], q
+
+
+def test_formula_hanja_alias_and_spacing():
+    index = NameIndex(["보중익기탕", "補中益氣湯", "가미 소요산", "소시호탕"], FORMULA_ALIASES)
+    assert index.containing("補中益氣湯") == ["보중익기탕", "補中益氣湯"]
+    assert index.containing("익기") == ["보중익기탕", "補中益氣湯"]
+    assert index.containing("가미소요") == ["가미 소요산"]
+    assert index.containing("逍遙散") == ["가미 소요산"]
+
+
+async def test_by_diagnosis_reads_only_matching_rows(tmp_path, monkeypatch):
+    rng = random.Random(2)
+    diagnoses = ["간기울결", "간기울결 겸 비허", "비위허약", "소양병", ""]
+    cases = [
+        {"id": f"c{i}", "diagnosis": rng.choice(diagnoses),
+         "formula_name": rng.choice(["소요산", "육군자탕", "소시호탕", "빈용", "x"])}
+        for i in range(300)
+    ]
+    (tmp_path / "all_cases_combined.json").write_text(json.dumps(cases, ensure_ascii=False), encoding="utf-8")
+    corpus = CaseCorpus(data_dir=tmp_path)
+    monkeypatch.setattr(module, "get_case_corpus", lambda: corpus)
+
+    for q in ["간기울결", "비위허약 및 간기울결", "허약", "없음"]:
+        expected = Counter(
+            c["formula_name"] for c in cases
+            if c["diagnosis"] and (q.lower() in c["diagnosis"].lower() or c["diagnosis"].lower() in q.lower())
+            and len(c["formula_name"]) >= 2 and c["formula_name"] != "빈용"
+        )
+        result = await module.get_formulas_by_diagnosis(q, top_k=10)
+        assert result["formulas"] == [{"formula": f, "count": c} for f, c in expected.most_common(10)]
+        assert result["total_cases"] == sum(expected.values())
+
+    assert set(get_formula_index(corpus.snapshot()).names) == {"소요산", "육군자탕", "소시호탕", "빈용", "x"}
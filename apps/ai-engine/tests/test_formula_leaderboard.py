@@ -0,0 +1,87 @@
+"""
+처방 순위표 — by-symptom / by-constitution / by-diagnosis 결과 일치 + 캐시 무효화 테스트.
+"""
+
+import json
+import random
+from collections import Counter
+
+from app.api.v1 import formula_recommendation as module
+from app.services.case_corpus import CaseCorpus
+from app.services.formula_leaderboard import FormulaLeaderboards, get_formula_leaderboards
+from app.services.formula_recommender import EXCLUDED_FORMULA_NAMES, get_recommend_index
+
+SYMPTOMS = ["두통", "편두통", "요통", "불면", "식욕부진", "어지러움", "Headache"]
+FORMULAS = ["소시호탕", "대시호탕", "반하사심탕", "보중익기탕", "되고", "빈용", "x", ""]
+
+
+def _random_cases(n, seed=0):
+    rng = random.Random(seed)
+    return [
+        {
+            "id": f"c{i}",
+            "formula_name": rng.choice(FORMULAS),
+            "symptoms": rng.sample(SYMPTOMS, rng.randint(0, 3)),
+            "diagnosis": rng.choice(["간기울결", "비위허약", "간기울결 겸 비허", ""]),
+            "patient_constitution": rng.choice(["소양인", "태음인", "", None]),
+        }
+        for i in range(n)
+    ]
+
+
+def _valid(formula):
+    return formula and len(formula) >= 2 and formula not in EXCLUDED_FORMULA_NAMES
+
+
+def _corpus(tmp_path, cases, monkeypatch):
+    (tmp_path / "all_cases_combined.json").write_text(json.dumps(cases, ensure_ascii=False), encoding="utf-8")
+    corpus = CaseCorpus(data_dir=tmp_path)
+    monkeypatch.setattr(module, "get_case_corpus", lambda: corpus)
+    return corpus
+
+
+async def test_endpoints_match_counter_scan(tmp_path, monkeypatch):
+    cases = _random_cases(500)
+    _corpus(tmp_path, cases, monkeypatch)
+
+    for q in ["두통", "HEADACHE", "편두통과 요통", "없는증상", "통"]:
+        expected = Counter(
+            c["formula_name"] for c in cases if _valid(c["formula_name"])
+            and any(q.lower() in s.lower() or s.lower() in q.lower() for s in c["symptoms"])
+        )
+        result = await module.get_formulas_by_symptom(symptom=q, top_k=5)
+        assert result["formulas"] == [{"formula": f, "count": n} for f, n in expected.most_common(5)]
+        assert result["total_matches"] == sum(expected.values())
+
+    for constitution in ["소양인", "태양인"]:
+        expected = Counter(
+            c["formula_name"] for c in cases
+            if c["patient_constitution"] == constitution and _valid(c["formula_name"])
+        )
+        result = await module.get_formulas_by_constitution(constitution, top_k=10)
+        assert result["formulas"] == [{"formula": f, "count": n} for f, n in expected.most_common(10)]
+        assert result["total_cases"] == sum(expected.values())
+
+
+def test_tail_queries_use_lru_and_precomputed_heads(tmp_path, monkeypatch):
+    corpus = _corpus(tmp_path, _random_cases(200), monkeypatch)
+    snap = corpus.snapshot()
+    boards = FormulaLeaderboards(snap, get_recommend_index(snap), top_symptoms=2, top_diagnoses=1, cache_size=2)
+    assert len(boards._symptoms) == 2 and len(boards._diagnoses) == 1
+
+    first = boards.by_symptom("편두통과 요통")
+    assert boards.by_symptom("편두통과 요통") is first
+    boards.by_symptom("a")
+    boards.by_diagnosis("없는진단")
+    assert ("symptom", "편두통과 요통") not in boards._cache
+    assert len(boards._cache) == 2
+
+
+def test_boards_are_replaced_with_snapshot(tmp_path, monkeypatch):
+    corpus = _corpus(tmp_path, _random_cases(100), monkeypatch)
+    before = get_formula_leaderboards(corpus.snapshot())
+    before.by_symptom("희귀 증상")
+
+    corpus.reload()
+    after = get_formula_leaderboards(corpus.snapshot())
+    assert after is not before and not after._cache
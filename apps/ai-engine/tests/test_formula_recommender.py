@@ -0,0 +1,104 @@
+"""
+처방 추천 색인 — 기존 케이스 순회 구현과 순위/점수 일치 테스트.
+"""
+
+import json
+import random
+
+from app.api.v1 import formula_recommendation as module
+from app.services.case_corpus import CaseCorpus
+from app.services.formula_recommender import RECOMMEND_EXCLUDED_NAMES
+
+SYMPTOMS = ["두통", "편두통", "요통", "불면", "식욕부진", "어지러움", "구갈", "변비", "Headache"]
+FORMULAS = ["소시호탕", "대시호탕", "반하사심탕", "보중익기탕", "육군자탕", "사상", "되고", "x", ""]
+
+
+def _random_cases(n, seed=0):
+    rng = random.Random(seed)
+    return [
+        {
+            "id": f"c{i}",
+            "formula_name": rng.choice(FORMULAS),
+            "symptoms": rng.sample(SYMPTOMS, rng.randint(0, 3)),
+            "diagnosis": rng.choice(["간기울결", "비위허약", "Spleen deficiency", ""]),
+            "patient_age": rng.choice([None, 0, 9, 30, 41, 52, 70]),
+            "patient_gender": rng.choice(["M", "F", None]),
+            "patient_constitution": rng.choice(["소양인", "태음인", "", None]),
+        }
+        for i in range(n)
+    ]
+
+
+def _expected(cases, request):
+    """기존 recommend_formula 의 케이스 순회 계산"""
+    table = {}
+    for case in cases:
+        formula = case.get("formula_name", "")
+        if not formula or len(formula) < 2 or formula in RECOMMEND_EXCLUDED_NAMES:
+            continue
+        score, reasons, matched = 0, [], []
+        case_symptoms = [s.lower() for s in case.get("symptoms", [])]
+        for symptom in request.symptoms:
+            sl = symptom.lower()
+            if any(sl in cs or cs in sl for cs in case_symptoms):
+                score += 20
+                matched.append(symptom)
+                reasons.append(f"증상 '{symptom}' 일치")
+        case_diagnosis = case.get("diagnosis", "").lower()
+        if request.diagnosis and case_diagnosis and request.diagnosis.lower() in case_diagnosis:
+            score += 30
+            reasons.append(f"진단 '{request.diagnosis}' 일치")
+        case_constitution = case.get("patient_constitution", "")
+        if request.constitution and case_constitution and request.constitution == case_constitution:
+            score += 25
+            reasons.append(f"체질 '{request.constitution}' 일치")
+        case_age = case.get("patient_age")
+        if request.age and case_age and abs(request.age - case_age) <= 10:
+            score += 10
+            reasons.append(f"연령대 유사 ({case_age}세)")
+        if request.gender and case.get("patient_gender") and request.gender == case["patient_gender"]:
+            score += 5
+            reasons.append("성별 일치")
+        if score > 0:
+            row = table.setdefault(formula, [0, 0, set(), set()])
+            row[0] += score
+            row[1] += 1
+            row[2].update(matched)
+            row[3].update(reasons)
+    ranked = [(f, round(t / c, 1), c, s, r) for f, (t, c, s, r) in table.items()]
+    ranked.sort(key=lambda x: (x[1], x[2]), reverse=True)
+    return ranked[:request.top_k]
+
+
+async def test_recommendations_match_case_scan(tmp_path, monkeypatch):
+    cases = _random_cases(600)
+    (tmp_path / "all_cases_combined.json").write_text(json.dumps(cases, ensure_ascii=False), encoding="utf-8")
+    corpus = CaseCorpus(data_dir=tmp_path)
+    monkeypatch.setattr(module, "get_case_corpus", lambda: corpus)
+
+    rng = random.Random(1)
+    requests = [
+        module.FormulaRecommendRequest(symptoms=["두통"]),
+        module.FormulaRecommendRequest(symptoms=["편두통과 요통", "HEAD", "두통"], top_k=3),
+        module.FormulaRecommendRequest(symptoms=[], diagnosis="간기", constitution="소양인", age=45, gender="F"),
+        module.FormulaRecommendRequest(symptoms=["없는증상"]),
+    ] + [
+        module.FormulaRecommendRequest(
+            symptoms=rng.sample(SYMPTOMS, rng.randint(0, 3)),
+            diagnosis=rng.choice([None, "허약", "spleen"]),
+            constitution=rng.choice([None, "태음인"]),
+            age=rng.choice([None, 35, 65]),
+            gender=rng.choice([None, "M"]),
+            top_k=rng.randint(1, 10),
+        )
+        for _ in range(40)
+    ]
+    for request in requests:
+        response = await module.recommend_formula(request)
+        expected = _expected(cases, request)
+        got = response.recommendations
+        assert [(r.formula_name, r.score, r.case_count) for r in got] == [e[:3] for e in expected]
+        for r, (_, _, _, symptoms, reasons) in zip(got, expected):
+            assert set(r.matching_symptoms) <= symptoms and len(r.matching_symptoms) == min(5, len(symptoms))
+            assert set(r.matching_reasons) <= reasons and len(r.matching_reasons) == min(5, len(reasons))
+        assert response.total_analyzed == len(cases)
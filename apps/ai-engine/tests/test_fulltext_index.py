@@ -0,0 +1,118 @@
+"""
+/cases/list 전문 색인 — 기존 소문자 부분 문자열 스캔과의 일치 테스트.
+"""
+
+import json
+import random
+
+import numpy as np
+
+from app.api.v1 import case_search as module
+from app.services.case_corpus import CaseCorpus, extend_snapshot
+from app.services.fulltext_index import CaseListIndex, FullTextIndex, get_case_list_index
+
+WORDS = ["두통", "요통이 심함", "소시호탕", "Bupleuri 가미", "간기울결", "脾虛", "불면", "ABC", "a", "호전", "완치", "무효"]
+
+
+def _random_cases(n, seed=0):
+    rng = random.Random(seed)
+
+    def text(k):
+        return " ".join(rng.choice(WORDS) for _ in range(rng.randint(0, k)))
+
+    return [
+        {
+            "id": f"c{i}",
+            "title": rng.choice([text(2), None]),
+            "chief_complaint": text(3),
+            "formula_name": rng.choice(["소시호탕", "대시호탕", "Gyeji-tang", ""]),
+            "diagnosis": text(1),
+            "differentiation": rng.choice([text(2), None]),
+            "full_text": text(12),
+            "patient_constitution": rng.choice(["소양인", "태음인", "", None]),
+            "result": rng.choice(["", "호전됨", "완치", "무효 — 경과 관찰", "Improved"]),
+        }
+        for i in range(n)
+    ]
+
+
+def _expected(cases, search=None, constitution=None, outcome=None):
+    """기존 /list 필터"""
+    fields = ("chief_complaint", "formula_name", "diagnosis", "differentiation", "title", "full_text")
+    ids = range(len(cases))
+    if search:
+        ids = [i for i in ids if any(search.lower() in (cases[i].get(f) or "").lower() for f in fields)]
+    if constitution:
+        ids = [i for i in ids if (cases[i].get("patient_constitution") or "") == constitution]
+    if outcome:
+        ids = [i for i in ids if outcome in (cases[i].get("result") or "")]
+    return list(ids)
+
+
+def test_search_matches_substring_scan():
+    cases = _random_cases(500)
+    fields = ("chief_complaint", "formula_name", "diagnosis", "differentiation", "title", "full_text")
+    index = FullTextIndex.build(len(cases), lambda i: [cases[i].get(f) or "" for f in fields])
+    for q in ["", "두", "통", "두통", "통이", "요통이 심", "소시호", "시호탕", "bupleuri", "BUP", "i 가", "脾虛",
+              "a", "abc", " ", "통 소", "없는말", "ㅎ"]:
+        assert index.search(q).tolist() == _expected(cases, search=q), q
+
+
+async def test_filters_combine_and_cache_pages(tmp_path, monkeypatch):
+    cases = _random_cases(300, seed=4)
+    (tmp_path / "all_cases_combined.json").write_text(json.dumps(cases, ensure_ascii=False), encoding="utf-8")
+    corpus = CaseCorpus(data_dir=tmp_path)
+    corpus.load()
+    snap = corpus.snapshot()
+    index = get_case_list_index(snap)
+    assert isinstance(index, CaseListIndex)
+
+    for search, constitution, outcome in [
+        (None, None, None), ("두통", None, None), (None, "소양인", None), (None, None, "호전"),
+        ("소시호탕", "태음인", "완치"), ("ABC", None, "improved"), (None, "없는체질", None), ("시", "소양인", "무효"),
+    ]:
+        ids = index.query(search, constitution, outcome)
+        assert ids.tolist() == _expected(snap.cases, search, constitution, outcome)
+        assert index.query(search, constitution, outcome) is ids
+
+    def no_recompute(*args):
+        raise AssertionError("recomputed")
+
+    monkeypatch.setattr(module, "get_case_corpus", lambda: corpus)
+    expected = _expected(snap.cases, "통", "소양인")
+    pages = []
+    for page in (1, 2, 3):
+        body = await module.list_cases(page=page, limit=7, search="통", constitution="소양인", outcome=None)
+        assert body["total"] == len(expected)
+        assert body["total_pages"] == (len(expected) + 6) // 7
+        pages.extend(c["id"] for c in body["cases"])
+        monkeypatch.setattr(index, "_compute", no_recompute)
+    assert pages == [f"c{i}" for i in expected[:21]]
+    assert np.array_equal(index.query("통", "소양인"), np.asarray(expected))
+
+
+
+def test_extend_matches_full_rebuild_and_keeps_base(tmp_path):
+    cases = _random_cases(2300, seed=7)
+    # 신규 케이스에만 있는 글자도 넣어 새 gram 키가 생기게 한다
+    for case in cases[2100:2200]:
+        case["full_text"] += " 새처방 𝔘"
+    (tmp_path / "all_cases_combined.json").write_text(json.dumps(cases[:2100], ensure_ascii=False), encoding="utf-8")
+    corpus = CaseCorpus(data_dir=tmp_path)
+    corpus.load()
+    base = corpus.snapshot()
+    index = get_case_list_index(base)
+    before = index.query("통", None, "호전")
+
+    snap = extend_snapshot(base, cases[2100:], version=base.version + 1)
+    extended = get_case_list_index(snap)
+    assert extended is not index and extended.snap is snap
+    for search, constitution, outcome in [
+        (None, None, None), ("두통", None, None), ("새처방", None, None), ("𝔘", None, None), ("처방 𝔘", None, None),
+        ("통", "소양인", "호전"), ("ABC", None, "Improved"), ("시호", "태음인", None),
+    ]:
+        assert extended.query(search, constitution, outcome).tolist() == _expected(snap.cases, search, constitution, outcome)
+    # 기존 스냅샷의 색인·캐시는 그대로
+    assert index.text.size == 2100
+    assert index.query("통", None, "호전") is before
+    assert before.tolist() == _expected(base.cases, "통", None, "호전")
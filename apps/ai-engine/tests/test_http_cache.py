@@ -0,0 +1,109 @@
+"""
+수집기 HTTP 캐시 — TTL, ETag 조건부 요청, 폼 본문 키, 오프라인 재생, 재시도 경로.
+"""
+
+import aiohttp
+import pytest
+from aiohttp import web
+
+from app.services.collector import http_cache as http_cache_module, process_pool
+from app.services.collector.adapters.oasis_adapter import OASISAdapter
+from app.services.collector.http_cache import HttpCache
+from app.services.collector.scheduler import CollectorScheduler
+
+DETAIL_HTML = """<html><body><table class="tstyle_view"><caption>소요산 치험례</caption>
+<tr><th>초록</th><td>환자: 45세 여자. 주소증: 불면, 두통. 소요산을 2주간 투여하였다.</td></tr>
+</table></body></html>"""
+
+
+@pytest.fixture
+async def server():
+    hits = []
+
+    async def page(request):
+        form = dict(await request.post()) if request.method == "POST" else {}
+        hits.append((request.method, request.path, request.headers.get("If-None-Match"), form))
+        if request.headers.get("If-None-Match") == '"v1"':
+            return web.Response(status=304)
+        if request.path == "/missing":
+            return web.Response(status=404)
+        word = form.get("q", request.query.get("q", ""))
+        return web.Response(text=f"결과 {word}", headers={"ETag": '"v1"'}, content_type="text/html", charset="utf-8")
+
+    app = web.Application()
+    app.router.add_route("*", "/{tail:.*}", page)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    async with aiohttp.ClientSession() as session:
+        yield f"http://127.0.0.1:{port}", session, hits
+    await runner.cleanup()
+
+
+async def test_ttl_and_conditional_revalidation(tmp_path, server):
+    base, session, hits = server
+    cache = HttpCache(tmp_path, ttls={"search": 60})
+
+    first = await cache.request(session, "GET", f"{base}/s", params={"q": "a"}, kind="search")
+    again = await cache.request(session, "GET", f"{base}/s", params={"q": "a"}, kind="search")
+    assert first.text() == again.text() == "결과 a"
+    assert not first.from_cache and again.from_cache and len(hits) == 1
+
+    # TTL 이 지나면 ETag 로 확인 — 304 면 저장된 본문
+    cache.ttls["search"] = 0
+    revalidated = await cache.request(session, "GET", f"{base}/s", params={"q": "a"}, kind="search")
+    assert revalidated.from_cache and revalidated.text() == "결과 a"
+    assert hits[-1][2] == '"v1"' and len(hits) == 2
+
+    # 200 이 아닌 응답은 저장하지 않는다
+    assert (await cache.request(session, "GET", f"{base}/missing")).status == 404
+    assert await cache.request(session, "GET", f"{base}/missing", offline=True) is None
+
+
+async def test_post_form_is_part_of_key_and_offline_replays(tmp_path, server):
+    base, session, hits = server
+    cache = HttpCache(tmp_path)
+
+    a = await cache.request(session, "POST", f"{base}/search", data={"q": "가"}, kind="search")
+    b = await cache.request(session, "POST", f"{base}/search", data={"q": "나"}, kind="search")
+    assert (a.text(), b.text()) == ("결과 가", "결과 나") and len(hits) == 2
+
+    cache.ttls["search"] = 0
+    replay = await cache.request(None, "POST", f"{base}/search", data={"q": "나"}, kind="search", offline=True)
+    assert replay.text() == "결과 나" and len(hits) == 2
+    assert cache.prune(max_age=-1) == 2 and not list(tmp_path.glob("*/*"))
+
+
+async def test_failed_retry_reparses_cached_detail_offline(tmp_path, monkeypatch):
+    monkeypatch.setattr(process_pool, "PROCESS_WORKERS", 0)
+    cache = HttpCache(tmp_path / "http_cache")
+    monkeypatch.setattr(http_cache_module, "_cache", cache)
+    adapter = OASISAdapter()
+    url = f"{adapter.base_url}{adapter.detail_action}?idx=7&srch_menu_nix={adapter.srch_menu_nix}"
+    key = cache.make_key("POST", url, None, {})
+    cache._store(key, {"status": 200, "url": url, "encoding": "utf-8", "stored_at": 0}, DETAIL_HTML.encode())
+
+    scheduler = CollectorScheduler(enabled=False, data_dir=tmp_path)
+    scheduler.adapters = {"oasis": adapter}
+    seen = []
+
+    async def fake_extract(text, article_dict):
+        seen.append(text)
+        return 0, []
+
+    monkeypatch.setattr(scheduler, "extract_article", fake_extract)
+    scheduler.failed_storage.add_failure(
+        {"article_id": "OASIS:7", "url": url, "source": "oasis"}, "발췌만", "no_cases_extracted"
+    )
+    scheduler.failed_storage.add_failure({"article_id": "OASIS:8", "source": "oasis"}, "캐시 없음", "no_cases_extracted")
+
+    try:
+        result = await scheduler.retry_failed()
+    finally:
+        await adapter.cleanup()
+
+    assert result["attempted"] == 2
+    assert "소요산을 2주간 투여" in seen[0] and seen[1] == "캐시 없음"
+    scheduler.storage.close()
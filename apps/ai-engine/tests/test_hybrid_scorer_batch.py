@@ -0,0 +1,89 @@
+"""
+HybridScorer.score_batch — calculate_score 와의 수치 동등성 테스트.
+"""
+
+import random
+
+import numpy as np
+
+from app.services.hybrid_scorer import HybridScorer
+
+CHIEFS = ["두통", "편두통", "두통 어지러움", "요통", "허리통증", "불면", "Headache", "통", ""]
+SYMPTOMS = ["두통", "머리아픔", "头痛", "어지러움", "현훈", "소화불량", "체함", "요통", "불면증", "기침", "Cough"]
+DIAGNOSES = ["담음두통", "담음", "기허", "간양상항", "", "두통"]
+FORMULAS = ["반하백출천마탕", "보중익기탕", "육군자탕", "향사육군자탕", ""]
+CONSTITUTIONS = ["소음인", "태음인", "소양인", "", None]
+GENDERS = ["M", "F", None, ""]
+AGES = [None, 0, 5, 30, 34, 41, 52, 65, 80, "47"]
+
+
+def _cases(n=400, seed=3):
+    rng = random.Random(seed)
+    return [
+        {
+            "chief_complaint": rng.choice(CHIEFS),
+            "title": rng.choice(CHIEFS) + f" 치험례 {i}",
+            "symptoms": rng.sample(SYMPTOMS, rng.randint(0, 4)),
+            "symptom_keywords": rng.sample(SYMPTOMS, rng.randint(0, 2)),
+            "diagnosis": rng.choice(DIAGNOSES),
+            "formula_name": rng.choice(FORMULAS),
+            "patient_constitution": rng.choice(CONSTITUTIONS),
+            "patient_gender": rng.choice(GENDERS),
+            "patient_age": rng.choice(AGES),
+        }
+        for i in range(n)
+    ]
+
+
+def _queries(n=150, seed=4):
+    rng = random.Random(seed)
+    queries = []
+    for _ in range(n):
+        q = {
+            "chief_complaint": rng.choice(CHIEFS),
+            # 중복 증상도 그대로 (증상 하나당 점수)
+            "symptoms": [rng.choice(SYMPTOMS) for _ in range(rng.randint(0, 3))],
+            "diagnosis": rng.choice(DIAGNOSES + ["음"]),
+            "formula": rng.choice(FORMULAS + ["육군자"]),
+        }
+        if rng.random() < 0.5:
+            q.update(patient_age=rng.choice([None, 33, 60]),
+                     patient_gender=rng.choice(GENDERS),
+                     patient_constitution=rng.choice(CONSTITUTIONS))
+        else:
+            q.update(age=rng.choice([None, 45]), gender="F", constitution="태음인")
+        queries.append(q)
+    return queries
+
+
+def test_score_batch_matches_calculate_score():
+    scorer = HybridScorer()
+    cases = _cases()
+    features = scorer.build_features(cases)
+    rng = random.Random(5)
+
+    for query in _queries():
+        vs = rng.choice([0.5, 0.7, 0.123, 1.0])
+        batch = scorer.score_batch(query, features, vector_similarity=vs)
+        assert batch.ids.tolist() == list(range(len(cases)))
+        for i, case in enumerate(cases):
+            expected = scorer.calculate_score(query, case, vs)
+            assert batch.total[i] == expected.total
+            assert batch.keyword_match[i] == expected.keyword_match
+            assert batch.metadata_match[i] == expected.metadata_match
+            assert batch.vector_similarity[i] == expected.vector_similarity
+            assert scorer._determine_grade(batch.raw_total[i]) == expected.grade
+
+
+def test_score_batch_subset_and_per_case_vector_similarity():
+    scorer = HybridScorer()
+    cases = _cases(60)
+    query = _queries(1)[0]
+    ids = np.array([3, 10, 11, 59])
+    sims = np.array([0.91, 0.5, 0.333, 0.0])
+
+    # dict 목록을 넘기면 즉석에서 피처를 만든다
+    batch = scorer.score_batch(query, cases, vector_similarity=sims, ids=ids)
+    assert batch.ids.tolist() == ids.tolist()
+    for pos, (i, vs) in enumerate(zip(ids.tolist(), sims.tolist())):
+        assert batch.total[pos] == scorer.calculate_score(query, cases[i], vs).total
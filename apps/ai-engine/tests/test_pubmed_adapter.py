@@ -0,0 +1,162 @@
+"""
+PubMed 어댑터 — history server 배치 EFetch, 다음 배치 선요청, 요청 없는 fetch_detail,
+iterparse 스트리밍 파서 (저장된 EFetch 응답 픽스처).
+"""
+
+import time
+from pathlib import Path
+
+import pytest
+from aiohttp import web
+
+from app.services.collector import http_cache as http_cache_module, process_pool, scheduler as scheduler_module
+from app.services.collector.adapters.pubmed_adapter import PubMedAdapter, iter_pubmed_articles
+from app.services.collector.http_cache import HttpCache
+from app.services.collector.scheduler import CollectorScheduler
+
+FIXTURE = Path(__file__).resolve().parent / "fixtures" / "pubmed_efetch.xml"
+PMIDS = [str(n) for n in range(105, 100, -1)]  # 최신순
+
+
+def efetch_xml(pmids):
+    articles = "".join(
+        f"""<PubmedArticle><MedlineCitation><PMID>{pmid}</PMID><Article>
+        <Journal><Title>J Korean Med</Title><JournalIssue><PubDate><Year>2024</Year></PubDate></JournalIssue></Journal>
+        <ArticleTitle>Case {pmid}</ArticleTitle>
+        <Abstract><AbstractText Label="CASE">insomnia {pmid}</AbstractText></Abstract>
+        <AuthorList><Author><LastName>Kim</LastName><ForeName>Min</ForeName></Author></AuthorList>
+        </Article></MedlineCitation></PubmedArticle>"""
+        for pmid in pmids
+    )
+    return f"<?xml version='1.0'?><PubmedArticleSet>{articles}</PubmedArticleSet>"
+
+
+@pytest.fixture
+async def eutils(tmp_path, monkeypatch):
+    monkeypatch.setattr(process_pool, "PROCESS_WORKERS", 0)
+    monkeypatch.setattr(http_cache_module, "_cache", HttpCache(tmp_path / "http_cache"))
+    hits = []
+
+    async def esearch(request):
+        hits.append(("esearch", dict(request.query), time.monotonic()))
+        ids = "".join(f"<Id>{p}</Id>" for p in PMIDS)
+        return web.Response(
+            text=f"<eSearchResult><Count>{len(PMIDS)}</Count><QueryKey>1</QueryKey>"
+            f"<WebEnv>NCID_1</WebEnv><IdList>{ids}</IdList></eSearchResult>",
+            content_type="text/xml",
+        )
+
+    async def efetch(request):
+        hits.append(("efetch", dict(request.query), time.monotonic()))
+        start, size = int(request.query.get("retstart", 0)), int(request.query.get("retmax", 0))
+        return web.Response(text=efetch_xml(PMIDS[start:start + size]), content_type="text/xml")
+
+    app = web.Application()
+    app.router.add_get("/esearch.fcgi", esearch)
+    app.router.add_get("/efetch.fcgi", efetch)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+
+    adapter = PubMedAdapter()
+    adapter.base_url = f"http://127.0.0.1:{port}"
+    adapter.EFETCH_BATCH = 2
+    try:
+        yield adapter, hits
+    finally:
+        await adapter.cleanup()
+        await runner.cleanup()
+
+
+async def test_search_fetches_history_in_batches_and_prefetches_next(eutils, monkeypatch):
+    adapter, hits = eutils
+    parsed_at = []
+    parse = PubMedAdapter._parse_efetch_xml
+
+    def slow_parse(xml):
+        time.sleep(0.2)
+        parsed_at.append(time.monotonic())
+        return parse(xml)
+
+    monkeypatch.setattr(PubMedAdapter, "_parse_efetch_xml", staticmethod(slow_parse))
+
+    infos = [a async for a in adapter.search(["acupuncture"], max_results=10)]
+    assert [a.article_id for a in infos] == [f"PMID:{p}" for p in PMIDS]
+    assert infos[0].title == "Case 105" and infos[0].authors == ["Min Kim"] and infos[0].year == 2024
+
+    searches = [q for kind, q, _ in hits if kind == "esearch"]
+    fetches = [(q, at) for kind, q, at in hits if kind == "efetch"]
+    assert len(searches) == 1 and searches[0]["usehistory"] == "y"
+    assert [q["retstart"] for q, _ in fetches] == ["0", "2", "4"]
+    assert all(q["WebEnv"] == "NCID_1" and q["query_key"] == "1" and "id" not in q for q, _ in fetches)
+    # 두 번째 배치는 첫 배치 파싱이 끝나기 전에 요청된다
+    assert fetches[1][1] < parsed_at[0]
+
+    # 상세는 검색에서 이미 받았다 — 추가 요청 없음
+    before = len(hits)
+    assert adapter.detail_ready("PMID:103")
+    detail = await adapter.fetch_detail("PMID:103")
+    assert detail.full_text == "CASE: insomnia 103" and len(hits) == before
+    assert not adapter.detail_ready("PMID:103")
+
+
+async def test_collection_uses_batched_details_without_per_article_requests(eutils, tmp_path, monkeypatch):
+    adapter, hits = eutils
+    seen = []
+    monkeypatch.setattr(scheduler_module, "_extract_article", lambda text, info: seen.append(text) or (1, []))
+    scheduler = CollectorScheduler(enabled=False, data_dir=tmp_path, request_delay=5)
+    scheduler.adapters = {"pubmed": adapter}
+
+    started = time.monotonic()
+    result = await scheduler.run_collection(sources=["pubmed"], keywords=["acupuncture"], max_articles=10)
+
+    # request_delay=5 초 간격이 적용되지 않았고 논문별 EFetch 도 없다
+    assert time.monotonic() - started < 5
+    assert result["statistics"]["articles_fetched"] == len(PMIDS)
+    assert sorted(seen) == sorted(f"CASE: insomnia {p}" for p in PMIDS)
+    assert all("id" not in q for kind, q, _ in hits if kind == "efetch")
+    scheduler.storage.close()
+
+
+async def test_batched_articles_are_cached_for_offline_retry(eutils):
+    adapter, hits = eutils
+    [a async for a in adapter.search(["acupuncture"], max_results=10)]
+
+    # 실패 큐 재시도는 새 어댑터로 offline 상세 조회 — 배치로 받은 본문이 PMID 키로 남아 있다
+    retry = PubMedAdapter()
+    retry.base_url = adapter.base_url
+    before = len(hits)
+    try:
+        detail = await retry.fetch_detail("PMID:103", offline=True)
+        assert detail.article_id == "PMID:103" and detail.full_text == "CASE: insomnia 103"
+        assert await retry.fetch_detail("PMID:999", offline=True) is None
+    finally:
+        await retry.cleanup()
+    assert len(hits) == before
+
+
+def test_stream_parser_reads_saved_efetch_response():
+    first, second, third = iter_pubmed_articles(FIXTURE.read_bytes())
+
+    assert first.article_id == "PMID:38412345" and first.url == "https://pubmed.ncbi.nlm.nih.gov/38412345/"
+    assert first.title == "Treatment of chronic insomnia with Gamisoyo-san: a case report."
+    assert first.authors == ["Min-Ji Kim", "Jae-Hoon Lee"]
+    assert (first.journal, first.year, first.doi) == ("Journal of Korean Medicine", 2024, "10.13048/jkm.24001")
+    assert first.full_text.splitlines()[0] == "INTRODUCTION: Insomnia is common in perimenopausal women."
+    assert first.keywords == [
+        "Gamisoyo-san", "insomnia", "Sleep Initiation and Maintenance Disorders", "Medicine, Korean Traditional",
+    ]
+
+    assert second.year is None and second.doi is None and "(p<0.05 not tested)" in second.abstract
+    assert third.title.startswith("Herbal medicine for functional dyspepsia with H2-blocker")
+    assert third.authors == ["Eun & Ha Choi"] and third.abstract == "" and third.doi == "10.1016/j.imr.2023.101"
+
+
+def test_stream_parser_keeps_articles_before_malformed_tail():
+    xml = FIXTURE.read_text(encoding="utf-8")
+    truncated = xml[: xml.index("<PMID Version=\"1\">38376543")]
+    assert [d.article_id for d in iter_pubmed_articles(truncated)] == ["PMID:38412345", "PMID:38398765"]
+    assert PubMedAdapter._parse_detail_xml(FIXTURE.read_bytes(), "1").article_id == "PMID:1"
+    assert PubMedAdapter._parse_detail_xml(b"<PubmedArticleSet/>", "1") is None
@@ -0,0 +1,133 @@
+"""
+추가 전용 세그먼트 로그 + CaseStorage 승인 로그 테스트.
+"""
+
+import json
+import os
+
+from app.services import case_log, segment_log
+from app.services.case_corpus import CaseCorpus
+from app.services.collector.storage.case_storage import CaseStorage
+from app.services.segment_log import SegmentLog, list_segments, read_values
+
+
+def _case(i, **extra):
+    return {"id": f"c{i}", "formula_name": "소시호탕", "symptoms": ["두통"], "confidence_score": 0.5, **extra}
+
+
+def test_replay_rotation_compaction_and_torn_tail(tmp_path, monkeypatch):
+    syncs = []
+    real_fsync = os.fsync
+    monkeypatch.setattr(segment_log.os, "fsync", lambda fd: (syncs.append(fd), real_fsync(fd)))
+
+    log = SegmentLog(tmp_path / "kv", segment_bytes=200, fsync_interval=60, fsync_batch=5)
+    log.put_many((f"k{i}", {"n": i}) for i in range(3))
+    assert syncs == []  # 배치 미만 — 타이머에 맡김
+    log.put("k1", {"n": 10})
+    assert log.delete_many(["k0", "없음"]) == 1
+    for i in range(3, 12):
+        log.put(f"k{i}", {"n": i, "pad": "가" * 10})
+    assert len(list_segments(log.directory)) > 1
+    assert syncs  # 배치/회전 시 fsync
+    expected = {k: log.get(k) for k in log.keys()}
+    assert list(expected) == ["k1", "k2"] + [f"k{i}" for i in range(3, 12)]
+    assert log.garbage == 3
+    log.close()
+
+    # 재생 + 잘린 꼬리 + 압축 중 남은 임시 파일
+    last = log.directory / f"seg-{list_segments(log.directory)[-1]:06d}.jsonl"
+    with open(last, "ab") as f:
+        f.write(b'{"k":"k99","v":{"n"')
+    (log.directory / "seg-999999.tmp").write_bytes(b'{"c":1}\n')
+    log = SegmentLog(tmp_path / "kv", segment_bytes=200)
+    assert dict(log.items()) == expected
+    assert not list(log.directory.glob("*.tmp"))
+    assert read_values(log.directory) == list(expected.values())
+
+    log.compact()
+    assert len(list_segments(log.directory)) == 1 and log.garbage == 0
+    log.put("k2", {"n": 20})
+    log.close()
+    log = SegmentLog(tmp_path / "kv")
+    assert log.get("k2") == {"n": 20} and log.get("k0") is None and len(log) == len(expected)
+    assert read_values(log.directory)[1] == {"n": 20}  # 덮어쓰기는 원래 순서 유지
+
+    entries = SegmentLog(tmp_path / "logs", keyed=False, segment_bytes=100)
+    entries.append_many({"i": i} for i in range(30))
+    entries.compact(keep_last=5)
+    entries.append({"i": 30})
+    assert entries.values(-3) == [{"i": 28}, {"i": 29}, {"i": 30}]
+    entries.close()
+    assert read_values(tmp_path / "logs", keyed=False) == [{"i": i} for i in range(25, 31)]
+
+
+def test_storage_appends_without_rewriting_combined_file(tmp_path, monkeypatch):
+    combined = tmp_path / "all_cases_combined.json"
+    combined.write_text(json.dumps([_case(i) for i in range(5)], ensure_ascii=False, indent=2), encoding="utf-8")
+    (tmp_path / "collector").mkdir()
+    (tmp_path / "collector" / "pending_cases.json").write_text(json.dumps([_case(5)]), encoding="utf-8")
+    original = combined.read_bytes()
+
+    corpus = CaseCorpus(data_dir=tmp_path)
+    corpus.load()
+    monkeypatch.setattr("app.services.collector.storage.case_storage.get_case_corpus", lambda: corpus)
+    storage = CaseStorage(data_dir=tmp_path)
+    assert (tmp_path / "collector" / "pending_cases.json.migrated").exists()
+
+    storage.add_to_pending([_case(i) for i in range(6, 12)])
+    assert storage.pending_count() == 7
+    assert [c["id"] for c in storage.load_pending_cases(2, 3)] == ["c7", "c8", "c9"]
+    assert storage.approve_cases(["c5", "c9", "c9", "없음"]) == 2
+    assert storage.reject_cases(["c6", "c9"]) == 1
+    assert [c["id"] for c in storage.load_pending_cases()] == ["c7", "c8", "c10", "c11"]
+    assert combined.read_bytes() == original
+
+    snap = corpus.snapshot()
+    assert [c["id"] for c in snap.cases] == [f"c{i}" for i in range(6)] + ["c9"]
+    assert [c["id"] for c in storage.load_existing_cases()] == [c["id"] for c in snap.cases]
+    for i in range(20):
+        storage.log_collection({"run": i})
+    assert storage.get_collection_logs(3) == [{"run": 17}, {"run": 18}, {"run": 19}]
+    storage.close()
+
+    # 다른 프로세스(새 코퍼스)도 통합 파일 + 승인 로그를 본다
+    fresh = CaseCorpus(data_dir=tmp_path)
+    assert [c["id"] for c in fresh.load().cases] == [c["id"] for c in snap.cases]
+    assert fresh.snapshot().cases[6]["approved_at"]
+
+
+def test_fold_merges_log_and_recovers_interrupted_fold(tmp_path, monkeypatch):
+    combined = tmp_path / "all_cases_combined.json"
+    combined.write_text(json.dumps([_case(i) for i in range(3)], ensure_ascii=False, indent=2), encoding="utf-8")
+    monkeypatch.setattr("app.services.collector.storage.case_storage.get_case_corpus", lambda: CaseCorpus(tmp_path))
+    storage = CaseStorage(data_dir=tmp_path)
+    storage.add_to_pending([_case(i) for i in range(3, 9)])
+    storage.approve_cases(["c3", "c4"])
+
+    assert case_log.fold_approved(combined, storage.approved) == 2
+    assert [c["id"] for c in json.loads(combined.read_text(encoding="utf-8"))] == ["c0", "c1", "c2", "c3", "c4"]
+    assert len(storage.approved) == 0 and not case_log.fold_marker_path(combined).exists()
+
+    # 교체 후 세그먼트 삭제 전에 중단된 병합: 읽는 쪽은 중복 없이, 다시 연 쪽은 정리
+    storage.approve_cases(["c5", "c6"])
+    with monkeypatch.context() as m:
+        m.setattr(storage.approved, "drop_segments", lambda segments: None)
+        m.setattr(case_log.Path, "unlink", lambda self, missing_ok=False: None)
+        case_log.fold_approved(combined, storage.approved)
+    assert case_log.fold_marker_path(combined).exists()
+    storage.approve_cases(["c7"])
+    storage.close()
+
+    ids = ["c0", "c1", "c2", "c3", "c4", "c5", "c6", "c7"]
+    assert [c["id"] for c in CaseCorpus(data_dir=tmp_path).load().cases] == ids
+    storage = CaseStorage(data_dir=tmp_path)
+    assert [c["id"] for c in storage.approved.values()] == ["c7"]
+    assert [c["id"] for c in storage.load_existing_cases()] == ids
+    assert storage.load_pending_cases()[0]["id"] == "c8"
+
+    # 빈 통합 파일에도 병합
+    combined.write_text("[]", encoding="utf-8")
+    storage.FOLD_THRESHOLD = 1
+    storage.compact()
+    assert [c["id"] for c in json.loads(combined.read_text(encoding="utf-8"))] == ["c7"]
+    assert len(storage.approved) == 0
@@ -0,0 +1,116 @@
+"""
+로컬 벡터 검색 — 인코더 결정성 / IVF 재현율 / 필터 / memmap 저장·로드 테스트.
+"""
+
+import json
+import random
+
+import numpy as np
+import pytest
+
+from app.services import vector_service as vs_module
+from app.services.case_corpus import CaseCorpus
+from app.services.local_encoder import HashingEncoder, case_embedding_text
+from app.services.vector_index import IVFFlatIndex
+from app.services.vector_service import VectorService
+
+SYMPTOMS = ["두통", "어지러움", "소화불량", "요통", "불면", "기침", "피로", "복통", "이명", "부종",
+            "반신마비", "언어장애", "식욕부진", "변비", "설사", "한출"]
+FORMULAS = ["반하백출천마탕", "보중익기탕", "육군자탕", "소속명탕", "귀비탕"]
+CONSTITUTIONS = ["소음인", "태음인", "소양인", ""]
+
+
+def _cases(n=800, seed=11):
+    rng = random.Random(seed)
+    cases = []
+    for i in range(n):
+        symptoms = rng.sample(SYMPTOMS, rng.randint(2, 5))
+        cases.append({
+            "id": f"case-{i}",
+            "title": f"{symptoms[0]} 치험례",
+            "chief_complaint": symptoms[0],
+            "symptoms": symptoms,
+            "formula_name": rng.choice(FORMULAS),
+            "patient_constitution": rng.choice(CONSTITUTIONS),
+        })
+    return cases
+
+
+def _build(cases, **kwargs):
+    encoder = HashingEncoder(dim=256)
+    texts = [case_embedding_text(c) for c in cases]
+    idf = encoder.fit_idf(texts)
+    vectors = encoder.encode(texts)
+    index = IVFFlatIndex.build(vectors, [c["id"] for c in cases], cases,
+                               meta={"encoder": {"idf": idf.tolist()}}, **kwargs)
+    return encoder, vectors, index
+
+
+def test_encoder_is_deterministic_and_normalized():
+    a = HashingEncoder(dim=128).encode(["주소증: 두통\n증상: 두통, 어지러움", ""])
+    b = HashingEncoder(dim=128).encode(["주소증: 두통\n증상: 두통, 어지러움", ""])
+    assert np.array_equal(a, b)
+    assert np.isclose(np.linalg.norm(a[0]), 1.0)
+    assert not a[1].any()  # 빈 텍스트는 0 벡터
+
+
+def test_ivf_recall_against_exact_search():
+    cases = _cases()
+    _, vectors, index = _build(cases, nlist=32)
+    hit = total = 0
+    for q in vectors[::20]:
+        exact = {cid for cid, _ in index.exact_search(q, 10)}
+        approx = {cid for cid, _ in index.search(q, 10, nprobe=8)}
+        hit += len(exact & approx)
+        total += len(exact)
+    assert hit / total >= 0.8
+    # 전체 리스트 탐색이면 정확 검색과 같은 점수
+    q = vectors[0]
+    assert [s for _, s in index.search(q, 5, nprobe=32)] == pytest.approx(
+        [s for _, s in index.exact_search(q, 5)])
+
+
+def test_filter_eq_and_and():
+    cases = _cases()
+    encoder, vectors, index = _build(cases, nlist=16)
+    by_id = {c["id"]: c for c in cases}
+    q = encoder.encode_one("증상: 두통, 어지러움")
+
+    hits = index.search(q, 20, filter_dict={"patient_constitution": {"$eq": "태음인"}})
+    assert hits and all(by_id[cid]["patient_constitution"] == "태음인" for cid, _ in hits)
+
+    flt = {"$and": [{"patient_constitution": {"$eq": "소음인"}}, {"formula_name": {"$eq": "귀비탕"}}]}
+    hits = index.search(q, 50, filter_dict=flt)
+    expected = [c for c in cases if c["patient_constitution"] == "소음인" and c["formula_name"] == "귀비탕"]
+    assert len(hits) == min(50, len(expected))
+    assert all(by_id[cid]["formula_name"] == "귀비탕" for cid, _ in hits)
+
+    assert index.search(q, 10, filter_dict={"formula_name": {"$eq": "없는처방"}}) == []
+    with pytest.raises(ValueError):
+        index.search(q, 10, filter_dict={"formula_name": {"$in": ["귀비탕"]}})
+
+
+async def test_vector_service_uses_memmapped_index(tmp_path, monkeypatch):
+    cases = _cases(200)
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    (data_dir / "all_cases_combined.json").write_text(json.dumps(cases, ensure_ascii=False), encoding="utf-8")
+    corpus = CaseCorpus(data_dir)
+    monkeypatch.setattr(vs_module, "get_case_corpus", lambda: corpus)
+
+    _, _, index = _build(cases, nlist=8)
+    index.save(tmp_path / "vector_index")
+
+    service = VectorService(index_dir=tmp_path / "vector_index")
+    assert isinstance(service.index.vectors, np.memmap)
+
+    results = await service.search("주소증: 반신마비\n증상: 반신마비, 언어장애",
+                                   filter_dict={"formula_name": {"$eq": "소속명탕"}}, top_k=5)
+    assert results
+    for r in results:
+        assert 0.0 <= r["score"] <= 1.0
+        assert r["metadata"]["formula_name"] == "소속명탕"
+        assert r["metadata"]["id"] == r["id"]
+    assert "반신마비" in results[0]["metadata"]["symptoms"]
+
+    assert VectorService(index_dir=tmp_path / "missing").index is None